@@ -1,10 +1,52 @@
-from .exceptions import AlphasecAPIError
-from .transaction.utils import load_config
-from .transaction.sign import AlphasecSigner
-from .agent import Agent
-from .async_agent import AsyncAgent
-from .api.api import API
-from .api.async_api import AsyncAPI
-from .websocket.ws import WebsocketManager
-from .websocket.async_ws import AsyncWebsocketManager
-from .perp import decode_perp_event, PerpEvent, PerpAgent, AsyncPerpAgent
\ No newline at end of file
+"""AlphaSec DEX Python SDK.
+
+Public names are imported lazily (PEP 562) so ``import alphasec`` stays cheap:
+each one is loaded on first attribute access, e.g. ``from alphasec import
+AlphasecSigner`` does not import the HTTP clients or WebSocket managers.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any
+
+# Public name -> defining module (relative to this package).
+_LAZY_EXPORTS = {
+    "AlphasecAPIError": ".exceptions",
+    "load_config": ".transaction.utils",
+    "AlphasecSigner": ".transaction.sign",
+    "Agent": ".agent",
+    "AsyncAgent": ".async_agent",
+    "API": ".api.api",
+    "AsyncAPI": ".api.async_api",
+    "WebsocketManager": ".websocket.ws",
+    "AsyncWebsocketManager": ".websocket.async_ws",
+    "decode_perp_event": ".perp.ws",
+    "PerpEvent": ".perp.ws",
+    "PerpAgent": ".perp.agent",
+    "AsyncPerpAgent": ".perp.async_agent",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+if TYPE_CHECKING:
+    from .exceptions import AlphasecAPIError
+    from .transaction.utils import load_config
+    from .transaction.sign import AlphasecSigner
+    from .agent import Agent
+    from .async_agent import AsyncAgent
+    from .api.api import API
+    from .api.async_api import AsyncAPI
+    from .websocket.ws import WebsocketManager
+    from .websocket.async_ws import AsyncWebsocketManager
+    from .perp import decode_perp_event, PerpEvent, PerpAgent, AsyncPerpAgent
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -10,9 +10,11 @@ import logging
 # logging.basicConfig(level=logging.DEBUG)
 
 class Agent:
-    def __init__(self, base_url: str, signer: Optional[AlphasecSigner] = None, timeout: Optional[int] = None):
-        self.api = API(base_url, timeout=timeout, signer=signer)
-        self.ws = WebsocketManager(base_url)
+    def __init__(self, base_url: str, signer: Optional[AlphasecSigner] = None, timeout: Optional[int] = None, **api_options: Any):
+        # api_options are forwarded to API (e.g. cache=, metadata_cache=).
+        self.api = API(base_url, timeout=timeout, signer=signer, **api_options)
+        self.ws = WebsocketManager(
+            base_url, endpoints=api_options.get("endpoints"), metrics=api_options.get("metrics"))
         self.perp = PerpAgent(self)
 
     # WebSocket lifecycle
@@ -1,10 +1,12 @@
 from typing import Literal
 from eth_utils.address import is_address, to_checksum_address
 import requests
+import requests.adapters
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from eth_account import Account
 import time
-import web3
 
 from alphasec.api.constants import ALPHASEC_KAIROS_URL, ALPHASEC_MAINNET_URL, KAIROS_URL, MAINNET_URL, BUY, SELL, LIMIT, MARKET, BASE_MODE, QUOTE_MODE
 from alphasec.transaction.constants import (
@@ -13,15 +15,36 @@ from alphasec.transaction.constants import (
     DexCommandSessionDelete,
 )
 from alphasec.exceptions import AlphasecAPIError
+from alphasec.api.cache import ResponseCache
+from alphasec.api.metadata_cache import MetadataCache
+from alphasec.api.endpoints import EndpointPool
+from alphasec.api.ratelimit import RateLimiter, classify
+from alphasec.api.retry import RETRY_STATUSES, RetryPolicy, transport_errors
+from alphasec.api.tracing import Trace, Tracer, response_outcome
+from alphasec.metrics import MetricsRegistry, sdk_metrics
 from alphasec.transaction.sign import AlphasecSigner
-from alphasec.transaction.utils import normalize_price_quantity, resolve_spot_order_price_quantity
+from alphasec.transaction.utils import NonceClock, normalize_price_quantity, resolve_spot_order_price_quantity
 
 from .utils import market_to_market_id, _clean_params, split_base_quote_token
 
 class API:
-    def __init__(self, url: str, timeout: int = None, signer: AlphasecSigner = None):
+    def __init__(self, url: str, timeout: int = None, signer: AlphasecSigner = None, cache: ResponseCache = None,
+                 metadata_cache: MetadataCache = None, pool_connections: int = 10, pool_maxsize: int = 10,
+                 connect_timeout: float = None, read_timeout: float = None, rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None, endpoints: EndpointPool = None, tracer: Tracer = None,
+                 metrics: MetricsRegistry = None):
+        # pool_connections: hosts kept in the pool; pool_maxsize: connections per host.
+        # Raise pool_maxsize to the number of threads submitting concurrently.
+        # connect_timeout / read_timeout override `timeout` per phase.
         self.url = url
         self.session = requests.Session()
+        if (pool_connections, pool_maxsize) != (10, 10):   # requests' default adapter is 10/10
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        if connect_timeout is not None or read_timeout is not None:
+            timeout = (timeout if connect_timeout is None else connect_timeout,
+                       timeout if read_timeout is None else read_timeout)
         self.timeout = timeout
         self.session.headers.update({"Content-Type": "application/json"})
         self._logger = logging.getLogger(__name__)
@@ -30,12 +53,43 @@ class API:
         self.token_id_address_map = {}
         self.token_id_decimals_map = {}
         self.signer = signer
+        # Optional TTL cache for reference-data GETs (see alphasec/api/cache.py).
+        self.cache = cache
+        # Optional on-disk token/perp-market metadata (see alphasec/api/metadata_cache.py).
+        self.metadata_cache = metadata_cache
+        self._revalidate_thread = None
+        # Optional client-side throttle; may be shared with other clients.
+        self.rate_limiter = rate_limiter
+        # Optional resend-on-transport-failure policy (see alphasec/api/retry.py).
+        self.retry_policy = retry_policy
+        # Optional multi-endpoint routing and failover (see alphasec/api/endpoints.py).
+        self.endpoints = endpoints
+        # Optional per-stage timing of signed submits (see alphasec/api/tracing.py).
+        self.tracer = tracer
+        # Optional Prometheus-style metrics (see alphasec/metrics.py).
+        self.metrics = metrics
+        self._metrics = sdk_metrics(metrics) if metrics is not None else None
+        if self._metrics is not None:
+            if cache is not None:
+                self._metrics.watch_cache(cache)
+            if rate_limiter is not None:
+                self._metrics.watch_rate_limiter(rate_limiter)
+            if endpoints is not None:
+                self._metrics.watch_endpoints(endpoints)
+        # One nonce source for every signed submit, so no two transactions share a nonce.
+        self._nonces = NonceClock()
         self._initialized = False
 
+    @property
+    def metadata_key(self) -> str:
+        return MetadataCache.key(self.url, getattr(self.signer, "network", None))
+
     def _ensure_initialized(self) -> None:
         # Lazy token-metadata load; mirrors AsyncAPI._ensure_initialized.
         if self._initialized:
             return
+        if self.metadata_cache is not None and self._seed_from_metadata_cache():
+            return
         maps = self.map_token_metadata()
         # Don't latch an empty map: retry on the next call.
         if maps[0]:
@@ -43,16 +97,66 @@ class API:
              self.token_id_address_map, self.token_id_decimals_map) = maps
             self._initialized = True
 
+    def warmup(self, connections: int = 1, path: str = "/api/v1/market") -> float:
+        """Open ``connections`` pooled connections ahead of the first order.
+
+        Issues that many concurrent GETs to ``path`` so the TCP/TLS handshakes
+        happen now. Response bodies and status codes are ignored, transport
+        errors are raised. With ``endpoints``, every endpoint in the pool is
+        warmed. Returns the elapsed seconds.
+        """
+        bases = self.endpoints.urls if self.endpoints is not None else [self.url]
+        urls = [base + path for base in bases for _ in range(connections)]
+        started = time.perf_counter()
+        if len(urls) == 1:
+            self.session.get(urls[0], timeout=self.timeout)
+        else:
+            with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+                futures = [pool.submit(self.session.get, url, timeout=self.timeout) for url in urls]
+                for future in futures:
+                    future.result()
+        return time.perf_counter() - started
+
     def initialize(self) -> None:
         """Eagerly load token metadata (fail-fast). Optional; methods lazy-init otherwise."""
         self._ensure_initialized()
 
+    def _seed_from_metadata_cache(self) -> bool:
+        """Load token maps from disk and revalidate them in a background thread."""
+        tokens = self.metadata_cache.get(self.metadata_key, "tokens")
+        if not tokens:
+            return False
+        (self.token_id_symbol_map, self.symbol_token_id_map,
+         self.token_id_address_map, self.token_id_decimals_map) = self._token_maps(tokens)
+        self._initialized = True
+        self._revalidate_thread = threading.Thread(
+            target=self._revalidate_token_metadata, name="alphasec-metadata", daemon=True)
+        self._revalidate_thread.start()
+        return True
+
+    def _revalidate_token_metadata(self) -> None:
+        try:
+            maps = self.map_token_metadata()
+        except Exception as exc:
+            self._logger.warning(f"token metadata revalidation failed: {exc!r}")
+            return
+        if maps[0]:
+            # Single assignment: readers see either the old or the new maps.
+            (self.token_id_symbol_map, self.symbol_token_id_map,
+             self.token_id_address_map, self.token_id_decimals_map) = maps
+
     def map_token_metadata(self):
+        tokens = self.get_tokens()
+        if self.metadata_cache is not None and tokens:
+            self.metadata_cache.put(self.metadata_key, "tokens", tokens)
+        return self._token_maps(tokens)
+
+    @staticmethod
+    def _token_maps(tokens):
         token_id_symbol_map = {}
         symbol_token_id_map = {}
         token_id_address_map = {}
         token_id_decimals_map = {}
-        tokens = self.get_tokens()
         for token in tokens:
             token_id_symbol_map[token['tokenId']] = token['l2Symbol']
             symbol_token_id_map[token['l2Symbol']] = token['tokenId']
@@ -62,31 +166,33 @@ class API:
 
     def get(self, path: str, params: dict = None):
         self._ensure_initialized()
-        response = self.session.get(self.url + path, params=params, timeout=self.timeout)
-        try:
-            return response.json()
-        except ValueError:
-            raise AlphasecAPIError(f"Could not parse JSON response: {response.text[:200]}")
+        if self.cache is not None:
+            return self.cache.get_or_fetch(path, params, lambda: self._get(path, params))
+        return self._get(path, params)
+
+    def _get(self, path: str, params: dict = None):
+        return self._request("GET", path, params)
 
     def post(self, path: str, params: dict = None):
         self._ensure_initialized()
-        response = self.session.post(self.url + path, json=params, timeout=self.timeout)
-        try:
-            return response.json()
-        except ValueError:
-            raise AlphasecAPIError(f"Could not parse JSON response: {response.text[:200]}")
+        return self._request("POST", path, params)
 
     def put(self, path: str, params: dict = None):
         self._ensure_initialized()
-        response = self.session.put(self.url + path, json=params, timeout=self.timeout)
-        try:
-            return response.json()
-        except ValueError:
-            raise AlphasecAPIError(f"Could not parse JSON response: {response.text[:200]}")
+        return self._request("PUT", path, params)
 
     def delete(self, path: str, params: dict = None):
         self._ensure_initialized()
-        response = self.session.delete(self.url + path, json=params, timeout=self.timeout)
+        return self._request("DELETE", path, params)
+
+    def _request(self, method: str, path: str, params: dict = None):
+        # Single choke point for every request (rate limiting and the
+        # per-request policies layered on top of it).
+        if self.retry_policy is not None and self.retry_policy.applies(method, params):
+            # Resends the identical body (same signed tx); never re-signs.
+            response = self.retry_policy.run(lambda: self._send(method, path, params))
+        else:
+            response = self._send(method, path, params)
         try:
             return response.json()
         except ValueError:
@@ -120,18 +226,82 @@ class API:
         return self._extract_result(response)
 
     def get_tokens(self):
-        # Direct session.get (NOT self.get) so token-metadata load does not
+        # Direct _send (NOT self.get) so token-metadata load does not
         # re-enter _ensure_initialized. Mirrors AsyncAPI.get_tokens.
-        response = self.session.get(self.url + "/api/v1/market/tokens", timeout=self.timeout)
-        try:
-            payload = response.json()
-        except ValueError:
-            raise AlphasecAPIError("Failed to fetch token metadata: non-JSON response")
+        if self.cache is not None:
+            payload = self.cache.get_or_fetch("/api/v1/market/tokens", None, self._fetch_tokens)
+        else:
+            payload = self._fetch_tokens()
         if "result" not in payload:
             raise AlphasecAPIError(
                 f"Failed to fetch token metadata: {str(payload.get('error', payload))[:200]}")
         return payload["result"]
 
+    def _send(self, method: str, path: str, params: dict = None):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(classify(method, path))
+        if self.endpoints is None:
+            return self._send_to(self.url, method, path, params)
+        # Idempotent requests fail over with the identical body; others go once.
+        failover = method == "GET" or (isinstance(params, dict) and "tx" in params)
+        candidates = self.endpoints.ordered() if failover else [self.endpoints.best()]
+        errors = transport_errors()
+        for i, base in enumerate(candidates):
+            last = i + 1 == len(candidates)
+            started = time.perf_counter()
+            try:
+                response = self._send_to(base, method, path, params)
+            except errors:
+                self.endpoints.report_failure(base)
+                if last:
+                    raise
+                continue
+            if getattr(response, "status_code", None) in RETRY_STATUSES:
+                self.endpoints.report_failure(base)
+                if not last:
+                    continue
+            else:
+                self.endpoints.report(base, time.perf_counter() - started)
+            return response
+
+    def _send_to(self, base: str, method: str, path: str, params: dict = None):
+        if self._metrics is None:
+            return self._send_http(base, method, path, params)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = self._send_http(base, method, path, params)
+            status = getattr(response, "status_code", "error")
+            return response
+        finally:
+            self._metrics.request(method, path, status, time.perf_counter() - started)
+
+    def _send_http(self, base: str, method: str, path: str, params: dict = None):
+        send = getattr(self.session, method.lower())
+        if method == "GET":
+            return send(base + path, params=params, timeout=self.timeout)
+        return send(base + path, json=params, timeout=self.timeout)
+
+    def _submit_tx(self, path: str, tx: str, trace: Trace = None):
+        # POST a signed tx; with a trace, time the round trip and finish it.
+        if trace is None:
+            return self.post(path, params={"tx": tx})
+        try:
+            response = self.post(path, params={"tx": tx})
+        except BaseException as exc:
+            self.tracer.finish(trace, error=repr(exc))
+            raise
+        trace.mark("submit")
+        self.tracer.finish(trace, *response_outcome(response))
+        return response
+
+    def _fetch_tokens(self):
+        response = self._send("GET", "/api/v1/market/tokens")
+        try:
+            return response.json()
+        except ValueError:
+            raise AlphasecAPIError("Failed to fetch token metadata: non-JSON response")
+
     def get_trades(self, market: str, limit: int = 100):
         self._ensure_initialized()
         market_id = market_to_market_id(market, self.symbol_token_id_map)
@@ -272,7 +442,7 @@ class API:
             raise ValueError("Only read-only API is available when signer is not set")
 
         # nonce and expiry is not used in blockchain side
-        nonce = int(time.time() * 1000) # dummy
+        nonce = self._nonces.next() # dummy
         expiry = int(time.time() * 1000) + 3600 # dummy
 
         data = self.signer.create_session_data(DexCommandSessionDelete, session_wallet.address, nonce, expiry)
@@ -291,7 +461,7 @@ class API:
             raise ValueError("Only read-only API is available when signer is not set")
 
         data = self.signer.create_value_transfer_data(to, value)
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
         response = self.post(f"/api/v1/wallet/transfer", params={
             "tx": tx,
         })
@@ -307,7 +477,7 @@ class API:
 
         self._ensure_initialized()
         data = self.signer.create_token_transfer_data(to, value, self.symbol_token_id_map[token])
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
         response = self.post(f"/api/v1/wallet/transfer", params={
             "tx": tx,
         })
@@ -322,13 +492,18 @@ class API:
             raise ValueError("Only read-only API is available when signer is not set")
 
         self._ensure_initialized()
+        trace = self.tracer.start("order", market=market) if self.tracer is not None else None
         base_token, quote_token = split_base_quote_token(market, self.symbol_token_id_map)
         normalized_price, adjusted_quantity = resolve_spot_order_price_quantity(order_type == MARKET, price, quantity)
+        if trace is not None:
+            trace.mark("normalize")
         data = self.signer.create_order_data(base_token, quote_token, side, normalized_price, adjusted_quantity, order_type, order_mode, tp_limit, sl_trigger, sl_limit)
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
-        response = self.post(f"/api/v1/order", params={
-            "tx": tx,
-        })
+        if trace is not None:
+            trace.mark("build")
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
+        if trace is not None:
+            trace.mark("sign")
+        response = self._submit_tx("/api/v1/order", tx, trace)
         return {
             "status": response['code'] == 200,
             "error": response['errMsg'],
@@ -339,11 +514,14 @@ class API:
         if self.signer is None:
             raise ValueError("Only read-only API is available when signer is not set")
 
+        trace = self.tracer.start("cancel") if self.tracer is not None else None
         data = self.signer.create_cancel_data(order_id)
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
-        response = self.post(f"/api/v1/order/cancel", params={
-            "tx": tx,
-        })
+        if trace is not None:
+            trace.mark("build")
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
+        if trace is not None:
+            trace.mark("sign")
+        response = self._submit_tx("/api/v1/order/cancel", tx, trace)
         return {
             "status": response['code'] == 200,
             "error": response['errMsg'],
@@ -354,11 +532,14 @@ class API:
         if self.signer is None:
             raise ValueError("Only read-only API is available when signer is not set")
 
+        trace = self.tracer.start("cancel_all") if self.tracer is not None else None
         data = self.signer.create_cancel_all_data()
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
-        response = self.post(f"/api/v1/order/cancel/all", params={
-            "tx": tx,
-        })
+        if trace is not None:
+            trace.mark("build")
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
+        if trace is not None:
+            trace.mark("sign")
+        response = self._submit_tx("/api/v1/order/cancel/all", tx, trace)
         return {
             "status": response['code'] == 200,
             "error": response['errMsg'],
@@ -371,12 +552,17 @@ class API:
 
         if new_price is None or new_qty is None:
             raise ValueError("new_price and new_qty are required")
+        trace = self.tracer.start("modify") if self.tracer is not None else None
         normalized_price, normalized_quantity = normalize_price_quantity(new_price, new_qty)
+        if trace is not None:
+            trace.mark("normalize")
         data = self.signer.create_modify_data(order_id, normalized_price, normalized_quantity, order_mode)
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
-        response = self.post(f"/api/v1/order/modify", params={
-            "tx": tx,
-        })
+        if trace is not None:
+            trace.mark("build")
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
+        if trace is not None:
+            trace.mark("sign")
+        response = self._submit_tx("/api/v1/order/modify", tx, trace)
         return {
             "status": response['code'] == 200,
             "error": response['errMsg'],
@@ -398,7 +584,7 @@ class API:
         normalized_price, normalized_quantity = normalize_price_quantity(price, quantity)
         normalized_stop_price, _ = normalize_price_quantity(stop_price, quantity)
         data = self.signer.create_stop_order_data(base_token, quote_token, normalized_stop_price, normalized_price, normalized_quantity, side, order_type, order_mode)
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
         response = self.post(f"/api/v1/order/trigger", params={
             "tx": tx,
         })
@@ -418,13 +604,14 @@ class API:
         token_id = self.symbol_token_id_map[symbol]
         token_l1_address = self.token_id_address_map.get(token_id)
 
+        import web3  # deferred: web3 is slow to import and only needed here
         l2_provider = None
         if self.signer.network == "mainnet":
             l2_provider = web3.Web3(web3.HTTPProvider(ALPHASEC_MAINNET_URL))
         else:
             l2_provider = web3.Web3(web3.HTTPProvider(ALPHASEC_KAIROS_URL))
 
-        tx = self.signer.generate_withdraw_transaction(l2_provider, token_id, value, token_l1_address)
+        tx = self.signer.generate_withdraw_transaction(l2_provider, token_id, value, token_l1_address, nonce=self._nonces.next())
         response = self.post(f"/api/v1/wallet/withdraw", params={
             "tx": tx,
         })
@@ -451,6 +638,7 @@ class API:
         token_id = self.symbol_token_id_map[symbol]
         token_l1_address = self.token_id_address_map.get(token_id)
 
+        import web3  # deferred: web3 is slow to import and only needed here
         l1_provider = None
         if self.signer.network == "mainnet":
             l1_provider = web3.Web3(web3.HTTPProvider(MAINNET_URL))
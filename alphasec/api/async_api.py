@@ -1,11 +1,10 @@
-from typing import Any, Optional
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
 from eth_utils.address import is_address, to_checksum_address
 import asyncio
 import httpx
 import logging
 # eth_account.Account is used for type compatibility with signer
 import time
-import web3
 
 from alphasec.api.constants import (
     ALPHASEC_KAIROS_URL,
@@ -25,8 +24,22 @@ from alphasec.transaction.constants import (
     DexCommandSessionDelete,
 )
 from alphasec.exceptions import AlphasecAPIError
+from alphasec.api.cache import ResponseCache
+from alphasec.api.metadata_cache import MetadataCache
+from alphasec.api.endpoints import EndpointPool
+from alphasec.api.ratelimit import RateLimiter, classify
+from alphasec.api.retry import RETRY_STATUSES, RetryPolicy, transport_errors
+from alphasec.api.hedge import HedgePolicy
+from alphasec.api.ladder import Ladder, LadderHandle
+from alphasec.api.tracing import Trace, Tracer, current_trace, response_outcome
+from alphasec.metrics import MetricsRegistry, sdk_metrics
 from alphasec.transaction.sign import AlphasecSigner
-from alphasec.transaction.utils import normalize_price_quantity, resolve_spot_order_price_quantity
+from alphasec.transaction.utils import (
+    NonceClock,
+    normalize_price_quantities,
+    normalize_price_quantity,
+    resolve_spot_order_price_quantity,
+)
 
 from .utils import market_to_market_id, _clean_params, split_base_quote_token
 
@@ -39,9 +52,44 @@ class AsyncAPI:
         url: str,
         timeout: Optional[float] = None,
         signer: Optional[AlphasecSigner] = None,
+        cache: Optional[ResponseCache] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        http2: bool = False,
+        max_connections: Optional[int] = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: Optional[float] = 5.0,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        pool_timeout: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        endpoints: Optional[EndpointPool] = None,
+        tracer: Optional[Tracer] = None,
+        metrics: Optional[MetricsRegistry] = None,
     ):
+        """Create the client.
+
+        ``timeout`` applies to every phase; ``connect_timeout`` /
+        ``read_timeout`` / ``pool_timeout`` override it per phase (the write
+        timeout stays ``timeout``). ``http2=True`` multiplexes concurrent
+        requests over one connection and needs the ``h2`` package
+        (``pip install alphasec-py[http2]``). The pool defaults match httpx's.
+        """
         self.url = url
         self.timeout = timeout
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeouts = httpx.Timeout(
+            timeout,
+            connect=timeout if connect_timeout is None else connect_timeout,
+            read=timeout if read_timeout is None else read_timeout,
+            pool=timeout if pool_timeout is None else pool_timeout,
+        )
         self._client: Optional[httpx.AsyncClient] = None
         self._logger = logging.getLogger(__name__)
         self.token_id_symbol_map: dict = {}
@@ -49,16 +97,50 @@ class AsyncAPI:
         self.token_id_address_map: dict = {}
         self.token_id_decimals_map: dict = {}
         self.signer = signer
+        # Optional TTL cache for reference-data GETs; concurrent identical
+        # GETs share one in-flight request (see alphasec/api/cache.py).
+        self.cache = cache
+        # Optional on-disk token/perp-market metadata, revalidated by a
+        # background task (see alphasec/api/metadata_cache.py).
+        self.metadata_cache = metadata_cache
+        self._revalidate_task: Optional[asyncio.Task] = None
+        # Optional client-side throttle; may be shared with other clients.
+        self.rate_limiter = rate_limiter
+        # Optional resend-on-transport-failure policy (see alphasec/api/retry.py).
+        self.retry_policy = retry_policy
+        # Optional hedging of latency-critical reads (see alphasec/api/hedge.py).
+        self.hedge_policy = hedge_policy
+        # Optional multi-endpoint routing and failover (see alphasec/api/endpoints.py).
+        self.endpoints = endpoints
+        # Optional per-stage timing of signed submits (see alphasec/api/tracing.py).
+        self.tracer = tracer
+        # Optional Prometheus-style metrics (see alphasec/metrics.py).
+        self.metrics = metrics
+        self._metrics = sdk_metrics(metrics) if metrics is not None else None
+        if self._metrics is not None:
+            if cache is not None:
+                self._metrics.watch_cache(cache)
+            if rate_limiter is not None:
+                self._metrics.watch_rate_limiter(rate_limiter)
+            if hedge_policy is not None:
+                self._metrics.watch_hedge(hedge_policy)
+            if endpoints is not None:
+                self._metrics.watch_endpoints(endpoints)
+        # One nonce source for every signed submit, so no two transactions share a nonce.
+        self._nonces = NonceClock()
+        self._deposit_pipeline = None   # alphasec.bridge.DepositPipeline, built by deposit_many
         self._initialized = False
 
+    @property
+    def metadata_key(self) -> str:
+        return MetadataCache.key(self.url, getattr(self.signer, "network", None))
+
     async def _ensure_initialized(self) -> None:
         """Ensure the client is initialized and token metadata is loaded."""
         if not self._initialized:
-            if self._client is None:
-                self._client = httpx.AsyncClient(
-                    headers={"Content-Type": "application/json"},
-                    timeout=self.timeout,
-                )
+            self._ensure_client()
+            if self.metadata_cache is not None and await self._seed_from_metadata_cache():
+                return
             await self._map_token_metadata()
             # Mark initialized only when token metadata is non-empty so an
             # empty token list is retried on the next call instead of being
@@ -66,13 +148,67 @@ class AsyncAPI:
             if self.token_id_symbol_map:
                 self._initialized = True
 
+    def _ensure_client(self) -> None:
+        if self._client is None:
+            self._client = self._build_client()
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeouts,
+            limits=self.limits,
+            http2=self.http2,
+        )
+
+    async def warmup(self, connections: int = 1, path: str = "/api/v1/market") -> float:
+        """Open ``connections`` pooled connections ahead of the first order.
+
+        Issues that many concurrent GETs to ``path`` so the TCP/TLS handshakes
+        happen now; with ``http2=True`` one connection serves every request,
+        so ``connections`` can stay 1. Response bodies and status codes are
+        ignored, transport errors are raised. With ``endpoints``, every
+        endpoint in the pool is warmed. Returns the elapsed seconds.
+        """
+        self._ensure_client()
+        assert self._client is not None
+        bases = self.endpoints.urls if self.endpoints is not None else [self.url]
+        started = time.perf_counter()
+        await asyncio.gather(*(self._client.get(base + path) for base in bases for _ in range(connections)))
+        return time.perf_counter() - started
+
     async def initialize(self) -> None:
         """Eagerly initialize the client and token metadata (fail-fast)."""
         await self._ensure_initialized()
 
+    async def _seed_from_metadata_cache(self) -> bool:
+        """Load token maps from disk and schedule a background revalidation."""
+        # File I/O runs in a thread so it never blocks the event loop.
+        tokens = await asyncio.to_thread(self.metadata_cache.get, self.metadata_key, "tokens")
+        if not tokens:
+            return False
+        self._apply_token_metadata(tokens)
+        self._initialized = True
+        self._revalidate_task = asyncio.create_task(self._revalidate_token_metadata())
+        return True
+
+    async def _revalidate_token_metadata(self) -> None:
+        try:
+            tokens = await self.get_tokens()
+        except Exception as exc:
+            self._logger.warning(f"token metadata revalidation failed: {exc!r}")
+            return
+        if tokens:
+            await asyncio.to_thread(self.metadata_cache.put, self.metadata_key, "tokens", tokens)
+            self._apply_token_metadata(tokens)
+
     async def _map_token_metadata(self) -> None:
         """Load and map token metadata from the API."""
         tokens = await self.get_tokens()
+        if self.metadata_cache is not None and tokens:
+            await asyncio.to_thread(self.metadata_cache.put, self.metadata_key, "tokens", tokens)
+        self._apply_token_metadata(tokens)
+
+    def _apply_token_metadata(self, tokens: list) -> None:
         token_id_symbol_map: dict = {}
         symbol_token_id_map: dict = {}
         token_id_address_map: dict = {}
@@ -99,63 +235,66 @@ class AsyncAPI:
 
     async def __aenter__(self) -> "AsyncAPI":
         """Async context manager entry."""
-        self._client = httpx.AsyncClient(
-            headers={"Content-Type": "application/json"},
-            timeout=self.timeout,
-        )
-        await self._map_token_metadata()
+        self._client = self._build_client()
+        if self.metadata_cache is None or not await self._seed_from_metadata_cache():
+            await self._map_token_metadata()
         self._initialized = True
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         """Async context manager exit."""
-        if self._client is not None:
-            await self._client.aclose()
-            self._client = None
-        self._initialized = False
+        await self.close()
 
     async def close(self) -> None:
         """Close the HTTP client."""
+        if self._revalidate_task is not None:
+            self._revalidate_task.cancel()
+            self._revalidate_task = None
         if self._client is not None:
             await self._client.aclose()
             self._client = None
         self._initialized = False
 
     async def get(self, path: str, params: Optional[dict] = None) -> dict:
-        """Make an async GET request."""
+        """Make an async GET request (served from ``cache`` when configured)."""
         await self._ensure_initialized()
-        assert self._client is not None
-        response = await self._client.get(self.url + path, params=params)
-        try:
-            return response.json()
-        except ValueError:
-            raise AlphasecAPIError(f"Could not parse JSON response: {response.text[:200]}")
+        return await self._cached_get(path, params)
+
+    async def _cached_get(self, path: str, params: Optional[dict] = None) -> dict:
+        # GET without waiting for token metadata; used where the maps are not
+        # needed (e.g. perp market prewarm running alongside initialize()).
+        self._ensure_client()
+        if self.cache is not None:
+            return await self.cache.aget_or_fetch(path, params, lambda: self._get(path, params))
+        return await self._get(path, params)
+
+    async def _get(self, path: str, params: Optional[dict] = None) -> dict:
+        if self.hedge_policy is not None and self.hedge_policy.matches(path):
+            return await self.hedge_policy.run(lambda: self._request("GET", path, params))
+        return await self._request("GET", path, params)
 
     async def post(self, path: str, params: Optional[dict] = None) -> dict:
         """Make an async POST request."""
         await self._ensure_initialized()
-        assert self._client is not None
-        response = await self._client.post(self.url + path, json=params)
-        try:
-            return response.json()
-        except ValueError:
-            raise AlphasecAPIError(f"Could not parse JSON response: {response.text[:200]}")
+        return await self._request("POST", path, params)
 
     async def put(self, path: str, params: Optional[dict] = None) -> dict:
         """Make an async PUT request."""
         await self._ensure_initialized()
-        assert self._client is not None
-        response = await self._client.put(self.url + path, json=params)
-        try:
-            return response.json()
-        except ValueError:
-            raise AlphasecAPIError(f"Could not parse JSON response: {response.text[:200]}")
+        return await self._request("PUT", path, params)
 
     async def delete(self, path: str, params: Optional[dict] = None) -> dict:
         """Make an async DELETE request."""
         await self._ensure_initialized()
-        assert self._client is not None
-        response = await self._client.request("DELETE", self.url + path, json=params)
+        return await self._request("DELETE", path, params)
+
+    async def _request(self, method: str, path: str, params: Optional[dict] = None) -> dict:
+        """Send one request; the single choke point for rate limiting and request policies."""
+        if self.retry_policy is not None and self.retry_policy.applies(method, params):
+            # Resends the identical body (same signed tx); never re-signs.
+            response = await self.retry_policy.arun(lambda: self._send(method, path, params))
+        else:
+            response = await self._send(method, path, params)
         try:
             return response.json()
         except ValueError:
@@ -196,22 +335,95 @@ class AsyncAPI:
 
     async def get_tokens(self) -> list:
         """Get list of supported tokens."""
-        if self._client is None:
-            self._client = httpx.AsyncClient(
-                headers={"Content-Type": "application/json"},
-                timeout=self.timeout,
-            )
-        response = await self._client.get(self.url + "/api/v1/market/tokens")
+        self._ensure_client()
+        if self.cache is not None:
+            payload = await self.cache.aget_or_fetch(
+                "/api/v1/market/tokens", None, self._fetch_tokens)
+        else:
+            payload = await self._fetch_tokens()
+        if "result" not in payload:
+            raise AlphasecAPIError(
+                f"Failed to fetch token metadata: {str(payload.get('error', payload))[:200]}")
+        return payload["result"]
+
+    async def _send(self, method: str, path: str, params: Optional[dict] = None) -> httpx.Response:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire(classify(method, path))
+        if self.endpoints is None:
+            return await self._send_to(self.url, method, path, params)
+        # Idempotent requests fail over with the identical body; others go once.
+        failover = method == "GET" or (isinstance(params, dict) and "tx" in params)
+        candidates = self.endpoints.ordered() if failover else [self.endpoints.best()]
+        errors = transport_errors()
+        for i, base in enumerate(candidates):
+            last = i + 1 == len(candidates)
+            started = time.perf_counter()
+            try:
+                response = await self._send_to(base, method, path, params)
+            except errors:
+                self.endpoints.report_failure(base)
+                if last:
+                    raise
+                continue
+            if response.status_code in RETRY_STATUSES:
+                self.endpoints.report_failure(base)
+                if not last:
+                    continue
+            else:
+                self.endpoints.report(base, time.perf_counter() - started)
+            return response
+
+    async def _send_to(self, base: str, method: str, path: str, params: Optional[dict] = None) -> httpx.Response:
+        if self._metrics is None:
+            return await self._send_http(base, method, path, params)
+        started = time.perf_counter()
+        status: Any = "error"
+        try:
+            response = await self._send_http(base, method, path, params)
+            status = response.status_code
+            return response
+        except asyncio.CancelledError:
+            status = "cancelled"   # e.g. the losing request of a hedge
+            raise
+        finally:
+            self._metrics.request(method, path, status, time.perf_counter() - started)
+
+    async def _send_http(self, base: str, method: str, path: str, params: Optional[dict] = None) -> httpx.Response:
+        assert self._client is not None
+        trace = current_trace.get()
+        if trace is not None:
+            # Only set around signed-tx POSTs (_submit_tx, KillSwitch.trigger).
+            return await self._client.request(method, base + path, json=params,
+                                              extensions={"trace": trace.http_hook()})
+        if method == "GET":
+            return await self._client.get(base + path, params=params)
+        return await self._client.request(method, base + path, json=params)
+
+    async def _submit_tx(self, path: str, tx: str, trace: Optional[Trace] = None) -> dict:
+        """POST a signed ``tx``; with a trace, time the round trip and finish it."""
+        if trace is None:
+            return await self.post(path, params={"tx": tx})
+        assert self.tracer is not None
+        token = current_trace.set(trace)
+        try:
+            response = await self.post(path, params={"tx": tx})
+        except BaseException as exc:
+            self.tracer.finish(trace, error=repr(exc))
+            raise
+        finally:
+            current_trace.reset(token)
+        trace.mark("submit")
+        self.tracer.finish(trace, *response_outcome(response))
+        return response
+
+    async def _fetch_tokens(self) -> dict:
+        response = await self._send("GET", "/api/v1/market/tokens")
         try:
-            payload = response.json()
+            return response.json()
         except ValueError:
             raise AlphasecAPIError(
                 f"Failed to fetch token metadata: non-JSON response "
                 f"(HTTP {response.status_code}): {response.text[:200]}")
-        if "result" not in payload:
-            raise AlphasecAPIError(
-                f"Failed to fetch token metadata: {str(payload.get('error', payload))[:200]}")
-        return payload["result"]
 
     async def get_trades(self, market: str, limit: int = 100) -> list:
         """Get recent trades for a market."""
@@ -382,7 +594,7 @@ class AsyncAPI:
             raise ValueError("Only read-only API is available when signer is not set")
 
         # nonce and expiry is not used in blockchain side
-        nonce = int(time.time() * 1000)  # dummy
+        nonce = self._nonces.next()  # dummy
         expiry = int(time.time() * 1000) + 3600  # dummy
 
         data = self.signer.create_session_data(
@@ -407,7 +619,7 @@ class AsyncAPI:
             raise ValueError("Only read-only API is available when signer is not set")
 
         data = self.signer.create_value_transfer_data(to, value)
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
         response = await self.post(
             "/api/v1/wallet/transfer",
             params={
@@ -429,7 +641,7 @@ class AsyncAPI:
         data = self.signer.create_token_transfer_data(
             to, value, self.symbol_token_id_map[token]
         )
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
         response = await self.post(
             "/api/v1/wallet/transfer",
             params={
@@ -459,12 +671,15 @@ class AsyncAPI:
             raise ValueError("Only read-only API is available when signer is not set")
 
         await self._ensure_initialized()
+        trace = self.tracer.start("order", market=market) if self.tracer is not None else None
         base_token, quote_token = split_base_quote_token(
             market, self.symbol_token_id_map
         )
         normalized_price, adjusted_quantity = resolve_spot_order_price_quantity(
             order_type == MARKET, price, quantity
         )
+        if trace is not None:
+            trace.mark("normalize")
         data = self.signer.create_order_data(
             base_token,
             quote_token,
@@ -477,13 +692,12 @@ class AsyncAPI:
             sl_trigger,
             sl_limit,
         )
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
-        response = await self.post(
-            "/api/v1/order",
-            params={
-                "tx": tx,
-            },
-        )
+        if trace is not None:
+            trace.mark("build")
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
+        if trace is not None:
+            trace.mark("sign")
+        response = await self._submit_tx("/api/v1/order", tx, trace)
         return {
             "status": response["code"] == 200,
             "error": response["errMsg"],
@@ -495,14 +709,14 @@ class AsyncAPI:
         if self.signer is None:
             raise ValueError("Only read-only API is available when signer is not set")
 
+        trace = self.tracer.start("cancel") if self.tracer is not None else None
         data = self.signer.create_cancel_data(order_id)
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
-        response = await self.post(
-            "/api/v1/order/cancel",
-            params={
-                "tx": tx,
-            },
-        )
+        if trace is not None:
+            trace.mark("build")
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
+        if trace is not None:
+            trace.mark("sign")
+        response = await self._submit_tx("/api/v1/order/cancel", tx, trace)
         return {
             "status": response["code"] == 200,
             "error": response["errMsg"],
@@ -514,14 +728,14 @@ class AsyncAPI:
         if self.signer is None:
             raise ValueError("Only read-only API is available when signer is not set")
 
+        trace = self.tracer.start("cancel_all") if self.tracer is not None else None
         data = self.signer.create_cancel_all_data()
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
-        response = await self.post(
-            "/api/v1/order/cancel/all",
-            params={
-                "tx": tx,
-            },
-        )
+        if trace is not None:
+            trace.mark("build")
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
+        if trace is not None:
+            trace.mark("sign")
+        response = await self._submit_tx("/api/v1/order/cancel/all", tx, trace)
         return {
             "status": response["code"] == 200,
             "error": response["errMsg"],
@@ -541,25 +755,128 @@ class AsyncAPI:
 
         if new_price is None or new_qty is None:
             raise ValueError("new_price and new_qty are required")
+        trace = self.tracer.start("modify") if self.tracer is not None else None
         normalized_price, normalized_quantity = normalize_price_quantity(
             new_price, new_qty
         )
+        if trace is not None:
+            trace.mark("normalize")
         data = self.signer.create_modify_data(
             order_id, normalized_price, normalized_quantity, order_mode
         )
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
-        response = await self.post(
-            "/api/v1/order/modify",
-            params={
-                "tx": tx,
-            },
-        )
+        if trace is not None:
+            trace.mark("build")
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
+        if trace is not None:
+            trace.mark("sign")
+        response = await self._submit_tx("/api/v1/order/modify", tx, trace)
         return {
             "status": response["code"] == 200,
             "error": response["errMsg"],
             "order_id": response["result"] if "result" in response else None,
         }
 
+    # -----------------------------------------------------------------------
+    # Bulk submits
+    #
+    # Every transaction is normalized, built and signed up front (signing is
+    # CPU-bound; there is nothing to overlap it with), then the POSTs run
+    # concurrently. Results keep the input order and the single-call shape; a
+    # submit that raised is reported as {"status": False, "error": repr(exc),
+    # "order_id": None} so one failure does not hide the orders that did land.
+    # The rate limiter, retries and endpoint failover apply to each POST.
+    # -----------------------------------------------------------------------
+
+    async def _submit_many(self, path: str, txs: List[str], concurrency: int) -> List[dict]:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def submit(tx: str) -> dict:
+            async with semaphore:
+                try:
+                    response = await self.post(path, params={"tx": tx})
+                except Exception as exc:
+                    self._logger.warning(f"Bulk submit to {path} failed: {exc!r}")
+                    return {"status": False, "error": repr(exc), "order_id": None}
+            return {
+                "status": response.get("code") == 200,
+                "error": response.get("errMsg", response.get("error")),
+                "order_id": response.get("result"),
+            }
+
+        return list(await asyncio.gather(*(submit(tx) for tx in txs)))
+
+    async def order_many(self, orders: Sequence[Mapping[str, Any]], concurrency: int = 8) -> List[dict]:
+        """Place many orders, on any mix of markets, in one batch.
+
+        Each mapping holds ``order()`` keyword arguments (``market``, ``side``,
+        ``price``, ``quantity``, ``order_type``, ``order_mode`` and optionally
+        ``tp_limit`` / ``sl_trigger`` / ``sl_limit``). All limit prices and
+        quantities are normalized in one pass, so invalid input rejects the
+        whole batch before anything is signed. At most ``concurrency`` submits
+        are in flight. Returns one ``order()``-style result per input, in order.
+        """
+        if self.signer is None:
+            raise ValueError("Only read-only API is available when signer is not set")
+        await self._ensure_initialized()
+
+        limit_idx = [i for i, o in enumerate(orders) if o["order_type"] != MARKET]
+        normalized = dict(zip(limit_idx, normalize_price_quantities(
+            [orders[i]["price"] for i in limit_idx], [orders[i]["quantity"] for i in limit_idx])))
+        txs = []
+        for i, o in enumerate(orders):
+            base_token, quote_token = split_base_quote_token(o["market"], self.symbol_token_id_map)
+            if i in normalized:
+                price, quantity = normalized[i]
+            else:
+                price, quantity = resolve_spot_order_price_quantity(True, o.get("price"), o["quantity"])
+            data = self.signer.create_order_data(
+                base_token, quote_token, o["side"], price, quantity, o["order_type"], o["order_mode"],
+                o.get("tp_limit"), o.get("sl_trigger"), o.get("sl_limit"))
+            txs.append(self.signer.generate_alphasec_transaction(self._nonces.next(), data))
+        return await self._submit_many("/api/v1/order", txs, concurrency)
+
+    async def cancel_many(self, order_ids: Sequence[str], concurrency: int = 8) -> List[dict]:
+        """Cancel many orders; one ``cancel()``-style result per id, in order."""
+        if self.signer is None:
+            raise ValueError("Only read-only API is available when signer is not set")
+        txs = [
+            self.signer.generate_alphasec_transaction(self._nonces.next(), self.signer.create_cancel_data(order_id))
+            for order_id in order_ids
+        ]
+        return await self._submit_many("/api/v1/order/cancel", txs, concurrency)
+
+    async def modify_many(self, modifications: Sequence[Mapping[str, Any]], concurrency: int = 8) -> List[dict]:
+        """Modify many orders; each mapping holds ``modify()`` keyword arguments.
+
+        ``new_price`` and ``new_qty`` are required for every entry and are
+        normalized in one pass. Returns one ``modify()``-style result per
+        entry, in order; ``order_id`` is the replacement order's id.
+        """
+        if self.signer is None:
+            raise ValueError("Only read-only API is available when signer is not set")
+        if any(m.get("new_price") is None or m.get("new_qty") is None for m in modifications):
+            raise ValueError("new_price and new_qty are required")
+        normalized = normalize_price_quantities(
+            [m["new_price"] for m in modifications], [m["new_qty"] for m in modifications])
+        txs = [
+            self.signer.generate_alphasec_transaction(
+                self._nonces.next(),
+                self.signer.create_modify_data(m["order_id"], price, quantity, m.get("order_mode")))
+            for m, (price, quantity) in zip(modifications, normalized)
+        ]
+        return await self._submit_many("/api/v1/order/modify", txs, concurrency)
+
+    async def place_ladder(self, ladder: Ladder, concurrency: int = 8) -> LadderHandle:
+        """Place every level of ``ladder`` through ``order_many``.
+
+        Returns a ``LadderHandle`` for modifying or cancelling the whole
+        ladder; levels that failed to place are recorded on it, not raised.
+        """
+        results = await self.order_many(ladder.orders(), concurrency=concurrency)
+        return LadderHandle(self, ladder, results, concurrency=concurrency)
+
     async def stop_order(
         self,
         market: str,
@@ -598,7 +915,7 @@ class AsyncAPI:
             order_type,
             order_mode,
         )
-        tx = self.signer.generate_alphasec_transaction(int(time.time() * 1000), data)
+        tx = self.signer.generate_alphasec_transaction(self._nonces.next(), data)
         response = await self.post(
             "/api/v1/order/trigger",
             params={
@@ -620,6 +937,7 @@ class AsyncAPI:
         token_id = self.symbol_token_id_map[symbol]
         token_l1_address = self.token_id_address_map.get(token_id)
 
+        import web3  # deferred: web3 is slow to import and only needed here
         l2_provider = None
         if self.signer.network == "mainnet":
             l2_provider = web3.Web3(web3.HTTPProvider(ALPHASEC_MAINNET_URL))
@@ -629,7 +947,7 @@ class AsyncAPI:
         # Offload blocking web3 RPC calls (gas/chainId fetch) to a thread
         tx = await asyncio.to_thread(
             self.signer.generate_withdraw_transaction,
-            l2_provider, token_id, value, token_l1_address,
+            l2_provider, token_id, value, token_l1_address, self._nonces.next(),
         )
         response = await self.post(
             "/api/v1/wallet/withdraw",
@@ -650,6 +968,32 @@ class AsyncAPI:
                 "tx_hash": response["result"] if "result" in response else None,
             }
 
+    async def deposit_many(
+        self, deposits: Sequence[Tuple[str, Any]], wait: bool = True, provider: Any = None
+    ) -> List[dict]:
+        """Deposit several ``(symbol, value)`` pairs to AlphaSec in one pipeline.
+
+        Reads are batched JSON-RPC over ``AsyncWeb3`` and approvals are
+        pipelined with local nonces (see ``alphasec/bridge.py``); amounts
+        use each token's L1 decimals. Returns one ``deposit_to_alphasec``-style
+        result per pair. ``provider`` (an ``AsyncWeb3``) is only read on the
+        first call.
+        """
+        if self.signer is None:
+            raise ValueError("Only read-only API is available when signer is not set")
+
+        await self._ensure_initialized()
+        if self._deposit_pipeline is None:
+            from alphasec.bridge import DepositPipeline  # deferred: imports web3
+            self._deposit_pipeline = DepositPipeline(self.signer, provider)
+        from alphasec.bridge import Deposit
+        batch = []
+        for symbol, value in deposits:
+            token_id = self.symbol_token_id_map[symbol]
+            batch.append(Deposit(token_id, value, self.token_id_address_map.get(token_id),
+                                 int(self.token_id_decimals_map.get(token_id, 18))))
+        return await self._deposit_pipeline.deposit_many(batch, wait=wait)
+
     async def deposit_to_alphasec(self, symbol: str, value: float) -> dict:
         """Deposit tokens to AlphaSec. Value is in token units."""
         if self.signer is None:
@@ -659,6 +1003,7 @@ class AsyncAPI:
         token_id = self.symbol_token_id_map[symbol]
         token_l1_address = self.token_id_address_map.get(token_id)
 
+        import web3  # deferred: web3 is slow to import and only needed here
         l1_provider = None
         if self.signer.network == "mainnet":
             l1_provider = web3.Web3(web3.HTTPProvider(MAINNET_URL))
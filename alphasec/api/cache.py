@@ -0,0 +1,231 @@
+"""TTL response cache with request coalescing for reference-data GETs.
+
+Opt-in for both clients: pass ``cache=ResponseCache()`` to ``API`` / ``AsyncAPI``
+(or through ``Agent`` / ``AsyncAgent``). Only paths with a TTL are cached, so
+account and order queries are never served stale. ``PerpAgent.get_markets``
+goes through ``api.get`` and is covered by the ``/fapi/v1/market`` entry.
+
+Concurrent identical GETs collapse into one in-flight request: the first
+caller fetches, every other caller (thread or coroutine) waits for and shares
+that result. Only successful envelopes (``result`` present, ``code`` 200 or
+absent) are stored; an error response is handed to the callers that were
+waiting for it but never cached.
+
+Cached payloads are shared between callers; treat them as read-only.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Path (without query string) -> TTL in seconds. Tickers move, so they only
+# get a short TTL that absorbs bursts of identical calls.
+DEFAULT_TTLS: Dict[str, float] = {
+    "/api/v1/market/tokens": 300.0,
+    "/api/v1/market": 60.0,
+    "/api/v1/market/ticker": 1.0,
+    "/fapi/v1/market": 60.0,
+}
+DEFAULT_MAX_ENTRIES = 256
+
+
+class _Call:
+    """A sync in-flight fetch that other threads can wait on."""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """Per-path TTL cache with LRU eviction and in-flight request coalescing.
+
+    Args:
+        ttls: Path -> TTL (seconds). Paths are matched without their query
+            string; the query string and ``params`` are part of the cache key.
+            Defaults to :data:`DEFAULT_TTLS`.
+        max_entries: LRU capacity across all paths.
+        clock: Monotonic time source (injectable for tests).
+
+    Attributes:
+        hits: Lookups served from the cache.
+        misses: Lookups that issued a request.
+        coalesced: Lookups that joined another caller's in-flight request.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self._clock = clock
+        # key -> (expires_at, value); guarded by _lock (short critical sections only).
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_inflight: Dict[Hashable, _Call] = {}
+        self._async_inflight: Dict[Hashable, "asyncio.Future"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    # -----------------------------------------------------------------------
+    # Keys and storage
+    # -----------------------------------------------------------------------
+
+    def ttl_for(self, path: str) -> Optional[float]:
+        """Return the TTL of ``path`` (query string ignored), or None if uncached."""
+        return self.ttls.get(path.split("?", 1)[0])
+
+    @staticmethod
+    def key(path: str, params: Optional[dict] = None) -> Hashable:
+        return (path, tuple(sorted(params.items())) if params else ())
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        if not _cacheable(value):
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop all entries, or only those of ``path`` (query string ignored)."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            base = path.split("?", 1)[0]
+            for key in [k for k in self._entries if k[0].split("?", 1)[0] == base]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters and the current entry count."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    # -----------------------------------------------------------------------
+    # Lookup-or-fetch
+    # -----------------------------------------------------------------------
+
+    def get_or_fetch(self, path: str, params: Optional[dict], fetch: Callable[[], Any]) -> Any:
+        """Return the cached response for ``path``/``params`` or call ``fetch`` once.
+
+        Threads asking for the same key while a fetch is running wait for it
+        instead of issuing their own request.
+        """
+        ttl = self.ttl_for(path)
+        if ttl is None:
+            return fetch()
+        key = self.key(path, params)
+        found, value = self._lookup(key)
+        if found:
+            return value
+
+        with self._lock:
+            call = self._sync_inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._sync_inflight[key] = _Call()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fetch()
+            self._store(key, call.value, ttl)
+            return call.value
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._sync_inflight[key]
+            call.event.set()
+
+    async def aget_or_fetch(
+        self, path: str, params: Optional[dict], fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Async :meth:`get_or_fetch`: concurrent coroutines share one request."""
+        ttl = self.ttl_for(path)
+        if ttl is None:
+            return await fetch()
+        key = self.key(path, params)
+        found, value = self._lookup(key)
+        if found:
+            return value
+
+        # Futures are bound to their loop, so in-flight calls are per loop.
+        loop = asyncio.get_running_loop()
+        inflight_key = (id(loop), key)
+        while True:
+            pending = self._async_inflight.get(inflight_key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                # shield: a cancelled waiter must not cancel the shared request.
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this waiter itself was cancelled
+                # The leading caller was cancelled: take over the fetch.
+
+        self.misses += 1
+        future = loop.create_future()
+        self._async_inflight[inflight_key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Retrieved here so an unawaited future does not log a warning.
+            future.exception()
+            raise
+        else:
+            self._store(key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            del self._async_inflight[inflight_key]
+
+
+def _cacheable(response: Any) -> bool:
+    return (
+        isinstance(response, dict)
+        and "result" in response
+        and response.get("code", 200) == 200
+    )
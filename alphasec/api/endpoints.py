@@ -0,0 +1,194 @@
+"""Multiple gateway endpoints with latency-based selection and failover.
+
+An :class:`EndpointPool` holds several base URLs for the same exchange. Every
+request made through a client configured with ``endpoints=pool`` goes to the
+fastest healthy endpoint and reports back its latency (an EWMA per endpoint);
+a transport failure or gateway error marks the endpoint down for a cooldown
+that grows with consecutive failures. Idempotent requests (GETs and signed
+``tx`` submits, whose nonce makes a resend harmless) fail over to the next
+endpoint within the same call. The request body is resent unchanged; a
+transaction is never re-signed. Other writes are sent once.
+
+Passive measurements come from real traffic; :meth:`EndpointPool.start_probing`
+adds a background thread that probes every endpoint so idle or down ones are
+re-measured too. The WebSocket managers pick ``pool.best()`` on every
+(re)connect.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_PATH = "/api/v1/market"
+
+
+def ws_url_for(base_url: str) -> str:
+    """Return the WebSocket URL of an ``http(s)://`` base URL."""
+    return "ws" + base_url[len("http"):] + "/ws"
+
+
+class EndpointState:
+    """Latency and health bookkeeping for one endpoint."""
+
+    __slots__ = ("url", "index", "ewma", "failures", "down_until", "requests")
+
+    def __init__(self, url: str, index: int):
+        self.url = url
+        self.index = index
+        self.ewma: Optional[float] = None
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+
+
+class EndpointPool:
+    """Select among several base URLs by measured latency and health.
+
+    Args:
+        urls: Base URLs (``https://...``), in order of preference for ties
+            and before any latency is known.
+        alpha: EWMA weight of a new latency sample.
+        cooldown: Seconds an endpoint stays down after a failure; doubles
+            per consecutive failure up to ``max_cooldown``.
+        probe_path: GET path used by the background prober.
+        clock: Monotonic time source (injectable for tests).
+
+    Example:
+        >>> pool = EndpointPool(["https://api.alphasec.trade", "https://api2.example"])
+        >>> pool.start_probing(interval=5)
+        >>> agent = AsyncAgent(pool.urls[0], signer=signer, endpoints=pool)
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        alpha: float = 0.2,
+        cooldown: float = 2.0,
+        max_cooldown: float = 60.0,
+        probe_path: str = DEFAULT_PROBE_PATH,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not urls:
+            raise ValueError("at least one endpoint URL is required")
+        self.urls = [u.rstrip("/") for u in urls]
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_path = probe_path
+        self._clock = clock
+        self._states: Dict[str, EndpointState] = {u: EndpointState(u, i) for i, u in enumerate(self.urls)}
+        self._lock = threading.Lock()
+        self._probe_thread: Optional[threading.Thread] = None
+        self._probe_stop = threading.Event()
+
+    # -----------------------------------------------------------------------
+    # Selection
+    # -----------------------------------------------------------------------
+
+    def ordered(self) -> List[str]:
+        """All endpoints, best first: healthy by EWMA latency, then down ones by recovery time."""
+        now = self._clock()
+        with self._lock:
+            states = list(self._states.values())
+
+        def rank(state: EndpointState):
+            if state.down_until > now:
+                return (1, state.down_until, state.index)
+            # Unmeasured endpoints rank after measured ones, in listed order.
+            return (0, state.ewma if state.ewma is not None else float("inf"), state.index)
+
+        return [s.url for s in sorted(states, key=rank)]
+
+    def best(self) -> str:
+        return self.ordered()[0]
+
+    # -----------------------------------------------------------------------
+    # Feedback
+    # -----------------------------------------------------------------------
+
+    def report(self, url: str, latency: float) -> None:
+        """Record a successful request to ``url`` that took ``latency`` seconds."""
+        with self._lock:
+            state = self._states.get(url)
+            if state is None:
+                return
+            state.requests += 1
+            state.failures = 0
+            state.down_until = 0.0
+            state.ewma = latency if state.ewma is None else (1 - self.alpha) * state.ewma + self.alpha * latency
+
+    def report_failure(self, url: str) -> None:
+        """Mark ``url`` down for a cooldown that grows with consecutive failures."""
+        with self._lock:
+            state = self._states.get(url)
+            if state is None:
+                return
+            state.requests += 1
+            state.failures += 1
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** (state.failures - 1))
+            state.down_until = self._clock() + cooldown
+        logger.warning(f"endpoint {url} failed ({state.failures}x), down for {cooldown:.1f}s")
+
+    def stats(self) -> Dict[str, dict]:
+        now = self._clock()
+        with self._lock:
+            return {
+                s.url: {
+                    "ewma": s.ewma,
+                    "failures": s.failures,
+                    "healthy": s.down_until <= now,
+                    "requests": s.requests,
+                }
+                for s in self._states.values()
+            }
+
+    # -----------------------------------------------------------------------
+    # Probing
+    # -----------------------------------------------------------------------
+
+    def probe(self, timeout: float = 2.0) -> None:
+        """Probe every endpoint once (concurrently) and record the results."""
+        import requests  # the async client never needs it unless probing
+
+        def probe_one(url: str) -> None:
+            started = time.perf_counter()
+            try:
+                response = requests.get(url + self.probe_path, timeout=timeout)
+            except requests.RequestException:
+                self.report_failure(url)
+                return
+            if response.status_code >= 500:
+                self.report_failure(url)
+            else:
+                self.report(url, time.perf_counter() - started)
+
+        threads = [threading.Thread(target=probe_one, args=(url,), daemon=True) for url in self.urls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def start_probing(self, interval: float = 5.0, timeout: float = 2.0) -> None:
+        """Probe all endpoints every ``interval`` seconds from a daemon thread."""
+        if self._probe_thread is not None and self._probe_thread.is_alive():
+            return
+        self._probe_stop.clear()
+
+        def loop() -> None:
+            while not self._probe_stop.is_set():
+                try:
+                    self.probe(timeout)
+                except Exception as exc:
+                    logger.warning(f"endpoint probe failed: {exc!r}")
+                self._probe_stop.wait(interval)
+
+        self._probe_thread = threading.Thread(target=loop, name="alphasec-endpoint-probe", daemon=True)
+        self._probe_thread.start()
+
+    def stop_probing(self) -> None:
+        self._probe_stop.set()
+        if self._probe_thread is not None:
+            self._probe_thread.join()
+            self._probe_thread = None
@@ -0,0 +1,125 @@
+"""Hedged GETs for latency-critical reads (``AsyncAPI`` only).
+
+With ``hedge_policy=HedgePolicy()``, a matching GET that has not answered
+within the current hedge delay gets a second, identical request. Whichever
+answers first is used and the other is cancelled. The delay tracks a rolling
+latency percentile (p95 by default), so only the slow tail is hedged. A budget
+caps the extra load: each request earns ``budget`` hedge credits, and a hedge
+costs one.
+
+Only idempotent reads should be hedged; the default patterns cover depth,
+ticker and single-order lookups, spot and perp.
+"""
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Pattern, Sequence
+
+DEFAULT_PATTERNS = (
+    r"^/f?api/v1/market/(depth|ticker)\b",
+    # Single order by id (not /open, /list, /trade, ...).
+    r"^/f?api/v1/order/(?!(open|list|trade|history|cancel|modify|trigger)\b)[^/?]+$",
+)
+
+# Samples needed before the percentile replaces ``initial_delay``.
+_MIN_SAMPLES = 20
+
+
+class HedgePolicy:
+    """Adaptive-delay request hedging with a load budget.
+
+    Args:
+        percentile: Latency percentile used as the hedge delay (0-1).
+        initial_delay: Delay used until enough samples are collected (seconds).
+        min_delay / max_delay: Clamp of the adaptive delay (seconds).
+        window: Number of recent latencies kept.
+        budget: Hedge credits earned per request (0.05 = at most ~5% extra).
+        max_credits: Cap on saved-up credits (bounds a hedge burst).
+        patterns: Regexes matched against the request path (query included).
+
+    Attributes:
+        requests: Matching requests seen.
+        hedged: Hedges sent.
+        hedge_wins: Hedges that answered before the original.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        initial_delay: float = 0.05,
+        min_delay: float = 0.002,
+        max_delay: float = 1.0,
+        window: int = 512,
+        budget: float = 0.05,
+        max_credits: float = 10.0,
+        patterns: Sequence[str] = DEFAULT_PATTERNS,
+    ):
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.max_credits = max_credits
+        self._patterns: Sequence[Pattern] = [re.compile(p) for p in patterns]
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._credits = 1.0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def matches(self, path: str) -> bool:
+        return any(p.search(path) for p in self._patterns)
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def delay(self) -> float:
+        """Current hedge delay: the configured percentile of recent latencies."""
+        if len(self._latencies) < _MIN_SAMPLES:
+            return self.initial_delay
+        ordered = sorted(self._latencies)
+        value = ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+        return min(self.max_delay, max(self.min_delay, value))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "delay": self.delay(),
+        }
+
+    async def run(self, send: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``send()``, hedging it with a second ``send()`` after :meth:`delay`."""
+        self.requests += 1
+        self._credits = min(self.max_credits, self._credits + self.budget)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(send())
+        tasks = {primary: started}
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.delay())
+            if not done and self._credits >= 1:
+                self._credits -= 1
+                self.hedged += 1
+                tasks[asyncio.ensure_future(send())] = time.perf_counter()
+            return await self._first_success(tasks, primary)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _first_success(self, tasks: Dict["asyncio.Future", float], primary: "asyncio.Future") -> Any:
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = error or task.exception()
+                    continue
+                self.record(time.perf_counter() - tasks[task])
+                if task is not primary:
+                    self.hedge_wins += 1
+                return task.result()
+        raise error
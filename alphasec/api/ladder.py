@@ -0,0 +1,209 @@
+"""Ladder (grid) orders: a run of limit orders across a price range, managed as one.
+
+``Ladder`` is the plan: ``levels`` prices evenly spaced from ``start`` to
+``stop`` (inclusive) with the total ``quantity`` split across them by a size
+curve. Levels are computed in ``Decimal`` so the spacing does not drift
+(0.1 + 0.2 style), then every price and quantity is normalized in one pass by
+``normalize_price_quantities`` -- the same rules ``AsyncAPI.order`` applies --
+so the plan is exactly what will be signed, and a level that would collapse
+onto its neighbour or round to zero size is rejected before anything is sent.
+
+``AsyncAPI.place_ladder`` signs every level, submits them concurrently through
+``order_many`` and returns a ``LadderHandle`` for modifying or cancelling the
+whole ladder::
+
+    ladder = Ladder("KAIA/USDT", BUY, start=0.99, stop=0.90, levels=10, quantity=1000, curve="linear")
+    handle = await api.place_ladder(ladder)
+    await handle.shift(-0.01)     # move every live level down a tick
+    await handle.cancel()
+"""
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Sequence, Tuple, Union
+
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT, SELL
+from alphasec.transaction.utils import normalize_price_quantities
+
+if TYPE_CHECKING:
+    from alphasec.api.async_api import AsyncAPI
+
+# A size curve: "flat" (equal sizes), "linear" (level i weighs i + 1, so
+# sizes grow from start towards stop), explicit per-level weights, or a
+# function (index, levels) -> weight.
+Curve = Union[str, Sequence[float], Callable[[int, int], float]]
+
+
+def _decimal(value: Any) -> Decimal:
+    # str() first: Decimal(0.1) would carry the float's binary error.
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _weights(curve: Curve, levels: int) -> List[Decimal]:
+    if curve == "flat":
+        weights = [Decimal(1)] * levels
+    elif curve == "linear":
+        weights = [Decimal(i + 1) for i in range(levels)]
+    elif isinstance(curve, str):
+        raise ValueError(f"Unknown curve: {curve!r} (use 'flat', 'linear', weights or a function)")
+    elif callable(curve):
+        weights = [_decimal(curve(i, levels)) for i in range(levels)]
+    else:
+        weights = [_decimal(w) for w in curve]
+        if len(weights) != levels:
+            raise ValueError(f"curve has {len(weights)} weights for {levels} levels")
+    if any(w < 0 for w in weights) or not any(weights):
+        raise ValueError("curve weights must be non-negative and not all zero")
+    return weights
+
+
+class Ladder:
+    """A planned ladder of limit orders on one market; see the module docstring."""
+
+    def __init__(
+        self,
+        market: str,
+        side: int,
+        start: float,
+        stop: float,
+        levels: int,
+        quantity: float,
+        curve: Curve = "flat",
+        order_mode: int = BASE_MODE,
+    ):
+        """
+        Args:
+            market: Market symbol, e.g. ``"KAIA/USDT"``.
+            side: ``BUY`` or ``SELL``.
+            start: Price of the first level (usually the one nearest the book).
+            stop: Price of the last level; ``levels`` prices are evenly spaced
+                from ``start`` to ``stop`` inclusive.
+            levels: Number of orders (>= 1; with 1, only ``start`` is used).
+            quantity: Total quantity across all levels.
+            curve: How ``quantity`` is split across levels (see ``Curve``).
+                Levels with zero weight are left out.
+            order_mode: ``BASE_MODE`` or ``QUOTE_MODE``, for every level.
+
+        Raises:
+            ValueError: On invalid arguments, or if normalization would make
+                two levels share a price or round a level's size to zero.
+        """
+        if side not in (BUY, SELL):
+            raise ValueError("Invalid side")
+        if levels < 1:
+            raise ValueError("levels must be at least 1")
+        self.market = market
+        self.side = side
+        self.order_mode = order_mode
+
+        first, last, total = _decimal(start), _decimal(stop), _decimal(quantity)
+        step = (last - first) / (levels - 1) if levels > 1 else Decimal(0)
+        weights = _weights(curve, levels)
+        weight_sum = sum(weights)
+        raw = [(first + step * i, total * w / weight_sum) for i, w in enumerate(weights) if w]
+
+        self.levels: List[Tuple[float, float]] = normalize_price_quantities(
+            [float(p) for p, _ in raw], [float(q) for _, q in raw])
+        prices = [p for p, _ in self.levels]
+        if len(set(prices)) != len(prices):
+            raise ValueError("Price range too narrow: levels collapse onto the same normalized price")
+        for price, size in self.levels:
+            if size <= 0:
+                raise ValueError(f"Level at {price} rounds to zero size; raise quantity or use fewer levels")
+
+    @property
+    def prices(self) -> List[float]:
+        return [p for p, _ in self.levels]
+
+    @property
+    def quantities(self) -> List[float]:
+        return [q for _, q in self.levels]
+
+    def orders(self) -> List[dict]:
+        """``AsyncAPI.order_many`` arguments for every level (already normalized)."""
+        return [
+            {"market": self.market, "side": self.side, "price": price, "quantity": size,
+             "order_type": LIMIT, "order_mode": self.order_mode}
+            for price, size in self.levels
+        ]
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def __repr__(self) -> str:
+        side = "BUY" if self.side == BUY else "SELL"
+        return f"Ladder({self.market!r}, {side}, {self.levels!r})"
+
+
+class LadderHandle:
+    """A placed ladder, returned by ``AsyncAPI.place_ladder``.
+
+    ``order_ids[i]`` is level i's live order id, or None if it failed to place
+    (``results[i]`` then holds the error) or has been cancelled. A modify
+    replaces the order, so a level's id changes when its modify succeeds.
+    Levels that are not live are skipped by ``modify`` / ``shift`` / ``cancel``.
+    """
+
+    def __init__(self, api: "AsyncAPI", ladder: Ladder, results: List[dict], concurrency: int = 8):
+        self.api = api
+        self.ladder = ladder
+        self.results = results
+        self.concurrency = concurrency
+        self.order_ids: List[Optional[str]] = [r["order_id"] if r["status"] else None for r in results]
+        self.prices = ladder.prices
+        self.quantities = ladder.quantities
+
+    @property
+    def placed(self) -> int:
+        return sum(1 for order_id in self.order_ids if order_id is not None)
+
+    def _live(self) -> List[int]:
+        return [i for i, order_id in enumerate(self.order_ids) if order_id is not None]
+
+    async def modify(
+        self,
+        prices: Optional[Sequence[float]] = None,
+        quantities: Optional[Sequence[float]] = None,
+    ) -> List[Optional[dict]]:
+        """Modify every live level to ``prices[i]`` / ``quantities[i]`` (current values where omitted).
+
+        Returns one result per level, None for levels that were not live.
+        """
+        n = len(self.order_ids)
+        if (prices is not None and len(prices) != n) or (quantities is not None and len(quantities) != n):
+            raise ValueError(f"Expected {n} values, one per level")
+        new_prices = list(prices) if prices is not None else self.prices
+        new_quantities = list(quantities) if quantities is not None else self.quantities
+        live = self._live()
+        levels = normalize_price_quantities([new_prices[i] for i in live], [new_quantities[i] for i in live])
+        results = await self.api.modify_many(
+            [{"order_id": self.order_ids[i], "new_price": price, "new_qty": size,
+              "order_mode": self.ladder.order_mode} for i, (price, size) in zip(live, levels)],
+            concurrency=self.concurrency)
+
+        out: List[Optional[dict]] = [None] * n
+        for i, (price, size), result in zip(live, levels, results):
+            out[i] = result
+            if result["status"]:
+                self.results[i] = result
+                self.order_ids[i] = result["order_id"]
+                self.prices[i], self.quantities[i] = price, size
+        return out
+
+    async def shift(self, offset: float) -> List[Optional[dict]]:
+        """Move every live level by ``offset`` in price, keeping sizes."""
+        delta = _decimal(offset)
+        return await self.modify(prices=[float(_decimal(p) + delta) for p in self.prices])
+
+    async def cancel(self) -> List[Optional[dict]]:
+        """Cancel every live level. Returns one result per level, None where not live."""
+        live = self._live()
+        results = await self.api.cancel_many([self.order_ids[i] for i in live], concurrency=self.concurrency)
+        out: List[Optional[dict]] = [None] * len(self.order_ids)
+        for i, result in zip(live, results):
+            out[i] = result
+            if result["status"]:
+                self.results[i] = result
+                self.order_ids[i] = None
+        return out
+
+    def __repr__(self) -> str:
+        return f"LadderHandle({self.ladder.market!r}, placed={self.placed}/{len(self.order_ids)})"
@@ -0,0 +1,121 @@
+"""Persistent on-disk cache of token and perp market metadata.
+
+``API`` / ``AsyncAPI`` load the token list before their first request, and the
+perp agents fetch the market list on their first symbol lookup. With
+``metadata_cache=MetadataCache()`` both are served from a small JSON file on
+startup, so a short-lived job can sign and submit without waiting on either
+request. The file is revalidated in the background (a daemon thread for the
+sync client, a task for the async one): the fresh response replaces the
+in-memory maps and is written back for the next run. The async client reads
+and writes the file in a worker thread, never on the event loop.
+
+Entries are keyed by base URL and network, so mainnet and testnet never share
+metadata. An entry older than ``max_age`` is ignored and fetched in the
+foreground as usual.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Entries older than this are not used for a cold start (seconds).
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+_VERSION = 1
+
+
+def default_path() -> str:
+    """Return ``$XDG_CACHE_HOME/alphasec/metadata.json`` (``~/.cache`` by default)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "alphasec", "metadata.json")
+
+
+class MetadataCache:
+    """JSON file holding token lists and perp symbol -> market_id maps.
+
+    Args:
+        path: Cache file (default: :func:`default_path`). Created on first save.
+        max_age: Entries older than this many seconds are treated as missing.
+        clock: Wall-clock time source (injectable for tests).
+
+    Example:
+        >>> agent = Agent(base_url, signer=signer, metadata_cache=MetadataCache())
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_age: float = DEFAULT_MAX_AGE,
+        clock=time.time,
+    ):
+        self.path = path or default_path()
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, network: Optional[str] = None) -> str:
+        return f"{url.rstrip('/')}|{network or ''}"
+
+    def get(self, key: str, field: str) -> Any:
+        """Return the stored ``field`` (``"tokens"`` / ``"perp_markets"``) of ``key``, or None."""
+        with self._lock:
+            entry = self._read().get(key) or {}
+        saved_at = entry.get(field + "_at")
+        if saved_at is None or self._clock() - saved_at > self.max_age:
+            return None
+        return entry.get(field)
+
+    def put(self, key: str, field: str, value: Any) -> None:
+        """Store ``value`` as ``field`` of ``key`` (atomic rewrite; errors are logged)."""
+        with self._lock:
+            entries = self._read()
+            entry = entries.setdefault(key, {})
+            entry[field] = value
+            entry[field + "_at"] = self._clock()
+            try:
+                self._write(entries)
+            except OSError as exc:
+                logger.warning(f"metadata cache: could not write {self.path}: {exc}")
+
+    def clear(self) -> None:
+        """Delete the cache file."""
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            # A corrupt or unreadable cache only costs a normal cold start.
+            logger.warning(f"metadata cache: ignoring {self.path}: {exc}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != _VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def _write(self, entries: Dict[str, dict]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # A fresh temp file per write, so writers sharing the path never clobber each other's.
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": _VERSION, "entries": entries}, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
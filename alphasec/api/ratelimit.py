@@ -0,0 +1,203 @@
+"""Client-side rate limiting with per-endpoint-group budgets and cancel priority.
+
+One :class:`RateLimiter` can be shared by any number of ``API`` / ``AsyncAPI``
+instances (and therefore by their ``PerpAgent`` / ``AsyncPerpAgent``, which
+send through the parent's api). Every request is classified into a group:
+
+  - ``cancel``: cancel and cancel-all, spot and perp
+  - ``order``:  every other write (orders, modifies, transfers, sessions, ...)
+  - ``query``:  GETs
+
+Each group may have its own token bucket, and an optional global bucket caps
+the total. When requests queue, cancels are served before orders and orders
+before queries, so reducing risk never waits behind market-data polling. A
+request only yields to a higher-priority one that its own group budget would
+allow through, so an exhausted query budget never delays cancels.
+
+Queueing delay per group is available from :meth:`RateLimiter.stats`.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+CANCEL = "cancel"
+ORDER = "order"
+QUERY = "query"
+
+# Lower value = served first when requests queue.
+PRIORITY = {CANCEL: 0, ORDER: 1, QUERY: 2}
+
+# Fallback re-check interval when a waiter yields to a higher-priority one.
+_YIELD_WAIT = 0.001
+
+
+def classify(method: str, path: str) -> str:
+    """Return the endpoint group of an HTTP ``method`` + ``path``."""
+    if method.upper() == "GET":
+        return QUERY
+    if "/order/cancel" in path:
+        return CANCEL
+    return ORDER
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst`` (default: ``rate``)."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1.0))
+        self._clock = clock
+        self.tokens = self.burst
+        self._updated = clock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class _Ticket:
+    __slots__ = ("group", "priority", "seq", "enqueued")
+
+    def __init__(self, group: str, seq: int, enqueued: float):
+        self.group = group
+        self.priority = PRIORITY.get(group, PRIORITY[QUERY])
+        self.seq = seq
+        self.enqueued = enqueued
+
+
+class RateLimiter:
+    """Token-bucket governor shared by the sync and async clients.
+
+    Args:
+        limits: Group -> ``(rate_per_second, burst)`` (burst may be None).
+            Groups without an entry are only bound by the global bucket.
+        global_limit: Optional ``(rate_per_second, burst)`` across all groups.
+        clock: Monotonic time source (injectable for tests).
+
+    Example:
+        >>> limiter = RateLimiter({"order": (20, 40), "cancel": (50, 50), "query": (10, 20)},
+        ...                       global_limit=(60, 60))
+        >>> agent = AsyncAgent(base_url, signer=signer, rate_limiter=limiter)
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, Optional[float]]]] = None,
+        global_limit: Optional[Tuple[float, Optional[float]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self._buckets: Dict[str, TokenBucket] = {
+            group: TokenBucket(rate, burst, clock) for group, (rate, burst) in (limits or {}).items()
+        }
+        self._global = TokenBucket(global_limit[0], global_limit[1], clock) if global_limit else None
+        self._cond = threading.Condition()
+        self._waiting: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # -----------------------------------------------------------------------
+    # Core (non-blocking, called under the condition's lock)
+    # -----------------------------------------------------------------------
+
+    def _try_acquire(self, ticket: _Ticket) -> float:
+        """Grant ``ticket`` (return 0) or return how long to wait before retrying."""
+        now = self._clock()
+        bucket = self._buckets.get(ticket.group)
+        own_wait = bucket.wait_time(now) if bucket is not None else 0.0
+        if own_wait > 0:
+            return own_wait
+        # Yield to earlier/higher-priority waiters whose own budget is free:
+        # they compete for the same global tokens.
+        for other in self._waiting:
+            if other is ticket or (other.priority, other.seq) > (ticket.priority, ticket.seq):
+                continue
+            other_bucket = self._buckets.get(other.group)
+            if other_bucket is None or other_bucket.wait_time(now) == 0:
+                global_wait = self._global.wait_time(now) if self._global is not None else 0.0
+                return max(global_wait, _YIELD_WAIT)
+        global_wait = self._global.wait_time(now) if self._global is not None else 0.0
+        if global_wait > 0:
+            return global_wait
+        if bucket is not None:
+            bucket.take()
+        if self._global is not None:
+            self._global.take()
+        return 0.0
+
+    def _enqueue(self, group: str) -> _Ticket:
+        ticket = _Ticket(group, next(self._seq), self._clock())
+        self._waiting.append(ticket)
+        return ticket
+
+    def _dequeue(self, ticket: _Ticket, granted: bool) -> None:
+        self._waiting.remove(ticket)
+        if granted:
+            delay = self._clock() - ticket.enqueued
+            s = self._stats.setdefault(ticket.group, {"count": 0, "total_delay": 0.0, "max_delay": 0.0})
+            s["count"] += 1
+            s["total_delay"] += delay
+            s["max_delay"] = max(s["max_delay"], delay)
+        self._cond.notify_all()
+
+    # -----------------------------------------------------------------------
+    # Public API
+    # -----------------------------------------------------------------------
+
+    def acquire(self, group: str) -> None:
+        """Block the calling thread until a request of ``group`` may be sent."""
+        with self._cond:
+            ticket = self._enqueue(group)
+            granted = False
+            try:
+                while True:
+                    wait = self._try_acquire(ticket)
+                    if wait == 0:
+                        granted = True
+                        return
+                    self._cond.wait(wait)
+            finally:
+                self._dequeue(ticket, granted)
+
+    async def aacquire(self, group: str) -> None:
+        """Async :meth:`acquire`: sleeps instead of blocking the event loop."""
+        with self._cond:
+            ticket = self._enqueue(group)
+        granted = False
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_acquire(ticket)
+                if wait == 0:
+                    granted = True
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            with self._cond:
+                self._dequeue(ticket, granted)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per group: ``count``, ``total_delay``, ``max_delay``, ``avg_delay`` (seconds), ``queued``."""
+        with self._cond:
+            queued: Dict[str, int] = {}
+            for ticket in self._waiting:
+                queued[ticket.group] = queued.get(ticket.group, 0) + 1
+            out = {}
+            for group in set(self._stats) | set(queued):
+                s = dict(self._stats.get(group, {"count": 0, "total_delay": 0.0, "max_delay": 0.0}))
+                s["avg_delay"] = s["total_delay"] / s["count"] if s["count"] else 0.0
+                s["queued"] = queued.get(group, 0)
+                out[group] = s
+            return out
@@ -0,0 +1,154 @@
+"""Retries for transport failures, safe for signed transaction submits.
+
+A signed AlphaSec transaction carries its own nonce (the millisecond timestamp
+it was signed with), so POSTing the *same* raw ``tx`` twice can never create
+two orders: the exchange accepts it at most once. :class:`RetryPolicy`
+therefore resends the identical request body on failures where the outcome is
+unknown (timeouts, connection resets, gateway errors) and never re-signs.
+
+Opt-in: pass ``retry_policy=RetryPolicy()`` to ``API`` / ``AsyncAPI`` (or through
+``Agent`` / ``AsyncAgent``). Only requests whose body carries a signed ``tx``
+and, unless ``retry_queries=False``, GETs are retried; other writes are sent
+once.
+
+If a resend is rejected as a duplicate or stale nonce, the first attempt most
+likely landed; the server's response is returned unchanged so callers can
+tell the two cases apart.
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Gateway errors: the request may or may not have reached the exchange.
+RETRY_STATUSES = (502, 503, 504)
+
+
+def transport_errors() -> Tuple[type, ...]:
+    """Exception types that mean "outcome unknown, safe to resend the same body".
+
+    Only transports that are already imported are consulted, so the async
+    client never imports requests just to classify an httpx error.
+    """
+    errors = [ConnectionError, TimeoutError]
+    httpx = sys.modules.get("httpx")
+    if httpx is not None:
+        errors += [httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError]
+    requests = sys.modules.get("requests")
+    if requests is not None:
+        errors += [requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError]
+    return tuple(errors)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff bounded by attempts and a deadline.
+
+    Args:
+        max_attempts: Total attempts, including the first.
+        base_delay: Backoff base (seconds); attempt ``n`` sleeps a uniformly
+            random time in ``[0, min(max_delay, base_delay * 2**n)]``.
+        max_delay: Cap of a single backoff sleep.
+        deadline: Give up once this many seconds have passed since the first
+            attempt (no sleep is started that would end past it). Keep it well
+            under the exchange's nonce acceptance window.
+        retry_statuses: HTTP statuses treated as "outcome unknown".
+        retry_queries: Also retry GETs (always safe).
+        rng: ``random.random``-like source (injectable for tests).
+        clock: Monotonic time source (injectable for tests).
+
+    Attributes:
+        retries: Number of resends performed so far.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.05,
+        max_delay: float = 1.0,
+        deadline: float = 5.0,
+        retry_statuses: Tuple[int, ...] = RETRY_STATUSES,
+        retry_queries: bool = True,
+        rng: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_queries = retry_queries
+        self._rng = rng
+        self._clock = clock
+        self.retries = 0
+
+    def applies(self, method: str, params: Optional[dict]) -> bool:
+        """Whether a request may be retried: signed submits and (optionally) GETs."""
+        if method.upper() == "GET":
+            return self.retry_queries
+        return isinstance(params, dict) and "tx" in params
+
+    def backoff(self, attempt: int) -> float:
+        """Sleep before attempt ``attempt + 1`` (``attempt`` counts from 0)."""
+        return self._rng() * min(self.max_delay, self.base_delay * (2 ** attempt))
+
+    def _next_delay(self, attempt: int, started: float, reason: str) -> Optional[float]:
+        """Backoff before the next attempt, or None when retries are exhausted."""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        if self._clock() + delay - started > self.deadline:
+            return None
+        self.retries += 1
+        logger.warning(f"retrying request after {reason} (attempt {attempt + 2}/{self.max_attempts})")
+        return delay
+
+    def _retryable_status(self, response: Any) -> bool:
+        return getattr(response, "status_code", None) in self.retry_statuses
+
+    def run(self, send: Callable[[], Any]) -> Any:
+        """Call ``send`` (returning a response) with retries; return the last response."""
+        errors = transport_errors()
+        started = self._clock()
+        attempt = 0
+        while True:
+            try:
+                response = send()
+            except errors as exc:
+                delay = self._next_delay(attempt, started, type(exc).__name__)
+                if delay is None:
+                    raise
+            else:
+                if not self._retryable_status(response):
+                    return response
+                delay = self._next_delay(attempt, started, f"HTTP {response.status_code}")
+                if delay is None:
+                    return response
+            time.sleep(delay)
+            attempt += 1
+
+    async def arun(self, send: Callable[[], Awaitable[Any]]) -> Any:
+        """Async :meth:`run`."""
+        errors = transport_errors()
+        started = self._clock()
+        attempt = 0
+        while True:
+            try:
+                response = await send()
+            except errors as exc:
+                delay = self._next_delay(attempt, started, type(exc).__name__)
+                if delay is None:
+                    raise
+            else:
+                if not self._retryable_status(response):
+                    return response
+                delay = self._next_delay(attempt, started, f"HTTP {response.status_code}")
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,346 @@
+"""Per-stage latency tracing of signed submits (order, cancel, modify, perp).
+
+With ``tracer=Tracer(sink)``, each spot ``order`` / ``cancel`` /
+``cancel_all`` / ``modify`` and every perp submit records how long each
+stage took, then hands the finished :class:`Trace` to ``sink``:
+
+=============  ==============================================================
+``normalize``  market lookup and price/quantity normalization
+``build``      payload model and JSON encoding (``create_*_data``)
+``sign``       transaction signing
+``submit``     POST round trip, including rate limiting, retries and failover
+``pool_wait``  waiting for a pooled connection (``AsyncAPI`` only)
+``connect``    TCP/TLS handshake when a new connection was opened (``AsyncAPI`` only)
+``http``       request write to response read, per attempt (``AsyncAPI`` only)
+``ack``        submit response to the matching ``userEvent`` (``track_acks=True``)
+=============  ==============================================================
+
+``pool_wait``, ``connect`` and ``http`` lie inside ``submit``. A sink is any
+callable taking a :class:`Trace`: a plain callback, a :class:`HistogramSink`
+or an :class:`OpenTelemetrySink`. The default (``tracer=None``) skips all of
+this; the call sites only test that one attribute.
+
+Acks need the userEvent stream: subscribe :meth:`Tracer.on_user_event` to
+``userEvent@<address>`` and each trace is emitted once its order's first
+event arrives (or without an ``ack`` stage after ``ack_timeout``).
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextvars import ContextVar
+from typing import Any, Callable, Collection, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The trace of the submit in progress; read by AsyncAPI._send_to to attach
+# httpcore's per-request trace hook.
+current_trace: ContextVar[Optional["Trace"]] = ContextVar("alphasec_trace", default=None)
+
+
+# Operation names of the perp submit paths (``PerpAgent._submit``).
+PERP_OPERATIONS = {
+    "/fapi/v1/order": "perp.order",
+    "/fapi/v1/order/cancel": "perp.cancel",
+    "/fapi/v1/order/cancel/all": "perp.cancel_all",
+    "/fapi/v1/order/modify": "perp.modify",
+    "/fapi/v1/position/leverage": "perp.set_leverage",
+    "/fapi/v1/wallet/deposit": "perp.deposit",
+    "/fapi/v1/wallet/withdraw": "perp.withdraw",
+}
+
+
+class Stage(NamedTuple):
+    name: str
+    start: float   # time.perf_counter()
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Trace:
+    """Stage timings of one traced call (``perf_counter`` seconds).
+
+    Attributes:
+        operation: e.g. ``"order"``, ``"cancel"``, ``"perp.order"``.
+        attributes: Call context (e.g. ``{"market": "KAIA/USDT"}``).
+        stages: Recorded :class:`Stage` spans, in recording order.
+        tx_hash: Hash returned by a successful submit.
+        error: Failure description, if the call failed.
+    """
+
+    __slots__ = ("operation", "attributes", "start", "start_ns", "end", "stages", "tx_hash", "error", "_last")
+
+    def __init__(self, operation: str, attributes: Optional[Dict[str, Any]] = None):
+        self.operation = operation
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.start = self._last = time.perf_counter()
+        self.end: Optional[float] = None
+        self.stages: List[Stage] = []
+        self.tx_hash: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def mark(self, name: str) -> None:
+        """Close stage ``name``: it spans the previous mark (or the start) to now."""
+        now = time.perf_counter()
+        self.stages.append(Stage(name, self._last, now))
+        self._last = now
+
+    def add(self, name: str, start: float, end: float) -> None:
+        """Record a nested stage measured elsewhere."""
+        self.stages.append(Stage(name, start, end))
+
+    @property
+    def duration(self) -> float:
+        """Start to the end of the last stage (``ack`` included, if recorded)."""
+        end = max([self.end or self._last] + [s.end for s in self.stages])
+        return end - self.start
+
+    def durations(self) -> Dict[str, float]:
+        """Seconds per stage name; repeated stages (e.g. retried ``http``) are summed."""
+        out: Dict[str, float] = {}
+        for stage in self.stages:
+            out[stage.name] = out.get(stage.name, 0.0) + stage.duration
+        return out
+
+    def wall_ns(self, t: float) -> int:
+        """Convert a ``perf_counter`` time of this trace to epoch nanoseconds."""
+        return self.start_ns + int((t - self.start) * 1e9)
+
+    def http_hook(self) -> Callable[[str, dict], Any]:
+        """An httpx ``extensions={"trace": ...}`` callback recording pool/connect/http stages."""
+        return _HttpHook(self)
+
+    def __repr__(self) -> str:
+        stages = ", ".join(f"{k}={v * 1e3:.3f}ms" for k, v in self.durations().items())
+        return f"Trace({self.operation!r}, {stages}, error={self.error!r})"
+
+
+class _HttpHook:
+    """Turns httpcore trace events of one request attempt into stages."""
+
+    __slots__ = ("trace", "started", "connect_start", "connect_end", "http_start")
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self.started: Optional[float] = time.perf_counter()
+        self.connect_start: Optional[float] = None
+        self.connect_end: Optional[float] = None
+        self.http_start: Optional[float] = None
+
+    async def __call__(self, name: str, info: dict) -> None:
+        now = time.perf_counter()
+        if self.started is not None:
+            # The first event fires once the pool has handed out a connection.
+            self.trace.add("pool_wait", self.started, now)
+            self.started = None
+        if name == "connection.connect_tcp.started":
+            self.connect_start = now
+        elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.connect_end = now
+        elif name.endswith(".send_request_headers.started"):
+            if self.connect_start is not None and self.connect_end is not None:
+                self.trace.add("connect", self.connect_start, self.connect_end)
+                self.connect_start = None
+            self.http_start = now
+        elif name.endswith(".receive_response_body.complete") and self.http_start is not None:
+            self.trace.add("http", self.http_start, now)
+            self.http_start = None
+
+
+class Tracer:
+    """Creates traces and delivers finished ones to ``sink``.
+
+    Args:
+        sink: Callable receiving each finished :class:`Trace`; exceptions it
+            raises are logged, never propagated to the trading call.
+        track_acks: Hold successful traces until their ``userEvent`` arrives
+            (see :meth:`on_user_event`) and record an ``ack`` stage.
+        ack_operations: Operations whose submit hash names the order in its
+            events. Cancels and modifies are acked under the *target* order's
+            id, so they are emitted right away.
+        ack_timeout: Seconds to wait for an ack before emitting without one.
+        max_pending: Cap on traces awaiting an ack (oldest emitted first).
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[Trace], Any],
+        track_acks: bool = False,
+        ack_operations: Collection[str] = ("order", "perp.order"),
+        ack_timeout: float = 30.0,
+        max_pending: int = 10_000,
+    ):
+        self.sink = sink
+        self.track_acks = track_acks
+        self.ack_operations = frozenset(ack_operations)
+        self.ack_timeout = ack_timeout
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, operation: str, **attributes: Any) -> Trace:
+        return Trace(operation, attributes)
+
+    def finish(self, trace: Trace, tx_hash: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Complete ``trace``; emit it now, or park it until its ack arrives."""
+        trace.end = time.perf_counter()
+        trace.tx_hash = tx_hash
+        trace.error = error
+        if not (self.track_acks and tx_hash and error is None and trace.operation in self.ack_operations):
+            self._emit(trace)
+            return
+        with self._lock:
+            self._pending[tx_hash.lower()] = trace
+            expired = self._expire_locked(trace.end)
+        for old in expired:
+            self._emit(old)
+
+    def ack(self, tx_hash: str) -> bool:
+        """Record the ack of ``tx_hash`` now; False if it is not awaiting one."""
+        now = time.perf_counter()
+        with self._lock:
+            trace = self._pending.pop(tx_hash.lower(), None)
+            expired = self._expire_locked(now)
+        for old in expired:
+            self._emit(old)
+        if trace is None:
+            return False
+        trace.add("ack", trace.end, now)
+        self._emit(trace)
+        return True
+
+    def on_user_event(self, payload: Any) -> None:
+        """``userEvent`` subscription callback (spot list or perp dict payloads)."""
+        for event in payload if isinstance(payload, list) else [payload]:
+            if not isinstance(event, dict):
+                continue
+            for key in ("tx_hash", "order_id", "txHash", "orderId"):
+                value = event.get(key)
+                if isinstance(value, str) and self.ack(value):
+                    break
+
+    def flush(self) -> None:
+        """Emit every trace still waiting for an ack."""
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for trace in pending:
+            self._emit(trace)
+
+    def _expire_locked(self, now: float) -> List[Trace]:
+        expired = []
+        while self._pending:
+            oldest = next(iter(self._pending.values()))
+            if len(self._pending) <= self.max_pending and now - oldest.end <= self.ack_timeout:
+                break
+            expired.append(self._pending.popitem(last=False)[1])
+        return expired
+
+    def _emit(self, trace: Trace) -> None:
+        try:
+            self.sink(trace)
+        except Exception:
+            logger.error("trace sink raised", exc_info=True)
+
+
+def response_outcome(response: Any) -> Tuple[Optional[str], Optional[str]]:
+    """``(tx_hash, error)`` of a ``{code, errMsg, result}`` submit envelope."""
+    if isinstance(response, dict) and response.get("code") == 200:
+        result = response.get("result")
+        return (result if isinstance(result, str) else None), None
+    if isinstance(response, dict):
+        return None, str(response.get("errMsg") or response.get("error") or response.get("code"))
+    return None, "unexpected response"
+
+
+def _nearest_rank(ordered: List[float], pct: float) -> float:
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+
+class HistogramSink:
+    """In-memory latency distribution per ``operation`` and stage.
+
+    Keeps the last ``window`` samples of each ``(operation, stage)`` pair,
+    where stage ``"total"`` is the whole trace. Thread-safe.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self.errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __call__(self, trace: Trace) -> None:
+        with self._lock:
+            for name, seconds in trace.durations().items():
+                self._samples[(trace.operation, name)].append(seconds)
+            self._samples[(trace.operation, "total")].append(trace.duration)
+            if trace.error is not None:
+                self.errors[trace.operation] += 1
+
+    def percentile(self, operation: str, stage: str, pct: float) -> Optional[float]:
+        """Nearest-rank ``pct`` (0-100) in seconds, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples.get((operation, stage), ()))
+        return _nearest_rank(samples, pct) if samples else None
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """``{operation: {stage: {count, mean, p50, p90, p99, max}}}`` in seconds."""
+        with self._lock:
+            snapshot = {key: sorted(values) for key, values in self._samples.items()}
+        out: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(dict)
+        for (operation, stage), samples in snapshot.items():
+            if not samples:
+                continue
+            n = len(samples)
+            out[operation][stage] = {
+                "count": n,
+                "mean": sum(samples) / n,
+                "p50": _nearest_rank(samples, 50),
+                "p90": _nearest_rank(samples, 90),
+                "p99": _nearest_rank(samples, 99),
+                "max": samples[-1],
+            }
+        return dict(out)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self.errors.clear()
+
+
+class OpenTelemetrySink:
+    """Export each trace as an OpenTelemetry span with one child span per stage.
+
+    Needs ``opentelemetry-api`` (``pip install alphasec-py[otel]``); spans go
+    to whatever SDK/exporter the application configured. Timestamps are the
+    measured ones, so spans are created after the fact without skew.
+    """
+
+    def __init__(self, tracer: Any = None):
+        try:
+            from opentelemetry import trace as otel_trace
+        except ImportError as exc:
+            raise ImportError(
+                "OpenTelemetrySink requires opentelemetry-api: pip install alphasec-py[otel]") from exc
+        self._otel = otel_trace
+        self.tracer = tracer if tracer is not None else otel_trace.get_tracer("alphasec")
+
+    def __call__(self, trace: Trace) -> None:
+        attributes = {f"alphasec.{k}": v for k, v in trace.attributes.items() if v is not None}
+        if trace.tx_hash:
+            attributes["alphasec.tx_hash"] = trace.tx_hash
+        span = self.tracer.start_span(f"alphasec.{trace.operation}", start_time=trace.start_ns,
+                                      attributes=attributes)
+        context = self._otel.set_span_in_context(span)
+        for stage in trace.stages:
+            child = self.tracer.start_span(stage.name, context=context, start_time=trace.wall_ns(stage.start))
+            child.end(end_time=trace.wall_ns(stage.end))
+        if trace.error is not None:
+            span.set_status(self._otel.Status(self._otel.StatusCode.ERROR, trace.error))
+        span.end(end_time=trace.start_ns + int(trace.duration * 1e9))
@@ -2,11 +2,13 @@
 
 Provides a high-level async interface combining AsyncAPI and AsyncWebsocketManager.
 """
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 import asyncio
 import logging
+import time
 
 from alphasec.api.async_api import AsyncAPI
+from alphasec.api.ladder import Ladder, LadderHandle
 from alphasec.websocket.async_ws import AsyncWebsocketManager
 from alphasec.transaction.sign import AlphasecSigner
 from alphasec.api.utils import market_to_market_id
@@ -14,8 +16,6 @@ from alphasec.perp.async_agent import AsyncPerpAgent
 
 logger = logging.getLogger(__name__)
 
-logger = logging.getLogger(__name__)
-
 
 class AsyncAgent:
     """Async agent combining API and WebSocket functionality.
@@ -35,40 +35,129 @@ class AsyncAgent:
         base_url: str,
         signer: Optional[AlphasecSigner] = None,
         timeout: Optional[float] = None,
+        **api_options: Any,
     ):
         self._base_url = base_url
         self._signer = signer
         self._timeout = timeout
+        # Forwarded to AsyncAPI (e.g. cache=, metadata_cache=).
+        self._api_options = api_options
         self.api: Optional[AsyncAPI] = None
         self.ws: Optional[AsyncWebsocketManager] = None
         self._ws_task: Optional[asyncio.Task] = None
         self.perp = AsyncPerpAgent(self)
+        # Per-phase durations (seconds) of the last startup() call.
+        self.startup_timings: Dict[str, float] = {}
+
+    def _new_api(self) -> AsyncAPI:
+        return AsyncAPI(self._base_url, timeout=self._timeout, signer=self._signer, **self._api_options)
+
+    def _new_ws(self) -> AsyncWebsocketManager:
+        # Shares the REST endpoint pool, if any, so WS follows the same routing.
+        return AsyncWebsocketManager(
+            self._base_url, endpoints=self._api_options.get("endpoints"), metrics=self._api_options.get("metrics"))
 
     async def __aenter__(self) -> "AsyncAgent":
         """Async context manager entry."""
-        self.api = AsyncAPI(self._base_url, timeout=self._timeout, signer=self._signer)
+        self.api = self._new_api()
         await self.api.initialize()
-        self.ws = AsyncWebsocketManager(self._base_url)
+        self.ws = self._new_ws()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         """Async context manager exit."""
         await self.stop()
+        self.perp._cancel_revalidation()
         if self.api is not None:
             await self.api.close()
 
     async def _ensure_initialized(self) -> None:
         """Ensure API and WebSocket are initialized."""
         if self.api is None:
-            self.api = AsyncAPI(self._base_url, timeout=self._timeout, signer=self._signer)
+            self.api = self._new_api()
             await self.api._ensure_initialized()
         if self.ws is None:
-            self.ws = AsyncWebsocketManager(self._base_url)
+            self.ws = self._new_ws()
 
     # WebSocket lifecycle
     async def start(self) -> None:
         """Start the WebSocket connection and message loop."""
         await self._ensure_initialized()
+        await self._connect_ws()
+
+    async def startup(
+        self,
+        subscriptions: Sequence[Tuple[str, Callable[[Any], Any]]] = (),
+        prewarm_perp: bool = True,
+        connect_ws: bool = True,
+    ) -> Dict[str, float]:
+        """Initialize everything concurrently and return per-phase timings.
+
+        Token metadata, the WebSocket connect and (optionally) the perp market
+        cache are loaded in parallel instead of one after another. Each
+        ``(channel, callback)`` in ``subscriptions`` is subscribed as soon as
+        both metadata and the socket are ready; ``perp_*`` channels go through
+        ``agent.perp.subscribe``, all others through :meth:`subscribe`.
+        The metadata request also opens the pooled HTTP connection, so the
+        first order does not pay a TCP/TLS handshake.
+
+        Returns (and stores in ``startup_timings``) the duration in seconds of
+        each phase that ran (``metadata``, ``ws_connect``, ``perp_markets``,
+        ``subscriptions``) plus ``total``. If any phase fails, the others are
+        cancelled and the error is raised.
+
+        Example:
+            >>> timings = await agent.startup([("trade@KAIA/USDT", on_trade)])
+            >>> timings
+            {'metadata': 0.08, 'ws_connect': 0.11, 'perp_markets': 0.09, ...}
+        """
+        # Validate before anything is scheduled, so a bad call leaves no task behind.
+        if subscriptions and not connect_ws:
+            raise ValueError("subscriptions require connect_ws=True")
+        if self.api is None:
+            self.api = self._new_api()
+        if self.ws is None:
+            self.ws = self._new_ws()
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        async def timed(phase: str, awaitable: Awaitable[Any]) -> Any:
+            t0 = time.perf_counter()
+            result = await awaitable
+            timings[phase] = time.perf_counter() - t0
+            return result
+
+        metadata = asyncio.ensure_future(timed("metadata", self.api.initialize()))
+        tasks = [metadata]
+        if connect_ws:
+            ws_connect = asyncio.ensure_future(timed("ws_connect", self._connect_ws()))
+            tasks.append(ws_connect)
+        if prewarm_perp:
+            tasks.append(asyncio.ensure_future(timed("perp_markets", self.perp.prewarm())))
+        if subscriptions:
+            async def subscribe_all() -> None:
+                await asyncio.gather(metadata, ws_connect)
+                await timed("subscriptions", asyncio.gather(*(
+                    self.perp.subscribe(channel, callback) if channel.startswith("perp_")
+                    else self.subscribe(channel, callback)
+                    for channel, callback in subscriptions
+                )))
+
+            tasks.append(asyncio.ensure_future(subscribe_all()))
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        timings["total"] = time.perf_counter() - started
+        self.startup_timings = timings
+        logger.debug(f"startup timings: {timings}")
+        return timings
+
+    async def _connect_ws(self) -> None:
         assert self.ws is not None
         await self.ws.connect()
         self._ws_task = asyncio.create_task(self.ws.run())
@@ -239,6 +328,30 @@ class AsyncAgent:
         assert self.api is not None
         return await self.api.modify(order_id, new_price, new_qty, order_mode)
 
+    async def order_many(self, orders: Sequence[Mapping[str, Any]], concurrency: int = 8) -> List[dict]:
+        """Place many orders in one batch (see ``AsyncAPI.order_many``)."""
+        await self._ensure_initialized()
+        assert self.api is not None
+        return await self.api.order_many(orders, concurrency=concurrency)
+
+    async def cancel_many(self, order_ids: Sequence[str], concurrency: int = 8) -> List[dict]:
+        """Cancel many orders in one batch."""
+        await self._ensure_initialized()
+        assert self.api is not None
+        return await self.api.cancel_many(order_ids, concurrency=concurrency)
+
+    async def modify_many(self, modifications: Sequence[Mapping[str, Any]], concurrency: int = 8) -> List[dict]:
+        """Modify many orders in one batch (see ``AsyncAPI.modify_many``)."""
+        await self._ensure_initialized()
+        assert self.api is not None
+        return await self.api.modify_many(modifications, concurrency=concurrency)
+
+    async def place_ladder(self, ladder: Ladder, concurrency: int = 8) -> LadderHandle:
+        """Place a ladder of limit orders; returns a handle for the whole ladder."""
+        await self._ensure_initialized()
+        assert self.api is not None
+        return await self.api.place_ladder(ladder, concurrency=concurrency)
+
     async def value_transfer(self, to: str, value: float) -> dict:
         """Transfer native value to an address."""
         await self._ensure_initialized()
@@ -263,6 +376,12 @@ class AsyncAgent:
         assert self.api is not None
         return await self.api.deposit_to_alphasec(token, value)
 
+    async def deposit_many(self, deposits: Sequence[Tuple[str, Any]], wait: bool = True) -> List[dict]:
+        """Deposit several (token, value) pairs to AlphaSec in one batched pipeline."""
+        await self._ensure_initialized()
+        assert self.api is not None
+        return await self.api.deposit_many(deposits, wait=wait)
+
     # State accessors
     @property
     def l1_address(self):
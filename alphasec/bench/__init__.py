@@ -0,0 +1,19 @@
+"""Benchmarks for the SDK's hot paths: ``python -m alphasec.bench``.
+
+* :mod:`alphasec.bench.micro` times builders, signing and WebSocket parsing
+  in isolation.
+* :mod:`alphasec.bench.macro` drives orders and WebSocket messages through
+  ``AsyncAgent`` against an in-process :class:`~alphasec.testing.FakeExchange`.
+* :mod:`alphasec.bench.report` writes JSON result documents and compares a
+  run against a stored baseline.
+
+Not imported by ``alphasec`` itself.
+"""
+from .report import Comparison, compare, document, load
+
+__all__ = [
+    "Comparison",
+    "compare",
+    "document",
+    "load",
+]
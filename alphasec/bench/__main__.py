@@ -0,0 +1,72 @@
+"""Run the SDK benchmarks: ``python -m alphasec.bench [--micro|--macro] [--output run.json] [--baseline base.json]``.
+
+Exits with status 1 when ``--baseline`` is given and any benchmark regressed
+by more than ``--threshold``.
+"""
+import argparse
+import fnmatch
+import json
+import sys
+
+from alphasec.bench import macro, micro, report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m alphasec.bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    suite = parser.add_mutually_exclusive_group()
+    suite.add_argument("--micro", action="store_true", help="run only the micro benchmarks")
+    suite.add_argument("--macro", action="store_true", help="run only the macro benchmarks")
+    parser.add_argument("-k", "--filter", action="append",
+                        help="glob over micro benchmark names (repeatable), e.g. 'create_perp_*'")
+    parser.add_argument("--list", action="store_true", help="list the micro benchmarks and exit")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per micro benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per micro benchmark")
+    parser.add_argument("--orders-per-sec", type=float, default=200, help="macro order rate (0 skips)")
+    parser.add_argument("--ws-per-sec", type=float, default=5000, help="macro WebSocket message rate (0 skips)")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per macro benchmark")
+    parser.add_argument("--server-latency", type=float, default=0.0, help="fake exchange REST delay (seconds)")
+    parser.add_argument("-o", "--output", help="write the JSON result document here ('-' for stdout)")
+    parser.add_argument("--baseline", help="earlier result document to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    names = list(micro.benchmarks())
+    if args.filter:
+        names = [n for n in names if any(fnmatch.fnmatchcase(n, pattern) for pattern in args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    def progress(name: str, result: dict) -> None:
+        print(f"{name:<48} {result['value']:>14,.1f} {result['unit']}", file=sys.stderr, flush=True)
+
+    results = {}
+    if not args.macro:
+        results.update(micro.run(names, min_time=args.min_time, repeat=args.repeat, progress=progress))
+    if not args.micro:
+        macro_results = macro.run(args.orders_per_sec, args.ws_per_sec, args.duration, args.server_latency)
+        for name, result in macro_results.items():
+            progress(name, result)
+        results.update(macro_results)
+
+    doc = report.document(results)
+    regressed = False
+    if args.baseline:
+        rows = report.compare(results, report.load(args.baseline)["results"], args.threshold)
+        doc["comparison"] = {"baseline": args.baseline, "threshold": args.threshold,
+                             "rows": [row._asdict() for row in rows]}
+        print(report.format_comparison(rows), file=sys.stderr)
+        regressed = any(row.regression for row in rows)
+
+    if args.output == "-":
+        json.dump(doc, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w") as f:
+            json.dump(doc, f, indent=2)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
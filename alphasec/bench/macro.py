@@ -0,0 +1,158 @@
+"""Macro benchmarks: load driven through ``AsyncAgent`` against a FakeExchange.
+
+The exchange runs on its own event loop in a background thread; the client
+runs on the calling thread's loop, so both sides behave as they would in a
+real deployment (modulo the shared GIL).
+
+* ``orders``: an open-loop generator placing ``rate`` spot orders per second.
+  Latency is measured from each order's *scheduled* send time, so a client
+  that falls behind shows up in the tail instead of silently sending less
+  (no coordinated omission).
+* ``ws``: the server publishes ``rate`` trade notifications per second to a
+  subscribed ``AsyncAgent``; latency is publish-to-callback, taken from a
+  ``perf_counter`` stamp embedded in each payload.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT, SELL
+from alphasec.async_agent import AsyncAgent
+from alphasec.bench.micro import bench_signer
+from alphasec.testing import FakeExchange
+
+MARKET = "KAIA/USDT"
+TRADE_CHANNEL = "trade@1_2"   # MARKET's channel on the default FakeExchange
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))   # ceil
+    return ordered[int(rank) - 1]
+
+
+def _latency_results(prefix: str, latencies: List[float]) -> Dict[str, dict]:
+    return {
+        f"{prefix}.latency_{name}": {"value": percentile(latencies, pct) * 1e3, "unit": "ms", "better": "lower"}
+        for name, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+    }
+
+
+async def drive_orders(url: str, rate: float, duration: float) -> Dict[str, dict]:
+    """Place ``rate`` orders per second for ``duration`` seconds through an ``AsyncAgent``."""
+    total = max(1, int(rate * duration))
+    latencies: List[float] = []
+    errors = 0
+
+    async with AsyncAgent(url, signer=bench_signer()) as agent:
+        assert agent.api is not None
+        await agent.api.warmup()
+
+        async def place(i: int, scheduled: float) -> None:
+            nonlocal errors
+            # Alternating sides at one price keep the book shallow and exercise
+            # matching; distinct quantities keep same-millisecond txs unique.
+            side = BUY if i % 2 == 0 else SELL
+            try:
+                response = await agent.order(MARKET, side, price=1.0, quantity=1 + i % 100_000,
+                                             order_type=LIMIT, order_mode=BASE_MODE)
+            except Exception:
+                errors += 1
+                return
+            if response["status"]:
+                latencies.append(time.perf_counter() - scheduled)
+            else:
+                errors += 1
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(total):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(place(i, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    results = _latency_results("macro.orders", latencies)
+    results["macro.orders.throughput"] = {
+        "value": len(latencies) / elapsed, "unit": "orders/s", "better": "higher",
+        "target": rate, "sent": total, "errors": errors,
+    }
+    return results
+
+
+async def _pump(exchange: FakeExchange, rate: float, duration: float) -> int:
+    """Publish ``rate`` trade messages per second on the server loop; returns the count sent."""
+    total = max(1, int(rate * duration))
+    sent = 0
+    start = time.perf_counter()
+    while sent < total:
+        due = min(total, int((time.perf_counter() - start) * rate) + 1)
+        while sent < due:
+            exchange.publish(TRADE_CHANNEL, [{
+                "marketId": "1_2", "tradeId": str(sent), "price": "1.0", "quantity": "1",
+                "isBuyerMaker": sent % 2 == 0, "sentAt": time.perf_counter(),
+            }])
+            sent += 1
+        await asyncio.sleep(0.001)
+    return sent
+
+
+async def drive_ws(exchange: FakeExchange, rate: float, duration: float,
+                   drain_timeout: float = 2.0) -> Dict[str, dict]:
+    """Push ``rate`` WebSocket messages per second from ``exchange`` to an ``AsyncAgent``."""
+    latencies: List[float] = []
+
+    def on_trade(result: List[Dict[str, Any]]) -> None:
+        now = time.perf_counter()
+        latencies.extend(now - trade["sent_at"] for trade in result)
+
+    async with AsyncAgent(exchange.url) as agent:
+        await agent.start()
+        await agent.subscribe("trade@" + MARKET, on_trade)
+        while not exchange.subscribers(TRADE_CHANNEL):
+            await asyncio.sleep(0.001)
+
+        assert exchange.loop is not None
+        start = time.perf_counter()
+        sent = await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(_pump(exchange, rate, duration), exchange.loop))
+        deadline = time.perf_counter() + drain_timeout
+        while len(latencies) < sent and time.perf_counter() < deadline:
+            await asyncio.sleep(0.005)
+        elapsed = time.perf_counter() - start
+
+    results = _latency_results("macro.ws", latencies)
+    results["macro.ws.throughput"] = {
+        "value": len(latencies) / elapsed, "unit": "msgs/s", "better": "higher",
+        "target": rate, "sent": sent, "received": len(latencies),
+    }
+    return results
+
+
+def run(
+    orders_per_sec: float = 200,
+    ws_per_sec: float = 5000,
+    duration: float = 5.0,
+    server_latency: float = 0.0,
+    exchange: Optional[FakeExchange] = None,
+) -> Dict[str, dict]:
+    """Run the macro benchmarks (a rate of 0 skips one) against a fresh FakeExchange."""
+    owned = exchange is None
+    if exchange is None:
+        exchange = FakeExchange(latency=server_latency).start_in_thread()
+    try:
+        results: Dict[str, dict] = {}
+        if orders_per_sec:
+            results.update(asyncio.run(drive_orders(exchange.url, orders_per_sec, duration)))
+        if ws_per_sec:
+            results.update(asyncio.run(drive_ws(exchange, ws_per_sec, duration)))
+        return results
+    finally:
+        if owned:
+            exchange.stop_thread()
@@ -0,0 +1,176 @@
+"""Micro benchmarks: hot pure-Python paths timed in isolation.
+
+Each benchmark is a zero-argument callable built once by its factory, then
+timed with ``perf_counter`` in auto-calibrated loops (like ``timeit``, with
+the garbage collector disabled). The reported value is the median time per
+call over ``repeat`` runs.
+"""
+import gc
+import json
+import statistics
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from eth_account import Account
+
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT
+from alphasec.perp.constants import GTC
+from alphasec.transaction.constants import DexCommandSessionCreate
+from alphasec.transaction.sign import AlphasecSigner, perp_decimal_str
+from alphasec.transaction.utils import normalize_price_quantity
+from alphasec.websocket.types import convert_to_snake_case
+
+# Fixed keys so signatures (and therefore timings) do not vary between runs.
+_L1_KEY = "0x" + "11" * 32
+_L2_KEY = "0x" + "22" * 32
+_ORDER_ID = "0x" + "ab" * 32
+_TIMESTAMP_MS = 1_700_000_000_000
+
+Benchmark = Callable[[], object]
+
+
+def bench_signer() -> AlphasecSigner:
+    """A deterministic kairos signer for benchmarks (never funded)."""
+    account = Account.from_key(_L1_KEY)
+    return AlphasecSigner({
+        "network": "kairos",
+        "l1_address": account.address,
+        "l1_wallet": _L1_KEY,
+        "l2_wallet": _L2_KEY,
+        "session_enabled": False,
+    })
+
+
+def _trade_message(n: int = 1) -> str:
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": "subscription",
+        "params": {
+            "channel": "trade@1_2",
+            "result": [{
+                "marketId": "1_2", "tradeId": str(i), "price": "1.2345", "quantity": "10.5",
+                "buyOrderId": _ORDER_ID, "sellOrderId": _ORDER_ID, "isBuyerMaker": False,
+                "createdAt": _TIMESTAMP_MS,
+            } for i in range(n)],
+        },
+    })
+
+
+def _signer_benchmarks() -> Dict[str, Benchmark]:
+    signer = bench_signer()
+    session_addr = Account.from_key(_L2_KEY).address
+    order_data = signer.create_order_data("1", "2", BUY, 1.2345, 10.5, LIMIT, BASE_MODE)
+    return {
+        "create_session_data": lambda: signer.create_session_data(
+            DexCommandSessionCreate, session_addr, _TIMESTAMP_MS, _TIMESTAMP_MS + 86_400_000),
+        "create_value_transfer_data": lambda: signer.create_value_transfer_data(session_addr, 1.5),
+        "create_token_transfer_data": lambda: signer.create_token_transfer_data(session_addr, 1.5, "2"),
+        "create_order_data": lambda: signer.create_order_data("1", "2", BUY, 1.2345, 10.5, LIMIT, BASE_MODE),
+        "create_order_data.tpsl": lambda: signer.create_order_data(
+            "1", "2", BUY, 1.2345, 10.5, LIMIT, BASE_MODE, tp_limit=1.5, sl_trigger=1.0, sl_limit=0.99),
+        "create_cancel_data": lambda: signer.create_cancel_data(_ORDER_ID),
+        "create_cancel_all_data": lambda: signer.create_cancel_all_data(),
+        "create_modify_data": lambda: signer.create_modify_data(_ORDER_ID, 1.25, 11.0, BASE_MODE),
+        "create_stop_order_data": lambda: signer.create_stop_order_data(
+            "1", "2", 1.1, 1.2, 10.5, BUY, LIMIT, BASE_MODE),
+        "create_perp_order_data": lambda: signer.create_perp_order_data(
+            1, BUY, Decimal("50000.5"), Decimal("0.25"), False, GTC, "bench-1"),
+        "create_perp_cancel_data": lambda: signer.create_perp_cancel_data(1, _ORDER_ID),
+        "create_perp_cancel_all_data": lambda: signer.create_perp_cancel_all_data(1),
+        "create_perp_modify_data": lambda: signer.create_perp_modify_data(
+            1, _ORDER_ID, Decimal("50001"), Decimal("0.3")),
+        "create_perp_set_leverage_data": lambda: signer.create_perp_set_leverage_data(1, 10),
+        "create_perp_deposit_data": lambda: signer.create_perp_deposit_data("2", Decimal("100.5")),
+        "create_perp_withdraw_data": lambda: signer.create_perp_withdraw_data("2", Decimal("100.5")),
+        "generate_alphasec_transaction": lambda: signer.generate_alphasec_transaction(
+            _TIMESTAMP_MS, order_data),
+    }
+
+
+def _ws_benchmarks() -> Dict[str, Benchmark]:
+    from alphasec.websocket import async_ws, ws
+
+    def noop(_payload: object) -> None:
+        pass
+
+    async_manager = async_ws.AsyncWebsocketManager("http://127.0.0.1:1")
+    async_manager.active_subscriptions["trade:1_2"].append(
+        async_ws.ActiveSubscription(noop, 1, "trade@1_2"))
+    sync_manager = ws.WebsocketManager("http://127.0.0.1:1")
+    sync_manager.active_subscriptions["trade:1_2"].append(ws.ActiveSubscription(noop, 1, "trade@1_2"))
+    single, batch = _trade_message(1), _trade_message(50)
+    parsed = json.loads(batch)
+    return {
+        "convert_to_snake_case": lambda: convert_to_snake_case(parsed),
+        "on_message.async": lambda: async_manager.on_message(single),
+        "on_message.async.50_trades": lambda: async_manager.on_message(batch),
+        "on_message.sync": lambda: sync_manager.on_message(None, single),
+    }
+
+
+def benchmarks() -> Dict[str, Benchmark]:
+    """All micro benchmarks by name (without the ``micro.`` prefix)."""
+    result: Dict[str, Benchmark] = {
+        "perp_decimal_str": lambda: perp_decimal_str("50000.123456789"),
+        "perp_decimal_str.decimal": lambda: perp_decimal_str(Decimal("5E+4")),
+        "normalize_price_quantity": lambda: normalize_price_quantity(1.23456789, 1234.56789),
+    }
+    result.update(_signer_benchmarks())
+    result.update(_ws_benchmarks())
+    return result
+
+
+def _time(fn: Benchmark, loops: int) -> float:
+    it = range(loops)
+    start = time.perf_counter()
+    for _ in it:
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(fn: Benchmark, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """Time ``fn``; each of the ``repeat`` runs lasts at least ``min_time / repeat`` seconds."""
+    target = min_time / repeat
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        fn()   # warm caches and lazy imports
+        loops = 1
+        while True:
+            elapsed = _time(fn, loops)
+            if elapsed >= target:
+                break
+            loops *= 10 if elapsed < target / 10 else 2
+        samples = [_time(fn, loops) / loops * 1e9 for _ in range(repeat)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "value": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "loops": loops,
+        "repeat": repeat,
+        "unit": "ns/op",
+        "better": "lower",
+    }
+
+
+def run(
+    names: Optional[Iterable[str]] = None,
+    min_time: float = 0.2,
+    repeat: int = 5,
+    progress: Optional[Callable[[str, dict], None]] = None,
+) -> Dict[str, dict]:
+    """Run the selected micro benchmarks (all by default); keys are ``micro.<name>``."""
+    available = benchmarks()
+    selected: List[Tuple[str, Benchmark]] = [
+        (name, available[name]) for name in (available if names is None else names)]
+    results = {}
+    for name, fn in selected:
+        result = measure(fn, min_time=min_time, repeat=repeat)
+        results[f"micro.{name}"] = result
+        if progress is not None:
+            progress(f"micro.{name}", result)
+    return results
@@ -0,0 +1,87 @@
+"""Benchmark result documents and baseline comparison.
+
+A result document is JSON::
+
+    {"sdk_version": "0.1.4", "python": "3.11.4", "platform": "...",
+     "timestamp": "2026-01-01T00:00:00+00:00",
+     "results": {"micro.create_order_data": {"value": 8123.0, "unit": "ns/op",
+                                             "better": "lower", ...}, ...}}
+
+Any earlier run's output file serves as a baseline.
+"""
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+def sdk_version() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+        return version("alphasec-py")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def document(results: Dict[str, dict]) -> Dict[str, Any]:
+    """Wrap ``results`` with the environment they were measured in."""
+    return {
+        "sdk_version": sdk_version(),
+        "python": platform.python_version(),
+        "implementation": sys.implementation.name,
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": results,
+    }
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        try:
+            doc = json.load(f)
+        except json.JSONDecodeError:
+            raise ValueError(f"Invalid benchmark file: {path}")
+    if not isinstance(doc.get("results"), dict):
+        raise ValueError(f"Benchmark file has no results: {path}")
+    return doc
+
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+    unit: str
+    change: Optional[float]   # relative; positive = worse; None if the baseline is 0
+    regression: bool
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], threshold: float = 0.10) -> List[Comparison]:
+    """Compare the benchmarks present in both result maps.
+
+    ``change`` is normalized so that a positive value is always worse,
+    whatever the benchmark's ``better`` direction; a benchmark regresses when
+    it is worse by more than ``threshold`` (0.10 = 10%).
+    """
+    rows = []
+    for name in sorted(current.keys() & baseline.keys()):
+        cur, base = current[name], baseline[name]
+        sign = -1.0 if cur.get("better", "lower") == "higher" else 1.0
+        if base["value"]:
+            change = sign * (cur["value"] - base["value"]) / abs(base["value"])
+            regression = change > threshold
+        else:
+            change = None
+            regression = sign * cur["value"] > 0
+        rows.append(Comparison(name, base["value"], cur["value"], cur.get("unit", ""), change, regression))
+    return rows
+
+
+def format_comparison(rows: List[Comparison]) -> str:
+    width = max((len(row.name) for row in rows), default=0)
+    lines = [f"{'benchmark':<{width}}  {'baseline':>14}  {'current':>14}  {'change':>8}"]
+    for row in rows:
+        change = "n/a" if row.change is None else f"{row.change:+.1%}"
+        flag = "  REGRESSION" if row.regression else ""
+        lines.append(f"{row.name:<{width}}  {row.baseline:>14,.1f}  {row.current:>14,.1f}  {change:>8}{flag}")
+    return "\n".join(lines)
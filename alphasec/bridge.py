@@ -0,0 +1,440 @@
+"""Pipelined L1 -> AlphaSec deposits over ``AsyncWeb3``.
+
+``AlphasecSigner.generate_deposit_transaction`` runs one blocking RPC per
+step: allowance, nonce, approve, a receipt wait, then the nonce again. For a
+treasury moving many tokens that is a few round trips plus a block time per
+token. :class:`DepositPipeline` reads everything in one request regardless of
+the number of deposits and never waits on a receipt before the next send:
+
+1. One JSON-RPC batch reads the chain id, gas price, the pending nonce and
+   the gateway allowance of every ERC-20 involved.
+2. Every approve and deposit is signed locally with consecutive nonces from
+   :class:`PendingNonces` and sent right away, in nonce order (an approve is
+   followed by its deposit, so the node executes them in order without
+   waiting for the approve's receipt). The first rejected transaction ends
+   the run: nothing after it is signed or sent, since its later nonces would
+   wait in the node's queue and run whenever the gap is filled.
+
+Receipts are then awaited concurrently::
+
+    pipeline = DepositPipeline(signer)
+    results = await pipeline.deposit_many([
+        Deposit("1", "10"),                                   # native KAIA
+        Deposit(usdt_id, "2500", usdt_l1_address, decimals=6),
+    ])
+
+``AsyncAPI.deposit_many`` resolves token symbols and uses one shared pipeline.
+Contract objects are built once per address.
+
+Withdrawals end on L1 with ``executeTransaction`` on the outbox, which needs
+an outbox proof for each ``L2ToL1Tx`` event. :class:`WithdrawalProofs` finds
+the events of a whole block range in one ``get_logs`` call, fetches their
+merkle tree states and proofs in two L2 batches and their outbox status
+(root registered, already spent) in one L1 batch::
+
+    proofs = WithdrawalProofs(signer)
+    ready = [w for w in await proofs.scan(from_block, to_block) if w.ready]
+    results = await proofs.execute(ready)   # sent like deposits: in nonce order, stopping at a rejection
+
+:class:`alphasec.testing.chain.FakeChain` stands in for both chains in tests.
+"""
+import asyncio
+import logging
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from eth_utils.address import is_address, to_checksum_address
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+from alphasec.api.constants import ALPHASEC_KAIROS_URL, ALPHASEC_MAINNET_URL, KAIROS_URL, MAINNET_URL
+from alphasec.transaction.abi import (
+    ERC20_ABI,
+    ERC20_ROUTER_ABI,
+    L1_OUTBOX_ABI,
+    L2_SYSTEM_ABI,
+    NATIVE_L1_ABI,
+    ZK_INTERFACE_ABI,
+)
+from alphasec.transaction.constants import (
+    ALPHASEC_NATIVE_TOKEN_ID,
+    ALPHASEC_SYSTEM_CONTRACT_ADDR,
+    ALPHASEC_ZK_INTERFACE_CONTRACT_ADDR,
+    KAIROS_ERC20_GATEWAY_CONTRACT_ADDR,
+    KAIROS_ERC20_ROUTER_CONTRACT_ADDR,
+    KAIROS_INBOX_CONTRACT_ADDR,
+    KAIROS_OUTBOX_CONTRACT_ADDR,
+    MAINNET_ERC20_GATEWAY_CONTRACT_ADDR,
+    MAINNET_ERC20_ROUTER_CONTRACT_ADDR,
+    MAINNET_INBOX_CONTRACT_ADDR,
+    MAINNET_OUTBOX_CONTRACT_ADDR,
+)
+from alphasec.transaction.sign import AlphasecSigner
+
+logger = logging.getLogger(__name__)
+
+# Same parameters as AlphasecSigner.generate_deposit_transaction.
+GAS_LIMIT = 1000000
+L2_GAS_LIMIT = 1000000
+L2_GAS_PRICE = 1000000
+MAX_SUBMISSION_COST = int(0.01 * 10**18)
+ERC20_DEPOSIT_FEE = int(0.02 * 10**18)
+
+
+ZERO_ROOT = bytes(32)
+NOT_SENT = "not sent: earlier nonce rejected"
+
+
+class Deposit(NamedTuple):
+    """One deposit: ``value`` in token units; ERC-20s need their L1 address."""
+    token_id: str
+    value: Union[Decimal, str, int, float]
+    token_l1_address: Optional[str] = None
+    decimals: int = 18
+
+
+class PendingNonces:
+    """Local counter of the account's next L1 nonce.
+
+    Seeded from the node's pending transaction count and advanced locally,
+    so transactions that depend on each other can be signed and sent back to
+    back. Never moves backwards while in use; :meth:`reset` after a failed send
+    so the next seed comes from the node again.
+    """
+
+    def __init__(self) -> None:
+        self._next: Optional[int] = None
+
+    def seed(self, pending_count: int) -> None:
+        self._next = pending_count if self._next is None else max(self._next, pending_count)
+
+    def take(self) -> int:
+        if self._next is None:
+            raise RuntimeError("PendingNonces.take() before seed()")
+        nonce = self._next
+        self._next += 1
+        return nonce
+
+    def reset(self) -> None:
+        self._next = None
+
+
+class _L1Client:
+    """Signs from the ``l1_wallet`` with local nonces and sends in JSON-RPC batches."""
+
+    def __init__(self, signer: AlphasecSigner, provider: Optional[AsyncWeb3], receipt_timeout: float):
+        if signer.l1_wallet is None:
+            raise ValueError("l1_wallet is not set, L1 transactions are only available for l1 wallet")
+        self.signer = signer
+        self.mainnet = signer.network == "mainnet"
+        self.w3 = provider or AsyncWeb3(AsyncHTTPProvider(MAINNET_URL if self.mainnet else KAIROS_URL))
+        self.receipt_timeout = receipt_timeout
+        self.nonces = PendingNonces()
+        self._contracts: Dict[str, Any] = {}
+        # Held from the read batch until every transaction is sent, so concurrent
+        # calls never interleave their nonces or send behind a rejected one.
+        self._lock = asyncio.Lock()
+
+    def _contract(self, address: str, abi: list) -> Any:
+        return _cached_contract(self.w3, self._contracts, address, abi)
+
+    async def _read_state(self, calls: Sequence[Any]) -> Tuple[dict, list]:
+        """Read chain id, gas price and the pending nonce along with ``calls`` in one batch.
+
+        Seeds the nonce counter; returns the common transaction fields and the call results.
+        """
+        async with self.w3.batch_requests() as batch:
+            batch.add(self.w3.eth.chain_id)
+            batch.add(self.w3.eth.gas_price)
+            batch.add(self.w3.eth.get_transaction_count(self.signer.l1_address, "pending"))
+            for call in calls:
+                batch.add(call)
+            chain_id, gas_price, pending, *results = await batch.async_execute()
+        self.nonces.seed(pending)
+        return {"chainId": chain_id, "gasPrice": gas_price, "gas": GAS_LIMIT}, results
+
+    def _sign(self, fields: dict, to: str, value: int, data: str) -> bytes:
+        tx = dict(fields, to=to, value=value, data=data, nonce=self.nonces.take())
+        return bytes(self.signer.l1_wallet.sign_transaction(tx).raw_transaction)
+
+    async def _send_in_order(
+        self, fields: dict, txs: Sequence[Tuple[str, int, str]],
+    ) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Sign and send each ``(to, value, data)`` with the next nonce; one ``(tx_hash, error)`` each.
+
+        Stops at the first rejection or transport error: the rest are neither
+        signed nor sent and get :data:`NOT_SENT`, and the nonce counter is
+        reset so the next call re-seeds from the node. Errors are returned,
+        not raised, so the hashes of the transactions already sent are never lost.
+        """
+        results: List[Tuple[Optional[str], Optional[str]]] = []
+        for to, value, data in txs:
+            if results and results[-1][1] is not None:
+                results.append((None, NOT_SENT))
+                continue
+            raw = self._sign(fields, to, value, data)
+            try:
+                # To the provider directly, so a rejection is an error result, not an exception.
+                response = await self.w3.provider.make_request("eth_sendRawTransaction", ["0x" + raw.hex()])
+            except Exception as exc:
+                self.nonces.reset()   # unknown whether the node took it
+                results.append((None, repr(exc)))
+                continue
+            except BaseException:
+                self.nonces.reset()
+                raise
+            if "error" in response:
+                self.nonces.reset()
+                results.append((None, str(response["error"])))
+            else:
+                results.append((response.get("result"), None))
+        return results
+
+    async def _await_receipts(self, results: List[dict], failure: str) -> None:
+        # Concurrently, for every result the node accepted; a revert or timeout fails it.
+        accepted = [result for result in results if result["status"]]
+        errors = await asyncio.gather(*(self._receipt(result["tx_hash"], failure) for result in accepted))
+        for result, error in zip(accepted, errors):
+            if error is not None:
+                result.update(status=False, error=error)
+
+    async def _receipt(self, tx_hash: str, failure: str) -> Optional[str]:
+        try:
+            receipt = await self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.receipt_timeout)
+        except Exception as exc:
+            return f"no receipt: {exc!r}"
+        return None if receipt["status"] == 1 else failure
+
+
+class DepositPipeline(_L1Client):
+    """Batched, pipelined deposits from the signer's ``l1_wallet``; see the module docstring.
+
+    Args:
+        signer: Signer with an ``l1_wallet``.
+        provider: ``AsyncWeb3`` for the L1 chain; default an HTTP provider for the signer's network.
+        receipt_timeout: Seconds to wait for each deposit's receipt.
+    """
+
+    def __init__(
+        self,
+        signer: AlphasecSigner,
+        provider: Optional[AsyncWeb3] = None,
+        receipt_timeout: float = 120.0,
+    ):
+        super().__init__(signer, provider, receipt_timeout)
+        self._inbox = MAINNET_INBOX_CONTRACT_ADDR if self.mainnet else KAIROS_INBOX_CONTRACT_ADDR
+        self._gateway = MAINNET_ERC20_GATEWAY_CONTRACT_ADDR if self.mainnet else KAIROS_ERC20_GATEWAY_CONTRACT_ADDR
+        self._router = MAINNET_ERC20_ROUTER_CONTRACT_ADDR if self.mainnet else KAIROS_ERC20_ROUTER_CONTRACT_ADDR
+
+    async def deposit_many(self, deposits: Sequence[Deposit], wait: bool = True) -> List[dict]:
+        """Send every deposit (and the approvals they need); one result per deposit.
+
+        Each result is ``{"status", "error", "tx_hash"}`` as from
+        ``AsyncAPI.deposit_to_alphasec``. With ``wait=False`` the status only
+        says the transaction was accepted by the node.
+
+        Raises:
+            ValueError: If a deposit is malformed (nothing is sent).
+        """
+        amounts = [_onchain_amount(deposit) for deposit in deposits]
+        totals: Dict[str, int] = {}   # ERC-20 address -> total for the gateway to pull
+        for deposit, amount in zip(deposits, amounts):
+            if deposit.token_id != ALPHASEC_NATIVE_TOKEN_ID:
+                if deposit.token_l1_address is None or not is_address(deposit.token_l1_address):
+                    raise ValueError("token_l1_address is invalid")
+                token = to_checksum_address(deposit.token_l1_address)
+                totals[token] = totals.get(token, 0) + amount
+
+        async with self._lock:
+            owner = self.signer.l1_address
+            fields, allowances = await self._read_state(
+                [self._contract(token, ERC20_ABI).functions.allowance(owner, self._gateway) for token in totals])
+            # (ERC-20 address for an approve or deposit index, (to, value, data)), in nonce order.
+            txs: List[Tuple[Union[str, int], Tuple[str, int, str]]] = []
+            for token, total in totals.items():
+                if allowances.pop(0) < total:
+                    data = self._contract(token, ERC20_ABI).encode_abi("approve", args=[self._gateway, total])
+                    txs.append((token, (token, 0, data)))
+            for index, (deposit, amount) in enumerate(zip(deposits, amounts)):
+                txs.append((index, self._deposit_call(deposit, amount)))
+            sent = await self._send_in_order(fields, [tx for _, tx in txs])
+
+        results = [{"status": False, "error": None, "tx_hash": None} for _ in deposits]
+        failed_approvals: Dict[str, str] = {}
+        for (key, _), (tx_hash, error) in zip(txs, sent):
+            if error is not None and error != NOT_SENT:
+                logger.warning(f"Deposit transaction rejected: {error}")
+            if isinstance(key, str):
+                if error is not None:
+                    failed_approvals[key] = f"allowance approve failed: {error}"
+                continue
+            deposit = deposits[key]
+            token = to_checksum_address(deposit.token_l1_address) if deposit.token_l1_address else None
+            error = failed_approvals.get(token) or error
+            results[key].update(status=error is None, error=error, tx_hash=tx_hash)
+
+        if wait:
+            await self._await_receipts(results, "deposit failed")
+        return results
+
+    def _deposit_call(self, deposit: Deposit, amount: int) -> Tuple[str, int, str]:
+        if deposit.token_id == ALPHASEC_NATIVE_TOKEN_ID:
+            return self._inbox, amount, self._contract(self._inbox, NATIVE_L1_ABI).encode_abi("depositEth")
+        extra = self.w3.codec.encode(["uint256", "bytes"], [MAX_SUBMISSION_COST, b""])
+        data = self._contract(self._router, ERC20_ROUTER_ABI).encode_abi(
+            "outboundTransfer",
+            args=[to_checksum_address(deposit.token_l1_address), self.signer.l1_address, amount,
+                  L2_GAS_LIMIT, L2_GAS_PRICE, extra])
+        return self._router, ERC20_DEPOSIT_FEE, data
+
+
+class Withdrawal(NamedTuple):
+    """An ``L2ToL1Tx`` event with its outbox proof and L1 status."""
+    event: Any              # the event args: caller, destination, position, arbBlockNum, ...
+    block_number: int       # L2 block of the event
+    root: bytes             # merkle root the proof is against
+    proof: List[bytes]
+    registered: bool        # root is known to the L1 outbox
+    spent: bool             # already executed on L1
+
+    @property
+    def position(self) -> int:
+        return self.event["position"]
+
+    @property
+    def destination(self) -> str:
+        return self.event["destination"]
+
+    @property
+    def ready(self) -> bool:
+        """Can be executed on L1 now."""
+        return self.registered and not self.spent
+
+
+def group_by_destination(withdrawals: Sequence[Withdrawal]) -> Dict[str, List[Withdrawal]]:
+    groups: Dict[str, List[Withdrawal]] = {}
+    for withdrawal in withdrawals:
+        groups.setdefault(withdrawal.destination, []).append(withdrawal)
+    return groups
+
+
+class WithdrawalProofs(_L1Client):
+    """Batched proof retrieval and L1 execution of withdrawals; see the module docstring.
+
+    Args:
+        signer: Signer with an ``l1_wallet`` (executes on L1 and is the default destination).
+        l2: ``AsyncWeb3`` for the AlphaSec chain; default an HTTP provider for the signer's network.
+        l1: ``AsyncWeb3`` for the L1 chain; default likewise.
+        receipt_timeout: Seconds to wait for each execution's receipt.
+    """
+
+    def __init__(
+        self,
+        signer: AlphasecSigner,
+        l2: Optional[AsyncWeb3] = None,
+        l1: Optional[AsyncWeb3] = None,
+        receipt_timeout: float = 120.0,
+    ):
+        super().__init__(signer, l1, receipt_timeout)
+        self.l2 = l2 or AsyncWeb3(AsyncHTTPProvider(ALPHASEC_MAINNET_URL if self.mainnet else ALPHASEC_KAIROS_URL))
+        self._l2_contracts: Dict[str, Any] = {}
+        self._outbox = MAINNET_OUTBOX_CONTRACT_ADDR if self.mainnet else KAIROS_OUTBOX_CONTRACT_ADDR
+        self._gateway = MAINNET_ERC20_GATEWAY_CONTRACT_ADDR if self.mainnet else KAIROS_ERC20_GATEWAY_CONTRACT_ADDR
+
+    async def scan(
+        self,
+        from_block: int,
+        to_block: int,
+        destinations: Optional[Sequence[str]] = None,
+    ) -> List[Withdrawal]:
+        """Every withdrawal in ``from_block..to_block`` (inclusive) with its proof and L1 status.
+
+        ``destinations`` defaults to the signer's L1 address and the ERC-20
+        gateway (token withdrawals are sent to the gateway), like
+        ``AlphasecSigner.get_withdraw_info_on_l2``.
+        """
+        if destinations is None:
+            destinations = [self.signer.l1_address, self._gateway]
+        system = _cached_contract(self.l2, self._l2_contracts, ALPHASEC_SYSTEM_CONTRACT_ADDR, L2_SYSTEM_ABI)
+        logs = await system.events.L2ToL1Tx().get_logs(
+            from_block=from_block, to_block=to_block,
+            argument_filters={"destination": [to_checksum_address(d) for d in destinations]})
+        if not logs:
+            return []
+
+        # The proof of a leaf is built against the tree as of the event's block.
+        blocks = sorted({log["blockNumber"] for log in logs})
+        states = await _batch_call(self.l2, [(system, "sendMerkleTreeState", [], block) for block in blocks])
+        sizes = {block: state[0] for block, state in zip(blocks, states)}
+        zk = _cached_contract(self.l2, self._l2_contracts, ALPHASEC_ZK_INTERFACE_CONTRACT_ADDR, ZK_INTERFACE_ABI)
+        proofs = await _batch_call(self.l2, [(zk, "constructOutboxProof",
+                                              [sizes[log["blockNumber"]], log["args"]["position"]], "latest")
+                                             for log in logs])
+
+        roots = list({proof[1] for proof in proofs})
+        outbox = self._contract(self._outbox, L1_OUTBOX_ABI)
+        status = await _batch_call(self.w3, [(outbox, "roots", [root], "latest") for root in roots]
+                                   + [(outbox, "isSpent", [log["args"]["position"]], "latest") for log in logs])
+        registered = {root: bytes(value[0]) != ZERO_ROOT for root, value in zip(roots, status)}
+        spent = [value[0] for value in status[len(roots):]]
+        return [Withdrawal(log["args"], log["blockNumber"], proof[1], list(proof[2]), registered[proof[1]], is_spent)
+                for log, proof, is_spent in zip(logs, proofs, spent)]
+
+    async def execute(self, withdrawals: Sequence[Withdrawal], wait: bool = True) -> List[dict]:
+        """Execute ``withdrawals`` on the L1 outbox with consecutive local nonces, sent in order.
+
+        Returns one ``{"status", "error", "tx_hash"}`` per withdrawal; one
+        that is not :attr:`~Withdrawal.ready` is skipped with an error. After a
+        rejected transaction nothing more is signed or sent; the rest fail with
+        :data:`NOT_SENT`.
+        """
+        results = [{"status": False, "error": None, "tx_hash": None} for _ in withdrawals]
+        outbox = self._contract(self._outbox, L1_OUTBOX_ABI)
+        txs: List[Tuple[int, Tuple[str, int, str]]] = []
+        async with self._lock:
+            fields, _ = await self._read_state([])
+            for index, withdrawal in enumerate(withdrawals):
+                if not withdrawal.ready:
+                    results[index]["error"] = "withdraw proof is already spent" if withdrawal.spent \
+                        else "withdraw proof root is not registered on L1 yet"
+                    continue
+                event = withdrawal.event
+                data = outbox.encode_abi("executeTransaction", args=[
+                    withdrawal.proof, event["position"], event["caller"], event["destination"],
+                    event["arbBlockNum"], event["ethBlockNum"], event["timestamp"], event["callvalue"],
+                    event["data"]])
+                txs.append((index, (self._outbox, 0, data)))
+            sent = await self._send_in_order(fields, [tx for _, tx in txs])
+
+        for (index, _), (tx_hash, error) in zip(txs, sent):
+            if error is not None and error != NOT_SENT:
+                logger.warning(f"Withdraw execution rejected: {error}")
+            results[index].update(status=error is None, error=error, tx_hash=tx_hash)
+        if wait:
+            await self._await_receipts(results, "withdraw execution failed")
+        return results
+
+
+async def _batch_call(w3: AsyncWeb3, calls: List[Tuple[Any, str, list, Any]]) -> List[tuple]:
+    """``eth_call`` each ``(contract, function, args, block)`` in one batch; returns the decoded outputs."""
+    if not calls:
+        return []
+    async with w3.batch_requests() as batch:
+        for contract, name, args, block in calls:
+            batch.add(w3.eth.call({"to": contract.address, "data": contract.encode_abi(name, args=args)}, block))
+        raw = await batch.async_execute()
+    return [w3.codec.decode([o["type"] for o in contract.get_function_by_name(name).abi["outputs"]], bytes(value))
+            for (contract, name, _, _), value in zip(calls, raw)]
+
+
+def _cached_contract(w3: AsyncWeb3, cache: Dict[str, Any], address: str, abi: list) -> Any:
+    contract = cache.get(address)
+    if contract is None:
+        contract = cache[address] = w3.eth.contract(address=address, abi=abi)
+    return contract
+
+
+def _onchain_amount(deposit: Deposit) -> int:
+    value = Decimal(str(deposit.value))
+    if not value.is_finite() or value <= 0:
+        raise ValueError(f"deposit value must be positive, got {deposit.value!r}")
+    return int(value * 10 ** deposit.decimals)
@@ -0,0 +1,10 @@
+"""Local, incremental copies of account history.
+
+:class:`HistorySync` mirrors order, trade, transfer and funding history into
+append-only :class:`ColumnStore` directories so reports scan local files
+instead of re-downloading everything from the API.
+"""
+from .columnar import ColumnStore, StringColumn
+from .sync import HistorySync, StreamSpec
+
+__all__ = ["ColumnStore", "StringColumn", "HistorySync", "StreamSpec"]
@@ -0,0 +1,277 @@
+"""Append-only columnar files for local history storage.
+
+A store is one directory holding one file per column, in a simple Arrow-like
+layout:
+
+  - ``i64`` / ``f64`` columns: ``<name>.i64`` / ``<name>.f64``, packed native
+    8-byte values (little-endian on every platform the SDK supports; the byte
+    order is recorded in the schema and checked on open).
+  - ``str`` columns: ``<name>.off`` (int64 end offsets, one per row) plus
+    ``<name>.utf8`` (the concatenated UTF-8 bytes), i.e. Arrow's
+    variable-length binary layout.
+
+``_meta.json`` holds the schema and the committed row count. It is rewritten
+(atomically, via ``os.replace``) only after every column file has been
+appended, so it is the commit point: a crash mid-append leaves trailing bytes
+past the committed length, which are truncated the next time the store is
+opened. Readers only ever see committed rows.
+
+Reads are memory-mapped: ``column()`` returns a zero-copy view over the file
+(``memoryview`` for fixed-width columns, :class:`StringColumn` for strings), so
+scanning a large history does not load it into Python objects up front.
+"""
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Column type -> (file suffix, array typecode). All fixed-width types are 8 bytes.
+_FIXED_TYPES = {
+    "i64": ("i64", "q"),
+    "f64": ("f64", "d"),
+}
+_STR_TYPE = "str"
+_META_FILE = "_meta.json"
+
+Schema = Sequence[Tuple[str, str]]
+
+
+class StringColumn:
+    """Memory-mapped view of a ``str`` column (offsets + UTF-8 data).
+
+    Indexing decodes a single value; nothing is decoded until it is read.
+    """
+
+    def __init__(self, offsets: memoryview, data: Union[mmap.mmap, bytes]):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self._offsets)
+        if not 0 <= index < len(self._offsets):
+            raise IndexError("column index out of range")
+        start = self._offsets[index - 1] if index > 0 else 0
+        return self._data[start:self._offsets[index]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        start = 0
+        for end in self._offsets:
+            yield self._data[start:end].decode("utf-8")
+            start = end
+
+
+class ColumnStore:
+    """An append-only table of typed columns backed by one directory.
+
+    Args:
+        path: Directory of the store (created on first use).
+        schema: ``[(column_name, type), ...]`` with type ``"i64"``, ``"f64"`` or
+            ``"str"``. Required when creating a store; when opening an existing
+            one it must match the stored schema (or be omitted).
+
+    Example:
+        >>> store = ColumnStore("/tmp/fills", [("time", "i64"), ("px", "str")])
+        >>> store.append([{"time": 1, "px": "0.15"}])
+        >>> list(store.column("px"))
+        ['0.15']
+    """
+
+    def __init__(self, path: str, schema: Optional[Schema] = None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta = self._read_meta()
+        if meta is None:
+            if schema is None:
+                raise ValueError(f"no column store at {path!r} and no schema given")
+            self.schema: List[Tuple[str, str]] = [(name, typ) for name, typ in schema]
+            self._validate_schema(self.schema)
+            self.rows = 0
+            self._write_meta()
+        else:
+            if meta.get("byteorder") != sys.byteorder:
+                raise ValueError(
+                    f"column store {path!r} was written with byte order "
+                    f"{meta.get('byteorder')!r}, this platform is {sys.byteorder!r}")
+            stored = [(name, typ) for name, typ in meta["schema"]]
+            if schema is not None and [(n, t) for n, t in schema] != stored:
+                raise ValueError(f"schema mismatch for column store {path!r}: {stored}")
+            self.schema = stored
+            self.rows = int(meta["rows"])
+        self._types: Dict[str, str] = dict(self.schema)
+        self._maps: List[mmap.mmap] = []
+        self._truncate_uncommitted()
+
+    # -----------------------------------------------------------------------
+    # Metadata
+    # -----------------------------------------------------------------------
+
+    @staticmethod
+    def _validate_schema(schema: List[Tuple[str, str]]) -> None:
+        seen = set()
+        for name, typ in schema:
+            if typ not in _FIXED_TYPES and typ != _STR_TYPE:
+                raise ValueError(f"unknown column type {typ!r} for column {name!r}")
+            if name in seen or name.startswith("_"):
+                raise ValueError(f"invalid or duplicate column name {name!r}")
+            seen.add(name)
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.path, _META_FILE), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self) -> None:
+        tmp = os.path.join(self.path, _META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"schema": self.schema, "rows": self.rows, "byteorder": sys.byteorder}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, _META_FILE))
+
+    def _file(self, name: str, suffix: str) -> str:
+        return os.path.join(self.path, f"{name}.{suffix}")
+
+    def _truncate_uncommitted(self) -> None:
+        """Drop bytes a crashed append left past the committed row count."""
+        for name, typ in self.schema:
+            if typ == _STR_TYPE:
+                off_path = self._file(name, "off")
+                _truncate(off_path, self.rows * 8)
+                _truncate(self._file(name, "utf8"), _last_offset(off_path, self.rows))
+            else:
+                _truncate(self._file(name, _FIXED_TYPES[typ][0]), self.rows * 8)
+
+    # -----------------------------------------------------------------------
+    # Writes
+    # -----------------------------------------------------------------------
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Append ``records`` (dicts keyed by column name); return the number appended.
+
+        Missing values are stored as ``0`` / ``0.0`` / ``""``.
+        """
+        records = list(records)
+        if not records:
+            return 0
+        for name, typ in self.schema:
+            if typ == _STR_TYPE:
+                off_path = self._file(name, "off")
+                base = _last_offset(off_path, self.rows)
+                encoded = [_to_str(r.get(name)).encode("utf-8") for r in records]
+                offsets = array("q")
+                for chunk in encoded:
+                    base += len(chunk)
+                    offsets.append(base)
+                with open(self._file(name, "utf8"), "ab") as f:
+                    f.write(b"".join(encoded))
+                with open(off_path, "ab") as f:
+                    offsets.tofile(f)
+            else:
+                suffix, code = _FIXED_TYPES[typ]
+                cast = int if code == "q" else float
+                values = array(code, (cast(r.get(name) or 0) for r in records))
+                with open(self._file(name, suffix), "ab") as f:
+                    values.tofile(f)
+        self.rows += len(records)
+        self._write_meta()
+        return len(records)
+
+    # -----------------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------------
+
+    def column(self, name: str) -> Union[memoryview, StringColumn]:
+        """Return a memory-mapped, zero-copy view of column ``name``.
+
+        Fixed-width columns come back as a ``memoryview`` cast to ``q``/``d``
+        (directly usable by ``numpy.frombuffer`` or ``sum()``); string columns
+        as a :class:`StringColumn`. Views stay valid until :meth:`close`.
+        """
+        typ = self._types.get(name)
+        if typ is None:
+            raise KeyError(f"unknown column {name!r}")
+        if typ == _STR_TYPE:
+            offsets = self._map(self._file(name, "off"), self.rows * 8).cast("q")
+            data_len = offsets[-1] if self.rows else 0
+            return StringColumn(offsets, self._map_raw(self._file(name, "utf8"), data_len))
+        suffix, code = _FIXED_TYPES[typ]
+        return self._map(self._file(name, suffix), self.rows * 8).cast(code)
+
+    def scan(self, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate committed rows as dicts (all columns, or just ``columns``)."""
+        names = list(columns) if columns is not None else [name for name, _ in self.schema]
+        views = [self.column(name) for name in names]
+        for i in range(self.rows):
+            yield {name: view[i] for name, view in zip(names, views)}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _map_raw(self, path: str, length: int) -> Union[mmap.mmap, bytes]:
+        # mmap refuses zero-length mappings; an empty column needs no file view.
+        if length == 0:
+            return b""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def _map(self, path: str, length: int) -> memoryview:
+        return memoryview(self._map_raw(path, length))
+
+    def close(self) -> None:
+        """Release the memory maps handed out by :meth:`column`.
+
+        Any view still referenced by the caller keeps its map alive; the map
+        is closed once those views are released.
+        """
+        maps, self._maps = self._maps, []
+        for mapped in maps:
+            try:
+                mapped.close()
+            except BufferError:
+                # A caller still holds an exported view; leave it to the GC.
+                pass
+
+    def __enter__(self) -> "ColumnStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def _to_str(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def _truncate(path: str, length: int) -> None:
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        open(path, "ab").close()
+        return
+    if size > length:
+        with open(path, "r+b") as f:
+            f.truncate(length)
+
+
+def _last_offset(path: str, rows: int) -> int:
+    if rows == 0:
+        return 0
+    with open(path, "rb") as f:
+        f.seek((rows - 1) * 8)
+        return array("q", f.read(8))[0]
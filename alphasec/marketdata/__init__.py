@@ -0,0 +1,37 @@
+"""Local market-data stores fed by the WebSocket streams.
+
+:class:`CandleAggregator` builds multi-resolution OHLCV bars from the trade
+streams, :class:`TradeTape` keeps a market's recent trades with rolling-window
+statistics, and :class:`TickerTable` keeps the latest ticker of every market
+in columns. The stores keep NumPy arrays and need the ``marketdata`` extra
+(``pip install alphasec-py[marketdata]``); names are loaded lazily (PEP 562),
+so importing this package does not import numpy.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any
+
+_LAZY_EXPORTS = {
+    "Candle": ".candles",
+    "CandleAggregator": ".candles",
+    "CandleRing": ".candles",
+    "TapeStats": ".tape",
+    "TradeTape": ".tape",
+    "Ticker": ".tickers",
+    "TickerTable": ".tickers",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+if TYPE_CHECKING:
+    from .candles import Candle, CandleAggregator, CandleRing
+    from .tape import TapeStats, TradeTape
+    from .tickers import Ticker, TickerTable
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
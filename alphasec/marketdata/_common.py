@@ -0,0 +1,42 @@
+"""Helpers shared by the market-data stores: the numpy import and stream parsing."""
+from typing import Any, Iterable, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover - exercised only without the extra
+    raise ImportError("alphasec.marketdata requires numpy: pip install alphasec-py[marketdata]") from exc
+
+__all__ = ["np", "split_channel", "trade_fields"]
+
+
+def split_channel(channel: str) -> Tuple[str, str]:
+    """Split ``"trade@1_2"`` into ``("trade", "1_2")``; the market part is required."""
+    kind, sep, market = channel.partition("@")
+    if not sep or not market:
+        raise ValueError(f"channel must look like '<stream>@<market>': {channel!r}")
+    return kind, market
+
+
+def _first(row: dict, keys: Iterable[str]) -> Optional[Any]:
+    for key in keys:
+        value = row.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def trade_fields(row: dict) -> Tuple[Optional[int], float, float, int]:
+    """``(time_ms, price, size, side)`` of one ``trade@`` / ``perp_aggTrade@`` row.
+
+    Accepts both the long (``price`` / ``quantity``) and short (``px`` / ``sz``)
+    field names. ``side`` is +1 for a buyer-initiated trade, -1 for a seller,
+    0 if the row does not say; ``time_ms`` is ``None`` if it is missing.
+    """
+    price = _first(row, ("price", "px", "p"))
+    size = _first(row, ("quantity", "sz", "qty", "q"))
+    if price is None or size is None:
+        raise ValueError(f"trade row has no price/size: {row!r}")
+    time_ms = _first(row, ("time", "timestamp"))
+    side = str(row.get("side", "")).upper()
+    return (None if time_ms is None else int(time_ms), float(price), float(size),
+            1 if side in ("BUY", "B", "0") else -1 if side in ("SELL", "S", "A", "1") else 0)
@@ -0,0 +1,352 @@
+"""Local OHLCV bars built from the trade streams.
+
+:class:`CandleAggregator` turns ``trade@<market>`` and ``perp_aggTrade@<id>``
+payloads into bars at several resolutions at once, kept per channel in
+fixed-size :class:`CandleRing` buffers (one NumPy structured array each, so
+memory does not grow with uptime). Every trade updates the open bar of each
+resolution; a bar closes when a trade for a later period arrives, or when
+:meth:`CandleAggregator.close_due` is called past its end, and closing it
+calls the :meth:`~CandleAggregator.on_close` listeners::
+
+    candles = CandleAggregator(resolutions=(60, 300), capacity=1440)
+    candles.on_close(lambda channel, resolution, bar: ...)
+    await agent.perp.subscribe("perp_aggTrade@1", candles.handler("perp_aggTrade@1"))
+    await candles.backfill_async(agent.perp, "perp_aggTrade@1", "BTCUSDT")
+    closes = candles.bars("perp_aggTrade@1", 60)["close"]
+
+Bars are keyed by their open time in epoch milliseconds, taken from the trade's
+``time`` field; periods without trades produce no bar. Prices and volumes are
+float64 -- good for signals, not for order prices (see :mod:`alphasec.perp.specs`).
+
+History comes from the perp candles endpoint (spot has none). It is stitched
+in front of the live bars: history fills every period before the first live
+bar, the live stream owns that bar and everything after it, and for the one
+seam bar the two are merged (history's open, the wider high/low, the live
+close, the larger volume), so no period appears twice.
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from ._common import np, split_channel, trade_fields
+
+logger = logging.getLogger(__name__)
+
+CANDLE_DTYPE = np.dtype([
+    ("time", "<i8"),      # bar open, epoch ms
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+    ("trades", "<i8"),
+])
+
+_TRADE_STREAMS = ("trade", "perp_aggTrade")
+
+# Field names accepted for candle rows from the REST endpoint, in CANDLE_DTYPE order.
+_ROW_KEYS = (
+    ("time", "openTime", "t"),
+    ("open", "o"),
+    ("high", "h"),
+    ("low", "l"),
+    ("close", "c"),
+    ("volume", "v"),
+    ("trades", "count", "n"),
+)
+
+
+class Candle(NamedTuple):
+    time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    trades: int
+
+
+class CandleRing:
+    """Fixed-size ring of bars at one resolution, oldest evicted first."""
+
+    def __init__(self, resolution: int, capacity: int):
+        if resolution <= 0 or capacity <= 0:
+            raise ValueError("resolution and capacity must be positive")
+        self.resolution = resolution
+        self.capacity = capacity
+        self.late = 0             # trades dropped because their bar had already closed
+        self.is_open = False      # whether the newest bar still takes trades
+        self._span = resolution * 1000
+        self._data = np.zeros(capacity, CANDLE_DTYPE)
+        self._start = 0
+        self._len = 0
+        # The newest bar as Python values, written through to its slot on every trade.
+        self._cur: List[Any] = []
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def last(self) -> Optional[Candle]:
+        return Candle(*self._cur) if self._len else None
+
+    def to_array(self) -> "np.ndarray":
+        """Chronological copy of the bars, oldest first."""
+        end = self._start + self._len
+        if end <= self.capacity:
+            return self._data[self._start:end].copy()
+        return np.concatenate((self._data[self._start:], self._data[:end - self.capacity]))
+
+    def add(self, time_ms: int, price: float, size: float) -> Optional[Candle]:
+        """Apply one trade; returns the bar it closed, if any."""
+        bucket = time_ms - time_ms % self._span
+        cur = self._cur
+        if self._len:
+            if bucket == cur[0] and self.is_open:
+                if price > cur[2]:
+                    cur[2] = price
+                elif price < cur[3]:
+                    cur[3] = price
+                cur[4] = price
+                cur[5] += size
+                cur[6] += 1
+                self._data[(self._start + self._len - 1) % self.capacity] = tuple(cur)
+                return None
+            if bucket <= cur[0]:
+                self.late += 1
+                return None
+        closed = Candle(*cur) if self.is_open else None
+        self._cur = [bucket, price, price, price, price, size, 1]
+        self._push(tuple(self._cur))
+        self.is_open = True
+        return closed
+
+    def close_due(self, now_ms: int) -> Optional[Candle]:
+        """Close the open bar if its period ended before ``now_ms``."""
+        if self.is_open and self._cur[0] + self._span <= now_ms:
+            self.is_open = False
+            return Candle(*self._cur)
+        return None
+
+    def seed(self, bars: Sequence[Tuple], now_ms: int) -> int:
+        """Stitch history (sorted, unique bar times) in front of the live bars.
+
+        Returns the number of periods added.
+        """
+        bars = [bar for bar in bars if bar[0] % self._span == 0]
+        if not bars:
+            return 0
+        live = self.to_array()
+        if len(live):
+            first = int(live["time"][0])
+            older = [bar for bar in bars if bar[0] < first]
+            seam = next((bar for bar in bars if bar[0] == first), None)
+            if seam is not None:
+                head = live[0]
+                live[0] = (first, seam[1], max(seam[2], head["high"]), min(seam[3], head["low"]),
+                           head["close"], max(seam[5], head["volume"]), max(seam[6], head["trades"]))
+            merged = np.concatenate((np.array(older, CANDLE_DTYPE), live))
+            added = len(older)
+        else:
+            merged = np.array(bars, CANDLE_DTYPE)
+            added = len(bars)
+            self.is_open = bars[-1][0] + self._span > now_ms
+        merged = merged[-self.capacity:]
+        self._data[:len(merged)] = merged
+        self._start, self._len = 0, len(merged)
+        self._cur = list(merged[-1].item())
+        return added
+
+    def _push(self, bar: Tuple) -> None:
+        if self._len < self.capacity:
+            slot = (self._start + self._len) % self.capacity
+            self._len += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._data[slot] = bar
+
+
+def parse_candles(rows: Any) -> List[Tuple]:
+    """Normalize candle rows from the REST endpoint into sorted, unique bar tuples.
+
+    Accepts a list of dicts (``time``/``open``/... or ``t``/``o``/...), a list of
+    ``[time, open, high, low, close, volume]`` arrays, or a column dict
+    (``{"t": [...], "o": [...], ...}``). Times in seconds are converted to
+    milliseconds; when two rows share a time, the later one wins.
+    """
+    if isinstance(rows, dict):
+        columns = [next((rows[key] for key in keys if key in rows), None) for keys in _ROW_KEYS]
+        if any(column is None for column in columns[:6]):
+            raise ValueError("candle columns must include time, open, high, low, close and volume")
+        count = len(columns[0])
+        rows = [[column[i] if column is not None else 0 for column in columns] for i in range(count)]
+    bars: Dict[int, Tuple] = {}
+    for row in rows:
+        if isinstance(row, dict):
+            values = [next((row[key] for key in keys if row.get(key) is not None), None) for keys in _ROW_KEYS]
+        else:
+            values = list(row) + [None] * (len(_ROW_KEYS) - len(row))
+        if any(value is None for value in values[:6]):
+            raise ValueError(f"candle row is missing OHLCV fields: {row!r}")
+        bar_time = int(values[0])
+        if bar_time < 10**11:   # epoch seconds (the endpoint's from/to unit)
+            bar_time *= 1000
+        bars[bar_time] = (bar_time, float(values[1]), float(values[2]), float(values[3]),
+                          float(values[4]), float(values[5]), int(values[6] or 0))
+    return [bars[t] for t in sorted(bars)]
+
+
+class CandleAggregator:
+    """Multi-resolution OHLCV bars per trade channel; see the module docstring.
+
+    Args:
+        resolutions: Bar lengths in seconds.
+        capacity: Bars kept per channel and resolution.
+        clock: Wall clock in epoch seconds, used for trades without a ``time``
+            field, :meth:`close_due` and the backfill window.
+    """
+
+    def __init__(
+        self,
+        resolutions: Iterable[int] = (60,),
+        capacity: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.resolutions = tuple(sorted({int(r) for r in resolutions}))
+        if not self.resolutions or self.resolutions[0] <= 0:
+            raise ValueError("resolutions must be positive numbers of seconds")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._clock = clock
+        self._rings: Dict[str, Dict[int, CandleRing]] = {}
+        self._listeners: List[Callable[[str, int, Candle], Any]] = []
+
+    # -----------------------------------------------------------------------
+    # Ingest
+    # -----------------------------------------------------------------------
+
+    def on_close(self, callback: Callable[[str, int, Candle], Any]) -> Callable[[str, int, Candle], Any]:
+        """Call ``callback(channel, resolution, bar)`` for every closed bar (usable as a decorator)."""
+        self._listeners.append(callback)
+        return callback
+
+    def handler(self, channel: str) -> Callable[[Any], None]:
+        """Subscription callback feeding ``channel``'s trades into the bars."""
+        self._market(channel)
+
+        def on_trades(payload: Any) -> None:
+            self.add_trades(channel, payload)
+        return on_trades
+
+    def add_trades(self, channel: str, trades: Any) -> None:
+        """Apply a ``trade@`` / ``perp_aggTrade@`` payload (a list of trade rows, or one row)."""
+        rings = self._market(channel)
+        if isinstance(trades, dict):
+            trades = [trades]
+        for row in trades:
+            time_ms, price, size, _ = trade_fields(row)
+            if time_ms is None:
+                time_ms = int(self._clock() * 1000)
+            for resolution, ring in rings.items():
+                closed = ring.add(time_ms, price, size)
+                if closed is not None:
+                    self._emit(channel, resolution, closed)
+
+    def close_due(self, now_ms: Optional[int] = None) -> int:
+        """Close every open bar whose period has ended; returns how many closed.
+
+        Bars otherwise close on the next trade, so call this on a timer to get
+        close events for quiet markets on time.
+        """
+        if now_ms is None:
+            now_ms = int(self._clock() * 1000)
+        closed = 0
+        for channel, rings in self._rings.items():
+            for resolution, ring in rings.items():
+                bar = ring.close_due(now_ms)
+                if bar is not None:
+                    closed += 1
+                    self._emit(channel, resolution, bar)
+        return closed
+
+    # -----------------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------------
+
+    @property
+    def channels(self) -> List[str]:
+        return list(self._rings)
+
+    def ring(self, channel: str, resolution: int) -> CandleRing:
+        try:
+            return self._rings[channel][resolution]
+        except KeyError:
+            raise KeyError(f"no {resolution}s bars for {channel}") from None
+
+    def bars(self, channel: str, resolution: int) -> "np.ndarray":
+        """Chronological copy of the bars (a ``CANDLE_DTYPE`` array), the open one last."""
+        return self.ring(channel, resolution).to_array()
+
+    def last(self, channel: str, resolution: int) -> Optional[Candle]:
+        """Newest bar, open or closed."""
+        return self.ring(channel, resolution).last
+
+    # -----------------------------------------------------------------------
+    # History
+    # -----------------------------------------------------------------------
+
+    def load_history(self, channel: str, resolution: int, rows: Any) -> int:
+        """Stitch REST candle ``rows`` in front of the live bars; returns the periods added."""
+        self._market(channel)
+        return self.ring(channel, resolution).seed(parse_candles(rows), int(self._clock() * 1000))
+
+    def backfill(self, perp, channel: str, symbol: str,
+                 resolution_label: Callable[[int], str] = str) -> Dict[int, int]:
+        """Fill every resolution of ``channel`` from ``perp.get_candles`` (a :class:`PerpAgent`).
+
+        Fetches one window of ``capacity`` bars per resolution; the endpoint's
+        resolution string is ``resolution_label(seconds)``. Returns the periods
+        added per resolution.
+        """
+        added = {}
+        for resolution, (start, end) in self._windows(channel).items():
+            rows = perp.get_candles(symbol, resolution_label(resolution), from_sec=start, to_sec=end)
+            added[resolution] = self.load_history(channel, resolution, rows)
+        return added
+
+    async def backfill_async(self, perp, channel: str, symbol: str,
+                             resolution_label: Callable[[int], str] = str) -> Dict[int, int]:
+        """:meth:`backfill` for an :class:`AsyncPerpAgent`."""
+        added = {}
+        for resolution, (start, end) in self._windows(channel).items():
+            rows = await perp.get_candles(symbol, resolution_label(resolution), from_sec=start, to_sec=end)
+            added[resolution] = self.load_history(channel, resolution, rows)
+        return added
+
+    # -----------------------------------------------------------------------
+    # Internals
+    # -----------------------------------------------------------------------
+
+    def _market(self, channel: str) -> Dict[int, CandleRing]:
+        rings = self._rings.get(channel)
+        if rings is None:
+            stream, _ = split_channel(channel)
+            if stream not in _TRADE_STREAMS:
+                raise ValueError(f"candles are built from trade@ or perp_aggTrade@ channels, not {channel!r}")
+            rings = self._rings[channel] = {r: CandleRing(r, self.capacity) for r in self.resolutions}
+        return rings
+
+    def _windows(self, channel: str) -> Dict[int, Tuple[int, int]]:
+        if split_channel(channel)[0] != "perp_aggTrade":
+            raise ValueError("only perp markets have a candles endpoint to backfill from")
+        now = int(self._clock())
+        return {r: (now - r * self.capacity, now) for r in self.resolutions}
+
+    def _emit(self, channel: str, resolution: int, bar: Candle) -> None:
+        for callback in self._listeners:
+            try:
+                callback(channel, resolution, bar)
+            except Exception:
+                logger.exception("candle close listener failed for %s %ss", channel, resolution)
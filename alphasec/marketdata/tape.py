@@ -0,0 +1,257 @@
+"""Trade tape with rolling-window statistics.
+
+A :class:`TradeTape` holds the most recent ``capacity`` trades of one market
+in preallocated NumPy rings (time, price, size, side), so memory stays flat no
+matter how long it runs. Payloads from ``trade@<market>`` or
+``perp_aggTrade@<id>`` are written a whole batch at a time::
+
+    tape = TradeTape(windows=(10, 60), capacity=100_000)
+    await agent.subscribe("trade@1_2", tape.add_trades)
+    stats = tape.stats(60)    # TapeStats(count, volume, vwap, buy_volume, sell_volume, imbalance)
+
+Each registered window keeps running sums and a tail pointer that only moves
+forward, so a query is a binary search for the new tail plus O(1) amortized
+work: the trades that fell out of the window since the last query are
+subtracted once. The sums are recomputed from the ring every ``capacity``
+trades, so float error does not accumulate over days of uptime.
+:meth:`TradeTape.stats` also accepts an unregistered window, at the cost of
+summing over it.
+
+Windows are measured on trade timestamps (``time``, epoch ms), clamped to be
+non-decreasing in arrival order, and end at the query time (the clock by
+default). A registered window only moves forward: querying it with an earlier
+time than before does not bring trades back. A window that holds more than
+``capacity`` trades only covers the newest ``capacity`` of them, and
+:meth:`TradeTape.truncated` reports when that has happened.
+"""
+import time
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from ._common import np, trade_fields
+
+
+class TapeStats(NamedTuple):
+    count: int
+    volume: float
+    vwap: float           # NaN without trades
+    buy_volume: float
+    sell_volume: float
+    imbalance: float      # (buy - sell) / (buy + sell), in [-1, 1]; NaN without sided volume
+
+
+class _Window:
+    __slots__ = ("span_ms", "tail", "volume", "notional", "buy", "sell", "truncated")
+
+    def __init__(self, span_ms: int):
+        self.span_ms = span_ms
+        self.tail = 0           # sequence number of the oldest trade still in the window
+        self.volume = 0.0
+        self.notional = 0.0
+        self.buy = 0.0
+        self.sell = 0.0
+        self.truncated = False
+
+
+class TradeTape:
+    """Fixed-size trade ring for one market; see the module docstring.
+
+    Args:
+        windows: Rolling windows in seconds kept with running sums.
+        capacity: Trades kept.
+        clock: Wall clock in epoch seconds, used for trades without a ``time``
+            field and as the default query time.
+    """
+
+    def __init__(
+        self,
+        windows: Iterable[float] = (60,),
+        capacity: int = 65536,
+        clock: Callable[[], float] = time.time,
+    ):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._clock = clock
+        self._time = np.zeros(capacity, "<i8")
+        self._price = np.zeros(capacity, "<f8")
+        self._size = np.zeros(capacity, "<f8")
+        self._side = np.zeros(capacity, "<i1")
+        self._seq = 0               # trades ever written; slot of trade n is n % capacity
+        self._last_time = 0
+        self._since_resync = 0
+        self._windows: Dict[float, _Window] = {}
+        for window in windows:
+            if window <= 0:
+                raise ValueError("windows must be positive numbers of seconds")
+            self._windows[window] = _Window(int(window * 1000))
+
+    def __len__(self) -> int:
+        return min(self._seq, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Trades ingested since creation, including those already evicted."""
+        return self._seq
+
+    # -----------------------------------------------------------------------
+    # Ingest
+    # -----------------------------------------------------------------------
+
+    def add_trades(self, trades: Any) -> None:
+        """Append a ``trade@`` / ``perp_aggTrade@`` payload (a list of trade rows, or one row).
+
+        Usable directly as a subscription callback.
+        """
+        if isinstance(trades, dict):
+            trades = [trades]
+        rows = [trade_fields(row) for row in trades]
+        if not rows:
+            return
+        now_ms = int(self._clock() * 1000)
+        times = np.array([now_ms if row[0] is None else row[0] for row in rows], "<i8")
+        np.maximum.accumulate(np.maximum(times, self._last_time), out=times)
+        prices = np.array([row[1] for row in rows], "<f8")
+        sizes = np.array([row[2] for row in rows], "<f8")
+        sides = np.array([row[3] for row in rows], "<i1")
+        if len(rows) > self.capacity:
+            # Only the newest ``capacity`` trades can be held; the rest never enter the windows.
+            cut = len(rows) - self.capacity
+            times, prices, sizes, sides = times[cut:], prices[cut:], sizes[cut:], sides[cut:]
+            for window in self._windows.values():
+                window.truncated = True
+        count = len(times)
+
+        # Trades about to be overwritten leave every window that still holds them.
+        oldest_after = self._seq + count - self.capacity
+        for window in self._windows.values():
+            if window.tail < oldest_after:
+                self._drop(window, oldest_after)
+                window.tail = oldest_after
+                window.truncated = True
+
+        start = self._seq % self.capacity
+        first = min(count, self.capacity - start)
+        for ring, values in ((self._time, times), (self._price, prices), (self._size, sizes), (self._side, sides)):
+            ring[start:start + first] = values[:first]
+            ring[:count - first] = values[first:]
+
+        notional = float(prices @ sizes)
+        volume = float(sizes.sum())
+        buy = float(sizes[sides > 0].sum())
+        sell = float(sizes[sides < 0].sum())
+        for window in self._windows.values():
+            window.volume += volume
+            window.notional += notional
+            window.buy += buy
+            window.sell += sell
+        self._seq += count
+        self._last_time = int(times[-1])
+
+        self._since_resync += count
+        if self._since_resync >= self.capacity:
+            self._since_resync = 0
+            for window in self._windows.values():
+                self._resync(window)
+
+    # -----------------------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------------------
+
+    def stats(self, window: float, now: Optional[float] = None) -> TapeStats:
+        """Statistics of the trades in the last ``window`` seconds before ``now``."""
+        now_ms = round((self._clock() if now is None else now) * 1000)
+        state = self._windows.get(window)
+        if state is None:
+            start = self._first_after(max(0, self._seq - self.capacity), now_ms - int(window * 1000))
+            volume, notional, buy, sell = self._sums(start, self._seq)
+            return _stats(self._seq - start, volume, notional, buy, sell)
+        self._advance(state, now_ms - state.span_ms)
+        return _stats(self._seq - state.tail, state.volume, state.notional, state.buy, state.sell)
+
+    def vwap(self, window: float, now: Optional[float] = None) -> float:
+        return self.stats(window, now).vwap
+
+    def volume(self, window: float, now: Optional[float] = None) -> float:
+        return self.stats(window, now).volume
+
+    def imbalance(self, window: float, now: Optional[float] = None) -> float:
+        return self.stats(window, now).imbalance
+
+    def count(self, window: float, now: Optional[float] = None) -> int:
+        return self.stats(window, now).count
+
+    def rate(self, window: float, now: Optional[float] = None) -> float:
+        """Trades per second over the window."""
+        return self.stats(window, now).count / window
+
+    def truncated(self, window: float) -> bool:
+        """Whether the registered ``window`` ever held more trades than the ring."""
+        return self._windows[window].truncated
+
+    def to_arrays(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Chronological copies of ``(time, price, size, side)``, oldest first."""
+        start = max(0, self._seq - self.capacity)
+        return tuple(self._slice(ring, start, self._seq) for ring in
+                     (self._time, self._price, self._size, self._side))
+
+    # -----------------------------------------------------------------------
+    # Internals
+    # -----------------------------------------------------------------------
+
+    def _advance(self, window: _Window, cutoff: int) -> None:
+        tail = self._first_after(window.tail, cutoff)
+        if tail == window.tail:
+            return
+        if tail == self._seq:
+            window.volume = window.notional = window.buy = window.sell = 0.0
+        else:
+            self._drop(window, tail)
+        window.tail = tail
+
+    def _drop(self, window: _Window, end: int) -> None:
+        volume, notional, buy, sell = self._sums(window.tail, end)
+        window.volume -= volume
+        window.notional -= notional
+        window.buy -= buy
+        window.sell -= sell
+
+    def _resync(self, window: _Window) -> None:
+        window.volume, window.notional, window.buy, window.sell = self._sums(window.tail, self._seq)
+
+    def _first_after(self, start: int, cutoff: int) -> int:
+        """Sequence number of the first trade in ``[start, seq)`` later than ``cutoff``."""
+        # Binary search each contiguous run of the ring in turn (at most two), without copying.
+        while start < self._seq:
+            first = start % self.capacity
+            run = self._time[first:first + min(self.capacity - first, self._seq - start)]
+            index = int(np.searchsorted(run, cutoff, side="right"))
+            if index < len(run):
+                return start + index
+            start += len(run)
+        return self._seq
+
+    def _sums(self, start: int, end: int) -> Tuple[float, float, float, float]:
+        if start >= end:
+            return 0.0, 0.0, 0.0, 0.0
+        prices = self._slice(self._price, start, end)
+        sizes = self._slice(self._size, start, end)
+        sides = self._slice(self._side, start, end)
+        return (float(sizes.sum()), float(prices @ sizes),
+                float(sizes[sides > 0].sum()), float(sizes[sides < 0].sum()))
+
+    def _slice(self, ring: "np.ndarray", start: int, end: int) -> "np.ndarray":
+        """Trades ``[start, end)`` by sequence number, as a view when they do not wrap."""
+        if start >= end:
+            return ring[:0]
+        first, last = start % self.capacity, (end - 1) % self.capacity + 1
+        if first < last:
+            return ring[first:last]
+        return np.concatenate((ring[first:], ring[:last]))
+
+
+def _stats(count: int, volume: float, notional: float, buy: float, sell: float) -> TapeStats:
+    if count == 0:
+        return TapeStats(0, 0.0, float("nan"), 0.0, 0.0, float("nan"))
+    sided = buy + sell
+    return TapeStats(count, volume, notional / volume if volume > 0 else float("nan"), buy, sell,
+                     (buy - sell) / sided if sided > 0 else float("nan"))
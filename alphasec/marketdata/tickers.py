@@ -0,0 +1,195 @@
+"""Latest ticker values for every market, in NumPy columns.
+
+:class:`TickerTable` keeps one row per market id and one float64 column per
+ticker field, updated in place from ``ticker@<market>`` and
+``perp_ticker@<id>`` payloads (or a ``get_tickers`` snapshot passed to
+:meth:`TickerTable.update`). Scans run on whole columns instead of
+re-parsing lists of string dicts::
+
+    table = TickerTable()
+    table.update(await agent.perp.get_tickers(), perp=True)   # optional seed
+    await agent.perp.subscribe("perp_ticker@1", table.handler("perp_ticker@1"))
+    movers = table.where(abs(table.change_24h()) > 0.05)
+    stale = table.stale(max_age=5.0)
+
+:meth:`TickerTable.column` returns views of the live storage, so read what
+you need before yielding to the event loop. Values a market has not reported
+are NaN (``mark_price`` is NaN for spot markets). ``updated`` is the local
+wall-clock time, in epoch seconds, at which a market's row was last written;
+staleness is measured from it.
+"""
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from ._common import np, split_channel
+
+_TICKER_STREAMS = ("ticker", "perp_ticker")
+
+# Column -> payload keys, camelCase as served by the REST API and snake_case as
+# delivered by the WebSocket managers.
+_FIELDS = (
+    ("price", ("price", "lastPrice", "last_price")),
+    ("open", ("open24h",)),
+    ("high", ("high24h",)),
+    ("low", ("low24h",)),
+    ("volume", ("volume24h",)),
+    ("quote_volume", ("quoteVolume24h", "quote_volume24h")),
+    ("mark_price", ("markPrice", "mark_price")),
+)
+COLUMNS = tuple(name for name, _ in _FIELDS) + ("updated",)
+
+
+class Ticker(NamedTuple):
+    market: str
+    perp: bool
+    price: float
+    open: float
+    high: float
+    low: float
+    volume: float
+    quote_volume: float
+    mark_price: float
+    updated: float
+
+
+class TickerTable:
+    """Columnar latest-ticker store indexed by market id; see the module docstring.
+
+    Args:
+        capacity: Initial number of rows; the columns double when it is exceeded.
+        clock: Wall clock in epoch seconds, used for ``updated`` and staleness.
+    """
+
+    def __init__(self, capacity: int = 64, clock: Callable[[], float] = time.time):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._clock = clock
+        self._rows: Dict[str, int] = {}
+        self._markets: List[str] = []
+        self._columns = {name: np.full(capacity, np.nan) for name in COLUMNS}
+        self._perp = np.zeros(capacity, bool)
+
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def __contains__(self, market: Any) -> bool:
+        return str(market) in self._rows
+
+    @property
+    def markets(self) -> List[str]:
+        """Market ids in row order."""
+        return list(self._markets)
+
+    # -----------------------------------------------------------------------
+    # Ingest
+    # -----------------------------------------------------------------------
+
+    def handler(self, channel: str) -> Callable[[Any], None]:
+        """Subscription callback writing ``channel``'s tickers into the table."""
+        stream, market = split_channel(channel)
+        if stream not in _TICKER_STREAMS:
+            raise ValueError(f"tickers come from ticker@ or perp_ticker@ channels, not {channel!r}")
+        perp = stream == "perp_ticker"
+
+        def on_tickers(payload: Any) -> None:
+            self.update(payload, perp=perp, market=market)
+        return on_tickers
+
+    def update(self, tickers: Any, perp: bool = False, market: Optional[str] = None) -> None:
+        """Write ticker rows (a list, or one dict) into the table.
+
+        Rows carry their market id (``marketId``); ``market`` is the fallback
+        for rows that do not. Fields a row leaves out keep their last value.
+        """
+        if isinstance(tickers, dict):
+            tickers = [tickers]
+        now = self._clock()
+        columns = self._columns
+        for ticker in tickers:
+            market_id = ticker.get("marketId", ticker.get("market_id", market))
+            if market_id is None:
+                raise ValueError(f"ticker row has no marketId: {ticker!r}")
+            row = self._row(str(market_id), perp)
+            for name, keys in _FIELDS:
+                for key in keys:
+                    value = ticker.get(key)
+                    if value is not None:
+                        columns[name][row] = float(value)
+                        break
+            columns["updated"][row] = now
+
+    # -----------------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------------
+
+    def index(self, market: Any) -> int:
+        """Row of ``market`` in every column."""
+        try:
+            return self._rows[str(market)]
+        except KeyError:
+            raise KeyError(f"no ticker for market {market!r}") from None
+
+    def column(self, name: str) -> "np.ndarray":
+        """Read-only view of one column (see ``COLUMNS``), one value per market in row order."""
+        if name not in self._columns:
+            raise KeyError(f"unknown ticker column {name!r}; expected one of {COLUMNS}")
+        view = self._columns[name][:len(self._markets)]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def perp(self) -> "np.ndarray":
+        """Boolean mask of the perp rows."""
+        view = self._perp[:len(self._markets)]
+        view.flags.writeable = False
+        return view
+
+    def get(self, market: Any) -> Ticker:
+        row = self.index(market)
+        return Ticker(self._markets[row], bool(self._perp[row]),
+                      *(float(self._columns[name][row]) for name in COLUMNS))
+
+    def change_24h(self) -> "np.ndarray":
+        """``price / open24h - 1`` per market (NaN where the open is 0 or unknown)."""
+        open_ = self.column("open")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(open_ > 0, self.column("price") / open_ - 1.0, np.nan)
+
+    def staleness(self, now: Optional[float] = None) -> "np.ndarray":
+        """Seconds since each market was last updated."""
+        return (self._clock() if now is None else now) - self.column("updated")
+
+    def stale(self, max_age: float, now: Optional[float] = None) -> List[str]:
+        """Markets not updated within ``max_age`` seconds."""
+        return self.where(self.staleness(now) > max_age)
+
+    def where(self, mask: Iterable[bool]) -> List[str]:
+        """Market ids of the rows selected by a boolean mask over the columns."""
+        return [self._markets[row] for row in np.flatnonzero(np.asarray(mask, bool))]
+
+    # -----------------------------------------------------------------------
+    # Internals
+    # -----------------------------------------------------------------------
+
+    def _row(self, market: str, perp: bool) -> int:
+        row = self._rows.get(market)
+        if row is not None:
+            return row
+        row = len(self._markets)
+        if row == len(self._perp):
+            self._grow(2 * row)
+        self._rows[market] = row
+        self._markets.append(market)
+        self._perp[row] = perp
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        # Swap in new arrays (never resize in place): views handed out by
+        # column() keep pointing at the old, still valid, storage.
+        for name, values in self._columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:len(values)] = values
+            self._columns[name] = grown
+        perp = np.zeros(capacity, bool)
+        perp[:len(self._perp)] = self._perp
+        self._perp = perp
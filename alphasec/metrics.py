@@ -0,0 +1,412 @@
+"""Client-side metrics with Prometheus text exposition.
+
+Opt-in like the other client options: pass ``metrics=MetricsRegistry()`` to
+``API`` / ``AsyncAPI`` (or ``Agent`` / ``AsyncAgent``, which also hand it to
+their WebSocket manager) and the SDK records:
+
+========================================================  ====================================
+``alphasec_http_requests_total{method,endpoint,status}``  every HTTP attempt (per endpoint
+                                                          of a pool, per retry)
+``alphasec_http_request_duration_seconds``                latency histogram per method/endpoint
+``alphasec_ws_messages_total{channel}``                   WebSocket messages received
+``alphasec_ws_received_bytes_total{channel}``             their size
+``alphasec_ws_reconnects_total``                          successful reconnects
+``alphasec_ws_reconnect_duration_seconds``                disconnect to reconnected
+``alphasec_ws_callback_errors_total{channel}``            subscription callbacks that raised
+========================================================  ====================================
+
+plus, read from the configured objects at scrape time (no hot-path cost):
+response-cache hits/misses/hit ratio, rate-limiter queue depth and delay,
+hedge counts, endpoint-pool health and pending async WS callbacks.
+
+Endpoints are path templates: the query string is dropped and id-like path
+segments become ``:id``, so order ids do not create new series.
+
+Hot-path updates take no registry-wide lock: a labelled child is found with
+a plain dict lookup and updated under its own uncontended lock; only the
+first use of a label combination locks the metric.
+
+Expose the text with :meth:`MetricsRegistry.render` or serve it on
+``/metrics`` with :meth:`MetricsRegistry.serve`.
+"""
+import math
+import re
+import threading
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a co-located gateway (~1ms) to a stalled request.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECONNECT_BUCKETS = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_ID_SEGMENT = re.compile(r"/(?:0x[0-9a-fA-F]+|\d+|[0-9a-fA-F]{32,})(?=/|$)")
+
+
+class Family(NamedTuple):
+    """One metric family as rendered: ``samples`` are ``(suffix, labels, value)``."""
+    name: str
+    type: str
+    help: str
+    samples: List[Tuple[str, Dict[str, str], float]]
+
+
+class _Value:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ("_lock", "_buckets", "counts", "sum")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot: above the largest bound
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self._buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        self._default = None if self.labelnames else self.labels()
+
+    def _new_child(self) -> Any:
+        return _Value()
+
+    def labels(self, *values: Any) -> Any:
+        """The child for one combination of label values (created on first use)."""
+        key = tuple(map(str, values))
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values!r}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [("", dict(zip(self.labelnames, key)), child.value) for key, child in list(self._children.items())]
+
+    def family(self) -> Family:
+        return Family(self.name, self.type, self.documentation, self._samples())
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def _samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        out = []
+        for key, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, key))
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                out.append(("_bucket", dict(labels, le=_format_value(bound)), cumulative))
+            out.append(("_sum", labels, total))
+            out.append(("_count", labels, cumulative))
+        return out
+
+
+class MetricsRegistry:
+    """A set of metrics plus scrape-time collectors, rendered as Prometheus text."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[Hashable, Callable[[], Iterable[Family]]] = {}
+        self._lock = threading.Lock()
+        self._sdk: Optional["SdkMetrics"] = None
+        self._sdk_lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, documentation: str, labelnames: Sequence[str],
+                       **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} is already registered as {metric.type} {metric.labelnames}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, key: Hashable, collect: Callable[[], Iterable[Family]]) -> None:
+        """Call ``collect`` at every scrape; a later collector with the same ``key`` replaces it."""
+        with self._lock:
+            self._collectors[key] = collect
+
+    def remove_collector(self, key: Hashable) -> None:
+        with self._lock:
+            self._collectors.pop(key, None)
+
+    def collect(self) -> List[Family]:
+        """All families; collector samples of the same name are merged."""
+        with self._lock:
+            families = [m.family() for m in self._metrics.values()]
+            collectors = list(self._collectors.values())
+        merged: Dict[str, Family] = {}
+        for family in families + [f for collect in collectors for f in collect()]:
+            if family.name in merged:
+                merged[family.name].samples.extend(family.samples)
+            else:
+                merged[family.name] = Family(family.name, family.type, family.help, list(family.samples))
+        return list(merged.values())
+
+    def get(self, name: str, **labels: str) -> Optional[float]:
+        """Value of the sample ``name`` (suffix included) with exactly ``labels``, or None."""
+        for family in self.collect():
+            for suffix, sample_labels, value in family.samples:
+                if family.name + suffix == name and sample_labels == labels:
+                    return value
+        return None
+
+    def render(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for suffix, labels, value in family.samples:
+                if labels:
+                    rendered = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                    lines.append(f"{family.name}{suffix}{{{rendered}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{family.name}{suffix} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9100, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """Serve :meth:`render` on ``http://host:port/metrics`` from a daemon thread.
+
+        Returns the server; call ``server.shutdown()`` to stop it. ``port=0``
+        picks a free port (``server.server_address[1]``).
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer   # only needed here
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="alphasec-metrics", daemon=True).start()
+        return server
+
+
+class SdkMetrics:
+    """The metrics the SDK updates internally; one instance per registry (see :func:`sdk_metrics`)."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.http_requests = registry.counter(
+            "alphasec_http_requests_total", "HTTP requests by endpoint and status.",
+            ("method", "endpoint", "status"))
+        self.http_duration = registry.histogram(
+            "alphasec_http_request_duration_seconds", "HTTP request latency.", ("method", "endpoint"))
+        self.ws_messages = registry.counter(
+            "alphasec_ws_messages_total", "WebSocket messages received.", ("channel",))
+        self.ws_bytes = registry.counter(
+            "alphasec_ws_received_bytes_total", "WebSocket message bytes received.", ("channel",))
+        self.ws_reconnects = registry.counter(
+            "alphasec_ws_reconnects_total", "Successful WebSocket reconnects.")
+        self.ws_reconnect_duration = registry.histogram(
+            "alphasec_ws_reconnect_duration_seconds", "Time from disconnect to reconnected.",
+            buckets=RECONNECT_BUCKETS)
+        self.callback_errors = registry.counter(
+            "alphasec_ws_callback_errors_total", "Subscription callbacks that raised.", ("channel",))
+
+    def request(self, method: str, path: str, status: Any, seconds: float) -> None:
+        endpoint = endpoint_label(path)
+        self.http_requests.labels(method, endpoint, status).inc()
+        self.http_duration.labels(method, endpoint).observe(seconds)
+
+    def ws_message(self, channel: str, size: int) -> None:
+        self.ws_messages.labels(channel).inc()
+        self.ws_bytes.labels(channel).inc(size)
+
+    def reconnected(self, seconds: float) -> None:
+        self.ws_reconnects.inc()
+        self.ws_reconnect_duration.observe(seconds)
+
+    # Scrape-time collectors for objects that already keep their own stats.
+
+    def watch_cache(self, cache: Any) -> None:
+        def collect() -> Iterable[Family]:
+            s = cache.stats()
+            return [
+                Family("alphasec_cache_hits_total", "counter", "Response-cache hits.", [("", {}, s["hits"])]),
+                Family("alphasec_cache_misses_total", "counter", "Response-cache misses.", [("", {}, s["misses"])]),
+                Family("alphasec_cache_coalesced_total", "counter", "Lookups joined to an in-flight request.",
+                       [("", {}, s["coalesced"])]),
+                Family("alphasec_cache_hit_ratio", "gauge", "Response-cache hit ratio since start.",
+                       [("", {}, s["hit_rate"])]),
+                Family("alphasec_cache_entries", "gauge", "Response-cache entries.", [("", {}, s["entries"])]),
+            ]
+        self.registry.add_collector(("cache", id(cache)), collect)
+
+    def watch_rate_limiter(self, limiter: Any) -> None:
+        def collect() -> Iterable[Family]:
+            stats = limiter.stats()
+            return [
+                Family("alphasec_rate_limiter_queued", "gauge", "Requests waiting for a rate-limit token.",
+                       [("", {"group": g}, s["queued"]) for g, s in stats.items()]),
+                Family("alphasec_rate_limiter_delay_seconds_total", "counter", "Total rate-limit queueing delay.",
+                       [("", {"group": g}, s["total_delay"]) for g, s in stats.items()]),
+            ]
+        self.registry.add_collector(("rate_limiter", id(limiter)), collect)
+
+    def watch_hedge(self, hedge: Any) -> None:
+        def collect() -> Iterable[Family]:
+            s = hedge.stats()
+            return [
+                Family("alphasec_hedge_requests_total", "counter", "Requests eligible for hedging.",
+                       [("", {}, s["requests"])]),
+                Family("alphasec_hedge_sent_total", "counter", "Hedge requests sent.", [("", {}, s["hedged"])]),
+                Family("alphasec_hedge_wins_total", "counter", "Hedges that answered first.",
+                       [("", {}, s["hedge_wins"])]),
+            ]
+        self.registry.add_collector(("hedge", id(hedge)), collect)
+
+    def watch_endpoints(self, pool: Any) -> None:
+        def collect() -> Iterable[Family]:
+            stats = pool.stats()
+            return [
+                Family("alphasec_endpoint_healthy", "gauge", "1 if the endpoint is in rotation.",
+                       [("", {"url": url}, 1.0 if s["healthy"] else 0.0) for url, s in stats.items()]),
+                Family("alphasec_endpoint_latency_seconds", "gauge", "Smoothed endpoint latency (EWMA).",
+                       [("", {"url": url}, s["ewma"]) for url, s in stats.items() if s["ewma"] is not None]),
+            ]
+        self.registry.add_collector(("endpoints", id(pool)), collect)
+
+    def watch_ws(self, manager: Any) -> None:
+        def collect() -> Iterable[Family]:
+            pending = len(getattr(manager, "_callback_tasks", ()))
+            return [Family("alphasec_ws_pending_callbacks", "gauge", "Async subscription callbacks still running.",
+                           [("", {}, pending)])]
+        self.registry.add_collector(("ws", id(manager)), collect)
+
+
+def sdk_metrics(registry: MetricsRegistry) -> SdkMetrics:
+    """The registry's :class:`SdkMetrics`, created on first use and shared by all clients."""
+    with registry._sdk_lock:
+        if registry._sdk is None:
+            registry._sdk = SdkMetrics(registry)
+        return registry._sdk
+
+
+def ws_channel_label(ws_msg: Any) -> str:
+    """The channel of a WebSocket message; ``"ack"`` / ``"other"`` for non-notifications."""
+    if isinstance(ws_msg, dict):
+        params = ws_msg.get("params")
+        if isinstance(params, dict) and isinstance(params.get("channel"), str):
+            return params["channel"]
+        if "id" in ws_msg and "result" in ws_msg:
+            return "ack"
+    return "other"
+
+
+def endpoint_label(path: str) -> str:
+    """``/api/v1/order/0xab..?x=1`` -> ``/api/v1/order/:id``."""
+    return _ID_SEGMENT.sub("/:id", path.split("?", 1)[0])
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
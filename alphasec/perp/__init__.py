@@ -1,9 +1,19 @@
-"""Perp (perpetual futures) support for the AlphaSec SDK."""
+"""Perp (perpetual futures) support for the AlphaSec SDK.
+
+Constants are imported eagerly; the agents and event decoder are loaded
+lazily (PEP 562) so importing a single perp module stays cheap.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any
 
 from .constants import BUY, SELL, GTC, IOC, POST, MARKET, SPOT_TO_PERP, PERP_TO_SPOT
-from .agent import PerpAgent
-from .async_agent import AsyncPerpAgent
-from .ws import decode_perp_event, PerpEvent
+
+_LAZY_EXPORTS = {
+    "PerpAgent": ".agent",
+    "AsyncPerpAgent": ".async_agent",
+    "decode_perp_event": ".ws",
+    "PerpEvent": ".ws",
+}
 
 __all__ = [
     "BUY",
@@ -19,3 +29,17 @@ __all__ = [
     "decode_perp_event",
     "PerpEvent",
 ]
+
+if TYPE_CHECKING:
+    from .agent import PerpAgent
+    from .async_agent import AsyncPerpAgent
+    from .ws import decode_perp_event, PerpEvent
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -10,13 +10,18 @@ section), backed by ``GET /fapi/v1/market``. All signed-transaction endpoints sh
 single ``_submit`` helper; all read endpoints return the raw ``result`` payload.
 """
 
+import logging
 import threading
-import time
 from typing import Any, Callable, Optional
 
+from alphasec.api.tracing import PERP_OPERATIONS, Trace
 from alphasec.api.utils import _clean_params
 from alphasec.exceptions import AlphasecAPIError
-from alphasec.perp.constants import PERP_TO_SPOT, SPOT_TO_PERP
+from alphasec.perp.constants import MARKET, PERP_TO_SPOT, SPOT_TO_PERP
+from alphasec.perp.specs import MarketSpec, MarketSpecIndex
+from alphasec.transaction.utils import NonceClock
+
+logger = logging.getLogger(__name__)
 
 
 class PerpAgent:
@@ -28,7 +33,14 @@ class PerpAgent:
         self._agent = agent
         # symbol(str) -> market_id(int). Lock-free reads; lock only the populate section.
         self._market_cache: dict[str, int] = {}
+        # symbol -> tick/lot/min-notional spec; filled by every markets fetch.
+        self.specs = MarketSpecIndex()
         self._cache_lock = threading.Lock()
+        # Whether the api's on-disk metadata cache (if any) has been consulted.
+        self._disk_checked = False
+        # Nonce source when the api has none of its own.
+        self._nonces = NonceClock()
+        self._spec_refresh_stop: Optional[threading.Event] = None
 
     # -----------------------------------------------------------------------
     # Lazy back-reference accessors
@@ -81,6 +93,13 @@ class PerpAgent:
             if cached is not None:
                 return cached
 
+            if not self._disk_checked:
+                self._disk_checked = True
+                if self._seed_market_cache():
+                    cached = self._market_cache.get(symbol)
+                    if cached is not None:
+                        return cached
+
             try:
                 markets = self.get_markets()
             except Exception:
@@ -92,19 +111,7 @@ class PerpAgent:
                     return cached
                 raise
 
-            # Build-then-swap so concurrent lock-free readers never observe a
-            # partially populated map.
-            new_cache: dict[str, int] = {}
-            for m in markets:
-                market_id = m.get("marketId")
-                sym = m.get("symbol")
-                if market_id is None or sym is None:
-                    continue
-                try:
-                    new_cache[sym] = int(market_id)
-                except (TypeError, ValueError):
-                    continue
-            self._market_cache = {**self._market_cache, **new_cache}
+            self._store_markets(markets)
 
             resolved = self._market_cache.get(symbol)
             if resolved is None:
@@ -112,6 +119,82 @@ class PerpAgent:
                 raise ValueError(f"Unknown perp symbol: {symbol}")
             return resolved
 
+    def _store_markets(self, markets: list[dict]) -> None:
+        """Merge fetched ``markets`` into the cache (caller holds the lock)."""
+        # Build-then-swap so concurrent lock-free readers never observe a
+        # partially populated map.
+        new_cache: dict[str, int] = {}
+        for m in markets:
+            market_id = m.get("marketId")
+            sym = m.get("symbol")
+            if market_id is None or sym is None:
+                continue
+            try:
+                new_cache[sym] = int(market_id)
+            except (TypeError, ValueError):
+                continue
+        self._market_cache = {**self._market_cache, **new_cache}
+        self.specs.update(markets)
+        metadata_cache = getattr(self._api, "metadata_cache", None)
+        if metadata_cache is not None and new_cache:
+            metadata_cache.put(self._api.metadata_key, "perp_markets", self._market_cache)
+
+    def _seed_market_cache(self) -> bool:
+        """Seed the cache from the api's on-disk metadata; revalidate in a thread."""
+        metadata_cache = getattr(self._api, "metadata_cache", None)
+        if metadata_cache is None:
+            return False
+        stored = metadata_cache.get(self._api.metadata_key, "perp_markets")
+        if not stored:
+            return False
+        self._market_cache = {**stored, **self._market_cache}
+        threading.Thread(
+            target=self._revalidate_markets, name="alphasec-perp-metadata", daemon=True
+        ).start()
+        return True
+
+    def _revalidate_markets(self) -> None:
+        try:
+            markets = self.get_markets()
+        except Exception as exc:
+            logger.warning(f"perp market revalidation failed: {exc!r}")
+            return
+        with self._cache_lock:
+            self._store_markets(markets)
+
+    def market_spec(self, symbol: str) -> MarketSpec:
+        """Return the cached tick/lot/min-notional spec of ``symbol``, fetching markets on a miss."""
+        spec = self.specs.get(symbol)
+        if spec is not None:
+            return spec
+        with self._cache_lock:
+            spec = self.specs.get(symbol)
+            if spec is None:
+                self._store_markets(self.get_markets())
+                spec = self.specs.get(symbol)
+        if spec is None:
+            raise ValueError(f"Unknown perp symbol: {symbol}")
+        return spec
+
+    def start_market_refresh(self, interval: float = 300.0) -> None:
+        """Re-fetch the market specs every ``interval`` seconds in a daemon thread."""
+        if self._spec_refresh_stop is not None:
+            return
+        stop = self._spec_refresh_stop = threading.Event()
+
+        def run() -> None:
+            while True:
+                self._revalidate_markets()
+                if stop.wait(interval):
+                    return
+
+        threading.Thread(target=run, name="alphasec-perp-specs", daemon=True).start()
+
+    def stop_market_refresh(self) -> None:
+        if self._spec_refresh_stop is not None:
+            self._spec_refresh_stop.set()
+            self._spec_refresh_stop = None
+
     # -----------------------------------------------------------------------
     # Submit / unwrap helpers
     # -----------------------------------------------------------------------
@@ -131,10 +214,24 @@ class PerpAgent:
             raise AlphasecAPIError(f"{code}: {err_msg}")
         return resp.get("result")
 
-    def _submit(self, path: str, data: bytes) -> str:
-        """Sign ``data``, POST ``{"tx": signed}`` to ``path``, return the tx-hash string."""
-        tx = self._signer.generate_alphasec_transaction(int(time.time() * 1000), data)
-        resp = self._api.post(path, {"tx": tx})
+    def _start_trace(self, path: str, **attributes) -> Optional[Trace]:
+        tracer = getattr(self._api, "tracer", None)
+        return tracer.start(PERP_OPERATIONS.get(path, path), **attributes) if tracer is not None else None
+
+    def _submit(self, path: str, data: bytes, trace: Optional[Trace] = None) -> str:
+        """Sign ``data``, POST ``{"tx": signed}`` to ``path``, return the tx-hash string.
+
+        Traces the sign and submit stages when the api has a ``tracer``.
+        """
+        if trace is None:
+            trace = self._start_trace(path)
+        # The api's nonce clock is shared with spot submits, so the two never reuse a nonce.
+        tx = self._signer.generate_alphasec_transaction(getattr(self._api, "_nonces", self._nonces).next(), data)
+        if trace is None:
+            resp = self._api.post(path, {"tx": tx})
+        else:
+            trace.mark("sign")
+            resp = self._api._submit_tx(path, tx, trace)
         return self._unwrap(resp)
 
     # -----------------------------------------------------------------------
@@ -150,18 +247,35 @@ class PerpAgent:
         tif: int,
         reduce_only: bool = False,
         client_order_id: Optional[str] = None,
+        normalize: bool = False,
     ) -> str:
         """Place a new perp order. Returns the accepted tx hash (not an order_id).
 
-        Price/quantity are NOT auto-normalized: the caller must round them to the
-        market's ``tickSize``/``lotSize`` (from ``get_markets``) and satisfy
-        ``minNotional``, otherwise the server rejects the order.
+        Price/quantity are NOT auto-normalized by default: the caller must round
+        them to the market's ``tickSize``/``lotSize`` (from ``get_markets``) and
+        satisfy ``minNotional``, otherwise the server rejects the order. With
+        ``normalize=True`` they are rounded with the cached ``MarketSpec`` (price
+        away from the book, quantity down) and an order that cannot meet the
+        spec raises ValueError before anything is sent.
         """
-        market_id = self._resolve_market_id(symbol)
+        trace = self._start_trace("/fapi/v1/order", symbol=symbol)
+        if normalize:
+            spec = self.market_spec(symbol)
+            market_id = spec.market_id
+            if tif == MARKET:  # the server ignores a market order's price
+                quantity = spec.normalize(None, quantity)[1]
+            else:
+                price, quantity = spec.normalize(price, quantity, side)
+        else:
+            market_id = self._resolve_market_id(symbol)
+        if trace is not None:
+            trace.mark("normalize")
         data = self._signer.create_perp_order_data(
             market_id, side, price, quantity, reduce_only, tif, client_order_id
         )
-        return self._submit("/fapi/v1/order", data)
+        if trace is not None:
+            trace.mark("build")
+        return self._submit("/fapi/v1/order", data, trace)
 
     def cancel(self, symbol: str, order_id: str) -> str:
         """Cancel an open perp order by order_id. Returns the tx hash."""
@@ -182,16 +296,37 @@ class PerpAgent:
         new_price=None,
         new_quantity=None,
         client_order_id: Optional[str] = None,
+        normalize: bool = False,
     ) -> str:
-        """Modify an open perp order via cancel-and-replace. Returns the tx hash."""
-        market_id = self._resolve_market_id(symbol)
+        """Modify an open perp order via cancel-and-replace. Returns the tx hash.
+
+        ``normalize=True`` rounds the new values to the market spec (price to
+        the nearest tick, since the side is not known here).
+        """
+        trace = self._start_trace("/fapi/v1/order/modify", symbol=symbol)
+        if normalize:
+            spec = self.market_spec(symbol)
+            market_id = spec.market_id
+            new_price, new_quantity = spec.normalize(new_price, new_quantity)
+        else:
+            market_id = self._resolve_market_id(symbol)
+        if trace is not None:
+            trace.mark("normalize")
         data = self._signer.create_perp_modify_data(
             market_id, order_id, new_price, new_quantity, client_order_id
         )
-        return self._submit("/fapi/v1/order/modify", data)
+        if trace is not None:
+            trace.mark("build")
+        return self._submit("/fapi/v1/order/modify", data, trace)
 
     def set_leverage(self, symbol: str, leverage: int) -> str:
-        """Set leverage for a symbol (market-scoped). Returns the tx hash."""
+        """Set leverage for a symbol (market-scoped). Returns the tx hash.
+
+        Checked against the market's ``maxLeverage`` when its spec is cached.
+        """
+        spec = self.specs.get(symbol)
+        if spec is not None:
+            spec.check_leverage(leverage)
         market_id = self._resolve_market_id(symbol)
         data = self._signer.create_perp_set_leverage_data(market_id, leverage)
         return self._submit("/fapi/v1/position/leverage", data)
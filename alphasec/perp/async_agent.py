@@ -13,12 +13,15 @@ call time, raising a clear ``RuntimeError`` if not yet initialized.
 from __future__ import annotations
 
 import asyncio
-import time
+import logging
 from decimal import Decimal
 from typing import Any, Callable, Optional, Union
 
+from alphasec.api.tracing import PERP_OPERATIONS, Trace
 from alphasec.exceptions import AlphasecAPIError
-from alphasec.perp.constants import PERP_TO_SPOT, SPOT_TO_PERP
+from alphasec.perp.constants import MARKET, PERP_TO_SPOT, SPOT_TO_PERP
+from alphasec.perp.specs import MarketSpec, MarketSpecIndex
+from alphasec.transaction.utils import NonceClock
 
 # Default server-side page size applied for /market/depth and /market/trades
 # when the caller passes limit=None (matches rust DEFAULT_LIMIT).
@@ -26,6 +29,8 @@ DEFAULT_LIMIT = 100
 
 PerpNumber = Union[Decimal, str]
 
+logger = logging.getLogger(__name__)
+
 
 class AsyncPerpAgent:
     """Sub-facade for all perpetual futures operations (async).
@@ -44,8 +49,16 @@ class AsyncPerpAgent:
         self._agent = agent
         # symbol(str) -> market_id(int); populated lazily on first miss.
         self._market_cache: dict[str, int] = {}
+        # symbol -> tick/lot/min-notional spec; filled by every markets fetch.
+        self.specs = MarketSpecIndex()
         # Guards only the populate critical section; reads are lock-free.
         self._cache_lock = asyncio.Lock()
+        # Whether the api's on-disk metadata cache (if any) has been consulted.
+        self._disk_checked = False
+        # Nonce source when the api has none of its own.
+        self._nonces = NonceClock()
+        self._revalidate_task: Optional[asyncio.Task] = None
+        self._spec_refresh_task: Optional[asyncio.Task] = None
 
     # -----------------------------------------------------------------------
     # Lazy parent accessors
@@ -111,6 +124,13 @@ class AsyncPerpAgent:
             if cached is not None:
                 return cached
 
+            if not self._disk_checked:
+                self._disk_checked = True
+                if await self._seed_market_cache():
+                    cached = self._market_cache.get(symbol)
+                    if cached is not None:
+                        return cached
+
             try:
                 markets = await self.get_markets()
             except Exception as exc:
@@ -122,21 +142,7 @@ class AsyncPerpAgent:
                     return cached
                 raise exc
 
-            # Build-then-swap so concurrent lock-free readers never observe a
-            # partially populated map.
-            new_cache: dict[str, int] = {}
-            for m in markets:
-                market_id = m.get("marketId")
-                sym = m.get("symbol")
-                if market_id is None or sym is None:
-                    continue
-                try:
-                    new_cache[sym] = int(market_id)
-                except (TypeError, ValueError):
-                    continue
-            # Preserve any prior entries not present in the fresh fetch.
-            merged = {**self._market_cache, **new_cache}
-            self._market_cache = merged
+            await self._store_markets(markets)
 
             resolved = self._market_cache.get(symbol)
             if resolved is None:
@@ -144,20 +150,122 @@ class AsyncPerpAgent:
                 raise ValueError(f"Unknown perp symbol: {symbol}")
             return resolved
 
+    async def _store_markets(self, markets: list) -> None:
+        """Merge fetched ``markets`` into the cache and persist it if configured."""
+        # Build-then-swap so concurrent lock-free readers never observe a
+        # partially populated map.
+        new_cache: dict[str, int] = {}
+        for m in markets:
+            market_id = m.get("marketId")
+            sym = m.get("symbol")
+            if market_id is None or sym is None:
+                continue
+            try:
+                new_cache[sym] = int(market_id)
+            except (TypeError, ValueError):
+                continue
+        # Preserve any prior entries not present in the fresh fetch.
+        merged = {**self._market_cache, **new_cache}
+        self._market_cache = merged
+        self.specs.update(markets)
+        metadata_cache = getattr(self._api, "metadata_cache", None)
+        if metadata_cache is not None and new_cache:
+            # The file rewrite runs in a thread, off the event loop.
+            await asyncio.to_thread(metadata_cache.put, self._api.metadata_key, "perp_markets", merged)
+
+    async def _seed_market_cache(self) -> bool:
+        """Seed the cache from the api's on-disk metadata; revalidate in a task."""
+        metadata_cache = getattr(self._api, "metadata_cache", None)
+        if metadata_cache is None:
+            return False
+        stored = await asyncio.to_thread(metadata_cache.get, self._api.metadata_key, "perp_markets")
+        if not stored:
+            return False
+        self._market_cache = {**stored, **self._market_cache}
+        self._revalidate_task = asyncio.create_task(self._revalidate_markets())
+        return True
+
+    async def prewarm(self) -> int:
+        """Fill the symbol -> market_id cache ahead of the first order.
+
+        Does not wait for the spot token metadata, so it can run concurrently
+        with ``api.initialize()``. Returns the number of cached symbols.
+        """
+        markets = _market_symbols(await self._api._cached_get("/fapi/v1/market"))
+        async with self._cache_lock:
+            await self._store_markets(markets)
+            self._disk_checked = True
+        return len(self._market_cache)
+
+    def _cancel_revalidation(self) -> None:
+        if self._revalidate_task is not None:
+            self._revalidate_task.cancel()
+            self._revalidate_task = None
+        self.stop_market_refresh()
+
+    async def market_spec(self, symbol: str) -> MarketSpec:
+        """Return the cached tick/lot/min-notional spec of ``symbol``, fetching markets on a miss."""
+        spec = self.specs.get(symbol)
+        if spec is not None:
+            return spec
+        async with self._cache_lock:
+            spec = self.specs.get(symbol)
+            if spec is None:
+                await self._store_markets(await self.get_markets())
+                spec = self.specs.get(symbol)
+        if spec is None:
+            raise ValueError(f"Unknown perp symbol: {symbol}")
+        return spec
+
+    def start_market_refresh(self, interval: float = 300.0) -> None:
+        """Re-fetch the market specs every ``interval`` seconds in a background task."""
+        if self._spec_refresh_task is None:
+            self._spec_refresh_task = asyncio.create_task(self._refresh_markets(interval))
+
+    def stop_market_refresh(self) -> None:
+        if self._spec_refresh_task is not None:
+            self._spec_refresh_task.cancel()
+            self._spec_refresh_task = None
+
+    async def _refresh_markets(self, interval: float) -> None:
+        while True:
+            await self._revalidate_markets()
+            await asyncio.sleep(interval)
+
+    async def _revalidate_markets(self) -> None:
+        try:
+            markets = await self.get_markets()
+        except Exception as exc:
+            logger.warning(f"perp market revalidation failed: {exc!r}")
+            return
+        await self._store_markets(markets)
+
     # -----------------------------------------------------------------------
     # Internal: sign and submit helpers
     # -----------------------------------------------------------------------
 
-    async def _submit(self, path: str, data: bytes) -> str:
+    def _start_trace(self, path: str, **attributes: Any) -> Optional[Trace]:
+        tracer = getattr(self._api, "tracer", None)
+        return tracer.start(PERP_OPERATIONS.get(path, path), **attributes) if tracer is not None else None
+
+    async def _submit(self, path: str, data: bytes, trace: Optional[Trace] = None) -> str:
         """Sign ``data`` and POST ``{"tx": ...}`` to ``path``; return tx hash.
 
+        With the api's ``tracer`` set, the sign and submit stages are traced
+        (continuing ``trace`` when the caller already started one).
+
         Raises:
             AlphasecAPIError: If the response envelope code != 200.
         """
-        tx = self._signer.generate_alphasec_transaction(
-            int(time.time() * 1000), data
-        )
-        resp = await self._api.post(path, {"tx": tx})
+        if trace is None:
+            trace = self._start_trace(path)
+        # The api's nonce clock is shared with spot submits, so the two never reuse a nonce.
+        tx = self._signer.generate_alphasec_transaction(getattr(self._api, "_nonces", self._nonces).next(), data)
+        if trace is None:
+            resp = await self._api.post(path, {"tx": tx})
+        else:
+            trace.mark("sign")
+            resp = await self._api._submit_tx(path, tx, trace)
         return _unwrap_submit(resp)
 
     # -----------------------------------------------------------------------
@@ -173,14 +281,30 @@ class AsyncPerpAgent:
         tif: int,
         reduce_only: bool = False,
         client_order_id: Optional[str] = None,
+        normalize: bool = False,
     ) -> str:
         """Place a new perp limit/market order. Returns the submit tx hash.
 
-        Price/quantity are NOT auto-normalized: the caller must round them to the
-        market's ``tickSize``/``lotSize`` (from ``get_markets``) and satisfy
-        ``minNotional``, otherwise the server rejects the order.
+        Price/quantity are NOT auto-normalized by default: the caller must
+        round them to the market's ``tickSize``/``lotSize`` (from
+        ``get_markets``) and satisfy ``minNotional``, otherwise the server
+        rejects the order. With ``normalize=True`` they are rounded with the
+        cached :class:`~alphasec.perp.specs.MarketSpec` (price away from the
+        book, quantity down) and an order that cannot meet the spec raises
+        ValueError before anything is sent.
         """
-        market_id = await self._resolve_market_id(symbol)
+        trace = self._start_trace("/fapi/v1/order", symbol=symbol)
+        if normalize:
+            spec = await self.market_spec(symbol)
+            market_id = spec.market_id
+            if tif == MARKET:   # the server ignores a market order's price
+                quantity = spec.normalize(None, quantity)[1]
+            else:
+                price, quantity = spec.normalize(price, quantity, side)
+        else:
+            market_id = await self._resolve_market_id(symbol)
+        if trace is not None:
+            trace.mark("normalize")
         data = self._signer.create_perp_order_data(
             market_id,
             side,
@@ -190,7 +314,9 @@ class AsyncPerpAgent:
             tif,
             client_order_id,
         )
-        return await self._submit("/fapi/v1/order", data)
+        if trace is not None:
+            trace.mark("build")
+        return await self._submit("/fapi/v1/order", data, trace)
 
     async def cancel(self, symbol: str, order_id: str) -> str:
         """Cancel an open perp order by order ID. Returns the submit tx hash."""
@@ -211,13 +337,24 @@ class AsyncPerpAgent:
         new_price: Optional[PerpNumber] = None,
         new_quantity: Optional[PerpNumber] = None,
         client_order_id: Optional[str] = None,
+        normalize: bool = False,
     ) -> str:
         """Modify (amend) an open perp order via cancel-and-replace (0x4A).
 
         ``None`` fields are omitted from the wire so the server inherits the
-        existing value. Returns the submit tx hash.
+        existing value. With ``normalize=True`` the new values are rounded to
+        the market spec (price to the nearest tick, since the side is not
+        known here). Returns the submit tx hash.
         """
-        market_id = await self._resolve_market_id(symbol)
+        trace = self._start_trace("/fapi/v1/order/modify", symbol=symbol)
+        if normalize:
+            spec = await self.market_spec(symbol)
+            market_id = spec.market_id
+            new_price, new_quantity = spec.normalize(new_price, new_quantity)
+        else:
+            market_id = await self._resolve_market_id(symbol)
+        if trace is not None:
+            trace.mark("normalize")
         data = self._signer.create_perp_modify_data(
             market_id,
             order_id,
@@ -225,7 +362,9 @@ class AsyncPerpAgent:
             new_quantity,
             client_order_id,
         )
-        return await self._submit("/fapi/v1/order/modify", data)
+        if trace is not None:
+            trace.mark("build")
+        return await self._submit("/fapi/v1/order/modify", data, trace)
 
     async def transfer(self, direction: int, token: str, amount: PerpNumber) -> str:
         """Transfer margin between Spot and Perp wallets.
@@ -252,7 +391,13 @@ class AsyncPerpAgent:
         return await self._submit(path, data)
 
     async def set_leverage(self, symbol: str, leverage: int) -> str:
-        """Set leverage for a symbol. Returns the submit tx hash."""
+        """Set leverage for a symbol. Returns the submit tx hash.
+
+        Checked against the market's ``maxLeverage`` when its spec is cached.
+        """
+        spec = self.specs.get(symbol)
+        if spec is not None:
+            spec.check_leverage(leverage)
         market_id = await self._resolve_market_id(symbol)
         data = self._signer.create_perp_set_leverage_data(market_id, leverage)
         return await self._submit("/fapi/v1/position/leverage", data)
@@ -390,11 +535,7 @@ class AsyncPerpAgent:
 
     async def get_markets(self) -> list:
         """Get all perp markets. Unwraps ``result.symbols``."""
-        resp = await self._api.get("/fapi/v1/market")
-        result = _unwrap_query(resp)
-        if isinstance(result, dict):
-            return result.get("symbols", [])
-        return result
+        return _market_symbols(await self._api.get("/fapi/v1/market"))
 
     async def get_tickers(self) -> list:
         """Get tickers for all markets."""
@@ -487,6 +628,14 @@ class AsyncPerpAgent:
 # ---------------------------------------------------------------------------
 
 
+def _market_symbols(resp: Any) -> list:
+    """Unwrap a /fapi/v1/market response to its ``symbols`` list."""
+    result = _unwrap_query(resp)
+    if isinstance(result, dict):
+        return result.get("symbols", [])
+    return result
+
+
 def _clean(params: dict) -> dict:
     """Drop keys whose value is None (omit absent optional query params)."""
     return {k: v for k, v in params.items() if v is not None}
@@ -0,0 +1,184 @@
+"""Perp market specs: tick/lot rounding and min-notional checks.
+
+The server rejects a perp order whose price is off the market's ``tickSize``,
+whose quantity is off its ``lotSize`` or whose notional is below
+``minNotional``. :class:`MarketSpec` holds those fields for one market and
+applies them with exact Decimal arithmetic; :class:`MarketSpecIndex` is the
+per-agent cache of every market's spec, refreshed from ``get_markets``.
+
+Rounding never makes an order more aggressive: buy prices round down, sell
+prices round up (to nearest when the side is unknown, as for ``modify``), and
+quantities round down to the lot.
+"""
+from decimal import ROUND_DOWN, ROUND_HALF_UP, ROUND_UP, Decimal, InvalidOperation, localcontext
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from alphasec.perp.constants import BUY, SELL
+
+Number = Union[Decimal, str, int]
+
+_PRICE_ROUNDING = {BUY: ROUND_DOWN, SELL: ROUND_UP}
+
+
+def _decimal(value: Number, what: str) -> Decimal:
+    # Floats are rejected with the same TypeError as the perp signing helpers
+    # (transaction/sign.py): their binary value is not the price meant.
+    if isinstance(value, float):
+        raise TypeError("float is not allowed for perp amounts; use Decimal or str")
+    try:
+        d = value if isinstance(value, Decimal) else Decimal(str(value))
+    except (InvalidOperation, ValueError, TypeError):
+        raise ValueError(f"{what} must be numeric, got {value!r}")
+    if not d.is_finite():
+        raise ValueError(f"{what} must be finite, got {value!r}")
+    return d
+
+
+def _optional_decimal(value: object) -> Optional[Decimal]:
+    if value in (None, ""):
+        return None
+    try:
+        d = Decimal(str(value))
+    except (InvalidOperation, ValueError, TypeError):
+        return None
+    return d if d.is_finite() and d > 0 else None
+
+
+def _round_to(value: Decimal, step: Decimal, rounding: str) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec = 50
+        return (value / step).quantize(Decimal(1), rounding=rounding) * step
+
+
+class MarketSpec(NamedTuple):
+    """Trading rules of one perp market; a None field is not enforced."""
+    symbol: str
+    market_id: int
+    tick_size: Optional[Decimal]
+    lot_size: Optional[Decimal]
+    min_notional: Optional[Decimal]
+    max_leverage: Optional[int]
+
+    @classmethod
+    def from_market(cls, market: dict) -> Optional["MarketSpec"]:
+        """Build a spec from a ``get_markets`` row; None if it has no symbol or market id."""
+        symbol, market_id = market.get("symbol"), market.get("marketId")
+        if symbol is None or market_id is None:
+            return None
+        try:
+            market_id = int(market_id)
+        except (TypeError, ValueError):
+            return None
+        try:
+            max_leverage = int(market["maxLeverage"]) if market.get("maxLeverage") is not None else None
+        except (TypeError, ValueError):
+            max_leverage = None
+        return cls(symbol, market_id, _optional_decimal(market.get("tickSize")),
+                   _optional_decimal(market.get("lotSize")), _optional_decimal(market.get("minNotional")),
+                   max_leverage)
+
+    def round_price(self, price: Number, side: Optional[int] = None) -> Decimal:
+        """``price`` on the tick grid, rounded away from the book for ``side``."""
+        price = _decimal(price, "price")
+        if self.tick_size is None:
+            return price
+        return _round_to(price, self.tick_size, _PRICE_ROUNDING.get(side, ROUND_HALF_UP))
+
+    def round_quantity(self, quantity: Number) -> Decimal:
+        """``quantity`` rounded down to the lot size."""
+        quantity = _decimal(quantity, "quantity")
+        if self.lot_size is None:
+            return quantity
+        return _round_to(quantity, self.lot_size, ROUND_DOWN)
+
+    def normalize(
+        self,
+        price: Optional[Number],
+        quantity: Optional[Number],
+        side: Optional[int] = None,
+    ) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+        """Round ``price`` and ``quantity`` and validate the result.
+
+        Either may be None (left unset, as for a market order's price or a
+        ``modify`` that changes one field); min notional is checked only when
+        both are given.
+
+        Raises:
+            ValueError: If a value is not positive after rounding or the
+                notional is below ``min_notional``.
+        """
+        if price is not None:
+            price = self.round_price(price, side)
+            if price <= 0:
+                raise ValueError(f"{self.symbol}: price rounds to {price} on tick {self.tick_size}")
+        if quantity is not None:
+            quantity = self.round_quantity(quantity)
+            if quantity <= 0:
+                raise ValueError(f"{self.symbol}: quantity rounds to {quantity} on lot {self.lot_size}")
+        if price is not None and quantity is not None and self.min_notional is not None:
+            if price * quantity < self.min_notional:
+                raise ValueError(f"{self.symbol}: notional {price * quantity} is below minNotional {self.min_notional}")
+        return price, quantity
+
+    def normalize_many(
+        self,
+        prices: Sequence[Number],
+        quantities: Sequence[Number],
+        sides: Union[int, Sequence[Optional[int]], None] = None,
+    ) -> List[Tuple[Decimal, Decimal]]:
+        """:meth:`normalize` a batch; every entry is validated before any is returned.
+
+        ``sides`` is one side for the whole batch or one per entry.
+
+        Raises:
+            ValueError: Naming the first offending index.
+        """
+        if len(prices) != len(quantities):
+            raise ValueError("prices and quantities must have the same length")
+        if sides is None or isinstance(sides, int):
+            sides = [sides] * len(prices)
+        elif len(sides) != len(prices):
+            raise ValueError("sides must be one side or one per price")
+        normalized = []
+        for index, (price, quantity, side) in enumerate(zip(prices, quantities, sides)):
+            try:
+                normalized.append(self.normalize(price, quantity, side))
+            except ValueError as exc:
+                raise ValueError(f"{exc} (index {index})") from None
+        return normalized
+
+    def check_leverage(self, leverage: int) -> None:
+        if leverage < 1 or (self.max_leverage is not None and leverage > self.max_leverage):
+            raise ValueError(f"{self.symbol}: leverage must be between 1 and {self.max_leverage}, got {leverage}")
+
+
+class MarketSpecIndex:
+    """Symbol -> :class:`MarketSpec`, updated whole so lock-free readers never see a partial map."""
+
+    def __init__(self, markets: Iterable[dict] = ()):
+        self._by_symbol: Dict[str, MarketSpec] = {}
+        self._by_id: Dict[int, MarketSpec] = {}
+        self.update(markets)
+
+    def update(self, markets: Iterable[dict]) -> int:
+        """Merge ``get_markets`` rows into the index; returns the number of specs read."""
+        fresh = [spec for spec in map(MarketSpec.from_market, markets) if spec is not None]
+        by_symbol = {**self._by_symbol, **{spec.symbol: spec for spec in fresh}}
+        self._by_id, self._by_symbol = {spec.market_id: spec for spec in by_symbol.values()}, by_symbol
+        return len(fresh)
+
+    def get(self, symbol: str) -> Optional[MarketSpec]:
+        return self._by_symbol.get(symbol)
+
+    def by_market_id(self, market_id: Union[int, str]) -> Optional[MarketSpec]:
+        return self._by_id.get(int(market_id))
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._by_symbol)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._by_symbol
+
+    def __len__(self) -> int:
+        return len(self._by_symbol)
@@ -0,0 +1,438 @@
+"""Quote reconciliation: turn a desired set of quotes into the fewest order actions.
+
+A market maker describes the quotes it wants resting on one market; the
+:class:`Reconciler` compares them with the live orders and sends only the
+difference::
+
+    reconciler = Reconciler(SpotVenue(api), live=LiveOrders())
+    await agent.subscribe(f"userEvent@{address}", reconciler.live.on_user_event)
+    ...
+    await reconciler.reconcile("KAIA/USDT", [Quote(BUY, 0.99, 100), Quote(SELL, 1.01, 100)])
+
+Per side, a live order that already matches a quote (same price, remaining
+quantity within ``quantity_tolerance``) is kept. The remaining quotes and live
+orders are paired best price first: each pair becomes one modify, the
+surplus quotes become places and the surplus orders become cancels. Every
+action touches one order, so this is the minimum number of transactions that
+reaches the target.
+
+Live orders come from a :class:`LiveOrders` cache fed by ``userEvent`` (no
+request per refresh), from ``get_open_orders`` when no cache is configured,
+or are passed in explicitly. The reconciler applies its own results to the
+cache immediately, so the next refresh does not act on orders whose events
+have not arrived yet. Perp submits only return a tx hash, so there the new
+orders are left to their userEvents and only the replaced and cancelled ones
+are dropped right away.
+
+Cancels are sent first and complete before the modifies and places, which
+then go out together; within each phase requests run concurrently.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT, SELL
+from alphasec.api.utils import market_to_market_id
+from alphasec.perp.constants import GTC
+from alphasec.transaction.utils import normalize_price_quantities
+
+if TYPE_CHECKING:
+    from alphasec.api.async_api import AsyncAPI
+    from alphasec.perp.async_agent import AsyncPerpAgent
+
+logger = logging.getLogger(__name__)
+
+Number = Union[Decimal, float, int, str]
+
+PLACE = "place"
+MODIFY = "modify"
+CANCEL = "cancel"
+
+_OPEN_STATUSES = ("NEW", "PARTIALLY_FILLED")
+
+
+class Quote(NamedTuple):
+    """A desired resting order: ``side`` (BUY / SELL), ``price``, ``quantity``."""
+    side: int
+    price: Number
+    quantity: Number
+
+
+class LiveOrder(NamedTuple):
+    """An open order: ``quantity`` is what is still resting (original - executed)."""
+    order_id: str
+    market_id: str
+    side: int
+    price: Decimal
+    quantity: Decimal
+
+
+class Action(NamedTuple):
+    kind: str                      # PLACE, MODIFY or CANCEL
+    quote: Optional[Quote]         # target for PLACE / MODIFY
+    order: Optional[LiveOrder]     # order acted on for MODIFY / CANCEL
+
+
+class Outcome(NamedTuple):
+    action: Action
+    order_id: Optional[str]        # new order's id for PLACE / MODIFY; the cancel tx hash for CANCEL
+    error: Optional[str]           # None on success
+    pending: bool = False          # order_id is the submit's tx hash; the order id comes with its userEvent
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ReconcileResult(NamedTuple):
+    kept: List[LiveOrder]
+    outcomes: List[Outcome]
+
+    @property
+    def actions(self) -> List[Action]:
+        return [o.action for o in self.outcomes]
+
+    @property
+    def errors(self) -> List[Outcome]:
+        return [o for o in self.outcomes if not o.ok]
+
+
+def _dec(value: Number) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _field(row: dict, camel: str, snake: str) -> Any:
+    return row[camel] if camel in row else row.get(snake)
+
+
+def parse_order(row: dict) -> Optional[LiveOrder]:
+    """A :class:`LiveOrder` from an open-orders row or userEvent item (camelCase or snake_case).
+
+    Returns None for rows that are not open orders.
+    """
+    order_id = _field(row, "orderId", "order_id")
+    status = row.get("status")
+    if order_id is None or (status is not None and status not in _OPEN_STATUSES):
+        return None
+    side = row.get("side")
+    if isinstance(side, str):
+        side = BUY if side.upper() == "BUY" else SELL
+    executed = _field(row, "executedQty", "executed_qty") or 0
+    return LiveOrder(
+        order_id=order_id,
+        market_id=str(_field(row, "marketId", "market_id")),
+        side=int(side),
+        price=_dec(_field(row, "origPrice", "orig_price")),
+        quantity=_dec(_field(row, "origQty", "orig_qty")) - _dec(executed),
+    )
+
+
+class LiveOrders:
+    """Open orders per market, kept current from ``userEvent`` messages.
+
+    Subscribe :meth:`on_user_event` to the account's ``userEvent`` channel and
+    optionally :meth:`load` a ``get_open_orders`` snapshot at start. Ids the
+    reconciler has cancelled or replaced are remembered (up to
+    ``max_tombstones``) so a late ``NEW`` event cannot resurrect them.
+    """
+
+    def __init__(self, max_tombstones: int = 10000):
+        self._orders: Dict[str, Dict[str, LiveOrder]] = {}
+        self._tombstones: "OrderedDict[str, None]" = OrderedDict()
+        self._max_tombstones = max_tombstones
+
+    def orders(self, market_id: str) -> List[LiveOrder]:
+        return list(self._orders.get(str(market_id), {}).values())
+
+    def load(self, rows: Iterable[dict]) -> None:
+        """Merge an open-orders snapshot (REST rows, either key style)."""
+        for row in rows:
+            self._apply(row)
+
+    def on_user_event(self, payload: Any) -> None:
+        """``userEvent`` callback: track each order item in the payload."""
+        items = payload if isinstance(payload, list) else [payload]
+        for item in items:
+            if isinstance(item, dict) and item.get("topic", "PERP_ORDER") == "PERP_ORDER":
+                self._apply(item)
+
+    def _apply(self, row: dict) -> None:
+        order_id = _field(row, "orderId", "order_id")
+        if order_id is None or order_id in self._tombstones:
+            return
+        order = parse_order(row)
+        if order is None:
+            self.remove(order_id)
+        else:
+            self.add(order)
+
+    def add(self, order: LiveOrder) -> None:
+        if order.order_id not in self._tombstones:
+            self._orders.setdefault(order.market_id, {})[order.order_id] = order
+
+    def remove(self, order_id: str) -> None:
+        for orders in self._orders.values():
+            if orders.pop(order_id, None) is not None:
+                break
+        self._tombstones[order_id] = None
+        if len(self._tombstones) > self._max_tombstones:
+            self._tombstones.popitem(last=False)
+
+
+def diff(
+    desired: Sequence[Quote],
+    live: Sequence[LiveOrder],
+    quantity_tolerance: Number = 0,
+) -> Tuple[List[LiveOrder], List[Action]]:
+    """The orders to keep and the minimal actions that turn ``live`` into ``desired``.
+
+    Prices compare exactly, so pass quotes already rounded the way the venue
+    will round them (``Reconciler`` does this for spot). A live order whose
+    remaining quantity is within ``quantity_tolerance`` of its quote's is kept
+    as is; one at the right price but the wrong size is resized with a modify.
+    """
+    tolerance = _dec(quantity_tolerance)
+    kept: List[LiveOrder] = []
+    actions: List[Action] = []
+    for side in (BUY, SELL):
+        quotes = [q for q in desired if q.side == side]
+        orders = [o for o in live if o.side == side]
+
+        # Exact price matches first: keep, or modify the size only.
+        by_price: Dict[Decimal, List[LiveOrder]] = {}
+        for order in orders:
+            by_price.setdefault(order.price, []).append(order)
+        unmatched_quotes = []
+        for quote in quotes:
+            same_price = by_price.get(_dec(quote.price))
+            if not same_price:
+                unmatched_quotes.append(quote)
+                continue
+            # Prefer the order closest in size, so duplicates cancel the worst fit.
+            same_price.sort(key=lambda o: abs(o.quantity - _dec(quote.quantity)))
+            order = same_price.pop(0)
+            if abs(order.quantity - _dec(quote.quantity)) <= tolerance:
+                kept.append(order)
+            else:
+                actions.append(Action(MODIFY, quote, order))
+        unmatched_orders = [o for group in by_price.values() for o in group]
+
+        # Moved levels: pair best price first, so each modify moves an order the least far.
+        best_first = side == BUY
+        unmatched_quotes.sort(key=lambda q: _dec(q.price), reverse=best_first)
+        unmatched_orders.sort(key=lambda o: o.price, reverse=best_first)
+        paired = min(len(unmatched_quotes), len(unmatched_orders))
+        actions.extend(Action(MODIFY, q, o) for q, o in zip(unmatched_quotes, unmatched_orders))
+        actions.extend(Action(PLACE, q, None) for q in unmatched_quotes[paired:])
+        actions.extend(Action(CANCEL, None, o) for o in unmatched_orders[paired:])
+    return kept, actions
+
+
+class SpotVenue:
+    """Reconciles spot markets through ``AsyncAPI``'s bulk methods.
+
+    Quotes are normalized with the same rules ``AsyncAPI.order`` applies
+    before they are compared with live orders.
+    """
+
+    returns_order_ids = True
+
+    def __init__(self, api: "AsyncAPI", order_mode: int = BASE_MODE):
+        self.api = api
+        self.order_mode = order_mode
+
+    async def market_id(self, market: str) -> str:
+        await self.api._ensure_initialized()
+        return str(market_to_market_id(market, self.api.symbol_token_id_map))
+
+    def prepare(self, quotes: Sequence[Quote], market: Optional[str] = None) -> List[Quote]:
+        normalized = normalize_price_quantities([float(q.price) for q in quotes], [float(q.quantity) for q in quotes])
+        return [Quote(q.side, price, quantity) for q, (price, quantity) in zip(quotes, normalized)]
+
+    async def open_orders(self, market: str) -> List[LiveOrder]:
+        if self.api.signer is None:
+            raise ValueError("Only read-only API is available when signer is not set")
+        rows = await self.api.get_open_orders(self.api.signer.l1_address, market) or []
+        return [o for o in map(parse_order, rows) if o is not None]
+
+    async def place(self, market: str, quotes: List[Quote], concurrency: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        results = await self.api.order_many(
+            [{"market": market, "side": q.side, "price": q.price, "quantity": q.quantity,
+              "order_type": LIMIT, "order_mode": self.order_mode} for q in quotes],
+            concurrency=concurrency)
+        return [_spot_outcome(r) for r in results]
+
+    async def modify(self, market: str, pairs: List[Tuple[Quote, LiveOrder]],
+                     concurrency: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        results = await self.api.modify_many(
+            [{"order_id": o.order_id, "new_price": q.price, "new_qty": q.quantity, "order_mode": self.order_mode}
+             for q, o in pairs],
+            concurrency=concurrency)
+        return [_spot_outcome(r) for r in results]
+
+    async def cancel(self, market: str, orders: List[LiveOrder],
+                     concurrency: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        results = await self.api.cancel_many([o.order_id for o in orders], concurrency=concurrency)
+        return [_spot_outcome(r) for r in results]
+
+
+def _spot_outcome(result: dict) -> Tuple[Optional[str], Optional[str]]:
+    if result["status"]:
+        return result["order_id"], None
+    return None, str(result["error"] or "rejected")
+
+
+class PerpVenue:
+    """Reconciles perp markets through ``AsyncPerpAgent``.
+
+    Without ``normalize`` quotes are compared and sent as given, so they must
+    already be on the market's tick and lot size (see ``AsyncPerpAgent.order``).
+    With it, quotes are rounded with the market's cached spec first and a
+    batch with a quote below ``minNotional`` raises before anything is sent.
+
+    ``order()`` and ``modify()`` return the submit's tx hash, not an order
+    id, so place / modify outcomes are ``pending``: the new order enters a
+    :class:`LiveOrders` cache with its userEvent.
+    """
+
+    returns_order_ids = False
+
+    def __init__(self, perp: "AsyncPerpAgent", tif: int = GTC, normalize: bool = False):
+        self.perp = perp
+        self.tif = tif
+        self.normalize = normalize
+
+    async def market_id(self, market: str) -> str:
+        if self.normalize:   # also makes sure prepare() finds the spec
+            return str((await self.perp.market_spec(market)).market_id)
+        return str(await self.perp._resolve_market_id(market))
+
+    def prepare(self, quotes: Sequence[Quote], market: Optional[str] = None) -> List[Quote]:
+        spec = self.perp.specs.get(market) if self.normalize and market is not None else None
+        if spec is None:
+            return [Quote(q.side, _dec(q.price), _dec(q.quantity)) for q in quotes]
+        normalized = spec.normalize_many([q.price for q in quotes], [q.quantity for q in quotes],
+                                         [q.side for q in quotes])
+        return [Quote(q.side, price, quantity) for q, (price, quantity) in zip(quotes, normalized)]
+
+    async def open_orders(self, market: str) -> List[LiveOrder]:
+        rows = await self.perp.get_open_orders(await self.market_id(market)) or []
+        return [o for o in map(parse_order, rows) if o is not None]
+
+    async def place(self, market: str, quotes: List[Quote], concurrency: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        return await _gather_calls(
+            [lambda q=q: self.perp.order(market, q.side, q.price, q.quantity, self.tif) for q in quotes], concurrency)
+
+    async def modify(self, market: str, pairs: List[Tuple[Quote, LiveOrder]],
+                     concurrency: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        return await _gather_calls(
+            [lambda q=q, o=o: self.perp.modify(market, o.order_id, q.price, q.quantity) for q, o in pairs],
+            concurrency)
+
+    async def cancel(self, market: str, orders: List[LiveOrder],
+                     concurrency: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        return await _gather_calls(
+            [lambda o=o: self.perp.cancel(market, o.order_id) for o in orders], concurrency)
+
+
+async def _gather_calls(calls: list, concurrency: int) -> List[Tuple[Optional[str], Optional[str]]]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(call: Any) -> Tuple[Optional[str], Optional[str]]:
+        async with semaphore:
+            try:
+                return await call(), None
+            except Exception as exc:
+                return None, repr(exc)
+
+    return list(await asyncio.gather(*(run(call) for call in calls)))
+
+
+class Reconciler:
+    """Drives one venue's markets towards desired quotes; see the module docstring."""
+
+    def __init__(
+        self,
+        venue: Union[SpotVenue, PerpVenue],
+        live: Optional[LiveOrders] = None,
+        quantity_tolerance: Number = 0,
+        concurrency: int = 8,
+    ):
+        """
+        Args:
+            venue: ``SpotVenue(api)`` or ``PerpVenue(agent.perp)``.
+            live: Optional userEvent-fed cache of open orders. Without one,
+                each :meth:`reconcile` fetches ``get_open_orders``.
+            quantity_tolerance: Keep a live order whose remaining quantity is
+                this close to its quote (avoids requoting after small fills).
+            concurrency: Maximum requests in flight per phase.
+        """
+        self.venue = venue
+        self.live = live
+        self.quantity_tolerance = quantity_tolerance
+        self.concurrency = concurrency
+
+    def plan(
+        self,
+        desired: Sequence[Quote],
+        live: Sequence[LiveOrder],
+        market: Optional[str] = None,
+    ) -> Tuple[List[LiveOrder], List[Action]]:
+        """The orders to keep and the actions :meth:`reconcile` would send (nothing is sent)."""
+        return diff(self.venue.prepare(desired, market), live, self.quantity_tolerance)
+
+    async def reconcile(
+        self,
+        market: str,
+        desired: Sequence[Quote],
+        live: Optional[Sequence[LiveOrder]] = None,
+    ) -> ReconcileResult:
+        """Move ``market`` to exactly ``desired``; returns what was kept and each action's outcome.
+
+        ``live`` overrides the cache / REST lookup. Failed actions are
+        reported in the result, not raised, so the next call retries them.
+        """
+        market_id = await self.venue.market_id(market)
+        if live is None:
+            live = self.live.orders(market_id) if self.live is not None else await self.venue.open_orders(market)
+        kept, actions = self.plan(desired, live, market)
+
+        outcomes: List[Outcome] = []
+        cancels = [a for a in actions if a.kind == CANCEL]
+        if cancels:
+            results = await self.venue.cancel(market, [a.order for a in cancels], self.concurrency)
+            outcomes.extend(Outcome(a, order_id, error) for a, (order_id, error) in zip(cancels, results))
+
+        modifies = [a for a in actions if a.kind == MODIFY]
+        places = [a for a in actions if a.kind == PLACE]
+        jobs = []
+        if modifies:
+            jobs.append(self.venue.modify(market, [(a.quote, a.order) for a in modifies], self.concurrency))
+        if places:
+            jobs.append(self.venue.place(market, [a.quote for a in places], self.concurrency))
+        pending = not self.venue.returns_order_ids
+        for group, results in zip([g for g in (modifies, places) if g], await asyncio.gather(*jobs)):
+            outcomes.extend(Outcome(a, order_id, error, pending) for a, (order_id, error) in zip(group, results))
+
+        if self.live is not None:
+            self._apply(market_id, outcomes)
+        for outcome in outcomes:
+            if not outcome.ok:
+                logger.warning(f"Reconcile {outcome.action.kind} on {market} failed: {outcome.error}")
+        return ReconcileResult(kept, outcomes)
+
+    def _apply(self, market_id: str, outcomes: List[Outcome]) -> None:
+        # Optimistic: reflect our own successful actions before their events arrive.
+        assert self.live is not None
+        for outcome in outcomes:
+            if not outcome.ok:
+                continue
+            action = outcome.action
+            if action.order is not None:
+                self.live.remove(action.order.order_id)
+            if action.quote is not None and outcome.order_id is not None and not outcome.pending:
+                quote = action.quote
+                self.live.add(LiveOrder(outcome.order_id, market_id, quote.side,
+                                        _dec(quote.price), _dec(quote.quantity)))
@@ -0,0 +1,309 @@
+"""Background rotation of session (L2) wallets.
+
+A session wallet registered with ``create_session`` stops being accepted at its
+expiry, and registering a replacement is an EIP-712 sign plus a POST. Doing
+that by hand means a window in which orders are signed with a wallet the
+exchange no longer accepts. The managers here register the next session
+``renew_before`` seconds ahead of expiry, swap it into the signer only once the
+exchange has accepted it (:meth:`AlphasecSigner.set_session_wallet`, a single
+attribute store, so a signature already in progress finishes with the old
+wallet, which is still valid), and delete the retired session ``grace`` seconds
+later, once anything signed with it has landed::
+
+    async with AsyncSessionManager(agent.api, lifetime=24 * 3600) as sessions:
+        ...   # trade; agent.api.signer.l2_wallet is replaced every ~23h
+
+``SessionManager`` does the same for the blocking :class:`~alphasec.api.api.API`
+from a daemon thread. Both need the signer's ``l1_wallet``, which authorizes
+every session.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+from eth_account import Account
+
+from alphasec.exceptions import AlphasecAPIError
+
+if TYPE_CHECKING:
+    from alphasec.api.api import API
+    from alphasec.api.async_api import AsyncAPI
+
+logger = logging.getLogger(__name__)
+
+
+class _Rotation:
+    """Rotation schedule shared by the async and threaded managers (no I/O)."""
+
+    def __init__(
+        self,
+        api,
+        lifetime: float,
+        renew_before: float,
+        grace: float,
+        retry_interval: float,
+        name_prefix: str,
+        wallet_factory: Callable[[], Account],
+        clock: Callable[[], float],
+    ):
+        signer = api.signer
+        if signer is None:
+            raise ValueError("Only read-only API is available when signer is not set")
+        if signer.l1_wallet is None:
+            raise ValueError("l1_wallet is required to register session wallets")
+        if not 0 < renew_before < lifetime:
+            raise ValueError("renew_before must be positive and shorter than lifetime")
+        self.api = api
+        self.signer = signer
+        self.lifetime = lifetime
+        self.renew_before = renew_before
+        self.grace = grace
+        self.retry_interval = retry_interval
+        self.name_prefix = name_prefix
+        self.wallet_factory = wallet_factory
+        self.clock = clock
+        self.expires_at: Optional[float] = None   # current session, seconds since epoch
+        self.rotate_at = 0.0
+        # (wallet, delete_at, expires_at) of sessions replaced but not yet deleted.
+        self.retired: List[Tuple[Account, float, float]] = []
+
+    def adopt(self, sessions: list) -> None:
+        # Pick up the signer's existing session wallet if the exchange knows it.
+        wallet = self.signer.l2_wallet
+        if wallet is None or not self.signer.session_enabled:
+            return
+        for session in sessions or []:
+            if str(session.get("publicKey", "")).lower() == wallet.address.lower():
+                self.expires_at = int(session["expiresAt"]) / 1000
+                self.rotate_at = self.expires_at - self.renew_before
+                return
+
+    def new_session(self) -> Tuple[str, Account, int, int]:
+        now = self.clock()
+        now_ms = int(now * 1000)
+        expiry = int((now + self.lifetime) * 1000)
+        return f"{self.name_prefix}-{now_ms}", self.wallet_factory(), expiry, now_ms
+
+    def swap(self, wallet: Account, expiry: int) -> None:
+        previous = self.signer.set_session_wallet(wallet)
+        if previous is not None and self.expires_at is not None:
+            self.retired.append((previous, self.clock() + self.grace, self.expires_at))
+        self.expires_at = expiry / 1000
+        self.rotate_at = self.expires_at - self.renew_before
+
+    def failed(self, exc: Exception) -> None:
+        now = self.clock()
+        if self.expires_at is not None and now >= self.expires_at:
+            logger.error(f"Session rotation failed and the current session has expired: {exc!r}")
+        else:
+            logger.warning(f"Session rotation failed, retrying in {self.retry_interval}s: {exc!r}")
+        self.rotate_at = now + self.retry_interval
+
+    def due_retired(self) -> List[Tuple[Account, float, float]]:
+        now = self.clock()
+        due = [entry for entry in self.retired if entry[1] <= now]
+        self.retired = [entry for entry in self.retired if entry[1] > now]
+        return due
+
+    def deleted(self, entry: Tuple[Account, float, float], result: Optional[dict]) -> None:
+        if result is not None and result["status"]:
+            return
+        wallet, _, expires_at = entry
+        if self.clock() < expires_at:   # retry until it expires on its own
+            self.retired.append((wallet, self.clock() + self.retry_interval, expires_at))
+        else:
+            logger.warning(f"Dropping expired session {wallet.address} that could not be deleted")
+
+    def wake_at(self) -> float:
+        return min([self.rotate_at] + [delete_at for _, delete_at, _ in self.retired])
+
+
+def _created(result: dict) -> None:
+    if not result["status"]:
+        raise AlphasecAPIError(f"create_session failed: {result['error']}")
+
+
+class AsyncSessionManager:
+    """Keeps ``api.signer`` on a valid session wallet from an asyncio task.
+
+    Args:
+        api: ``AsyncAPI`` whose signer is rotated; its ``l1_wallet`` authorizes each session.
+        lifetime: Seconds each new session is registered for.
+        renew_before: Register the next session this many seconds before the current one expires.
+        grace: Seconds a replaced session stays registered before it is deleted.
+        retry_interval: Seconds between attempts after a failed register or delete.
+        name_prefix: Session names are ``"<prefix>-<ms timestamp>"``.
+        wallet_factory: Creates each new session wallet.
+    """
+
+    def __init__(
+        self,
+        api: "AsyncAPI",
+        lifetime: float = 24 * 3600,
+        renew_before: float = 3600,
+        grace: float = 60,
+        retry_interval: float = 5.0,
+        name_prefix: str = "alphasec-py",
+        wallet_factory: Callable[[], Account] = Account.create,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._rotation = _Rotation(api, lifetime, renew_before, grace, retry_interval,
+                                   name_prefix, wallet_factory, clock)
+        self.api = api
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def wallet(self) -> Optional[Account]:
+        return self.api.signer.l2_wallet
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """Expiry of the current session (seconds since epoch); None before start()."""
+        return self._rotation.expires_at
+
+    async def start(self) -> None:
+        """Adopt the signer's session (or register one now) and start rotating in the background."""
+        if self._task is not None:
+            return
+        rotation = self._rotation
+        rotation.adopt(await self.api.get_sessions(rotation.signer.l1_address))
+        if rotation.expires_at is None or rotation.clock() >= rotation.rotate_at:
+            await self.rotate()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def rotate(self) -> None:
+        """Register a new session wallet and switch the signer to it once accepted."""
+        async with self._lock:
+            name, wallet, expiry, nonce = self._rotation.new_session()
+            _created(await self.api.create_session(name, wallet, expiry, nonce))
+            self._rotation.swap(wallet, expiry)
+            logger.info(f"Session rotated to {wallet.address} ({name})")
+
+    async def cleanup(self) -> None:
+        """Delete the replaced sessions whose grace period has passed."""
+        rotation = self._rotation
+        for entry in rotation.due_retired():
+            try:
+                result = await self.api.delete_session(entry[0])
+            except Exception as exc:
+                logger.warning(f"Deleting session {entry[0].address} failed: {exc!r}")
+                result = None
+            rotation.deleted(entry, result)
+
+    async def _run(self) -> None:
+        rotation = self._rotation
+        while True:
+            await asyncio.sleep(max(0.0, rotation.wake_at() - rotation.clock()))
+            if rotation.clock() >= rotation.rotate_at:
+                try:
+                    await self.rotate()
+                except Exception as exc:
+                    rotation.failed(exc)
+            await self.cleanup()
+
+    async def __aenter__(self) -> "AsyncSessionManager":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+
+class SessionManager:
+    """Blocking counterpart of :class:`AsyncSessionManager` for :class:`~alphasec.api.api.API`.
+
+    Rotation runs in a daemon thread; arguments are the same.
+    """
+
+    def __init__(
+        self,
+        api: "API",
+        lifetime: float = 24 * 3600,
+        renew_before: float = 3600,
+        grace: float = 60,
+        retry_interval: float = 5.0,
+        name_prefix: str = "alphasec-py",
+        wallet_factory: Callable[[], Account] = Account.create,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._rotation = _Rotation(api, lifetime, renew_before, grace, retry_interval,
+                                   name_prefix, wallet_factory, clock)
+        self.api = api
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def wallet(self) -> Optional[Account]:
+        return self.api.signer.l2_wallet
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """Expiry of the current session (seconds since epoch); None before start()."""
+        return self._rotation.expires_at
+
+    def start(self) -> None:
+        """Adopt the signer's session (or register one now) and start rotating in the background."""
+        if self._thread is not None:
+            return
+        rotation = self._rotation
+        rotation.adopt(self.api.get_sessions(rotation.signer.l1_address))
+        if rotation.expires_at is None or rotation.clock() >= rotation.rotate_at:
+            self.rotate()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alphasec-session-rotation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def rotate(self) -> None:
+        """Register a new session wallet and switch the signer to it once accepted."""
+        with self._lock:
+            name, wallet, expiry, nonce = self._rotation.new_session()
+            _created(self.api.create_session(name, wallet, expiry, nonce))
+            self._rotation.swap(wallet, expiry)
+            logger.info(f"Session rotated to {wallet.address} ({name})")
+
+    def cleanup(self) -> None:
+        """Delete the replaced sessions whose grace period has passed."""
+        rotation = self._rotation
+        for entry in rotation.due_retired():
+            try:
+                result = self.api.delete_session(entry[0])
+            except Exception as exc:
+                logger.warning(f"Deleting session {entry[0].address} failed: {exc!r}")
+                result = None
+            rotation.deleted(entry, result)
+
+    def _run(self) -> None:
+        rotation = self._rotation
+        while not self._stop.wait(max(0.0, rotation.wake_at() - rotation.clock())):
+            if rotation.clock() >= rotation.rotate_at:
+                try:
+                    self.rotate()
+                except Exception as exc:
+                    rotation.failed(exc)
+            self.cleanup()
+
+    def __enter__(self) -> "SessionManager":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
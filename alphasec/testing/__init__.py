@@ -0,0 +1,19 @@
+"""Offline test and benchmark support: a fake AlphaSec exchange.
+
+Not imported by ``alphasec`` itself; import it explicitly::
+
+    from alphasec.testing import FakeExchange
+
+The EVM JSON-RPC stand-in for the bridge helpers imports web3, so it lives in
+its own module: ``from alphasec.testing.chain import FakeChain``.
+"""
+from .engine import MatchingEngine
+from .server import FakeExchange
+from .tx import DecodedTx, decode_tx
+
+__all__ = [
+    "DecodedTx",
+    "FakeExchange",
+    "MatchingEngine",
+    "decode_tx",
+]
@@ -0,0 +1,35 @@
+"""Run the fake exchange: ``python -m alphasec.testing --port 8080 --latency 0.002``."""
+import argparse
+import asyncio
+
+from alphasec.api.endpoints import ws_url_for
+from alphasec.testing.server import FakeExchange
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m alphasec.testing", description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="REST response delay in seconds")
+    parser.add_argument("--rate", type=float, help="shared request budget per second (HTTP 429 above it)")
+    parser.add_argument("--burst", type=float, help="burst for --rate (default: --rate)")
+    parser.add_argument("--chain-id", type=int, help="reject transactions for other chains")
+    args = parser.parse_args()
+
+    rate_limits = {"all": (args.rate, args.burst or args.rate)} if args.rate else None
+    exchange = FakeExchange(args.host, args.port, latency=args.latency, rate_limits=rate_limits,
+                            chain_id=args.chain_id)
+
+    async def serve() -> None:
+        await exchange.start()
+        print(f"fake exchange listening on {exchange.url} (WebSocket: {ws_url_for(exchange.url)})", flush=True)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""In-memory EVM JSON-RPC stand-in for the L1/L2 helpers in :mod:`alphasec.bridge`.
+
+:class:`FakeChain` is an ``AsyncWeb3`` provider, not a node: it answers the
+RPCs the bridge helpers use from state the test sets up, and records what
+was sent::
+
+    chain = FakeChain()
+    chain.on_call(token, ERC20_ABI, "allowance", lambda block, owner, spender: 0)
+    chain.add_log(system, L2_SYSTEM_ABI, "L2ToL1Tx", block=120, caller=..., destination=..., ...)
+    w3 = AsyncWeb3(chain)
+
+Contract reads (``eth_call``) are dispatched by address and function selector
+to a handler called with the block identifier and the decoded arguments; its
+return value is ABI-encoded. ``eth_getLogs`` filters the added logs by
+address, block range and topics. ``eth_sendRawTransaction`` decodes legacy
+transactions into :attr:`FakeChain.sent` and advances the sender's nonce;
+every sent transaction gets a successful receipt. Batches are served like
+single requests and recorded in :attr:`FakeChain.batches`.
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+import rlp
+from eth_abi import decode as abi_decode
+from eth_abi import encode as abi_encode
+from eth_account import Account
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector, keccak, to_checksum_address
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+
+class SentTx(NamedTuple):
+    sender: str
+    nonce: int
+    to: str
+    value: int
+    data: bytes
+    hash: str
+
+
+def _types(params: List[dict]) -> List[str]:
+    # Tuples do not occur in the bridge ABIs; plain types are enough here.
+    return [param["type"] for param in params]
+
+
+def _hex(value: int) -> str:
+    return hex(value)
+
+
+def _block(value: Any, latest: int) -> int:
+    if value in (None, "latest", "pending", "safe", "finalized"):
+        return latest
+    if value == "earliest":
+        return 0
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+class FakeChain(AsyncJSONBaseProvider):
+    """Scriptable EVM JSON-RPC provider; see the module docstring."""
+
+    def __init__(self, chain_id: int = 1001, gas_price: int = 25 * 10**9, block_number: int = 1):
+        super().__init__()
+        self.chain_id = chain_id
+        self.gas_price = gas_price
+        self.block_number = block_number
+        self.nonces: Dict[str, int] = {}           # lowercase address -> next nonce
+        self.sent: List[SentTx] = []
+        self.reject_nonces: Set[int] = set()       # eth_sendRawTransaction fails for these
+        self.failed_txs: Set[str] = set()          # receipts for these hashes have status 0
+        self.requests: List[str] = []              # methods of single (non-batch) requests
+        self.batches: List[List[str]] = []         # methods of each batch request
+        self._calls: Dict[Tuple[str, bytes], Tuple[dict, Callable[..., Any]]] = {}
+        self._logs: List[dict] = []
+
+    # -----------------------------------------------------------------------
+    # Scripting
+    # -----------------------------------------------------------------------
+
+    def on_call(self, address: str, abi: List[dict], name: str, handler: Callable[..., Any]) -> None:
+        """Answer ``eth_call`` to ``name`` on ``address`` with ``handler(block, *args)``."""
+        fn = next(item for item in abi if item.get("type") == "function" and item.get("name") == name)
+        self._calls[(address.lower(), function_abi_to_4byte_selector(fn))] = (fn, handler)
+
+    def add_log(self, address: str, abi: List[dict], name: str, block: int, **args: Any) -> None:
+        """Emit event ``name`` from ``address`` in ``block`` (raises the chain head if needed)."""
+        event = next(item for item in abi if item.get("type") == "event" and item.get("name") == name)
+        indexed = [param for param in event["inputs"] if param.get("indexed")]
+        data = [param for param in event["inputs"] if not param.get("indexed")]
+        topics = ["0x" + event_abi_to_log_topic(event).hex()]
+        topics += ["0x" + abi_encode([param["type"]], [args[param["name"]]]).hex() for param in indexed]
+        index = len(self._logs)
+        self._logs.append({
+            "address": to_checksum_address(address),
+            "topics": topics,
+            "data": "0x" + abi_encode(_types(data), [args[param["name"]] for param in data]).hex(),
+            "blockNumber": _hex(block),
+            "blockHash": "0x" + keccak(block.to_bytes(32, "big")).hex(),
+            "transactionHash": "0x" + keccak(b"log" + index.to_bytes(32, "big")).hex(),
+            "transactionIndex": "0x0",
+            "logIndex": _hex(index),
+            "removed": False,
+        })
+        self.block_number = max(self.block_number, block)
+
+    # -----------------------------------------------------------------------
+    # Provider interface
+    # -----------------------------------------------------------------------
+
+    async def make_request(self, method: str, params: Any) -> dict:
+        self.requests.append(method)
+        return self._answer(1, method, params)
+
+    async def make_batch_request(self, requests: List[Tuple[str, Any]]) -> List[dict]:
+        self.batches.append([method for method, _ in requests])
+        return [self._answer(id, method, params) for id, (method, params) in enumerate(requests)]
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+    def _answer(self, id: int, method: str, params: Any) -> dict:
+        handler = getattr(self, "_rpc_" + method, None)
+        if handler is None:
+            return {"jsonrpc": "2.0", "id": id, "error": {"code": -32601, "message": f"method {method} not found"}}
+        try:
+            return {"jsonrpc": "2.0", "id": id, "result": handler(*params)}
+        except ValueError as exc:
+            return {"jsonrpc": "2.0", "id": id, "error": {"code": -32000, "message": str(exc)}}
+
+    # -----------------------------------------------------------------------
+    # RPC methods
+    # -----------------------------------------------------------------------
+
+    def _rpc_eth_chainId(self) -> str:
+        return _hex(self.chain_id)
+
+    def _rpc_eth_gasPrice(self) -> str:
+        return _hex(self.gas_price)
+
+    def _rpc_eth_blockNumber(self) -> str:
+        return _hex(self.block_number)
+
+    def _rpc_eth_getTransactionCount(self, address: str, block: Any = "latest") -> str:
+        return _hex(self.nonces.get(address.lower(), 0))
+
+    def _rpc_eth_call(self, call: dict, block: Any = "latest") -> str:
+        data = bytes.fromhex(call["data"][2:])
+        entry = self._calls.get((call["to"].lower(), data[:4]))
+        if entry is None:
+            raise ValueError(f"execution reverted: no handler for 0x{data[:4].hex()} on {call['to']}")
+        fn, handler = entry
+        result = handler(_block(block, self.block_number), *abi_decode(_types(fn["inputs"]), data[4:]))
+        outputs = _types(fn["outputs"])
+        if len(outputs) == 1:
+            result = (result,)
+        return "0x" + abi_encode(outputs, list(result)).hex()
+
+    def _rpc_eth_getLogs(self, query: dict) -> List[dict]:
+        start = _block(query.get("fromBlock"), self.block_number)
+        end = _block(query.get("toBlock"), self.block_number)
+        addresses = query.get("address")
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {a.lower() for a in addresses} if addresses else None
+        topics: List[Union[None, str, List[str]]] = query.get("topics") or []
+        matched = []
+        for log in self._logs:
+            if not start <= int(log["blockNumber"], 16) <= end:
+                continue
+            if addresses is not None and log["address"].lower() not in addresses:
+                continue
+            if all(_topic_matches(want, log["topics"][i] if i < len(log["topics"]) else None)
+                   for i, want in enumerate(topics)):
+                matched.append(log)
+        return matched
+
+    def _rpc_eth_sendRawTransaction(self, raw_hex: str) -> str:
+        raw = bytes.fromhex(raw_hex[2:])
+        fields = rlp.decode(raw)
+        nonce = int.from_bytes(fields[0], "big")
+        if nonce in self.reject_nonces:
+            raise ValueError("transaction underpriced")
+        sender = Account.recover_transaction(raw)
+        tx_hash = "0x" + keccak(raw).hex()
+        to = to_checksum_address(fields[3]) if fields[3] else ""
+        self.sent.append(SentTx(sender, nonce, to, int.from_bytes(fields[4], "big"), bytes(fields[5]), tx_hash))
+        key = sender.lower()
+        self.nonces[key] = max(self.nonces.get(key, 0), nonce + 1)
+        return tx_hash
+
+    def _rpc_eth_getTransactionReceipt(self, tx_hash: str) -> Optional[dict]:
+        if not any(tx.hash == tx_hash for tx in self.sent):
+            return None
+        return {
+            "transactionHash": tx_hash,
+            "status": "0x0" if tx_hash in self.failed_txs else "0x1",
+            "blockNumber": _hex(self.block_number),
+        }
+
+
+def _topic_matches(want: Union[None, str, List[str]], topic: Optional[str]) -> bool:
+    if want is None:
+        return True
+    if topic is None:
+        return False
+    options = want if isinstance(want, list) else [want]
+    return topic.lower() in {option.lower() for option in options}
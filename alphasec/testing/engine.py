@@ -0,0 +1,268 @@
+"""Price-time priority matching engine for the fake exchange.
+
+Deliberately small: one book per market id, ``Decimal`` prices and
+quantities, no balances, margin or fees. Spot and perp books share the
+engine; spot markets are keyed ``"<base>_<quote>"`` and perp markets by their
+numeric id as a string. The engine is pure (no I/O); the server turns the
+returned orders and trades into REST payloads and WebSocket events.
+"""
+import bisect
+import itertools
+from collections import deque
+from decimal import Decimal
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+BUY = 0
+SELL = 1
+
+# Time in force (perp wire values; spot MARKET orders map to TIF_MARKET).
+GTC = 0
+IOC = 1
+POST = 2
+TIF_MARKET = 3
+
+NEW = "NEW"
+PARTIALLY_FILLED = "PARTIALLY_FILLED"
+FILLED = "FILLED"
+CANCELED = "CANCELED"
+REJECTED = "REJECTED"
+
+_ZERO = Decimal(0)
+
+
+class Order:
+    __slots__ = ("order_id", "tx_hash", "owner", "market_id", "side", "price", "quantity", "quote_quantity",
+                 "remaining", "executed_qty", "executed_quote", "tif", "status", "created_at")
+
+    def __init__(self, order_id: str, owner: str, market_id: str, side: int, price: Decimal,
+                 quantity: Decimal, tif: int, created_at: int, quote_quantity: Decimal = _ZERO):
+        self.order_id = order_id
+        self.tx_hash = order_id   # the submitting transaction; set by the server when ids differ
+        self.owner = owner
+        self.market_id = market_id
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.quote_quantity = quote_quantity   # quote-mode market buys: spend this much quote
+        self.remaining = quantity
+        self.executed_qty = _ZERO
+        self.executed_quote = _ZERO
+        self.tif = tif
+        self.status = NEW
+        self.created_at = created_at
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in (NEW, PARTIALLY_FILLED)
+
+
+class Trade:
+    __slots__ = ("trade_id", "market_id", "price", "quantity", "taker", "maker", "time")
+
+    def __init__(self, trade_id: str, market_id: str, price: Decimal, quantity: Decimal,
+                 taker: Order, maker: Order, time: int):
+        self.trade_id = trade_id
+        self.market_id = market_id
+        self.price = price
+        self.quantity = quantity
+        self.taker = taker
+        self.maker = maker
+        self.time = time
+
+
+class OrderBook:
+    """Resting orders of one market: FIFO queues per price level."""
+
+    def __init__(self):
+        self.levels: Tuple[Dict[Decimal, Deque[Order]], Dict[Decimal, Deque[Order]]] = ({}, {})
+        # Ascending prices per side; the best bid is the last element.
+        self.prices: Tuple[List[Decimal], List[Decimal]] = ([], [])
+
+    def best(self, side: int) -> Optional[Decimal]:
+        prices = self.prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == BUY else prices[0]
+
+    def add(self, order: Order) -> None:
+        levels = self.levels[order.side]
+        queue = levels.get(order.price)
+        if queue is None:
+            queue = levels[order.price] = deque()
+            bisect.insort(self.prices[order.side], order.price)
+        queue.append(order)
+
+    def remove(self, order: Order) -> None:
+        levels = self.levels[order.side]
+        queue = levels.get(order.price)
+        if queue is None:
+            return
+        try:
+            queue.remove(order)
+        except ValueError:
+            return
+        if not queue:
+            self._drop_level(order.side, order.price)
+
+    def _drop_level(self, side: int, price: Decimal) -> None:
+        del self.levels[side][price]
+        prices = self.prices[side]
+        del prices[bisect.bisect_left(prices, price)]
+
+    def depth(self, side: int, limit: int) -> List[List[str]]:
+        prices = self.prices[side]
+        ordered = reversed(prices) if side == BUY else iter(prices)
+        out = []
+        for price in itertools.islice(ordered, limit):
+            total = sum((o.remaining for o in self.levels[side][price]), _ZERO)
+            out.append([str(price), str(total)])
+        return out
+
+
+class MarketStats:
+    __slots__ = ("open", "high", "low", "last", "volume", "quote_volume")
+
+    def __init__(self):
+        self.open: Optional[Decimal] = None
+        self.high: Optional[Decimal] = None
+        self.low: Optional[Decimal] = None
+        self.last: Optional[Decimal] = None
+        self.volume = _ZERO
+        self.quote_volume = _ZERO
+
+    def record(self, price: Decimal, quantity: Decimal) -> None:
+        if self.open is None:
+            self.open = self.high = self.low = price
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.last = price
+        self.volume += quantity
+        self.quote_volume += price * quantity
+
+
+class MatchingEngine:
+    """Books for every market plus the order index.
+
+    Args:
+        clock_ms: Millisecond wall clock used for order and trade timestamps.
+        trade_history: Recent trades kept per market.
+    """
+
+    def __init__(self, clock_ms: Callable[[], int], trade_history: int = 1000):
+        self._clock_ms = clock_ms
+        self._trade_history = trade_history
+        self.books: Dict[str, OrderBook] = {}
+        self.orders: Dict[str, Order] = {}
+        self._resting: Dict[str, Order] = {}
+        self.trades: Dict[str, Deque[Trade]] = {}
+        self.stats: Dict[str, MarketStats] = {}
+        self._trade_ids = itertools.count(1)
+        self.sequence = 0   # bumps on every book change (depth firstId/finalId)
+
+    def book(self, market_id: str) -> OrderBook:
+        book = self.books.get(market_id)
+        if book is None:
+            book = self.books[market_id] = OrderBook()
+            self.trades[market_id] = deque(maxlen=self._trade_history)
+            self.stats[market_id] = MarketStats()
+        return book
+
+    def place(self, order_id: str, owner: str, market_id: str, side: int, price: Decimal,
+              quantity: Decimal, tif: int = GTC, quote_quantity: Decimal = _ZERO) -> Tuple[Order, List[Trade]]:
+        """Match a new order, rest any GTC remainder, and return it with its fills."""
+        book = self.book(market_id)
+        order = Order(order_id, owner, market_id, side, price, quantity, tif, self._clock_ms(), quote_quantity)
+        self.orders[order_id] = order
+        if tif == POST and self._crosses(book, order):
+            order.status = REJECTED
+            return order, []
+        trades = self._match(book, order)
+        if _done(order):
+            order.status = FILLED
+        elif tif == GTC:
+            book.add(order)
+            self._resting[order_id] = order
+            self.sequence += 1
+        else:
+            order.status = CANCELED   # IOC / market remainder is cancelled
+        return order, trades
+
+    def cancel(self, order_id: str, owner: Optional[str] = None) -> Optional[Order]:
+        order = self.orders.get(order_id)
+        if order is None or not order.is_open or (owner is not None and order.owner != owner):
+            return None
+        self.books[order.market_id].remove(order)
+        self._resting.pop(order_id, None)
+        order.status = CANCELED
+        self.sequence += 1
+        return order
+
+    def cancel_all(self, owner: str, market_id: Optional[str] = None) -> List[Order]:
+        return [o for o in self.open_orders(owner, market_id) if self.cancel(o.order_id)]
+
+    def modify(self, order_id: str, new_order_id: str, owner: str, new_price: Optional[Decimal],
+               new_quantity: Optional[Decimal]) -> Tuple[Optional[Order], Optional[Order], List[Trade]]:
+        """Cancel-and-replace; returns (cancelled, replacement, fills)."""
+        old = self.cancel(order_id, owner)
+        if old is None:
+            return None, None, []
+        price = old.price if new_price is None else new_price
+        quantity = old.remaining if new_quantity is None else new_quantity
+        new, trades = self.place(new_order_id, owner, old.market_id, old.side, price, quantity, old.tif)
+        return old, new, trades
+
+    def open_orders(self, owner: Optional[str] = None, market_id: Optional[str] = None) -> List[Order]:
+        return [o for o in self._resting.values()
+                if o.is_open and (owner is None or o.owner == owner)
+                and (market_id is None or o.market_id == market_id)]
+
+    def depth(self, market_id: str, limit: int = 100) -> Dict[str, List[List[str]]]:
+        book = self.book(market_id)
+        return {"bids": book.depth(BUY, limit), "asks": book.depth(SELL, limit)}
+
+    @staticmethod
+    def _crosses(book: OrderBook, order: Order) -> bool:
+        best = book.best(SELL if order.side == BUY else BUY)
+        if best is None:
+            return False
+        return order.price >= best if order.side == BUY else order.price <= best
+
+    def _match(self, book: OrderBook, taker: Order) -> List[Trade]:
+        trades: List[Trade] = []
+        opposite = SELL if taker.side == BUY else BUY
+        unlimited = taker.tif == TIF_MARKET
+        while not _done(taker):
+            price = book.best(opposite)
+            if price is None:
+                break
+            if not unlimited and (price > taker.price if taker.side == BUY else price < taker.price):
+                break
+            queue = book.levels[opposite][price]
+            maker = queue[0]
+            if taker.quote_quantity > 0:
+                quantity = min(maker.remaining, (taker.quote_quantity - taker.executed_quote) / price)
+            else:
+                quantity = min(maker.remaining, taker.remaining)
+            trade = Trade(str(next(self._trade_ids)), taker.market_id, price, quantity, taker, maker,
+                          self._clock_ms())
+            for order in (taker, maker):
+                order.remaining = max(_ZERO, order.remaining - quantity)
+                order.executed_qty += quantity
+                order.executed_quote += price * quantity
+                order.status = FILLED if _done(order) else PARTIALLY_FILLED
+            if _done(maker):
+                queue.popleft()
+                self._resting.pop(maker.order_id, None)
+                if not queue:
+                    book._drop_level(opposite, price)
+            self.trades[taker.market_id].append(trade)
+            self.stats[taker.market_id].record(price, quantity)
+            trades.append(trade)
+            self.sequence += 1
+        return trades
+
+
+def _done(order: Order) -> bool:
+    if order.quote_quantity > 0:
+        return order.executed_quote >= order.quote_quantity
+    return order.remaining <= 0
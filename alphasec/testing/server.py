@@ -0,0 +1,824 @@
+"""In-process fake AlphaSec exchange for offline end-to-end tests and benchmarks.
+
+:class:`FakeExchange` serves the REST routes used by ``API`` / ``AsyncAPI`` /
+``PerpAgent`` (``/api/v1/...``, ``/fapi/v1/...``) and the ``/ws`` JSON-RPC
+subscribe/ping protocol on one port, on a plain asyncio server (HTTP/1.1
+keep-alive and a minimal RFC 6455 WebSocket; no extra dependencies).
+
+Signed transactions are decoded and run through a price-time matching engine
+(:mod:`alphasec.testing.engine`); fills and book changes are published on the
+spot (``trade@``, ``depth@``, ``ticker@``, ``userEvent@``) and perp
+(``perp_aggTrade@``, ``perp_aggDepth@``, ``perp_ticker@``) channels. There
+are no balances, margin, fees or stop-order triggers. Re-submitting an
+identical raw transaction is rejected as already known, like the real node.
+
+Knobs for benchmarks: ``latency`` (seconds, or a callable returning seconds)
+delays every REST response; ``rate_limits`` rejects requests over budget with
+HTTP 429; :meth:`FakeExchange.fail_next` injects gateway errors and
+:meth:`FakeExchange.drop_connections` severs every WebSocket to exercise
+reconnects.
+
+Example:
+    >>> with FakeExchange(latency=0.002) as exchange:   # runs in a thread
+    ...     agent = Agent(exchange.url, signer=signer)
+    ...     agent.api.order("KAIA/USDT", BUY, 1.5, 10, LIMIT, BASE_MODE)
+
+or ``await exchange.start()`` inside a running loop, or
+``python -m alphasec.testing --port 8080``.
+"""
+import asyncio
+import base64
+import concurrent.futures
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from alphasec.api.ratelimit import TokenBucket, classify
+from alphasec.testing.engine import (
+    BUY,
+    CANCELED,
+    GTC,
+    NEW,
+    REJECTED,
+    SELL,
+    TIF_MARKET,
+    MatchingEngine,
+    Order,
+    Trade,
+)
+from alphasec.testing.tx import DecodedTx, decode_tx
+from alphasec.transaction import constants as cmd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKENS = (
+    {"tokenId": "1", "l2Symbol": "KAIA", "l1Address": "0x" + "00" * 20, "l1Decimal": 18},
+    {"tokenId": "2", "l2Symbol": "USDT", "l1Address": "0x" + "22" * 20, "l1Decimal": 6},
+    {"tokenId": "3", "l2Symbol": "BTC", "l1Address": "0x" + "33" * 20, "l1Decimal": 8},
+)
+DEFAULT_SPOT_MARKETS = (("KAIA", "USDT"), ("BTC", "USDT"))
+DEFAULT_PERP_MARKETS = (
+    {"marketId": 1, "symbol": "BTCUSDT", "tickSize": "0.1", "lotSize": "0.001", "minNotional": "5"},
+    {"marketId": 2, "symbol": "ETHUSDT", "tickSize": "0.01", "lotSize": "0.01", "minNotional": "5"},
+)
+# Levels published on depth channels.
+DEPTH_LEVELS = 20
+# Owner of liquidity added with seed_book().
+SEED_OWNER = "0x" + "5e" * 20
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_OP_CONT, _OP_TEXT, _OP_BINARY, _OP_CLOSE, _OP_PING, _OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+            502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class _Reject(Exception):
+    """A request the exchange refuses: ``{"code": code, "errMsg": ...}`` with HTTP ``status``."""
+
+    def __init__(self, message: str, code: int = 400, status: int = 200):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+class _WsConnection:
+    __slots__ = ("writer", "channels")
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        # lower-cased channel -> channel as the client subscribed it
+        self.channels: Dict[str, str] = {}
+
+    def send(self, message: dict) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(_ws_frame(_OP_TEXT, json.dumps(message, separators=(",", ":")).encode()))
+
+
+class FakeExchange:
+    """Offline stand-in for the AlphaSec gateway (REST + WebSocket).
+
+    Args:
+        host / port: Listen address; ``port=0`` picks a free port (see :attr:`url`).
+        tokens: Token metadata served on ``/api/v1/market/tokens``.
+        spot_markets: ``(base_symbol, quote_symbol)`` pairs.
+        perp_markets: Perp market dicts (``marketId``, ``symbol``, ``tickSize``, ...).
+        latency: Delay before every REST response, in seconds, or a callable
+            returning one (e.g. ``lambda: random.expovariate(1 / 0.003)``).
+        rate_limits: ``{group: (rate, burst)}`` token buckets; groups are the
+            client limiter's (``"order"``, ``"cancel"``, ``"query"``) plus
+            ``"all"`` for a shared budget. Over-budget requests get HTTP 429.
+        chain_id: If set, transactions for another chain are rejected.
+        recover_senders: Recover each transaction's signer (slow without a
+            native secp256k1 backend; the ``l1owner`` in the payload is used
+            for ownership either way).
+        perp_order_ids: Maps a perp submit's tx hash to the id of the order
+            it creates. By default the id is the tx hash itself; the real
+            exchange assigns its own, so set this to catch code that mixes
+            the two up (``/fapi/v1/order/list`` resolves a tx hash to its orders).
+
+    Attributes:
+        spot / perp: The :class:`MatchingEngine` of each product.
+        stats: Counters (``requests``, ``rate_limited``, ``orders``,
+            ``trades``, ``events``, ``ws_connections``, ...).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tokens: Sequence[dict] = DEFAULT_TOKENS,
+        spot_markets: Sequence[Tuple[str, str]] = DEFAULT_SPOT_MARKETS,
+        perp_markets: Sequence[dict] = DEFAULT_PERP_MARKETS,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        rate_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        chain_id: Optional[int] = None,
+        recover_senders: bool = False,
+        perp_order_ids: Optional[Callable[[str], str]] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.tokens = [dict(t) for t in tokens]
+        self._symbol_token_id = {t["l2Symbol"]: t["tokenId"] for t in self.tokens}
+        self.spot_markets = [
+            {
+                "marketId": f"{self._symbol_token_id[base]}_{self._symbol_token_id[quote]}",
+                "baseTokenId": self._symbol_token_id[base],
+                "quoteTokenId": self._symbol_token_id[quote],
+                "symbol": f"{base}/{quote}",
+            }
+            for base, quote in spot_markets
+        ]
+        self.perp_markets = [dict(m) for m in perp_markets]
+        self._latency = latency if callable(latency) else (lambda: latency)
+        self._buckets = {group: TokenBucket(rate, burst) for group, (rate, burst) in (rate_limits or {}).items()}
+        self.chain_id = chain_id
+        self.recover_senders = recover_senders
+        self._perp_order_id = perp_order_ids or (lambda tx_hash: tx_hash)
+        self.spot = MatchingEngine(_now_ms)
+        self.perp = MatchingEngine(_now_ms)
+        self.stats: Counter = Counter()
+        self._seen_txs: Set[str] = set()
+        self._sessions: Dict[str, List[dict]] = {}
+        self._leverage: Dict[Tuple[str, int], int] = {}
+        self._failures: List[int] = []
+        self._ws: Set[_WsConnection] = set()
+        self._subscribers: Counter = Counter()   # lower-cased channel -> subscriber count
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set["asyncio.Task"] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._get_routes: Dict[str, Callable[[Dict[str, str]], Any]] = {
+            "/api/v1/market": lambda q: self.spot_markets,
+            "/api/v1/market/tokens": lambda q: self.tokens,
+            "/api/v1/market/ticker": lambda q: self._tickers(self.spot, self._spot_ids(q)),
+            "/api/v1/market/depth": lambda q: self._depth(self.spot, q["marketId"], q),
+            "/api/v1/market/trades": lambda q: self._trades(self.spot, q["marketId"], q),
+            "/api/v1/wallet/balance": lambda q: [],
+            "/api/v1/wallet/session": lambda q: self._sessions.get(_owner(q), []),
+            "/api/v1/wallet/transfer": lambda q: [],
+            "/api/v1/order/open": lambda q: self._orders(self.spot, q, open_only=True),
+            "/api/v1/order/": lambda q: self._orders(self.spot, q, open_only=False),
+            "/fapi/v1/market": lambda q: {"symbols": self.perp_markets},
+            "/fapi/v1/market/ticker": lambda q: self._tickers(self.perp, self._perp_ids(q)),
+            "/fapi/v1/market/depth": lambda q: self._depth(self.perp, q["marketId"], q),
+            "/fapi/v1/market/trades": lambda q: self._trades(self.perp, q["marketId"], q),
+            "/fapi/v1/market/candles": lambda q: [],
+            "/fapi/v1/order/open": lambda q: self._orders(self.perp, q, open_only=True),
+            "/fapi/v1/order": lambda q: self._orders(self.perp, q, open_only=False),
+            "/fapi/v1/order/list": lambda q: [self._order_json(o) for o in self.perp.orders.values()
+                                              if o.tx_hash == q.get("txHash")],
+            "/fapi/v1/order/trade": lambda q: [],
+            "/fapi/v1/position": lambda q: {"positions": []},
+            "/fapi/v1/position/history": lambda q: [],
+            "/fapi/v1/position/settings": lambda q: [
+                {"marketId": m, "leverage": lev} for (o, m), lev in self._leverage.items() if o == _owner(q)],
+            "/fapi/v1/wallet/account": lambda q: {"address": _owner(q)},
+            "/fapi/v1/wallet/funding": lambda q: [],
+        }
+        # path -> {command byte: handler}; withdraw is an L2 contract call, not a DEX command.
+        self._post_routes: Dict[str, Dict[Optional[int], Callable[[DecodedTx], Any]]] = {
+            "/api/v1/order": {cmd.DexCommandOrder: self._spot_order},
+            "/api/v1/order/cancel": {cmd.DexCommandCancel: self._spot_cancel},
+            "/api/v1/order/cancel/all": {cmd.DexCommandCancelAll: self._spot_cancel_all},
+            "/api/v1/order/modify": {cmd.DexCommandModify: self._spot_modify},
+            "/api/v1/order/trigger": {cmd.DexCommandStopOrder: self._ack},
+            "/api/v1/wallet/session": {cmd.DexCommandSession: self._session},
+            "/api/v1/wallet/session/update": {cmd.DexCommandSession: self._session},
+            "/api/v1/wallet/session/delete": {cmd.DexCommandSession: self._session},
+            "/api/v1/wallet/transfer": {cmd.DexCommandTransfer: self._ack, cmd.DexCommandTokenTransfer: self._ack},
+            "/api/v1/wallet/withdraw": {None: self._ack},
+            "/fapi/v1/order": {cmd.DexCommandPerpOrder: self._perp_order},
+            "/fapi/v1/order/cancel": {cmd.DexCommandPerpCancel: self._perp_cancel},
+            "/fapi/v1/order/cancel/all": {cmd.DexCommandPerpCancelAll: self._perp_cancel_all},
+            "/fapi/v1/order/modify": {cmd.DexCommandPerpModify: self._perp_modify},
+            "/fapi/v1/position/leverage": {cmd.DexCommandPerpSetLeverage: self._perp_leverage},
+            "/fapi/v1/wallet/deposit": {cmd.DexCommandPerpDeposit: self._ack},
+            "/fapi/v1/wallet/withdraw": {cmd.DexCommandPerpWithdraw: self._ack},
+        }
+
+    @property
+    def url(self) -> str:
+        """Base URL for ``API`` / ``Agent`` (the WebSocket is ``url + "/ws"``)."""
+        return f"http://{self.host}:{self.port}"
+
+    # -----------------------------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------------------------
+
+    async def start(self) -> "FakeExchange":
+        """Start listening on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        # Handlers exit on EOF; waiting (not cancelling) keeps shutdown quiet.
+        if self._handlers:
+            await asyncio.wait(self._handlers, timeout=1.0)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def __aenter__(self) -> "FakeExchange":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+    def start_in_thread(self) -> "FakeExchange":
+        """Run the server on its own event loop in a daemon thread (for sync clients)."""
+        started: concurrent.futures.Future = concurrent.futures.Future()
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as exc:
+                started.set_exception(exc)
+                loop.close()
+                return
+            started.set_result(None)
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="alphasec-fake-exchange", daemon=True)
+        self._thread.start()
+        started.result()
+        return self
+
+    def stop_thread(self) -> None:
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "FakeExchange":
+        return self.start_in_thread()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop_thread()
+
+    def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn`` on the server loop (public methods may be called from any thread)."""
+        loop = self._loop
+        if loop is None or not loop.is_running() or self._in_loop_thread():
+            return fn(*args)
+        done: concurrent.futures.Future = concurrent.futures.Future()
+
+        def call() -> None:
+            try:
+                done.set_result(fn(*args))
+            except BaseException as exc:
+                done.set_exception(exc)
+
+        loop.call_soon_threadsafe(call)
+        return done.result()
+
+    def _in_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    # -----------------------------------------------------------------------
+    # Test / benchmark controls
+    # -----------------------------------------------------------------------
+
+    def seed_book(self, market: str, bids: Iterable[Tuple[Any, Any]] = (), asks: Iterable[Tuple[Any, Any]] = (),
+                  owner: str = SEED_OWNER) -> None:
+        """Rest ``(price, quantity)`` levels in ``market`` ("KAIA/USDT", "BTCUSDT" or a market id)."""
+        self._call(self._seed_book, market, list(bids), list(asks), owner.lower())
+
+    def _seed_book(self, market: str, bids: list, asks: list, owner: str) -> None:
+        engine, market_id = self._resolve_market(market)
+        for side, levels in ((BUY, bids), (SELL, asks)):
+            for price, quantity in levels:
+                self.stats["seeded"] += 1
+                engine.place(f"seed-{self.stats['seeded']}", owner, market_id, side,
+                             Decimal(str(price)), Decimal(str(quantity)))
+        self._publish_depth(engine, market_id)
+
+    def publish(self, channel: str, result: Any) -> None:
+        """Send ``result`` to every subscriber of ``channel`` (arbitrary event emission)."""
+        self._call(self._publish, channel, result)
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """The event loop the server runs on (for scheduling load generators)."""
+        return self._loop
+
+    def subscribers(self, channel: str) -> int:
+        """Number of WebSocket connections subscribed to ``channel``."""
+        return self._subscribers[channel.lower()]
+
+    def fail_next(self, count: int = 1, status: int = 503) -> None:
+        """Answer the next ``count`` REST requests with HTTP ``status`` (unprocessed)."""
+        self._call(self._failures.extend, [status] * count)
+
+    def drop_connections(self) -> int:
+        """Abort every WebSocket connection; returns how many were dropped."""
+        return self._call(self._drop_connections)
+
+    def _drop_connections(self) -> int:
+        dropped = list(self._ws)
+        for conn in dropped:
+            conn.writer.transport.abort()
+        return len(dropped)
+
+    def _resolve_market(self, market: str) -> Tuple[MatchingEngine, str]:
+        for m in self.spot_markets:
+            if market in (m["symbol"], m["marketId"]):
+                return self.spot, m["marketId"]
+        for m in self.perp_markets:
+            if market in (m["symbol"], str(m["marketId"])):
+                return self.perp, str(m["marketId"])
+        raise ValueError(f"Unknown market: {market}")
+
+    # -----------------------------------------------------------------------
+    # HTTP
+    # -----------------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        self._writers.add(writer)
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self._serve_ws(reader, writer, target, headers)
+                    break
+                status, payload = await self._respond(method, target, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_http_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _respond(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        self.stats["requests"] += 1
+        delay = self._latency()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._failures:
+            self.stats["injected_failures"] += 1
+            return self._failures.pop(0), {"error": "injected failure"}
+        url = urlsplit(target)
+        path = url.path
+        if self._buckets and not self._admit(method, path):
+            self.stats["rate_limited"] += 1
+            return 429, {"code": 429, "errMsg": "rate limit exceeded"}
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if method == "GET":
+                result = self._get(path, query)
+            else:
+                result = self._post(method, path, body)
+        except _Reject as exc:
+            return exc.status, {"code": exc.code, "errMsg": str(exc)}
+        except (KeyError, ValueError, ArithmeticError) as exc:
+            return 200, {"code": 400, "errMsg": f"bad request: {exc!r}"}
+        return 200, {"code": 200, "errMsg": "", "result": result}
+
+    def _admit(self, method: str, path: str) -> bool:
+        now = time.monotonic()
+        buckets = [b for b in (self._buckets.get(classify(method, path)), self._buckets.get("all")) if b]
+        if any(b.wait_time(now) > 0 for b in buckets):
+            return False
+        for bucket in buckets:
+            bucket.take()
+        return True
+
+    def _get(self, path: str, query: Dict[str, str]) -> Any:
+        route = self._get_routes.get(path)
+        if route is not None:
+            return route(query)
+        for prefix, engine in (("/api/v1/order/", self.spot), ("/fapi/v1/order/", self.perp)):
+            order_id = path[len(prefix):]
+            if path.startswith(prefix) and order_id and "/" not in order_id:
+                order = engine.orders.get(order_id)
+                if order is None:
+                    raise _Reject(f"order not found: {order_id}", code=404)
+                return self._order_json(order)
+        raise _Reject(f"no route: GET {path}", code=404, status=404)
+
+    def _post(self, method: str, path: str, body: bytes) -> Any:
+        handlers = self._post_routes.get(path)
+        if handlers is None or method != "POST":
+            raise _Reject(f"no route: {method} {path}", code=404, status=404)
+        params = json.loads(body or b"{}")
+        if not isinstance(params, dict) or not isinstance(params.get("tx"), str):
+            raise _Reject("missing tx")
+        tx = decode_tx(params["tx"], recover_sender=self.recover_senders)
+        if self.chain_id is not None and tx.chain_id != self.chain_id:
+            raise _Reject(f"wrong chain id {tx.chain_id}")
+        if tx.hash in self._seen_txs:
+            raise _Reject("already known")
+        handler = handlers.get(tx.command, handlers.get(None))
+        if handler is None:
+            raise _Reject(f"unexpected command 0x{tx.command:02x} for {path}")
+        result = handler(tx)
+        self._seen_txs.add(tx.hash)
+        return result
+
+    # -----------------------------------------------------------------------
+    # Command handlers
+    # -----------------------------------------------------------------------
+
+    @staticmethod
+    def _ack(tx: DecodedTx) -> str:
+        return tx.hash
+
+    def _session(self, tx: DecodedTx) -> str:
+        payload = tx.payload()
+        owner = payload["l1owner"].lower()
+        sessions = [s for s in self._sessions.get(owner, []) if s["publicKey"] != payload.get("publickey")]
+        if payload.get("type") != cmd.DexCommandSessionDelete:
+            sessions.append({"publicKey": payload.get("publickey"), "expiresAt": payload.get("expiresAt")})
+        self._sessions[owner] = sessions
+        return tx.hash
+
+    def _spot_order(self, tx: DecodedTx) -> str:
+        p = tx.payload()
+        market_id = f"{p['baseToken']}_{p['quoteToken']}"
+        price, quantity = Decimal(p["price"]), Decimal(p["quantity"])
+        is_market = int(p["orderType"]) == 1
+        quote_quantity = Decimal(0)
+        if int(p["orderMode"]) == 1:   # QUOTE_MODE: quantity is in quote units
+            if is_market:
+                quote_quantity, quantity = quantity, Decimal(0)
+            else:
+                quantity = quantity / price
+        order, trades = self.spot.place(tx.hash, p["l1owner"].lower(), market_id, int(p["side"]), price,
+                                        quantity, TIF_MARKET if is_market else GTC, quote_quantity)
+        self._after_place(self.spot, order, trades)
+        return tx.hash
+
+    def _spot_cancel(self, tx: DecodedTx) -> str:
+        p = tx.payload()
+        order = self.spot.cancel(p["orderId"], p["l1owner"].lower())
+        if order is None:
+            raise _Reject(f"order not found: {p['orderId']}")
+        self._after_cancel(self.spot, [order])
+        return tx.hash
+
+    def _spot_cancel_all(self, tx: DecodedTx) -> str:
+        self._after_cancel(self.spot, self.spot.cancel_all(tx.payload()["l1owner"].lower()))
+        return tx.hash
+
+    def _spot_modify(self, tx: DecodedTx) -> str:
+        p = tx.payload()
+        return self._modify(self.spot, tx, p, p.get("newPrice"), p.get("newQty"))
+
+    def _perp_order(self, tx: DecodedTx) -> str:
+        p = tx.payload()
+        order, trades = self.perp.place(self._perp_order_id(tx.hash), p["l1owner"].lower(), str(p["marketId"]),
+                                        int(p["side"]), Decimal(p["price"]), Decimal(p["quantity"]),
+                                        int(p["timeInForce"]))
+        order.tx_hash = tx.hash
+        self._after_place(self.perp, order, trades)
+        return tx.hash
+
+    def _perp_cancel(self, tx: DecodedTx) -> str:
+        p = tx.payload()
+        order = self.perp.cancel(p["orderId"], p["l1owner"].lower())
+        if order is None:
+            raise _Reject(f"order not found: {p['orderId']}")
+        self._after_cancel(self.perp, [order])
+        return tx.hash
+
+    def _perp_cancel_all(self, tx: DecodedTx) -> str:
+        p = tx.payload()
+        market_id = str(p["marketId"]) if p.get("marketId") else None   # 0 = all markets
+        self._after_cancel(self.perp, self.perp.cancel_all(p["l1owner"].lower(), market_id))
+        return tx.hash
+
+    def _perp_modify(self, tx: DecodedTx) -> str:
+        p = tx.payload()
+        return self._modify(self.perp, tx, p, p.get("newPrice"), p.get("newQuantity"))
+
+    def _perp_leverage(self, tx: DecodedTx) -> str:
+        p = tx.payload()
+        self._leverage[(p["l1owner"].lower(), int(p["marketId"]))] = int(p["leverage"])
+        return tx.hash
+
+    def _modify(self, engine: MatchingEngine, tx: DecodedTx, p: dict, new_price: Optional[str],
+                new_quantity: Optional[str]) -> str:
+        new_id = self._perp_order_id(tx.hash) if engine is self.perp else tx.hash
+        old, new, trades = engine.modify(
+            p["orderId"], new_id, p["l1owner"].lower(),
+            None if new_price is None else Decimal(new_price),
+            None if new_quantity is None else Decimal(new_quantity))
+        if old is None:
+            raise _Reject(f"order not found: {p['orderId']}")
+        new.tx_hash = tx.hash
+        self._after_cancel(engine, [old])
+        self._after_place(engine, new, trades)
+        return tx.hash
+
+    # -----------------------------------------------------------------------
+    # Events
+    # -----------------------------------------------------------------------
+
+    def _after_place(self, engine: MatchingEngine, order: Order, trades: List[Trade]) -> None:
+        self.stats["orders"] += 1
+        self.stats["trades"] += len(trades)
+        market_id = order.market_id
+        self._user_event(order, "REJECTED" if order.status == REJECTED else NEW)
+        for trade in trades:
+            for o, is_maker in ((trade.maker, True), (trade.taker, False)):
+                self._user_event(o, "TRADE", trade, is_maker)
+        if order.status == CANCELED:
+            self._user_event(order, "CANCELED")
+        if trades:
+            perp = engine is self.perp
+            self._publish(("perp_aggTrade@" if perp else "trade@") + market_id,
+                          [self._trade_json(t) for t in trades])
+            self._publish(("perp_ticker@" if perp else "ticker@") + market_id, self._tickers(engine, [market_id]))
+        self._publish_depth(engine, market_id)
+
+    def _after_cancel(self, engine: MatchingEngine, orders: List[Order]) -> None:
+        for order in orders:
+            self._user_event(order, "CANCELED")
+        for market_id in {o.market_id for o in orders}:
+            self._publish_depth(engine, market_id)
+
+    def _user_event(self, order: Order, event_type: str, trade: Optional[Trade] = None,
+                    is_maker: bool = False) -> None:
+        channel = f"userevent@{order.owner}"
+        if not self._subscribers[channel]:
+            return
+        event = self._order_json(order)
+        event.update({
+            "eventType": event_type,
+            "eventTime": _now_ms(),
+            "lastPrice": str(trade.price) if trade else "0",
+            "lastQty": str(trade.quantity) if trade else "0",
+            "fee": "0",
+            "feeTokenId": None,
+            "tradeId": trade.trade_id if trade else "",
+            "isMaker": is_maker,
+        })
+        self._publish(channel, [event])
+
+    def _publish_depth(self, engine: MatchingEngine, market_id: str) -> None:
+        channel = ("perp_aggDepth@" if engine is self.perp else "depth@") + market_id
+        if self._subscribers[channel.lower()]:
+            self._publish(channel, self._depth(engine, market_id, {"limit": str(DEPTH_LEVELS)}))
+
+    def _publish(self, channel: str, result: Any) -> None:
+        key = channel.lower()
+        if not self._subscribers[key]:
+            return
+        for conn in list(self._ws):
+            subscribed = conn.channels.get(key)
+            if subscribed is not None:
+                self.stats["events"] += 1
+                conn.send({"jsonrpc": "2.0", "method": "subscription",
+                           "params": {"channel": subscribed, "result": result}})
+
+    # -----------------------------------------------------------------------
+    # Payloads
+    # -----------------------------------------------------------------------
+
+    def _order_json(self, order: Order) -> dict:
+        perp = "_" not in order.market_id   # spot ids are "<base>_<quote>"
+        out = {
+            "orderId": order.order_id,
+            "txHash": order.tx_hash,
+            "marketId": int(order.market_id) if perp else order.market_id,
+            "address": order.owner,
+            "side": "BUY" if order.side == BUY else "SELL",
+            "orderType": "MARKET" if order.tif == TIF_MARKET else "LIMIT",
+            "origPrice": str(order.price),
+            "origQty": str(order.quantity),
+            "origQuoteOrderQty": str(order.quote_quantity),
+            "status": order.status,
+            "createdAt": order.created_at,
+            "executedQty": str(order.executed_qty),
+            "executedQuoteQty": str(order.executed_quote),
+        }
+        if perp:
+            out["timeInForce"] = order.tif
+        return out
+
+    @staticmethod
+    def _trade_json(trade: Trade) -> dict:
+        return {
+            "tradeId": trade.trade_id,
+            "marketId": trade.market_id,
+            "price": str(trade.price),
+            "quantity": str(trade.quantity),
+            "side": "BUY" if trade.taker.side == BUY else "SELL",
+            "buyOrderId": (trade.taker if trade.taker.side == BUY else trade.maker).order_id,
+            "sellOrderId": (trade.maker if trade.taker.side == BUY else trade.taker).order_id,
+            "time": trade.time,
+        }
+
+    def _depth(self, engine: MatchingEngine, market_id: str, query: Dict[str, str]) -> dict:
+        depth = engine.depth(market_id, int(query.get("limit", 100)))
+        return {"marketId": market_id, **depth, "firstId": engine.sequence, "finalId": engine.sequence,
+                "time": _now_ms()}
+
+    def _trades(self, engine: MatchingEngine, market_id: str, query: Dict[str, str]) -> list:
+        engine.book(market_id)
+        trades = list(engine.trades[market_id])[-int(query.get("limit", 100)):]
+        return [self._trade_json(t) for t in reversed(trades)]
+
+    def _tickers(self, engine: MatchingEngine, market_ids: Iterable[str]) -> list:
+        out = []
+        for market_id in market_ids:
+            engine.book(market_id)
+            s = engine.stats[market_id]
+            out.append({
+                "marketId": market_id,
+                "price": str(s.last or 0),
+                "open24h": str(s.open or 0),
+                "high24h": str(s.high or 0),
+                "low24h": str(s.low or 0),
+                "volume24h": str(s.volume),
+                "quoteVolume24h": str(s.quote_volume),
+            })
+        return out
+
+    def _spot_ids(self, query: Dict[str, str]) -> List[str]:
+        return [query["marketId"]] if "marketId" in query else [m["marketId"] for m in self.spot_markets]
+
+    def _perp_ids(self, query: Dict[str, str]) -> List[str]:
+        return [query["marketId"]] if "marketId" in query else [str(m["marketId"]) for m in self.perp_markets]
+
+    def _orders(self, engine: MatchingEngine, query: Dict[str, str], open_only: bool) -> list:
+        owner = _owner(query)
+        market_id = query.get("marketId")
+        if open_only:
+            orders = engine.open_orders(owner, market_id)
+        else:
+            orders = [o for o in engine.orders.values()
+                      if not o.is_open and o.owner == owner and (market_id is None or o.market_id == market_id)]
+        limit = int(query.get("limit", 100))
+        return [self._order_json(o) for o in orders[-limit:]]
+
+    # -----------------------------------------------------------------------
+    # WebSocket
+    # -----------------------------------------------------------------------
+
+    async def _serve_ws(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, target: str,
+                        headers: Dict[str, str]) -> None:
+        key = headers.get("sec-websocket-key")
+        if urlsplit(target).path != "/ws" or not key:
+            writer.write(_http_response(404, {"error": "not a websocket endpoint"}, keep_alive=False))
+            return
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        conn = _WsConnection(writer)
+        self._ws.add(conn)
+        self.stats["ws_connections"] += 1
+        try:
+            message = b""
+            while True:
+                fin, opcode, payload = await _read_frame(reader)
+                if opcode == _OP_PING:
+                    writer.write(_ws_frame(_OP_PONG, payload))
+                elif opcode == _OP_CLOSE:
+                    writer.write(_ws_frame(_OP_CLOSE, payload[:2]))
+                    break
+                elif opcode in (_OP_TEXT, _OP_BINARY, _OP_CONT):
+                    message += payload
+                    if fin:
+                        self._on_ws_message(conn, message)
+                        message = b""
+                await writer.drain()
+        finally:
+            self._ws.discard(conn)
+            for channel in conn.channels:
+                self._subscribers[channel] -= 1
+
+    def _on_ws_message(self, conn: _WsConnection, raw: bytes) -> None:
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+        method = message.get("method")
+        if method == "ping":
+            conn.send({"jsonrpc": "2.0", "method": "subscription", "params": {"channel": "pong", "result": {}}})
+            return
+        channels = (message.get("params") or {}).get("channels") or []
+        for channel in channels:
+            key = channel.lower()
+            if method == "subscribe" and key not in conn.channels:
+                conn.channels[key] = channel
+                self._subscribers[key] += 1
+            elif method == "unsubscribe" and key in conn.channels:
+                del conn.channels[key]
+                self._subscribers[key] -= 1
+        if method in ("subscribe", "unsubscribe") and isinstance(message.get("id"), int):
+            conn.send({"jsonrpc": "2.0", "id": message["id"], "result": f"{method}d"})
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _owner(query: Dict[str, str]) -> str:
+    return query.get("address", "").lower()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+def _http_response(status: int, payload: Any, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[bool, int, bytes]:
+    head = await reader.readexactly(2)
+    fin, opcode = bool(head[0] & 0x80), head[0] & 0x0F
+    masked, length = head[1] & 0x80, head[1] & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    mask = await reader.readexactly(4) if masked else b""
+    payload = await reader.readexactly(length)
+    if mask and payload:
+        key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+        payload = (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big")
+    return fin, opcode, payload
+
+
+def _ws_frame(opcode: int, payload: bytes) -> bytes:
+    length = len(payload)
+    if length < 126:
+        head = bytes([0x80 | opcode, length])
+    elif length < 1 << 16:
+        head = bytes([0x80 | opcode, 126]) + length.to_bytes(2, "big")
+    else:
+        head = bytes([0x80 | opcode, 127]) + length.to_bytes(8, "big")
+    return head + payload
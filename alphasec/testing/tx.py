@@ -0,0 +1,63 @@
+"""Decode signed AlphaSec transactions (the ``{"tx": ...}`` request body).
+
+A transaction is an EIP-1559 envelope whose ``data`` is ``command byte +
+JSON``, as built by ``AlphasecSigner.create_*_data``. Recovering the signer
+is optional: it costs several milliseconds per transaction without a native
+secp256k1 backend, which would dominate throughput benchmarks.
+"""
+import json
+from typing import Any, NamedTuple, Optional
+
+import rlp
+from eth_utils import keccak, to_checksum_address
+
+_EIP1559 = 0x02
+
+
+class DecodedTx(NamedTuple):
+    hash: str
+    chain_id: int
+    nonce: int
+    to: str
+    data: bytes
+    sender: Optional[str]
+
+    @property
+    def command(self) -> Optional[int]:
+        return self.data[0] if self.data else None
+
+    def payload(self) -> Any:
+        """The JSON after the command byte; raises ``ValueError`` if there is none."""
+        try:
+            return json.loads(self.data[1:])
+        except ValueError:
+            raise ValueError("tx data is not command + JSON")
+
+
+def decode_tx(raw: str, recover_sender: bool = False) -> DecodedTx:
+    """Decode a ``0x``-prefixed raw transaction; raises ``ValueError`` if malformed."""
+    try:
+        data = bytes.fromhex(raw[2:] if raw.startswith("0x") else raw)
+    except (AttributeError, ValueError):
+        raise ValueError("tx is not a hex string")
+    if not data or data[0] != _EIP1559:
+        raise ValueError("tx is not an EIP-1559 transaction")
+    try:
+        fields = rlp.decode(data[1:])
+    except rlp.exceptions.DecodingError as exc:
+        raise ValueError(f"tx is not valid RLP: {exc}")
+    if len(fields) != 12:
+        raise ValueError("tx has an unexpected field count")
+    chain_id, nonce, _, _, _, to, _, calldata = fields[:8]
+    sender = None
+    if recover_sender:
+        from eth_account import Account
+        sender = Account.recover_transaction(data)
+    return DecodedTx(
+        hash="0x" + keccak(data).hex(),
+        chain_id=int.from_bytes(chain_id, "big"),
+        nonce=int.from_bytes(nonce, "big"),
+        to=to_checksum_address(to) if to else "",
+        data=bytes(calldata),
+        sender=sender,
+    )
@@ -1,13 +1,16 @@
 import time
 from decimal import Decimal, ROUND_DOWN, localcontext, InvalidOperation
-from ens.ens import default
 from eth_account import Account
 from eth_account.messages import encode_typed_data
 import json
 import base64
-from typing import Literal, Optional, Union
+from typing import TYPE_CHECKING, Literal, Optional, Union
 from eth_utils.address import is_address
-from web3 import Web3
+
+if TYPE_CHECKING:
+    # web3 takes ~0.5s to import; only the deposit/withdraw helpers need it
+    # and they receive a provider from the caller.
+    from web3 import Web3
 
 from alphasec.api.constants import ALPHASEC_KAIROS_URL, ALPHASEC_MAINNET_URL, KAIROS_URL, MAINNET_URL
 
@@ -193,6 +196,16 @@ class AlphasecSigner:
             return self.l2_wallet
         return self.l1_wallet
 
+    def set_session_wallet(self, wallet: Account) -> Optional[Account]:
+        # Swap the L2 (session) wallet and sign with it from now on; returns the
+        # previous one. Each signature reads the wallet once (get_wallet), so one
+        # in progress finishes with the wallet it started with -- the swap is a
+        # single attribute store and needs no lock.
+        previous = self.l2_wallet
+        self.l2_wallet = wallet
+        self.session_enabled = True
+        return previous
+
     def session_register_typed_data(self, session_addr: str, nonce: int, expiry: int):
         return {
             "domain": {
@@ -415,7 +428,7 @@ class AlphasecSigner:
         raw = signed.raw_transaction
         return "0x" + raw.hex()
 
-    def generate_deposit_transaction(self, l1_provider: Web3, token_id, value: float, token_l1_address: Optional[str] = None, token_l1_decimals: int = 18) -> str:
+    def generate_deposit_transaction(self, l1_provider: "Web3", token_id, value: float, token_l1_address: Optional[str] = None, token_l1_decimals: int = 18) -> str:
         if self.l1_wallet is None:
             raise ValueError("l1_wallet is not set, deposit is only available for l1 wallet")
 
@@ -468,7 +481,7 @@ class AlphasecSigner:
             signed = self.l1_wallet.sign_transaction(tx)
             return "0x" + signed.raw_transaction.hex()
 
-    def generate_withdraw_transaction(self, l2_provider: Web3, token_id: str, value: float, token_l1_address: Optional[str] = None) -> str:
+    def generate_withdraw_transaction(self, l2_provider: "Web3", token_id: str, value: float, token_l1_address: Optional[str] = None, nonce: Optional[int] = None) -> str:
         if self.l1_wallet is None:
             raise ValueError("l1_wallet is not set, withdraw is only available for l1 wallet")
 
@@ -478,6 +491,8 @@ class AlphasecSigner:
 
         # All of the tokens have 18 decimals in Alphasec l2 chain
         value_onchain_unit = int(value * 10 ** 18)
+        if nonce is None:
+            nonce = int(time.time() * 1000)
 
         if token_id == ALPHASEC_NATIVE_TOKEN_ID:
             system_contract_addr = ALPHASEC_SYSTEM_CONTRACT_ADDR
@@ -486,7 +501,7 @@ class AlphasecSigner:
                 "from": self.l1_address,
                 "value": value_onchain_unit,
                 "gas": 1000000,
-                "nonce": int(time.time() * 1000),
+                "nonce": nonce,
             })
         else:
             erc20_router_addr = ALPHASEC_GATEWAY_ROUTER_CONTRACT_ADDR
@@ -494,14 +509,14 @@ class AlphasecSigner:
             tx = contract.functions.outboundTransfer(token_l1_address, self.l1_address, value_onchain_unit, '0x').build_transaction({
                 "from": self.l1_address,
                 "gas": 1000000,
-                "nonce": int(time.time() * 1000),
+                "nonce": nonce,
             })
 
         signed = self.l1_wallet.sign_transaction(tx)
         return "0x" + signed.raw_transaction.hex()
 
     ## only for testing
-    def get_withdraw_info_on_l2(self, l2_provider: Web3, block_num_on_l2: int) -> tuple[int, bytes, list[str], dict[str, any]]:
+    def get_withdraw_info_on_l2(self, l2_provider: "Web3", block_num_on_l2: int) -> tuple[int, bytes, list[str], dict[str, any]]:
         if self.l1_wallet is None:
             raise ValueError("l1_wallet is not set, withdraw is only available for l1 wallet")
 
@@ -530,7 +545,7 @@ class AlphasecSigner:
         return proof_data[0], proof_data[1], proof_data[2], l2_to_l1_event
 
     ## only for testing
-    def is_withdraw_proof_registered(self, l1_provider: Web3, root: bytes) -> bool:
+    def is_withdraw_proof_registered(self, l1_provider: "Web3", root: bytes) -> bool:
         endpoint_url = MAINNET_URL if self.network == "mainnet" else KAIROS_URL
         if l1_provider.provider.endpoint_uri != endpoint_url:
             raise ValueError("withdraw proof registration should be executed on the l1 provider")
@@ -541,7 +556,7 @@ class AlphasecSigner:
         return roots.hex() != "0000000000000000000000000000000000000000000000000000000000000000"
 
     ## only for testing
-    def generate_withdraw_transaction_on_l1(self, l1_provider: Web3, proof: list[str], l2_to_l1_event: dict[str, any]) -> str:
+    def generate_withdraw_transaction_on_l1(self, l1_provider: "Web3", proof: list[str], l2_to_l1_event: dict[str, any]) -> str:
         if self.l1_wallet is None:
             raise ValueError("l1_wallet is not set, withdraw is only available for l1 wallet")
 
@@ -1,6 +1,28 @@
 import json
 import os
 import math
+import threading
+import time
+from bisect import bisect_right
+from decimal import ROUND_HALF_EVEN, Decimal, localcontext
+from typing import Callable, Sequence
+
+# Price tiers for normalize_price_quantity: a price p falls in tier
+# bisect_right(_PRICE_TIERS, p), i.e. tier 0 is < $1 and tier 5 is >= $10,000.
+_PRICE_TIERS = (1, 10, 100, 1000, 10000)
+_PRICE_DECIMALS = (8, 4, 3, 2, 1, 0)
+_QUANTITY_DECIMALS = (0, 1, 2, 3, 4, 5)
+_QUANTUMS = tuple(Decimal(1).scaleb(-places) for places in range(9))
+
+
+def _round_decimal(value: float, places: int) -> float:
+    """Round ``value`` as written in decimal, not as its binary float (2.675 -> 2.68)."""
+    value = Decimal(str(value))
+    with localcontext() as ctx:
+        # Enough digits for every integer digit plus ``places``; the default 28 fails on 1e24 at 5 places.
+        ctx.prec = max(ctx.prec, value.adjusted() + 1 + places)
+        return float(value.quantize(_QUANTUMS[places], rounding=ROUND_HALF_EVEN))
+
 
 def load_config(path: str):
     config_path = os.path.join(path, "config.json")
@@ -46,40 +68,6 @@ def normalize_price_quantity(price: float, quantity: float) -> tuple[float, floa
     Returns:
         Tuple of (normalized_price, normalized_quantity)
     """
-    def get_price_decimal_precision(price_value: float) -> int:
-        """Get decimal precision for price based on price value thresholds."""
-        abs_value = abs(price_value)
-        
-        if abs_value >= 10000:
-            return 0
-        elif abs_value >= 1000:
-            return 1
-        elif abs_value >= 100:
-            return 2
-        elif abs_value >= 10:
-            return 3
-        elif abs_value >= 1:
-            return 4
-        else:
-            return 8
-    
-    def get_quantity_decimal_precision(price_value: float) -> int:
-        """Get quantity precision for quantity based on price value thresholds."""
-        abs_value = abs(price_value)
-        
-        if abs_value >= 10000:
-            return 5
-        elif abs_value >= 1000:
-            return 4
-        elif abs_value >= 100:
-            return 3
-        elif abs_value >= 10:
-            return 2
-        elif abs_value >= 1:
-            return 1
-        else:
-            return 0
-
     # Validation
     if price is None or quantity is None:
         raise ValueError("Price and quantity are required")
@@ -87,18 +75,72 @@ def normalize_price_quantity(price: float, quantity: float) -> tuple[float, floa
         raise ValueError("Price must be positive")
     if quantity <= 0:
         raise ValueError("Quantity must be positive")
+    if not (math.isfinite(price) and math.isfinite(quantity)):
+        raise ValueError("Price and quantity must be finite")
     
-    # Normalize price based on its own value
-    price_precision = get_price_decimal_precision(price)
-    normalized_price = round(price, price_precision)
-    
-    # Normalize quantity based on price value (minimum size constraint)
-    quantity_precision = get_quantity_decimal_precision(price)
-    normalized_quantity = round(quantity, quantity_precision)
+    # Price precision follows the price's own value; quantity precision (the
+    # minimum size) follows the price too.
+    tier = bisect_right(_PRICE_TIERS, abs(price))
+    normalized_price = _round_decimal(price, _PRICE_DECIMALS[tier])
+    normalized_quantity = _round_decimal(quantity, _QUANTITY_DECIMALS[tier])
 
     return normalized_price, normalized_quantity
 
 
+def normalize_price_quantities(prices: Sequence[float], quantities: Sequence[float]) -> list[tuple[float, float]]:
+    """
+    Normalize many (price, quantity) pairs in one pass.
+
+    Same rules and results as ``normalize_price_quantity`` applied to each
+    pair, but validation runs over the whole batch up front and each tier is
+    found with one bisect instead of the threshold chain, so a ladder of
+    levels is either normalized completely or rejected before anything is
+    signed.
+
+    Raises:
+        ValueError: On length mismatch or any missing / non-positive value
+            (the message names the offending index).
+    """
+    if len(prices) != len(quantities):
+        raise ValueError("prices and quantities must have the same length")
+    for i, (price, quantity) in enumerate(zip(prices, quantities)):
+        if price is None or quantity is None:
+            raise ValueError(f"Price and quantity are required (index {i})")
+        if price <= 0:
+            raise ValueError(f"Price must be positive (index {i})")
+        if quantity <= 0:
+            raise ValueError(f"Quantity must be positive (index {i})")
+        if not (math.isfinite(price) and math.isfinite(quantity)):
+            raise ValueError(f"Price and quantity must be finite (index {i})")
+
+    tiers = [bisect_right(_PRICE_TIERS, abs(price)) for price in prices]
+    return [
+        (_round_decimal(price, _PRICE_DECIMALS[tier]), _round_decimal(quantity, _QUANTITY_DECIMALS[tier]))
+        for price, quantity, tier in zip(prices, quantities, tiers)
+    ]
+
+
+class NonceClock:
+    """
+    Millisecond-timestamp nonces that never repeat.
+
+    ``next()`` returns the current time in ms, or one more than the last
+    nonce handed out if the clock has not advanced, so transactions signed
+    back-to-back (a batch of orders) still get distinct nonces. Thread-safe.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            nonce = max(int(self._clock() * 1000), self._last + 1)
+            self._last = nonce
+            return nonce
+
+
 def resolve_spot_order_price_quantity(is_market: bool, price: float, quantity: float):
     """MARKET: server ignores price -> (0.0, raw quantity). LIMIT: value-based normalize."""
     if is_market:
@@ -1,8 +1,31 @@
 """WebSocket module for AlphaSec DEX.
 
-Provides both synchronous and asynchronous websocket managers.
+Provides both synchronous and asynchronous websocket managers. They are
+imported lazily (PEP 562): the sync manager needs websocket-client, the async
+one websockets, and most programs use only one of them. Both track their
+connection in a :class:`ConnectionState`.
 """
-from .ws import WebsocketManager
-from .async_ws import AsyncWebsocketManager
+import importlib
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["WebsocketManager", "AsyncWebsocketManager"]
+_LAZY_EXPORTS = {
+    "WebsocketManager": ".ws",
+    "AsyncWebsocketManager": ".async_ws",
+    "ConnectionState": ".state",
+}
+
+__all__ = ["WebsocketManager", "AsyncWebsocketManager", "ConnectionState"]
+
+if TYPE_CHECKING:
+    from .ws import WebsocketManager
+    from .async_ws import AsyncWebsocketManager
+    from .state import ConnectionState
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -4,8 +4,10 @@ Provides asynchronous websocket connection management with subscription handling
 using the websockets library and asyncio.
 """
 import asyncio
+import functools
 import json
 import logging
+import time
 from collections import defaultdict
 from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
 
@@ -14,6 +16,10 @@ from typing_extensions import TypeGuard
 from websockets.asyncio.client import ClientConnection, connect
 from websockets.exceptions import ConnectionClosed
 
+from alphasec.api.endpoints import EndpointPool, ws_url_for
+from alphasec.metrics import MetricsRegistry, sdk_metrics, ws_channel_label
+
+from .state import CONNECTING, READY, RECONNECTING, STOPPED, ConnectionState
 from .types import Ack, WsMsg, convert_to_snake_case
 
 logger = logging.getLogger(__name__)
@@ -160,6 +166,11 @@ class AsyncWebsocketManager:
     (exponential backoff, infinite retries) and restores all registered
     subscriptions on reconnect. The loop only terminates via stop().
 
+    The connection moves through ``connecting``, ``ready``, ``reconnecting``
+    and ``stopped`` (see alphasec/websocket/state.py). subscribe() and
+    unsubscribe() wait on that state machine and resume as soon as the
+    connection is ready, with no polling.
+
     Callbacks may be sync or async. Sync callbacks are invoked directly on
     the event loop and must be non-blocking. Async callbacks are scheduled
     as tasks; their exceptions are logged and pending tasks are cancelled
@@ -167,7 +178,8 @@ class AsyncWebsocketManager:
 
     Attributes:
         ws_url: The websocket URL to connect to
-        ws_ready: Whether the websocket connection is established
+        state: The connection state ("connecting", "ready", "reconnecting", "stopped")
+        ws_ready: Whether the websocket connection is established (state == "ready")
         subscription_id_counter: Counter for generating subscription IDs
         active_subscriptions: Dictionary mapping identifiers to their callbacks
 
@@ -180,31 +192,83 @@ class AsyncWebsocketManager:
         >>> await manager.stop()
     """
 
-    def __init__(self, base_url: str) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        endpoints: Optional[EndpointPool] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
         """Initialize the AsyncWebsocketManager.
 
         Args:
             base_url: The base HTTP URL (e.g., "http://api.example.com")
                      Will be converted to websocket URL automatically.
+            endpoints: Optional endpoint pool; every (re)connect then goes to
+                     its current best endpoint, and failed connects mark that
+                     endpoint down.
+            metrics: Optional registry for message, reconnect and callback
+                     error metrics (see alphasec/metrics.py).
         """
         self.subscription_id_counter: int = 0
-        self.ws_ready: bool = False
+        self._state = ConnectionState()
         self.active_subscriptions: Dict[str, List[ActiveSubscription]] = defaultdict(list)
 
         # Convert http(s) URL to ws(s) URL
-        self.ws_url: str = "ws" + base_url[len("http") :] + "/ws"
+        self.ws_url: str = ws_url_for(base_url)
+        self.endpoints = endpoints
 
         self._ws: Optional[ClientConnection] = None
         self._stop_event: asyncio.Event = asyncio.Event()
         self._ping_task: Optional[asyncio.Task] = None
         self._run_task: Optional[asyncio.Task] = None
         self._callback_tasks: Set[asyncio.Task] = set()
+        self._metrics = sdk_metrics(metrics) if metrics is not None else None
+        if self._metrics is not None:
+            self._metrics.watch_ws(self)
+
+    @property
+    def state(self) -> str:
+        """The connection state: "connecting", "ready", "reconnecting" or "stopped"."""
+        return self._state.state
+
+    @property
+    def ws_ready(self) -> bool:
+        """Whether the websocket connection is established."""
+        return self._state.state == READY
+
+    @ws_ready.setter
+    def ws_ready(self, ready: bool) -> None:
+        # Boolean view of the state machine: a ready connection that is
+        # marked not ready is reconnecting.
+        if ready:
+            self._state.set(READY)
+        elif self._state.state == READY:
+            self._state.set(RECONNECTING)
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> None:
+        """Wait until the connection is ready, resuming on the transition itself.
+
+        Args:
+            timeout: Optional timeout in seconds
+
+        Raises:
+            TimeoutError: If timeout is specified and ws is not ready in time
+            RuntimeError: If the manager is stopped while waiting
+        """
+        if self._state.state != READY:
+            logger.debug("Websocket is not ready yet, waiting")
+        try:
+            state = await self._state.wait_async((READY, STOPPED), timeout)
+        except TimeoutError:
+            raise TimeoutError("Websocket is not ready after timeout") from None
+        if state == STOPPED:
+            raise RuntimeError("Websocket manager is stopped")
 
     async def connect(self) -> None:
         """Establish the websocket connection.
 
-        This method connects to the websocket server and sets ws_ready to True
-        once the connection is established.
+        This method connects to the websocket server and moves the manager to
+        the ready state once the connection is established.
 
         Raises:
             Exception: If the connection fails
@@ -212,9 +276,9 @@ class AsyncWebsocketManager:
         # Recreate the stop event so the manager can be restarted after a
         # previous stop() (an asyncio.Event stays set once triggered).
         self._stop_event = asyncio.Event()
-        logger.debug(f"Connecting to websocket at {self.ws_url}")
-        self._ws = await connect(self.ws_url)
-        self.ws_ready = True
+        self._state.set(CONNECTING)
+        self._ws = await self._open()
+        self._state.set(READY)
         logger.debug("Websocket connection established")
 
     async def run(self) -> None:
@@ -256,10 +320,27 @@ class AsyncWebsocketManager:
             if self._stop_event.is_set():
                 break
 
-            self.ws_ready = False
+            self._state.set(RECONNECTING)
             logger.warning("WebSocket disconnected, reconnecting...")
+            disconnected = time.perf_counter()
             if not await self._reconnect():
                 break
+            if self._metrics is not None:
+                self._metrics.reconnected(time.perf_counter() - disconnected)
+
+    async def _open(self) -> ClientConnection:
+        """Open a connection to ``ws_url``, or to the pool's best endpoint."""
+        if self.endpoints is None:
+            logger.debug(f"Connecting to websocket at {self.ws_url}")
+            return await connect(self.ws_url)
+        base = self.endpoints.best()
+        self.ws_url = ws_url_for(base)
+        logger.debug(f"Connecting to websocket at {self.ws_url}")
+        try:
+            return await connect(self.ws_url)
+        except Exception:
+            self.endpoints.report_failure(base)
+            raise
 
     async def _reconnect(self) -> bool:
         """Reconnect with exponential backoff and restore subscriptions.
@@ -273,7 +354,7 @@ class AsyncWebsocketManager:
         delay = RECONNECT_INITIAL_DELAY_SECS
         while not self._stop_event.is_set():
             try:
-                self._ws = await connect(self.ws_url)
+                self._ws = await self._open()
                 restored = await self._restore_subscriptions()
             except Exception as exc:
                 logger.warning(
@@ -288,14 +369,14 @@ class AsyncWebsocketManager:
                 continue
 
             # stop() may have completed while connect/restore were in
-            # flight: it only closed the old socket and left ws_ready
-            # False. Close the fresh socket here instead of leaking it
+            # flight: it only closed the old socket and marked the manager
+            # stopped. Close the fresh socket here instead of leaking it
             # and re-marking the manager ready after shutdown.
             if self._stop_event.is_set():
                 await self._ws.close()
                 return False
 
-            self.ws_ready = True
+            self._state.set(READY)
             logger.warning(f"WebSocket reconnected, {restored} subscriptions restored")
             return True
         return False
@@ -304,7 +385,7 @@ class AsyncWebsocketManager:
         """Resend subscribe frames for all registered subscriptions.
 
         Iterating without a copy is safe: subscribe()/unsubscribe() are
-        parked on ws_ready (False during reconnection), so
+        parked in wait_ready() (the state is "reconnecting"), so
         active_subscriptions cannot change while this method awaits.
 
         Returns:
@@ -372,6 +453,7 @@ class AsyncWebsocketManager:
         """
         logger.debug("Stopping websocket manager")
         self._stop_event.set()
+        self._state.set(STOPPED)   # wakes subscribe()/unsubscribe() callers still waiting
 
         # Cancel ping task
         await self._cleanup_ping_task()
@@ -387,7 +469,6 @@ class AsyncWebsocketManager:
         if self._ws:
             await self._ws.close()
 
-        self.ws_ready = False
         logger.debug("Websocket manager stopped")
 
     def is_ack(self, msg: object) -> TypeGuard[Ack]:
@@ -423,6 +504,8 @@ class AsyncWebsocketManager:
         """
         try:
             ws_msg: WsMsg = json.loads(message)
+            if self._metrics is not None:
+                self._metrics.ws_message(ws_channel_label(ws_msg), len(message))
 
             if self.is_ack(ws_msg):
                 logger.debug("Websocket received acknowledgment")
@@ -458,9 +541,9 @@ class AsyncWebsocketManager:
                     f"Failed to convert websocket message: {message!r}", exc_info=True
                 )
                 return
-            self._dispatch_callback(active_subscription.callback, payload)
+            self._dispatch_callback(active_subscription.callback, payload, active_subscription.channel)
 
-    def _dispatch_callback(self, callback: Callable[[Any], Any], payload: Any) -> None:
+    def _dispatch_callback(self, callback: Callable[[Any], Any], payload: Any, channel: str = "") -> None:
         """Invoke a single subscription callback with exception isolation.
 
         Sync callbacks are called directly and must be non-blocking (they
@@ -473,13 +556,15 @@ class AsyncWebsocketManager:
             if asyncio.iscoroutinefunction(callback):
                 task = asyncio.create_task(callback(payload))
                 self._callback_tasks.add(task)
-                task.add_done_callback(self._on_callback_task_done)
+                task.add_done_callback(functools.partial(self._on_callback_task_done, channel=channel))
             else:
                 callback(payload)
         except Exception:
             logger.error("Websocket subscription callback raised", exc_info=True)
+            if self._metrics is not None:
+                self._metrics.callback_errors.labels(channel).inc()
 
-    def _on_callback_task_done(self, task: "asyncio.Task") -> None:
+    def _on_callback_task_done(self, task: "asyncio.Task", channel: str = "") -> None:
         """Reap a finished async callback task and log its exception."""
         self._callback_tasks.discard(task)
         if task.cancelled():
@@ -487,6 +572,8 @@ class AsyncWebsocketManager:
         exc = task.exception()
         if exc is not None:
             logger.error(f"Websocket async callback task failed: {exc!r}")
+            if self._metrics is not None:
+                self._metrics.callback_errors.labels(channel).inc()
 
     def _check_userevent_guard(self, identifier: str) -> None:
         """Reject a second userEvent subscription for the same address."""
@@ -521,17 +608,10 @@ class AsyncWebsocketManager:
 
         Raises:
             TimeoutError: If timeout is specified and ws is not ready in time
+            RuntimeError: If the manager is stopped while waiting
             ValueError: If a userEvent subscription already exists for the address
         """
-        start_time = asyncio.get_running_loop().time()
-
-        while not self.ws_ready:
-            logger.debug("Websocket is not ready yet, waiting")
-            if timeout is not None:
-                elapsed = asyncio.get_running_loop().time() - start_time
-                if elapsed > timeout:
-                    raise TimeoutError("Websocket is not ready after timeout")
-            await asyncio.sleep(0.1)
+        await self.wait_ready(timeout)
 
         if subscription_id is None:
             self.subscription_id_counter += 1
@@ -581,16 +661,9 @@ class AsyncWebsocketManager:
 
         Raises:
             TimeoutError: If timeout is specified and ws is not ready in time
+            RuntimeError: If the manager is stopped while waiting
         """
-        start_time = asyncio.get_running_loop().time()
-
-        while not self.ws_ready:
-            logger.debug("Websocket is not ready yet, waiting")
-            if timeout is not None:
-                elapsed = asyncio.get_running_loop().time() - start_time
-                if elapsed > timeout:
-                    raise TimeoutError("Websocket is not ready after timeout")
-            await asyncio.sleep(0.1)
+        await self.wait_ready(timeout)
 
         identifier = channel_to_identifier(channel)
         active_subscriptions = self.active_subscriptions[identifier]
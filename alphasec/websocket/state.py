@@ -0,0 +1,106 @@
+"""Connection state shared by the WebSocket managers.
+
+A manager is always in one of four states::
+
+    CONNECTING --connect/open--> READY --drop--> RECONNECTING --reopen--> READY
+         \\________________________\\_________________\\__stop()__> STOPPED
+
+``connect()`` / a restart puts a stopped manager back in CONNECTING.
+:class:`ConnectionState` records the current state and wakes waiters on
+every transition: threads block in :meth:`ConnectionState.wait`, coroutines
+await :meth:`ConnectionState.wait_async`. Both return the moment the state
+they wait for is entered, instead of polling it.
+"""
+import asyncio
+import threading
+from typing import Collection, List, Optional, Tuple
+
+CONNECTING = "connecting"
+READY = "ready"
+RECONNECTING = "reconnecting"
+STOPPED = "stopped"
+
+STATES = (CONNECTING, READY, RECONNECTING, STOPPED)
+
+
+def _resolve(future: "asyncio.Future", state: str) -> None:
+    if not future.done():
+        future.set_result(state)
+
+
+class ConnectionState:
+    """Current connection state with blocking and awaitable transitions.
+
+    Transitions may come from any thread; async waiters are resumed on their
+    own event loop.
+    """
+
+    def __init__(self, state: str = CONNECTING):
+        if state not in STATES:
+            raise ValueError(f"unknown connection state {state!r}")
+        self._state = state
+        self._cond = threading.Condition()
+        self._futures: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future", Collection[str]]] = []
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def __repr__(self) -> str:
+        return f"ConnectionState({self._state!r})"
+
+    def set(self, state: str) -> None:
+        """Enter ``state`` and wake everything waiting for it."""
+        if state not in STATES:
+            raise ValueError(f"unknown connection state {state!r}")
+        with self._cond:
+            if state == self._state:
+                return
+            self._state = state
+            self._cond.notify_all()
+            woken = [entry for entry in self._futures if state in entry[2]]
+            self._futures = [entry for entry in self._futures if state not in entry[2]]
+        for loop, future, _ in woken:
+            if loop.is_closed():
+                continue
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                _resolve(future, state)
+            else:
+                loop.call_soon_threadsafe(_resolve, future, state)
+
+    def wait(self, states: Collection[str], timeout: Optional[float] = None) -> str:
+        """Block until the state is one of ``states``; returns it.
+
+        Raises:
+            TimeoutError: If ``timeout`` seconds pass first.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._state in states, timeout):
+                raise TimeoutError(f"connection still {self._state} after {timeout}s")
+            return self._state
+
+    async def wait_async(self, states: Collection[str], timeout: Optional[float] = None) -> str:
+        """Await a state in ``states``; returns it.
+
+        Raises:
+            TimeoutError: If ``timeout`` seconds pass first.
+        """
+        with self._cond:
+            if self._state in states:
+                return self._state
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            entry = (loop, future, states)
+            self._futures.append(entry)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"connection still {self._state} after {timeout}s") from None
+        finally:
+            with self._cond:
+                if entry in self._futures:
+                    self._futures.remove(entry)
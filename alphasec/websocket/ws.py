@@ -11,6 +11,10 @@ import websocket
 from typing import Any, Callable, Dict, NamedTuple, Optional
 from typing_extensions import TypeGuard
 
+from alphasec.api.endpoints import ws_url_for
+from alphasec.metrics import sdk_metrics, ws_channel_label
+
+from .state import READY, RECONNECTING, STOPPED, ConnectionState
 from .types import Ack, WsMsg, convert_to_snake_case
 
 RECONNECT_INITIAL_DELAY_SECS = 1.0
@@ -114,18 +118,57 @@ def ws_msg_to_identifier(ws_msg: WsMsg) -> Optional[str]:
     return None
 
 class WebsocketManager(threading.Thread):
-    def __init__(self, base_url):
+    def __init__(self, base_url, endpoints=None, metrics=None):
+        # endpoints: optional EndpointPool; each (re)connect goes to its best endpoint.
+        # metrics: optional MetricsRegistry for message/reconnect/callback error counts.
         super().__init__()
         self.subscription_id_counter = 0
-        self.ws_ready = False
+        # connecting -> ready <-> reconnecting -> stopped (alphasec/websocket/state.py);
+        # subscribe/unsubscribe block on it and wake the moment the socket opens.
+        self._state = ConnectionState()
         self.active_subscriptions: Dict[str, List[ActiveSubscription]] = defaultdict(list)
-        self.ws_url = "ws" + base_url[len("http") :] + "/ws"
+        self.ws_url = ws_url_for(base_url)
+        self.endpoints = endpoints
+        self._endpoint = None
+        self._opened = False
         self.ws = self._build_app()
         self.ping_sender = threading.Thread(target=self.send_ping, daemon=True)
         self.stop_event = threading.Event()
         self._reconnect_delay = RECONNECT_INITIAL_DELAY_SECS
+        self._disconnected_at = None
+        self._metrics = sdk_metrics(metrics) if metrics is not None else None
+
+    @property
+    def state(self) -> str:
+        return self._state.state
+
+    @property
+    def ws_ready(self) -> bool:
+        return self._state.state == READY
+
+    @ws_ready.setter
+    def ws_ready(self, ready: bool) -> None:
+        if ready:
+            self._state.set(READY)
+        elif self._state.state == READY:
+            self._state.set(RECONNECTING)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> None:
+        # Block until the socket is open; TimeoutError after timeout, RuntimeError once stopped.
+        if self._state.state != READY:
+            logging.debug("websocket is not ready yet, waiting")
+        try:
+            state = self._state.wait((READY, STOPPED), timeout)
+        except TimeoutError:
+            raise TimeoutError("Websocket is not ready after timeout") from None
+        if state == STOPPED:
+            raise RuntimeError("Websocket manager is stopped")
 
     def _build_app(self):
+        if self.endpoints is not None:
+            self._endpoint = self.endpoints.best()
+            self.ws_url = ws_url_for(self._endpoint)
+        self._opened = False
         return websocket.WebSocketApp(
             self.ws_url, on_message=self.on_message, on_open=self.on_open,
             on_close=self.on_close, on_error=self.on_error)
@@ -133,14 +176,18 @@ class WebsocketManager(threading.Thread):
     def run(self):
         # Reconnect loop: run_forever() returns on disconnect; back off (interruptible
         # by stop()), rebuild the app, and let on_open restore subscriptions. Mirrors
-        # AsyncWebsocketManager. ws_ready=False during the gap parks subscribe/unsubscribe.
+        # AsyncWebsocketManager. The "reconnecting" state during the gap parks subscribe/unsubscribe.
         self.ping_sender.start()
         self._reconnect_delay = RECONNECT_INITIAL_DELAY_SECS
         while not self.stop_event.is_set():
             self.ws.run_forever()
             if self.stop_event.is_set():
                 break
-            self.ws_ready = False
+            self._state.set(RECONNECTING)
+            if self._disconnected_at is None:
+                self._disconnected_at = time.perf_counter()
+            if self.endpoints is not None and not self._opened:
+                self.endpoints.report_failure(self._endpoint)   # never connected
             logging.warning("Websocket disconnected, reconnecting...")
             if self.stop_event.wait(self._reconnect_delay):   # interruptible backoff
                 break
@@ -160,6 +207,7 @@ class WebsocketManager(threading.Thread):
 
     def stop(self):
         self.stop_event.set()
+        self._state.set(STOPPED)
         self.ws.close()
         if self.ping_sender.is_alive():
             self.ping_sender.join()
@@ -174,6 +222,8 @@ class WebsocketManager(threading.Thread):
 
     def on_message(self, _ws, message):
         ws_msg: WsMsg = json.loads(message)
+        if self._metrics is not None:
+            self._metrics.ws_message(ws_channel_label(ws_msg), len(message))
         if self.is_ack(ws_msg):
             logging.debug("Websocket was established")
             return
@@ -192,12 +242,22 @@ class WebsocketManager(threading.Thread):
         else:
             for active_subscription in active_subscriptions:
                 ws_msg = convert_to_snake_case(ws_msg)
-                active_subscription.callback(ws_msg['params']['result'])
+                try:
+                    active_subscription.callback(ws_msg['params']['result'])
+                except Exception:
+                    if self._metrics is not None:
+                        self._metrics.callback_errors.labels(active_subscription.channel).inc()
+                    raise
 
     def on_open(self, _ws):
         logging.debug("on_open")
-        self.ws_ready = True
+        self._opened = True
+        self._state.set(READY)
         self._reconnect_delay = RECONNECT_INITIAL_DELAY_SECS   # reset backoff on success
+        if self._disconnected_at is not None:
+            if self._metrics is not None:
+                self._metrics.reconnected(time.perf_counter() - self._disconnected_at)
+            self._disconnected_at = None
         self._restore_subscriptions()
 
     def on_close(self, _ws, *args):
@@ -209,7 +269,7 @@ class WebsocketManager(threading.Thread):
 
     def _restore_subscriptions(self):
         # Resend subscribe frames for every registered subscription on (re)connect.
-        # Safe to iterate: callers are parked on ws_ready while reconnecting.
+        # Safe to iterate: callers are parked in wait_ready() while reconnecting.
         for subs in list(self.active_subscriptions.values()):
             for sub in subs:
                 self.ws.send(json.dumps(
@@ -218,15 +278,8 @@ class WebsocketManager(threading.Thread):
     def subscribe(
         self, channel: str, callback: Callable[[Any], None], subscription_id: Optional[int] = None, timeout: Optional[int] = None
     ) -> int:
-        start_time = time.time()
-        while not self.ws_ready:
-            if self.stop_event.is_set():
-                raise RuntimeError("Websocket manager is stopped")
-            logging.debug("websocket is not ready yet, waiting")
-            if timeout is not None and time.time() - start_time > timeout:
-                raise TimeoutError("Websocket is not ready after timeout")
-            self.stop_event.wait(0.1)
-                
+        self.wait_ready(timeout)
+
         if subscription_id is None:
             self.subscription_id_counter += 1
             subscription_id = self.subscription_id_counter
@@ -241,17 +294,8 @@ class WebsocketManager(threading.Thread):
         return subscription_id
 
     def unsubscribe(self, channel: str, subscription_id: int, timeout: Optional[int] = None) -> bool:
-        start_time = time.time()
-        while not self.ws_ready:
-            if self.stop_event.is_set():
-                raise RuntimeError("Websocket manager is stopped")
-            logging.debug("websocket is not ready yet, waiting")
-            if timeout is not None and time.time() - start_time > timeout:
-                raise TimeoutError("Websocket is not ready after timeout")
-            self.stop_event.wait(0.1)
+        self.wait_ready(timeout)
 
-        if not self.ws_ready:
-            raise NotImplementedError("Can't unsubscribe before websocket connected")
         identifier = channel_to_identifier(channel)
         active_subscriptions = self.active_subscriptions[identifier]
         new_active_subscriptions = [x for x in active_subscriptions if x.subscription_id != subscription_id]
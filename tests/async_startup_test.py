@@ -0,0 +1,84 @@
+"""Offline tests for AsyncAgent.startup (concurrent initialization)."""
+import asyncio
+
+import httpx
+import pytest
+
+from alphasec.async_agent import AsyncAgent
+
+URL = "http://offline.test"
+TOKENS_RESULT = [
+    {"tokenId": "1", "l2Symbol": "KAIA", "l1Address": "0x" + "11" * 20, "l1Decimal": 18},
+    {"tokenId": "2", "l2Symbol": "USDT", "l1Address": "0x" + "22" * 20, "l1Decimal": 6},
+]
+DELAY = 0.1
+
+
+class FakeWs:
+    """Stand-in for AsyncWebsocketManager with a slow connect."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.subscribed = []
+        self.stopped = False
+
+    async def connect(self):
+        await asyncio.sleep(DELAY)
+        if self.fail:
+            raise ConnectionError("ws down")
+
+    async def run(self):
+        await asyncio.Event().wait()
+
+    async def subscribe(self, channel, callback, timeout=None):
+        self.subscribed.append(channel)
+        return len(self.subscribed)
+
+    async def stop(self):
+        self.stopped = True
+
+
+def make_agent(ws):
+    async def handler(request):
+        await asyncio.sleep(DELAY)
+        if request.url.path == "/api/v1/market/tokens":
+            return httpx.Response(200, json={"result": TOKENS_RESULT})
+        return httpx.Response(200, json={"code": 200, "result": {"symbols": [{"symbol": "BTCUSDT", "marketId": 7}]}})
+
+    agent = AsyncAgent(URL)
+    agent.api = agent._new_api()
+    agent.api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    agent.ws = ws
+    return agent
+
+
+async def test_startup_runs_phases_concurrently():
+    ws = FakeWs()
+    agent = make_agent(ws)
+    timings = await agent.startup(subscriptions=[("trade@KAIA/USDT", print), ("perp_ticker@7", print)])
+    assert set(timings) == {"metadata", "ws_connect", "perp_markets", "subscriptions", "total"}
+    # Three DELAY-long phases overlap instead of adding up.
+    assert timings["total"] < 2.5 * DELAY
+    assert ws.subscribed == ["trade@1_2", "perp_ticker@7"]
+    assert agent.perp._market_cache == {"BTCUSDT": 7}
+    assert agent.startup_timings is timings
+    await agent.stop()
+    await agent.api.close()
+
+
+async def test_startup_failure_cancels_other_phases():
+    agent = make_agent(FakeWs(fail=True))
+    with pytest.raises(ConnectionError):
+        await agent.startup(subscriptions=[("trade@KAIA/USDT", print)])
+    assert agent.startup_timings == {}
+    await agent.api.close()
+
+
+async def test_startup_rejects_subscriptions_without_ws_before_scheduling():
+    ws = FakeWs()
+    agent = make_agent(ws)
+    before = asyncio.all_tasks()
+    with pytest.raises(ValueError, match="connect_ws=True"):
+        await agent.startup(subscriptions=[("trade@KAIA/USDT", print)], connect_ws=False)
+    assert asyncio.all_tasks() == before and agent._ws_task is None
+    await agent.api.close()
@@ -0,0 +1,61 @@
+"""Smoke tests for the benchmark suite and its baseline comparison."""
+import json
+import subprocess
+import sys
+
+from alphasec.bench import compare, document, macro, micro
+
+
+def test_micro_benchmarks_cover_builders_and_run():
+    names = set(micro.benchmarks())
+    assert {"perp_decimal_str", "normalize_price_quantity", "generate_alphasec_transaction",
+            "convert_to_snake_case", "on_message.async", "on_message.sync"} <= names
+    signer_builders = {name for name in dir(micro.bench_signer()) if name.startswith("create_")}
+    assert signer_builders <= names
+
+    results = micro.run(["perp_decimal_str", "on_message.async"], min_time=0.005, repeat=2)
+    assert set(results) == {"micro.perp_decimal_str", "micro.on_message.async"}
+    assert all(r["value"] > 0 and r["unit"] == "ns/op" for r in results.values())
+
+
+def test_compare_flags_regressions_in_either_direction():
+    baseline = {
+        "a": {"value": 100.0, "unit": "ns/op", "better": "lower"},
+        "b": {"value": 100.0, "unit": "orders/s", "better": "higher"},
+        "c": {"value": 0.0, "unit": "ms", "better": "lower"},
+        "gone": {"value": 1.0, "unit": "ns/op", "better": "lower"},
+    }
+    current = {
+        "a": {"value": 115.0, "unit": "ns/op", "better": "lower"},
+        "b": {"value": 95.0, "unit": "orders/s", "better": "higher"},
+        "c": {"value": 0.0, "unit": "ms", "better": "lower"},
+        "new": {"value": 1.0, "unit": "ns/op", "better": "lower"},
+    }
+    rows = {row.name: row for row in compare(current, baseline, threshold=0.10)}
+    assert set(rows) == {"a", "b", "c"}
+    assert rows["a"].regression and abs(rows["a"].change - 0.15) < 1e-9
+    assert not rows["b"].regression and abs(rows["b"].change - 0.05) < 1e-9
+    assert rows["c"].change is None and not rows["c"].regression
+
+
+def test_macro_orders_and_ws_against_fake_exchange():
+    results = macro.run(orders_per_sec=20, ws_per_sec=200, duration=0.5)
+    orders, ws = results["macro.orders.throughput"], results["macro.ws.throughput"]
+    assert orders["sent"] == 10 and orders["errors"] == 0
+    assert ws["received"] == ws["sent"] == 100
+    assert results["macro.ws.latency_p50"]["value"] <= results["macro.ws.latency_max"]["value"]
+
+
+def test_cli_exits_nonzero_on_regression(tmp_path):
+    baseline = document({"micro.perp_decimal_str": {"value": 1e-3, "unit": "ns/op", "better": "lower"}})
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps(baseline))
+    out = tmp_path / "run.json"
+    proc = subprocess.run(
+        [sys.executable, "-m", "alphasec.bench", "--micro", "-k", "perp_decimal_str", "--min-time", "0.005",
+         "--baseline", str(path), "-o", str(out)],
+        capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 1, proc.stderr
+    assert "REGRESSION" in proc.stderr
+    doc = json.loads(out.read_text())
+    assert doc["comparison"]["rows"][0]["regression"] is True
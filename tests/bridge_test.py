@@ -0,0 +1,108 @@
+"""Pipelined deposits against FakeChain."""
+import os
+
+import pytest
+from web3 import AsyncWeb3
+
+from alphasec import AlphasecSigner, load_config
+from alphasec.bridge import NOT_SENT, Deposit, DepositPipeline
+from alphasec.testing.chain import FakeChain
+from alphasec.transaction.abi import ERC20_ABI
+from alphasec.transaction.constants import ALPHASEC_NATIVE_TOKEN_ID
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+USDT = "0x" + "22" * 20
+BTC = "0x" + "33" * 20
+
+
+def _chain(allowances, nonce=7):
+    chain = FakeChain()
+    chain.nonces[CONFIG["l1_address"].lower()] = nonce
+    for token in (USDT, BTC):
+        chain.on_call(token, ERC20_ABI, "allowance", lambda block, owner, spender, token=token: allowances.get(token, 0))
+    return chain
+
+
+def _pipeline(chain):
+    return DepositPipeline(AlphasecSigner(CONFIG), AsyncWeb3(chain), receipt_timeout=1)
+
+
+async def test_reads_are_batched_and_approvals_pipelined():
+    provider = _chain({BTC: 10**30})   # USDT needs an approve, BTC does not
+    pipeline = _pipeline(provider)
+    results = await pipeline.deposit_many([
+        Deposit(ALPHASEC_NATIVE_TOKEN_ID, "1.5"),
+        Deposit("2", "100", USDT, decimals=6),
+        Deposit("2", "50", USDT, decimals=6),
+        Deposit("3", "0.1", BTC, decimals=8),
+    ])
+    assert [r["status"] for r in results] == [True] * 4 and all(r["tx_hash"] for r in results)
+    assert provider.batches == [["eth_chainId", "eth_gasPrice", "eth_getTransactionCount", "eth_call", "eth_call"]]
+    # One approve covering both USDT deposits; no receipt is awaited between sends.
+    assert provider.requests == ["eth_sendRawTransaction"] * 5 + ["eth_getTransactionReceipt"] * 4
+    assert [tx.nonce for tx in provider.sent] == [7, 8, 9, 10, 11]
+    assert provider.sent[0].to.lower() == USDT        # approve goes first, to the token
+
+    # The next call continues from the local counter.
+    await pipeline.deposit_many([Deposit(ALPHASEC_NATIVE_TOKEN_ID, "1")], wait=False)
+    assert provider.sent[-1].nonce == 12
+
+
+async def test_rejected_approve_fails_its_deposits_and_resets_nonce():
+    provider = _chain({})
+    provider.reject_nonces.add(7)
+    pipeline = _pipeline(provider)
+    results = await pipeline.deposit_many([Deposit("2", "1", USDT, decimals=6),
+                                           Deposit(ALPHASEC_NATIVE_TOKEN_ID, "1")], wait=False)
+    assert not results[0]["status"] and "approve failed" in results[0]["error"]
+    assert results[1] == {"status": False, "error": NOT_SENT, "tx_hash": None}
+    assert provider.sent == []
+    assert pipeline.nonces._next is None   # next call re-reads the pending nonce
+
+    with pytest.raises(ValueError, match="token_l1_address"):
+        await pipeline.deposit_many([Deposit("2", "1")])
+    with pytest.raises(ValueError, match="positive"):
+        await pipeline.deposit_many([Deposit(ALPHASEC_NATIVE_TOKEN_ID, "0")])
+
+
+async def test_rejection_mid_batch_stops_signing_and_sending():
+    provider = _chain({}, nonce=7)
+    provider.reject_nonces.add(9)
+    pipeline = _pipeline(provider)
+    signed = []
+    sign = pipeline._sign
+    pipeline._sign = lambda *args: signed.append(1) or sign(*args)
+
+    results = await pipeline.deposit_many([Deposit(ALPHASEC_NATIVE_TOKEN_ID, str(i + 1)) for i in range(5)])
+    assert [r["status"] for r in results] == [True, True, False, False, False]
+    assert "underpriced" in results[2]["error"]
+    assert [r["error"] for r in results[3:]] == [NOT_SENT, NOT_SENT] and results[3]["tx_hash"] is None
+    assert [tx.nonce for tx in provider.sent] == [7, 8] and len(signed) == 3
+    assert provider.requests.count("eth_sendRawTransaction") == 3
+
+    # The next call re-seeds from the node and fills the gap.
+    provider.reject_nonces.clear()
+    await pipeline.deposit_many([Deposit(ALPHASEC_NATIVE_TOKEN_ID, "4")], wait=False)
+    assert provider.sent[-1].nonce == 9
+
+
+async def test_transport_error_mid_batch_reports_what_was_sent():
+    provider = _chain({}, nonce=7)
+    pipeline = _pipeline(provider)
+    make_request = provider.make_request
+    sends = []
+
+    async def flaky(method, params):
+        if method == "eth_sendRawTransaction":
+            sends.append(method)
+            if len(sends) == 2:
+                raise ConnectionError("connection reset")
+        return await make_request(method, params)
+
+    provider.make_request = flaky
+    results = await pipeline.deposit_many([Deposit(ALPHASEC_NATIVE_TOKEN_ID, str(i + 1)) for i in range(3)],
+                                          wait=False)
+    assert results[0] == {"status": True, "error": None, "tx_hash": provider.sent[0].hash}
+    assert not results[1]["status"] and "connection reset" in results[1]["error"]
+    assert results[2] == {"status": False, "error": NOT_SENT, "tx_hash": None}
+    assert len(sends) == 2 and pipeline.nonces._next is None
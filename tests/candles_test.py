@@ -0,0 +1,99 @@
+"""OHLCV bars from trade streams: ring buffers, close events and history stitching."""
+import asyncio
+import os
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from alphasec import AlphasecSigner, AsyncAgent, load_config  # noqa: E402
+from alphasec.marketdata import Candle, CandleAggregator, CandleRing  # noqa: E402
+from alphasec.marketdata.candles import parse_candles  # noqa: E402
+from alphasec.perp.constants import BUY, GTC, SELL  # noqa: E402
+from alphasec.testing import FakeExchange  # noqa: E402
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+T0 = 1_700_000_100_000   # a five-minute boundary, epoch ms
+
+
+def _trade(offset_s, price, qty="1"):
+    return {"price": str(price), "quantity": qty, "side": "BUY", "time": T0 + int(offset_s * 1000)}
+
+
+def test_bars_close_on_later_trades_and_ring_stays_fixed():
+    candles = CandleAggregator(resolutions=(60, 300), capacity=3, clock=lambda: T0 / 1000)
+    closed = []
+    candles.on_close(lambda channel, resolution, bar: closed.append((resolution, bar)))
+    candles.on_close(lambda *args: 1 / 0)   # a failing listener does not stop ingestion
+
+    candles.add_trades("trade@1_2", [_trade(0, 10), _trade(10, 12), _trade(20, 9, "2"), _trade(59, 11)])
+    assert candles.last("trade@1_2", 60) == Candle(T0, 10.0, 12.0, 9.0, 11.0, 5.0, 4)
+    assert closed == []
+
+    candles.add_trades("trade@1_2", [_trade(61, 13), _trade(30, 1)])   # the second is late
+    assert closed == [(60, Candle(T0, 10.0, 12.0, 9.0, 11.0, 5.0, 4))]
+    assert candles.ring("trade@1_2", 60).late == 1
+    assert candles.last("trade@1_2", 300).volume == 7.0   # ...but still counts in the open 5m bar
+
+    for minute in range(2, 6):
+        candles.add_trades("trade@1_2", [_trade(minute * 60, 20 + minute)])
+    bars = candles.bars("trade@1_2", 60)
+    assert list(bars["time"]) == [T0 + m * 60_000 for m in (3, 4, 5)]   # capacity 3, oldest evicted
+    assert list(bars["close"]) == [23.0, 24.0, 25.0]
+
+    assert candles.close_due(T0 + 5 * 60_000) == 0
+    assert candles.close_due(T0 + 6 * 60_000) == 1 and closed[-1][1].time == T0 + 5 * 60_000
+    with pytest.raises(ValueError, match="trade@"):
+        candles.handler("depth@1_2")
+
+
+def test_history_is_stitched_without_duplicate_periods():
+    ring = CandleRing(60, capacity=10)
+    ring.add(T0 + 120_000 + 5_000, 7.0, 1.0)      # live stream starts mid-bar at minute 2
+    ring.add(T0 + 180_000, 8.0, 1.0)
+    history = [(T0 + m * 60_000, 5.0 + m, 9.0, 1.0, 5.5 + m, 3.0, 0) for m in range(3)]
+    assert ring.seed(parse_candles(history + history[:1]), now_ms=T0 + 190_000) == 2
+    bars = ring.to_array()
+    assert list(bars["time"]) == [T0, T0 + 60_000, T0 + 120_000, T0 + 180_000]
+    assert tuple(bars[2].item()) == (T0 + 120_000, 7.0, 9.0, 1.0, 7.0, 3.0, 1)   # seam merged
+    assert ring.is_open and ring.last.close == 8.0
+
+    empty = CandleRing(60, capacity=2)
+    assert empty.seed(history, now_ms=T0 + 150_000) == 3 and len(empty) == 2 and empty.is_open
+    empty.add(T0 + 130_000, 4.0, 1.0)              # the backfilled bar keeps taking trades
+    assert empty.last == Candle(T0 + 120_000, 7.0, 9.0, 1.0, 4.0, 4.0, 1)
+
+
+async def test_perp_stream_feeds_bars_after_backfill():
+    now = time.time()
+    bar = int(now // 60 * 60)
+    async with FakeExchange() as exchange:
+        exchange.seed_book("BTCUSDT", asks=[(100, "1")])
+        queries = []
+
+        def candles_route(query):
+            queries.append(query)
+            return [{"time": bar - 120, "open": "90", "high": "95", "low": "88", "close": "94", "volume": "3"},
+                    {"time": bar - 60, "open": "94", "high": "99", "low": "93", "close": "98", "volume": "2"}]
+        exchange._get_routes["/fapi/v1/market/candles"] = candles_route
+
+        async with AsyncAgent(exchange.url, signer=AlphasecSigner(CONFIG)) as agent:
+            await agent.start()
+            candles = CandleAggregator(resolutions=(60,), capacity=100)
+            await agent.perp.subscribe("perp_aggTrade@1", candles.handler("perp_aggTrade@1"))
+            await asyncio.sleep(0.05)
+            assert await candles.backfill_async(agent.perp, "perp_aggTrade@1", "BTCUSDT") == {60: 2}
+            assert (queries[0]["resolution"], int(queries[0]["to"]) - int(queries[0]["from"])) == ("60", 6000)
+
+            await agent.perp.order("BTCUSDT", BUY, "100", "0.4", GTC)
+            for _ in range(100):
+                if candles.last("perp_aggTrade@1", 60).volume >= 0.4:
+                    break
+                await asyncio.sleep(0.01)
+            bars = candles.bars("perp_aggTrade@1", 60)
+            assert list(bars["close"][:2]) == [94.0, 98.0]
+            assert bars["close"][-1] == 100.0 and bars["volume"][-1] == pytest.approx(0.4)
+            with pytest.raises(ValueError, match="perp"):
+                await candles.backfill_async(agent.perp, "trade@1_2", "KAIA/USDT")
+            await agent.perp.order("BTCUSDT", SELL, "101", "0.1", GTC)
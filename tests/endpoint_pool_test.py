@@ -0,0 +1,129 @@
+"""Offline tests for EndpointPool routing and failover."""
+import httpx
+import pytest
+import requests
+
+from alphasec.api.api import API
+from alphasec.api.async_api import AsyncAPI
+from alphasec.api.endpoints import EndpointPool, ws_url_for
+from alphasec.exceptions import AlphasecAPIError
+from alphasec.websocket.async_ws import AsyncWebsocketManager
+
+A = "http://a.test"
+B = "http://b.test"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_best_prefers_lowest_latency_then_list_order():
+    pool = EndpointPool([A, B])
+    assert pool.best() == A             # nothing measured yet
+    pool.report(A, 0.050)
+    pool.report(B, 0.010)
+    assert pool.ordered() == [B, A]
+    pool.report(B, 0.200)               # EWMA: 0.8 * 0.010 + 0.2 * 0.200 = 0.048
+    assert pool.best() == B
+    assert pool.stats()[B]["ewma"] == pytest.approx(0.048)
+
+
+def test_failed_endpoint_is_down_for_a_growing_cooldown():
+    clock = FakeClock()
+    pool = EndpointPool([A, B], cooldown=1.0, clock=clock)
+    pool.report(A, 0.001)
+    pool.report_failure(A)
+    assert pool.best() == B
+    clock.now = 1.5
+    assert pool.best() == A             # cooldown over
+    pool.report_failure(A)              # second consecutive failure: 2s
+    clock.now = 3.0
+    assert pool.best() == B
+    assert not pool.stats()[A]["healthy"]
+    pool.report_failure(B)
+    assert pool.best() == A             # all down: soonest recovery first
+
+
+def test_ws_url_for():
+    assert ws_url_for("https://api.alphasec.trade") == "wss://api.alphasec.trade/ws"
+
+
+async def test_async_order_submit_fails_over_with_same_body():
+    bodies = []
+
+    def handler(request):
+        bodies.append((request.url.host, request.content))
+        if request.url.host == "a.test":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"code": 200, "result": "0xhash"})
+
+    pool = EndpointPool([A, B])
+    api = AsyncAPI(A, endpoints=pool)
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api._initialized = True
+    assert await api.post("/api/v1/order", {"tx": "0xsigned"}) == {"code": 200, "result": "0xhash"}
+    assert [host for host, _ in bodies] == ["a.test", "b.test"]
+    assert bodies[0][1] == bodies[1][1]
+    assert pool.best() == B
+    await api.close()
+
+
+async def test_async_unsigned_write_does_not_fail_over():
+    hosts = []
+
+    def handler(request):
+        hosts.append(request.url.host)
+        return httpx.Response(503, text="unavailable")
+
+    api = AsyncAPI(A, endpoints=EndpointPool([A, B]))
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api._initialized = True
+    with pytest.raises(AlphasecAPIError):
+        await api.post("/api/v1/wallet/session", {"address": "0x1"})
+    assert hosts == ["a.test"]
+    await api.close()
+
+
+def test_sync_get_fails_over_and_routes_to_fastest(monkeypatch):
+    hosts = []
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return {"code": 200, "result": []}
+
+    def get(url, params=None, timeout=None):
+        hosts.append(url.split("/")[2])
+        if url.startswith(A):
+            raise requests.ConnectionError("reset")
+        return Response()
+
+    pool = EndpointPool([A, B])
+    api = API(A, endpoints=pool)
+    api._initialized = True
+    monkeypatch.setattr(api.session, "get", get)
+    api.get("/api/v1/order/open")
+    api.get("/api/v1/order/open")
+    assert hosts == ["a.test", "b.test", "b.test"]
+
+
+async def test_ws_connect_uses_best_endpoint_and_reports_failure(monkeypatch):
+    attempted = []
+
+    async def fake_connect(url):
+        attempted.append(url)
+        raise OSError("refused")
+
+    monkeypatch.setattr("alphasec.websocket.async_ws.connect", fake_connect)
+    pool = EndpointPool([A, B])
+    pool.report(B, 0.001)
+    manager = AsyncWebsocketManager(A, endpoints=pool)
+    with pytest.raises(OSError):
+        await manager.connect()
+    assert attempted == ["ws://b.test/ws"]
+    assert pool.best() == A
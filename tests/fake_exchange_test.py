@@ -0,0 +1,137 @@
+"""Offline end-to-end tests against the in-process FakeExchange."""
+import asyncio
+import os
+import threading
+from decimal import Decimal
+
+import pytest
+
+from alphasec import Agent, AlphasecSigner, load_config
+from alphasec.api.async_api import AsyncAPI
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT, MARKET, QUOTE_MODE, SELL
+from alphasec.perp.constants import GTC, IOC
+from alphasec.testing import FakeExchange, MatchingEngine, decode_tx
+from alphasec.testing.engine import CANCELED, FILLED, POST, REJECTED
+from alphasec.websocket import async_ws
+from alphasec.websocket.async_ws import AsyncWebsocketManager
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+OWNER = CONFIG["l1_address"].lower()
+
+
+def engine():
+    return MatchingEngine(clock_ms=lambda: 0)
+
+
+def test_engine_price_time_priority_and_partial_fill():
+    e = engine()
+    e.place("a1", "maker", "1_2", SELL, Decimal("1.01"), Decimal("5"))
+    e.place("a2", "maker", "1_2", SELL, Decimal("1.00"), Decimal("3"))
+    e.place("a3", "maker2", "1_2", SELL, Decimal("1.00"), Decimal("3"))
+    order, trades = e.place("b1", "taker", "1_2", BUY, Decimal("1.01"), Decimal("7"))
+    assert [(t.maker.order_id, t.price, t.quantity) for t in trades] == [
+        ("a2", Decimal("1.00"), Decimal("3")), ("a3", Decimal("1.00"), Decimal("3")),
+        ("a1", Decimal("1.01"), Decimal("1"))]
+    assert order.status == FILLED
+    assert e.depth("1_2") == {"bids": [], "asks": [["1.01", "4"]]}
+    assert [o.order_id for o in e.open_orders("maker")] == ["a1"]
+
+
+def test_engine_ioc_post_only_and_quote_market():
+    e = engine()
+    e.place("s", "maker", "1_2", SELL, Decimal("2"), Decimal("10"))
+    ioc, _ = e.place("i", "taker", "1_2", BUY, Decimal("2"), Decimal("15"), tif=IOC)
+    assert ioc.status == CANCELED and ioc.executed_qty == 10
+    e.place("s2", "maker", "1_2", SELL, Decimal("2"), Decimal("10"))
+    post, _ = e.place("p", "taker", "1_2", BUY, Decimal("2"), Decimal("1"), tif=POST)
+    assert post.status == REJECTED
+    market, trades = e.place("m", "taker", "1_2", BUY, Decimal("0"), Decimal("0"), tif=3,
+                             quote_quantity=Decimal("5"))
+    assert market.status == FILLED and market.executed_qty == Decimal("2.5")
+
+
+async def test_async_orders_match_and_duplicates_are_rejected():
+    async with FakeExchange() as exchange:
+        exchange.seed_book("KAIA/USDT", asks=[(1.5, 4)])
+        api = AsyncAPI(exchange.url, signer=AlphasecSigner(CONFIG))
+        buy = await api.order("KAIA/USDT", BUY, price=1.5, quantity=10, order_type=LIMIT, order_mode=BASE_MODE)
+        assert buy["status"] and buy["order_id"].startswith("0x")
+        depth = await api.get_depth("KAIA/USDT")
+        assert depth["bids"] == [["1.5", "6.0"]] and depth["asks"] == []
+        open_orders = await api.get_open_orders(OWNER, "KAIA/USDT")
+        assert [o["orderId"] for o in open_orders] == [buy["order_id"]]
+        assert (await api.cancel(buy["order_id"]))["status"]
+        assert await api.get_open_orders(OWNER, "KAIA/USDT") == []
+
+        tx = api.signer.generate_alphasec_transaction(1, api.signer.create_cancel_all_data())
+        assert decode_tx(tx).payload() == {"l1owner": CONFIG["l1_address"]}
+        assert (await api.post("/api/v1/order/cancel/all", {"tx": tx}))["code"] == 200
+        duplicate = await api.post("/api/v1/order/cancel/all", {"tx": tx})
+        assert duplicate["code"] == 400 and "already known" in duplicate["errMsg"]
+        await api.close()
+
+
+async def test_rate_limit_and_injected_failures():
+    async with FakeExchange(rate_limits={"query": (1, 2)}) as exchange:
+        api = AsyncAPI(exchange.url)
+        api._initialized = True
+        exchange.fail_next(1, status=503)
+        with pytest.raises(Exception):
+            await api.get_tickers()
+        await api.get_tickers()
+        await api.get_tickers()
+        limited = await api.get("/api/v1/market/ticker")
+        assert limited["code"] == 429 and exchange.stats["rate_limited"] == 1
+        await api.close()
+
+
+async def test_ws_events_and_reconnect(monkeypatch):
+    monkeypatch.setattr(async_ws, "RECONNECT_INITIAL_DELAY_SECS", 0.01)
+    async with FakeExchange() as exchange:
+        manager = AsyncWebsocketManager(exchange.url)
+        await manager.connect()
+        run = asyncio.ensure_future(manager.run())
+        trades, events = asyncio.Queue(), asyncio.Queue()
+        await manager.subscribe("trade@1_2", trades.put_nowait)
+        await manager.subscribe(f"userEvent@{CONFIG['l1_address']}", events.put_nowait)
+        await asyncio.sleep(0.05)
+
+        assert exchange.drop_connections() == 1
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if manager.ws_ready and exchange.stats["ws_connections"] == 2:
+                break
+        await asyncio.sleep(0.05)   # let the restored subscribe frames land
+
+        exchange.seed_book("KAIA/USDT", bids=[(1.0, 2)])
+        api = AsyncAPI(exchange.url, signer=AlphasecSigner(CONFIG))
+        await api.order("KAIA/USDT", SELL, price=1.0, quantity=2, order_type=LIMIT, order_mode=BASE_MODE)
+        trade = await asyncio.wait_for(trades.get(), 2)
+        assert trade[0]["price"] == "1.0" and trade[0]["quantity"] == "2"
+        event_types = [(await asyncio.wait_for(events.get(), 2))[0]["event_type"] for _ in range(2)]
+        assert event_types == ["NEW", "TRADE"]
+        await manager.stop()
+        run.cancel()
+        await api.close()
+
+
+def test_sync_agent_spot_perp_and_ws_in_thread():
+    with FakeExchange() as exchange:
+        exchange.seed_book("BTCUSDT", asks=[(100, "0.5")])
+        agent = Agent(exchange.url, signer=AlphasecSigner(CONFIG))
+        agent.start()
+        received = threading.Event()
+        agent.subscribe("depth@KAIA/USDT", lambda msg: received.set(), timeout=5)
+        try:
+            order = agent.api.order("KAIA/USDT", BUY, price=0.9, quantity=1, order_type=LIMIT, order_mode=BASE_MODE)
+            assert order["status"]
+            assert received.wait(5)
+
+            tx_hash = agent.perp.order("BTCUSDT", BUY, price="100", quantity="0.2", tif=GTC)
+            assert agent.perp.get_order(tx_hash)["status"] == FILLED
+            assert agent.perp.get_depth("BTCUSDT")["asks"] == [["100", "0.3"]]
+            market = agent.api.order("KAIA/USDT", SELL, price=0, quantity=0.5, order_type=MARKET,
+                                     order_mode=QUOTE_MODE)
+            assert agent.api.get_order_by_id(market["order_id"])["executedQty"] == "0.5555555555555555555555555556"
+        finally:
+            agent.stop()
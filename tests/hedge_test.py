@@ -0,0 +1,82 @@
+"""Offline tests for HedgePolicy on AsyncAPI."""
+import asyncio
+
+import httpx
+import pytest
+
+from alphasec.api.async_api import AsyncAPI
+from alphasec.api.hedge import HedgePolicy
+
+
+def test_default_patterns():
+    policy = HedgePolicy()
+    assert policy.matches("/api/v1/market/depth?marketId=1_2&limit=100")
+    assert policy.matches("/fapi/v1/market/ticker")
+    assert policy.matches("/api/v1/order/0xabc")
+    assert policy.matches("/fapi/v1/order/123")
+    assert not policy.matches("/api/v1/order/open")
+    assert not policy.matches("/fapi/v1/order/list")
+    assert not policy.matches("/api/v1/market/tokens")
+
+
+def test_delay_tracks_percentile():
+    policy = HedgePolicy(percentile=0.9, initial_delay=0.2, min_delay=0.0)
+    assert policy.delay() == 0.2
+    for i in range(100):
+        policy.record(i / 1000)
+    assert policy.delay() == pytest.approx(0.09)
+
+
+async def test_slow_primary_is_hedged_and_loser_cancelled():
+    calls, cancelled = [], []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        try:
+            await asyncio.sleep(1.0 if len(calls) == 1 else 0.0)
+        except asyncio.CancelledError:
+            cancelled.append(len(calls))
+            raise
+        return httpx.Response(200, json={"code": 200, "result": {"bids": [], "n": len(calls)}})
+
+    api = AsyncAPI("http://offline.test", hedge_policy=HedgePolicy(initial_delay=0.02))
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api._initialized = True
+    started = asyncio.get_running_loop().time()
+    response = await api.get("/api/v1/market/depth?marketId=1_2")
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert response["result"]["n"] == 2
+    await asyncio.sleep(0)
+    assert cancelled == [2]
+    assert api.hedge_policy.stats()["hedge_wins"] == 1
+    await api.close()
+
+
+async def test_budget_caps_hedges_and_unmatched_paths_are_not_hedged():
+    calls = []
+
+    async def send():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    policy = HedgePolicy(initial_delay=0.0, min_delay=0.0, budget=0.0)
+    # One starting credit, no refill: only the first request may hedge.
+    for _ in range(3):
+        await policy.run(send)
+    assert policy.hedged == 1 and len(calls) == 4
+
+
+async def test_error_on_one_leg_uses_the_other():
+    attempts = []
+
+    async def send():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.02)
+            raise httpx.ReadError("reset")
+        await asyncio.sleep(0.05)
+        return "backup"
+
+    policy = HedgePolicy(initial_delay=0.005)
+    assert await policy.run(send) == "backup"
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from alphasec.history import ColumnStore, HistorySync
+from alphasec.history import sync as sync_mod
+
+ADDR = "0x70dBb395AF2eDCC2833D803C03AbBe56ECe7c25c"
+
+
+def test_column_store_roundtrip_and_reopen(tmp_path):
+    path = str(tmp_path / "s")
+    with ColumnStore(path, [("time", "i64"), ("px", "str"), ("w", "f64")]) as store:
+        store.append([{"time": 1, "px": "0.15", "w": 1.5}, {"time": 2, "px": "", "w": None}])
+        assert list(store.column("time")) == [1, 2]
+        assert list(store.column("px")) == ["0.15", ""]
+        assert store.column("px")[-2] == "0.15"
+    with ColumnStore(path) as store:
+        store.append([{"time": 3, "px": "12345.6"}])
+        assert list(store.scan(["time", "px"]))[-1] == {"time": 3, "px": "12345.6"}
+        assert len(store) == 3
+
+
+def test_column_store_drops_uncommitted_tail(tmp_path):
+    path = str(tmp_path / "s")
+    store = ColumnStore(path, [("time", "i64"), ("px", "str")])
+    store.append([{"time": 1, "px": "1"}])
+    # Simulate a crash after the column files were written but before the
+    # meta commit: stray bytes past the committed length.
+    with open(str(tmp_path / "s" / "time.i64"), "ab") as f:
+        f.write(b"\x00" * 8)
+    with open(str(tmp_path / "s" / "px.utf8"), "ab") as f:
+        f.write(b"junk")
+    store = ColumnStore(path)
+    store.append([{"time": 2, "px": "2"}])
+    assert list(store.column("time")) == [1, 2]
+    assert list(store.column("px")) == ["1", "2"]
+    store.close()
+
+
+def test_column_store_rejects_schema_mismatch(tmp_path):
+    ColumnStore(str(tmp_path), [("time", "i64")])
+    with pytest.raises(ValueError, match="schema mismatch"):
+        ColumnStore(str(tmp_path), [("time", "str")])
+
+
+class FakeServer:
+    """Transfer history backend honouring from/to/limit, newest first."""
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    def get_transfer_history(self, addr, token_id=None, from_msec=None, to_msec=None, limit=100):
+        self.calls.append((from_msec, to_msec))
+        rows = [r for r in self.records if from_msec <= r["timestamp"] <= to_msec]
+        rows.sort(key=lambda r: -r["timestamp"])
+        return rows[:limit]
+
+
+class FakeAgent:
+    l1_address = ADDR
+
+    def __init__(self, server):
+        self._server = server
+
+    def get_transfer_history(self, *args, **kwargs):
+        return self._server.get_transfer_history(*args, **kwargs)
+
+
+def _transfer(i, ts):
+    return {"id": str(i), "timestamp": ts, "amount": f"{i}.5", "tokenId": "2"}
+
+
+def test_sync_fetches_delta_only(tmp_path):
+    server = FakeServer([_transfer(i, 1000 + i) for i in range(5)])
+    sync = HistorySync(FakeAgent(server), str(tmp_path), lookback_ms=10)
+    assert sync.sync(["transfers"], now_msec=2000) == {"transfers": 5}
+
+    server.records.append(_transfer(5, 1500))
+    server.calls.clear()
+    assert sync.sync(["transfers"], now_msec=3000) == {"transfers": 1}
+    assert server.calls == [(1004 - 10, 3000)]   # from the checkpoint, not from 0
+
+    with sync.store("transfers") as store:
+        assert list(store.column("id")) == ["0", "1", "2", "3", "4", "5"]
+        assert list(store.column("amount"))[-1] == "5.5"
+        assert json.loads(store.column("raw")[0])["tokenId"] == "2"
+    assert sync.checkpoint("transfers")["hwm"] == 1500
+
+
+def test_sync_bisects_full_pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(sync_mod, "PAGE_LIMIT", 4)
+    server = FakeServer([_transfer(i, 100 + i * 10) for i in range(11)])
+    sync = HistorySync(FakeAgent(server), str(tmp_path))
+    assert sync.sync(["transfers"], now_msec=1000) == {"transfers": 11}
+    with sync.store("transfers") as store:
+        assert list(store.column("time")) == sorted(store.column("time"))
+
+
+def test_sync_recovers_rows_appended_before_checkpoint(tmp_path, monkeypatch):
+    server = FakeServer([_transfer(i, 1000 + i) for i in range(3)])
+    sync = HistorySync(FakeAgent(server), str(tmp_path))
+    monkeypatch.setattr(HistorySync, "_write_checkpoint", lambda *a: None)   # "crash"
+    sync.sync(["transfers"], now_msec=2000)
+    monkeypatch.undo()
+    assert sync.sync(["transfers"], now_msec=2000) == {"transfers": 0}
+    with sync.store("transfers") as store:
+        assert len(store) == 3
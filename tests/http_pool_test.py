@@ -0,0 +1,62 @@
+"""Offline tests for connection-pool / timeout options and warmup()."""
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from alphasec.api.api import API
+from alphasec.api.async_api import AsyncAPI
+
+
+def test_async_client_options_are_applied():
+    api = AsyncAPI("http://offline.test", timeout=10, max_connections=256,
+                   max_keepalive_connections=64, keepalive_expiry=30, connect_timeout=1.5, pool_timeout=0.5)
+    assert api.timeouts == httpx.Timeout(10, connect=1.5, read=10, pool=0.5)
+    client = api._build_client()
+    pool = client._transport._pool
+    assert pool._max_connections == 256
+    assert pool._max_keepalive_connections == 64
+    assert pool._keepalive_expiry == 30
+    assert client.timeout.connect == 1.5
+
+
+def test_async_http2_requires_h2():
+    pytest.importorskip("h2")
+    client = AsyncAPI("http://offline.test", http2=True)._build_client()
+    assert client._transport._pool._http2 is True
+
+
+async def test_async_warmup_issues_concurrent_requests():
+    in_flight, peak = [0], [0]
+
+    async def handler(request):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.02)
+        in_flight[0] -= 1
+        return httpx.Response(404)
+
+    api = AsyncAPI("http://offline.test")
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await api.warmup(connections=4)
+    assert peak[0] == 4
+    await api.close()
+
+
+def test_sync_pool_and_phase_timeouts(monkeypatch):
+    api = API("http://offline.test", timeout=10, pool_maxsize=64, connect_timeout=2)
+    assert api.timeout == (2, 10)
+    adapter = api.session.get_adapter("https://api.alphasec.trade")
+    assert adapter._pool_maxsize == 64
+
+    urls = []
+    monkeypatch.setattr(api.session, "get", lambda url, timeout=None: urls.append((url, timeout)))
+    api.warmup(connections=3)
+    assert urls == [("http://offline.test/api/v1/market", (2, 10))] * 3
+
+
+def test_sync_defaults_keep_plain_session():
+    api = API("http://offline.test", timeout=5)
+    assert api.timeout == 5
+    assert isinstance(api.session.get_adapter("https://x"), requests.adapters.HTTPAdapter)
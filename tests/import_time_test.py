@@ -0,0 +1,63 @@
+"""Import-cost guards: ``import alphasec`` must stay lazy.
+
+Each check runs in a fresh interpreter so modules imported by other tests do
+not hide a regression.
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ["web3", "ens", "httpx", "websockets", "websocket", "requests", "pydantic", "aiohttp"]
+
+# Generous wall-clock budgets (seconds); they catch an accidental eager web3
+# import (~0.5s on its own) without flaking on slow CI machines.
+BARE_IMPORT_BUDGET = 0.25
+SIGNER_IMPORT_BUDGET = 1.0
+
+
+def _probe(statement: str) -> dict:
+    code = (
+        "import json, sys, time\n"
+        "t0 = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - t0\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY!r} if m in sys.modules]}}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_bare_import_loads_no_dependencies():
+    result = _probe("import alphasec")
+    assert result["loaded"] == []
+    assert result["elapsed"] < BARE_IMPORT_BUDGET
+
+
+def test_signing_path_does_not_import_web3_or_transports():
+    result = _probe(
+        "from alphasec import AlphasecSigner, load_config\n"
+        "from alphasec.transaction.sign import AlphasecSigner"
+    )
+    assert set(result["loaded"]) <= {"pydantic"}
+    assert result["elapsed"] < SIGNER_IMPORT_BUDGET
+
+
+def test_agent_import_skips_web3():
+    result = _probe("from alphasec import Agent, AsyncAgent")
+    assert "web3" not in result["loaded"]
+    assert "ens" not in result["loaded"]
+
+
+def test_lazy_exports_resolve():
+    import alphasec
+    import alphasec.perp
+    import alphasec.websocket
+
+    for name in alphasec.__all__:
+        assert getattr(alphasec, name) is not None
+    assert alphasec.PerpAgent is alphasec.perp.PerpAgent
+    assert alphasec.websocket.AsyncWebsocketManager is alphasec.AsyncWebsocketManager
+    with pytest.raises(AttributeError):
+        alphasec.NotAThing
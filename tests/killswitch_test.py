@@ -0,0 +1,48 @@
+"""Pre-signed kill switch against the FakeExchange."""
+import asyncio
+import os
+
+from alphasec import AlphasecSigner, AsyncAgent, load_config
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT
+from alphasec.killswitch import KillSwitch
+from alphasec.perp.constants import GTC
+from alphasec.testing import FakeExchange
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+
+
+async def test_trigger_cancels_spot_and_every_perp_market():
+    async with FakeExchange() as exchange:
+        async with AsyncAgent(exchange.url, signer=AlphasecSigner(CONFIG)) as agent:
+            await agent.order("KAIA/USDT", BUY, price=0.5, quantity=10, order_type=LIMIT, order_mode=BASE_MODE)
+            await agent.perp.order("BTCUSDT", BUY, "100", "0.5", GTC)
+            await agent.perp.order("ETHUSDT", BUY, "10", "1", GTC)
+
+            async with KillSwitch(agent.api, agent.perp, refresh_interval=0.05) as kill:
+                assert kill.targets == ["spot", "BTCUSDT", "ETHUSDT"]
+                first = kill._signed
+                await asyncio.sleep(0.2)
+                assert kill._signed[0] > first[0] and kill._signed[1] != first[1]   # re-signed in background
+
+                report = await kill.trigger()
+                assert report.ok and [s.target for s in report.shots] == kill.targets
+                assert all(0 < s.wire <= s.response <= report.duration for s in report.shots)
+                assert report.signature_age < 1.0
+                assert exchange.spot.open_orders() == [] and exchange.perp.open_orders() == []
+
+                await asyncio.sleep(0.1)
+                assert kill.armed   # re-signed after firing
+                again = await kill.trigger()
+                assert again.ok and not set(s.tx_hash for s in again.shots) & set(s.tx_hash for s in report.shots)
+
+
+async def test_failed_target_is_reported_not_raised():
+    async with FakeExchange() as exchange:
+        async with AsyncAgent(exchange.url, signer=AlphasecSigner(CONFIG)) as agent:
+            kill = KillSwitch(agent.api, agent.perp, symbols=["BTCUSDT"], max_age=0.0)
+            await kill.arm()
+            exchange.fail_next(1, status=400)
+            report = await kill.trigger()   # max_age=0: signed inline before firing
+            await kill.disarm()
+    assert len(report.shots) == 2 and not report.ok
+    assert sum(1 for s in report.shots if not s.ok) == 1
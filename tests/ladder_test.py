@@ -0,0 +1,146 @@
+"""Batch normalization, bulk submits and ladder orders against the FakeExchange."""
+import os
+import random
+from decimal import Decimal
+
+import pytest
+
+from alphasec import API, AlphasecSigner, AsyncAgent, AsyncAPI, load_config
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT, SELL
+from alphasec.api.ladder import Ladder
+from alphasec.perp.constants import GTC
+from alphasec.testing import FakeExchange
+from alphasec.transaction.utils import NonceClock, normalize_price_quantities, normalize_price_quantity
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+
+
+def test_batch_normalization_matches_single_calls():
+    rng = random.Random(7)
+    prices = [10 ** rng.uniform(-4, 6) for _ in range(2000)] + [0.5, 1, 10, 100, 1000, 10000, 9999.95, 2.675]
+    quantities = [10 ** rng.uniform(-6, 4) for _ in prices]
+    assert normalize_price_quantities(prices, quantities) == [
+        normalize_price_quantity(p, q) for p, q in zip(prices, quantities)]
+    with pytest.raises(ValueError, match="index 1"):
+        normalize_price_quantities([1.0, -1.0], [1.0, 1.0])
+
+
+def test_normalization_rounds_the_decimal_value():
+    # Float round() sees the binary 10.03749999... and gives 10.037.
+    assert normalize_price_quantity(10.0375, 1.005) == (10.038, 1.0)
+    assert normalize_price_quantities([10.0375, 0.15], [1.015, 2.5]) == [(10.038, 1.02), (0.15, 2.0)]
+
+
+def test_normalization_handles_huge_values_and_rejects_non_finite():
+    # More digits than the default 28-digit decimal context holds.
+    assert normalize_price_quantity(10000, 1e24) == (10000.0, 1e24)
+    assert normalize_price_quantities([1e300, 0.5], [1e300, 1e30]) == [(1e300, 1e300), (0.5, 1e30)]
+    for price, quantity in ((float("inf"), 1.0), (1.0, float("inf")), (float("nan"), 1.0)):
+        with pytest.raises(ValueError, match="finite"):
+            normalize_price_quantity(price, quantity)
+    with pytest.raises(ValueError, match="finite.*index 1"):
+        normalize_price_quantities([1.0, 2.0], [1.0, float("inf")])
+
+
+def test_nonce_clock_never_repeats():
+    clock = NonceClock(clock=lambda: 1700000000.0)
+    assert [clock.next() for _ in range(3)] == [1700000000000, 1700000000001, 1700000000002]
+
+
+def _record_nonces(signer):
+    nonces = []
+    sign = signer.generate_alphasec_transaction
+
+    def recording(timestamp_ms, data, *args, **kwargs):
+        nonces.append(timestamp_ms)
+        return sign(timestamp_ms, data, *args, **kwargs)
+
+    signer.generate_alphasec_transaction = recording
+    return nonces
+
+
+async def test_every_async_submit_draws_from_the_shared_nonce_clock():
+    async with FakeExchange() as exchange:
+        exchange.seed_book("BTCUSDT", asks=[(100, "1")])
+        signer = AlphasecSigner(CONFIG)
+        nonces = _record_nonces(signer)
+        async with AsyncAgent(exchange.url, signer=signer) as agent:
+            await agent.start()
+            agent.api._nonces = NonceClock(clock=lambda: 1700000000.0)   # frozen: only the clock separates them
+            single = await agent.api.order("KAIA/USDT", BUY, 0.5, 10, LIMIT, BASE_MODE)
+            batch = await agent.api.order_many([
+                {"market": "KAIA/USDT", "side": BUY, "price": 0.4, "quantity": 10, "order_type": LIMIT,
+                 "order_mode": BASE_MODE}] * 2)
+            await agent.api.modify(single["order_id"], new_price=0.45, new_qty=10, order_mode=BASE_MODE)
+            await agent.perp.order("BTCUSDT", BUY, "100", "0.25", GTC)
+            await agent.api.cancel(batch[0]["order_id"])
+            await agent.api.cancel_all()
+    assert nonces == [1700000000000 + i for i in range(7)]
+
+
+def test_every_sync_submit_draws_from_the_nonce_clock():
+    with FakeExchange() as exchange:
+        signer = AlphasecSigner(CONFIG)
+        nonces = _record_nonces(signer)
+        api = API(exchange.url, signer=signer)
+        api._nonces = NonceClock(clock=lambda: 1700000000.0)
+        placed = api.order("KAIA/USDT", BUY, 0.5, 10, LIMIT, BASE_MODE)
+        api.modify(placed["order_id"], new_price=0.45, new_qty=10, order_mode=BASE_MODE)
+        api.cancel_all()
+    assert nonces == [1700000000000, 1700000000001, 1700000000002]
+
+
+def test_ladder_levels_are_exact_and_validated():
+    ladder = Ladder("KAIA/USDT", BUY, start=0.3, stop=0.1, levels=3, quantity=60, curve="linear")
+    assert ladder.prices == [0.3, 0.2, 0.1]   # Decimal steps: no 0.30000000000000004
+    assert ladder.quantities == [10.0, 20.0, 30.0]
+    assert Ladder("BTC/USDT", SELL, 100, 100, 1, 0.5).levels == [(100.0, 0.5)]
+    assert len(Ladder("KAIA/USDT", SELL, 1, 2, 3, 30, curve=[1, 0, 2])) == 2
+    with pytest.raises(ValueError, match="collapse"):
+        Ladder("BTC/USDT", BUY, 20000.0, 20000.4, 3, 1)
+    with pytest.raises(ValueError, match="zero size"):
+        Ladder("KAIA/USDT", BUY, 0.5, 0.4, 10, 3)
+
+
+async def test_place_modify_and_cancel_ladder():
+    async with FakeExchange() as exchange:
+        api = AsyncAPI(exchange.url, signer=AlphasecSigner(CONFIG))
+        ladder = Ladder("KAIA/USDT", BUY, start=0.99, stop=0.90, levels=10, quantity=1000, curve="linear")
+        handle = await api.place_ladder(ladder, concurrency=4)
+        assert handle.placed == 10 and len(set(handle.order_ids)) == 10
+        book = sorted(exchange.spot.open_orders(), key=lambda o: -o.price)
+        assert [o.price for o in book] == [Decimal(str(p)) for p in ladder.prices]
+
+        old_ids = list(handle.order_ids)
+        results = await handle.shift(-0.05)
+        assert all(r["status"] for r in results)
+        assert handle.prices[0] == 0.94 and handle.prices[-1] == 0.85
+        assert not set(handle.order_ids) & set(old_ids)
+        assert {o.order_id for o in exchange.spot.open_orders()} == set(handle.order_ids)
+
+        await handle.cancel()
+        assert handle.placed == 0 and exchange.spot.open_orders() == []
+        await api.close()
+
+
+async def test_order_many_across_markets_reports_failures_in_place():
+    async with FakeExchange() as exchange:
+        api = AsyncAPI(exchange.url, signer=AlphasecSigner(CONFIG))
+        orders = [
+            {"market": "KAIA/USDT", "side": BUY, "price": 0.5, "quantity": 10, "order_type": LIMIT,
+             "order_mode": BASE_MODE},
+            {"market": "BTC/USDT", "side": SELL, "price": 30000, "quantity": 0.01, "order_type": LIMIT,
+             "order_mode": BASE_MODE},
+            {"market": "KAIA/USDT", "side": "bogus", "price": 0.5, "quantity": 10, "order_type": LIMIT,
+             "order_mode": BASE_MODE},
+        ]
+        with pytest.raises(Exception):
+            await api.order_many(orders)   # invalid input fails while building, before any submit
+        assert exchange.stats["orders"] == 0
+
+        exchange.fail_next(1, status=400)
+        results = await api.order_many(orders[:2], concurrency=1)
+        assert results[0]["status"] is False and results[0]["order_id"] is None
+        assert results[1]["status"] is True
+        assert [o.order_id for o in exchange.spot.open_orders()] == [results[1]["order_id"]]
+        await api.close()
@@ -0,0 +1,80 @@
+"""Perp market specs: exact rounding, min-notional checks and agent integration."""
+import os
+from decimal import Decimal
+
+import pytest
+
+from alphasec import Agent, AlphasecSigner, AsyncAgent, load_config
+from alphasec.perp.constants import BUY, GTC, MARKET, SELL
+from alphasec.perp.specs import MarketSpec, MarketSpecIndex
+from alphasec.reconcile import PerpVenue, Quote, Reconciler
+from alphasec.testing import FakeExchange
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+
+BTC = MarketSpec.from_market({"marketId": 1, "symbol": "BTCUSDT", "tickSize": "0.1", "lotSize": "0.001",
+                              "minNotional": "5", "maxLeverage": "50"})
+
+
+def test_rounding_is_exact_and_never_more_aggressive():
+    assert BTC.round_price("100.07", BUY) == Decimal("100.0")
+    assert BTC.round_price("100.01", SELL) == Decimal("100.1")
+    assert BTC.round_price("100.05") == Decimal("100.1")
+    with pytest.raises(TypeError, match="float"):
+        BTC.round_price(0.3, BUY)
+    assert BTC.round_quantity("0.0129") == Decimal("0.012")
+    assert BTC.normalize("100.07", "0.0509", BUY) == (Decimal("100.0"), Decimal("0.050"))
+    assert BTC.normalize(None, "1.0005") == (None, Decimal("1.000"))
+
+    with pytest.raises(ValueError, match="quantity rounds to"):
+        BTC.normalize("100", "0.0009", BUY)
+    with pytest.raises(ValueError, match="minNotional"):
+        BTC.normalize("100", "0.049", BUY)
+    with pytest.raises(ValueError, match="index 1"):
+        BTC.normalize_many(["100", "100"], ["0.1", "0.01"], BUY)
+    assert BTC.normalize_many(["100.05", "100.05"], ["0.1", "0.1"], [BUY, SELL]) == [
+        (Decimal("100.0"), Decimal("0.100")), (Decimal("100.1"), Decimal("0.100"))]
+    with pytest.raises(ValueError, match="leverage"):
+        BTC.check_leverage(51)
+
+
+def test_index_merges_and_skips_unusable_rows():
+    index = MarketSpecIndex([{"marketId": 1, "symbol": "BTCUSDT", "tickSize": "0.1"}, {"symbol": "NOID"}])
+    assert index.symbols == ["BTCUSDT"] and index.get("BTCUSDT").lot_size is None
+    index.update([{"marketId": "2", "symbol": "ETHUSDT", "tickSize": "0.01"}])
+    assert "BTCUSDT" in index and index.by_market_id("2").symbol == "ETHUSDT" and len(index) == 2
+
+
+async def test_async_order_modify_and_reconcile_normalize():
+    async with FakeExchange() as exchange:
+        async with AsyncAgent(exchange.url, signer=AlphasecSigner(CONFIG)) as agent:
+            perp = agent.perp
+            await perp.order("BTCUSDT", BUY, "100.07", "0.0509", GTC, normalize=True)
+            (order,) = exchange.perp.open_orders()
+            assert (order.price, order.remaining) == (Decimal("100.0"), Decimal("0.050"))
+            assert perp.specs.get("ETHUSDT").tick_size == Decimal("0.01")
+
+            await perp.modify("BTCUSDT", order.order_id, new_price="100.26", normalize=True)
+            assert exchange.perp.open_orders()[0].price == Decimal("100.3")
+            with pytest.raises(ValueError, match="minNotional"):
+                await perp.order("BTCUSDT", SELL, "101", "0.01", GTC, normalize=True)
+            await perp.order("BTCUSDT", SELL, "0", "0.0104", MARKET, normalize=True)   # price untouched
+
+            await perp.cancel_all("BTCUSDT")
+            reconciler = Reconciler(PerpVenue(perp, normalize=True))
+            await reconciler.reconcile("BTCUSDT", [Quote(BUY, "99.99", "0.1"), Quote(SELL, "101.01", "0.1")])
+            result = await reconciler.reconcile("BTCUSDT", [Quote(BUY, "99.95", "0.1"), Quote(SELL, "101.05", "0.1")])
+            assert result.outcomes == [] and len(result.kept) == 2
+            assert sorted(o.price for o in exchange.perp.open_orders()) == [Decimal("99.9"), Decimal("101.1")]
+
+
+def test_sync_order_normalizes_and_refreshes_specs():
+    with FakeExchange() as exchange:
+        agent = Agent(exchange.url, signer=AlphasecSigner(CONFIG))
+        agent.perp.order("ETHUSDT", SELL, "10.001", "1.009", GTC, normalize=True)
+        (order,) = exchange.perp.open_orders()
+        assert (order.price, order.remaining) == (Decimal("10.01"), Decimal("1.00"))
+
+        exchange.perp_markets[1] = dict(exchange.perp_markets[1], tickSize="0.05")
+        agent.perp._revalidate_markets()
+        assert agent.perp.market_spec("ETHUSDT").tick_size == Decimal("0.05")
@@ -0,0 +1,166 @@
+"""Offline tests for the on-disk MetadataCache (cold start + revalidation)."""
+import asyncio
+import json
+import threading
+
+import httpx
+
+from alphasec.agent import Agent
+from alphasec.api.async_api import AsyncAPI
+from alphasec.api.metadata_cache import MetadataCache
+from alphasec.async_agent import AsyncAgent
+
+URL = "http://offline.test"
+TOKENS_RESULT = [
+    {"tokenId": "1", "l2Symbol": "KAIA", "l1Address": "0x" + "11" * 20, "l1Decimal": 18},
+    {"tokenId": "2", "l2Symbol": "USDT", "l1Address": "0x" + "22" * 20, "l1Decimal": 6},
+]
+MARKETS_RESULT = {"symbols": [{"symbol": "BTCUSDT", "marketId": 7}]}
+
+
+class Response:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def install_session(monkeypatch, gate=None):
+    """Patch requests.Session; ``gate`` (an Event) blocks every GET until set."""
+    calls = []
+
+    class Session:
+        headers = {}
+
+        def get(self, url, params=None, timeout=None):
+            if gate is not None:
+                gate.wait(5)
+            path = url[len(URL):]
+            calls.append(path)
+            if path == "/api/v1/market/tokens":
+                return Response({"result": TOKENS_RESULT})
+            if path == "/fapi/v1/market":
+                return Response({"code": 200, "result": MARKETS_RESULT})
+            return Response({"code": 200, "result": [{"marketId": "7"}]})
+
+    monkeypatch.setattr("alphasec.api.api.requests.Session", Session)
+    return calls
+
+
+def test_entries_are_keyed_by_url_and_network_and_expire(tmp_path):
+    now = [1000.0]
+    cache = MetadataCache(str(tmp_path / "m.json"), max_age=60, clock=lambda: now[0])
+    cache.put(MetadataCache.key(URL + "/", "kairos"), "tokens", TOKENS_RESULT)
+    assert cache.get(MetadataCache.key(URL, "kairos"), "tokens") == TOKENS_RESULT
+    assert cache.get(MetadataCache.key(URL, "mainnet"), "tokens") is None
+    now[0] += 61
+    assert cache.get(MetadataCache.key(URL, "kairos"), "tokens") is None
+
+
+def test_corrupt_file_is_ignored(tmp_path):
+    path = tmp_path / "m.json"
+    path.write_text("{not json")
+    cache = MetadataCache(str(path))
+    assert cache.get("k", "tokens") is None
+    cache.put("k", "tokens", [1])
+    assert json.loads(path.read_text())["entries"]["k"]["tokens"] == [1]
+
+
+def test_sync_cold_start_uses_disk_then_revalidates(tmp_path, monkeypatch):
+    path = str(tmp_path / "m.json")
+    install_session(monkeypatch)
+    agent = Agent(URL, metadata_cache=MetadataCache(path))
+    agent.perp.get_ticker("BTCUSDT")
+
+    # Second process: the server stalls, yet token maps and market ids resolve.
+    gate = threading.Event()
+    calls = install_session(monkeypatch, gate)
+    agent = Agent(URL, metadata_cache=MetadataCache(path))
+    agent.api.initialize()
+    assert agent.api.symbol_token_id_map == {"KAIA": "1", "USDT": "2"}
+    assert agent.perp._resolve_market_id("BTCUSDT") == 7
+    assert calls == []
+    gate.set()
+    agent.api._revalidate_thread.join(5)
+    assert "/api/v1/market/tokens" in calls
+
+
+async def test_async_cold_start_uses_disk_then_revalidates(tmp_path):
+    path = str(tmp_path / "m.json")
+    MetadataCache(path).put(MetadataCache.key(URL), "tokens", TOKENS_RESULT)
+    MetadataCache(path).put(MetadataCache.key(URL), "perp_markets", {"BTCUSDT": 7})
+    gate = asyncio.Event()
+    calls = []
+
+    async def handler(request):
+        await gate.wait()
+        calls.append(request.url.path)
+        if request.url.path == "/api/v1/market/tokens":
+            return httpx.Response(200, json={"result": TOKENS_RESULT[:1]})
+        return httpx.Response(200, json={"code": 200, "result": {"symbols": [{"symbol": "ETHUSDT", "marketId": 8}]}})
+
+    agent = AsyncAgent(URL, metadata_cache=MetadataCache(path))
+    agent.api = AsyncAPI(URL, metadata_cache=MetadataCache(path))
+    agent.api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await agent.api.initialize()
+    assert agent.api.symbol_token_id_map == {"KAIA": "1", "USDT": "2"}
+    assert await agent.perp._resolve_market_id("BTCUSDT") == 7
+
+    gate.set()
+    await agent.api._revalidate_task
+    await agent.perp._revalidate_task
+    assert agent.api.symbol_token_id_map == {"KAIA": "1"}
+    assert MetadataCache(path).get(MetadataCache.key(URL), "perp_markets") == {"BTCUSDT": 7, "ETHUSDT": 8}
+    await agent.api.close()
+
+
+def test_writers_sharing_a_path_use_their_own_temp_files(tmp_path):
+    path = tmp_path / "m.json"
+    caches = [MetadataCache(str(path)) for _ in range(4)]
+    errors = []
+
+    def write(cache, n):
+        try:
+            for i in range(25):
+                cache.put(f"k{n}", "tokens", [i])
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(cache, n)) for n, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and [p.name for p in tmp_path.iterdir()] == ["m.json"]
+    assert json.loads(path.read_text())["version"] == 1
+
+
+async def test_async_paths_do_file_io_off_the_event_loop(tmp_path, monkeypatch):
+    path = str(tmp_path / "m.json")
+    MetadataCache(path).put(MetadataCache.key(URL), "tokens", TOKENS_RESULT)
+    loop_thread = threading.get_ident()
+    io_threads = []
+    for name in ("get", "put"):
+        original = getattr(MetadataCache, name)
+
+        def record(self, *args, original=original):
+            io_threads.append(threading.get_ident())
+            return original(self, *args)
+
+        monkeypatch.setattr(MetadataCache, name, record)
+
+    async def handler(request):
+        if request.url.path == "/api/v1/market/tokens":
+            return httpx.Response(200, json={"result": TOKENS_RESULT})
+        return httpx.Response(200, json={"code": 200, "result": MARKETS_RESULT})
+
+    agent = AsyncAgent(URL, metadata_cache=MetadataCache(path))
+    agent.api = AsyncAPI(URL, metadata_cache=MetadataCache(path))
+    agent.api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await agent.api.initialize()                                  # get, then the revalidation put
+    await agent.api._revalidate_task
+    assert await agent.perp._resolve_market_id("BTCUSDT") == 7    # get, then put
+    await agent.perp._revalidate_markets()                        # the periodic refresh's put
+    assert len(io_threads) == 5 and loop_thread not in io_threads
+    await agent.api.close()
@@ -0,0 +1,118 @@
+"""Metrics registry, Prometheus rendering and SDK instrumentation."""
+import asyncio
+import os
+import urllib.request
+
+from alphasec import API, AlphasecSigner, AsyncAPI, load_config
+from alphasec.api.cache import ResponseCache
+from alphasec.api.constants import BASE_MODE, LIMIT, SELL
+from alphasec.metrics import MetricsRegistry, endpoint_label
+from alphasec.testing import FakeExchange
+from alphasec.websocket import async_ws
+from alphasec.websocket.async_ws import AsyncWebsocketManager
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+
+
+def test_render_counters_gauges_and_histograms():
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests.\nSecond line.", ("path",))
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    registry.gauge("demo_depth", "Depth.").set(1.5)
+    latency = registry.histogram("demo_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert "# HELP demo_requests_total Requests.\\nSecond line." in text
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{path="/a\\"b"} 3' in text
+    assert "demo_depth 1.5" in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_count 3" in text and "demo_seconds_sum 5.55" in text
+    assert registry.counter("demo_requests_total", "Requests.", ("path",)) is requests
+
+
+def test_endpoint_label_collapses_ids():
+    assert endpoint_label("/api/v1/order/0xdeadBEEF?x=1") == "/api/v1/order/:id"
+    assert endpoint_label("/api/v1/wallet/transfer/123/status") == "/api/v1/wallet/transfer/:id/status"
+    assert endpoint_label("/api/v1/market/ticker") == "/api/v1/market/ticker"
+
+
+def test_sync_requests_cache_and_http_exposition():
+    registry = MetricsRegistry()
+    cache = ResponseCache()
+    with FakeExchange() as exchange:
+        api = API(exchange.url, cache=cache, metrics=registry)
+        api.get_tickers()
+        api.get_tickers()
+        exchange.fail_next(1, status=400)
+        try:
+            api.get_market_list()
+        except Exception:
+            pass
+
+    get = registry.get
+    assert get("alphasec_http_requests_total", method="GET", endpoint="/api/v1/market/ticker", status="200") == 1
+    assert get("alphasec_http_requests_total", method="GET", endpoint="/api/v1/market", status="400") == 1
+    assert get("alphasec_http_request_duration_seconds_count", method="GET", endpoint="/api/v1/market/ticker") == 1
+    assert get("alphasec_cache_hits_total") == 1 and get("alphasec_cache_hit_ratio") > 0
+
+    server = registry.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "alphasec_cache_misses_total" in body
+    finally:
+        server.shutdown()
+
+
+async def test_async_ws_messages_reconnects_and_callback_errors(monkeypatch):
+    monkeypatch.setattr(async_ws, "RECONNECT_INITIAL_DELAY_SECS", 0.01)
+    registry = MetricsRegistry()
+    async with FakeExchange() as exchange:
+        manager = AsyncWebsocketManager(exchange.url, metrics=registry)
+        await manager.connect()
+        run = asyncio.ensure_future(manager.run())
+        trades = asyncio.Queue()
+
+        def broken(_):
+            raise RuntimeError("boom")
+
+        await manager.subscribe("trade@1_2", trades.put_nowait)
+        await manager.subscribe(f"userEvent@{CONFIG['l1_address']}", broken)
+        await asyncio.sleep(0.05)
+        assert exchange.drop_connections() == 1
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if manager.ws_ready and exchange.stats["ws_connections"] == 2:
+                break
+        await asyncio.sleep(0.05)
+
+        exchange.seed_book("KAIA/USDT", bids=[(1.0, 2)])
+        api = AsyncAPI(exchange.url, signer=AlphasecSigner(CONFIG), metrics=registry)
+        await api.order("KAIA/USDT", SELL, price=1.0, quantity=2, order_type=LIMIT, order_mode=BASE_MODE)
+        await asyncio.wait_for(trades.get(), 2)
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        run.cancel()
+        await api.close()
+
+    get = registry.get
+    user_event = f"userEvent@{CONFIG['l1_address']}"
+    assert get("alphasec_ws_messages_total", channel="trade@1_2") == 1
+    assert get("alphasec_ws_received_bytes_total", channel="trade@1_2") > 0
+    assert get("alphasec_ws_callback_errors_total", channel=user_event) >= 1
+    assert get("alphasec_ws_reconnects_total") == 1
+    assert get("alphasec_ws_reconnect_duration_seconds_count") == 1
+    assert get("alphasec_ws_pending_callbacks") == 0
+    assert get("alphasec_http_requests_total", method="POST", endpoint="/api/v1/order", status="200") == 1
+
+
+def test_default_has_no_metrics():
+    assert API("http://127.0.0.1:1").metrics is None
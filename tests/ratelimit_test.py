@@ -0,0 +1,106 @@
+"""Offline tests for the client-side RateLimiter."""
+import asyncio
+import threading
+import time
+
+import httpx
+
+from alphasec.api.async_api import AsyncAPI
+from alphasec.api.ratelimit import CANCEL, ORDER, QUERY, RateLimiter, TokenBucket, classify
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_classify():
+    assert classify("GET", "/api/v1/order/open") == QUERY
+    assert classify("POST", "/api/v1/order/cancel") == CANCEL
+    assert classify("POST", "/fapi/v1/order/cancel/all") == CANCEL
+    assert classify("POST", "/fapi/v1/order/modify") == ORDER
+    assert classify("POST", "/api/v1/wallet/transfer") == ORDER
+
+
+def test_token_bucket_refills_up_to_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    for _ in range(3):
+        assert bucket.wait_time(clock()) == 0
+        bucket.take()
+    assert bucket.wait_time(clock()) == 0.5
+    clock.now = 10
+    bucket.wait_time(clock())
+    assert bucket.tokens == 3
+
+
+def test_higher_priority_waiter_wins_the_global_token():
+    clock = FakeClock()
+    limiter = RateLimiter({QUERY: (100, 100)}, global_limit=(1, 1), clock=clock)
+    limiter._global.take()   # global budget exhausted
+    query = limiter._enqueue(QUERY)
+    cancel = limiter._enqueue(CANCEL)
+    clock.now = 1.0          # one global token refilled
+    assert limiter._try_acquire(query) > 0
+    assert limiter._try_acquire(cancel) == 0
+
+
+def test_exhausted_group_does_not_block_other_groups():
+    clock = FakeClock()
+    limiter = RateLimiter({CANCEL: (1, 1)}, global_limit=(100, 100), clock=clock)
+    limiter._buckets[CANCEL].take()
+    cancel = limiter._enqueue(CANCEL)
+    query = limiter._enqueue(QUERY)
+    assert limiter._try_acquire(cancel) == 1.0
+    assert limiter._try_acquire(query) == 0
+
+
+async def test_async_cancels_jump_the_queue():
+    limiter = RateLimiter(global_limit=(50, 1))
+    order = []
+
+    async def send(group, tag):
+        await limiter.aacquire(group)
+        order.append(tag)
+
+    await limiter.aacquire(QUERY)   # drain the burst so everything below queues
+    tasks = [asyncio.ensure_future(send(QUERY, f"q{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(send(CANCEL, "cancel")))
+    await asyncio.gather(*tasks)
+    assert order[0] == "cancel"
+    stats = limiter.stats()
+    assert stats[QUERY]["count"] == 4 and stats[QUERY]["queued"] == 0
+    assert stats[QUERY]["max_delay"] > 0
+
+
+def test_sync_threads_respect_rate():
+    limiter = RateLimiter({ORDER: (100, 1)})
+    started = time.perf_counter()
+    threads = [threading.Thread(target=limiter.acquire, args=(ORDER,)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.perf_counter() - started >= 0.045
+    assert limiter.stats()[ORDER]["count"] == 6
+
+
+async def test_async_api_throttles_requests():
+    limiter = RateLimiter({QUERY: (1000, 1)})
+    seen = []
+
+    async def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"code": 200, "result": []})
+
+    api = AsyncAPI("http://offline.test", rate_limiter=limiter)
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api._initialized = True
+    await asyncio.gather(*(api.get("/api/v1/order/open") for _ in range(3)))
+    assert len(seen) == 3
+    assert limiter.stats()[QUERY]["count"] == 3
+    await api.close()
@@ -0,0 +1,131 @@
+"""Quote reconciliation: diffing and execution against the FakeExchange."""
+import asyncio
+import os
+from decimal import Decimal
+
+from alphasec import AlphasecSigner, AsyncAgent, AsyncAPI, load_config
+from alphasec.api.constants import BUY, SELL
+from alphasec.reconcile import (
+    CANCEL, MODIFY, PLACE, LiveOrder, LiveOrders, PerpVenue, Quote, Reconciler, SpotVenue, diff, parse_order,
+)
+from alphasec.testing import FakeExchange
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+
+
+def _live(order_id, side, price, quantity):
+    return LiveOrder(order_id, "1_2", side, Decimal(str(price)), Decimal(str(quantity)))
+
+
+def test_diff_keeps_resizes_moves_and_trims():
+    live = [_live("a", BUY, 0.99, 10), _live("b", BUY, 0.98, 10), _live("c", BUY, 0.97, 10),
+            _live("d", SELL, 1.01, 10)]
+    desired = [Quote(BUY, 0.99, 10), Quote(BUY, 0.98, 15), Quote(BUY, 0.96, 10),
+               Quote(SELL, 1.01, 10), Quote(SELL, 1.02, 10)]
+    kept, actions = diff(desired, live)
+    assert [o.order_id for o in kept] == ["a", "d"]
+    assert sorted((a.kind, a.order.order_id if a.order else None, a.quote.price if a.quote else None)
+                  for a in actions) == [(MODIFY, "b", 0.98), (MODIFY, "c", 0.96), (PLACE, None, 1.02)]
+
+    kept, actions = diff([], live)
+    assert kept == [] and [a.kind for a in actions] == [CANCEL] * 4
+    kept, actions = diff([Quote(BUY, 0.99, 9.5)], [_live("a", BUY, 0.99, 10)], quantity_tolerance=1)
+    assert [o.order_id for o in kept] == ["a"] and actions == []
+
+
+def test_parse_order_accepts_rest_and_event_rows():
+    rest = {"orderId": "0x1", "marketId": "1_2", "side": "SELL", "origPrice": "1.5", "origQty": "10",
+            "executedQty": "4", "status": "PARTIALLY_FILLED"}
+    assert parse_order(rest) == LiveOrder("0x1", "1_2", SELL, Decimal("1.5"), Decimal("6"))
+    event = {"order_id": "0x1", "market_id": "1_2", "side": "SELL", "orig_price": "1.5", "orig_qty": "10",
+             "executed_qty": "10", "status": "FILLED"}
+    assert parse_order(event) is None
+
+    cache = LiveOrders()
+    cache.load([rest])
+    assert cache.orders("1_2") == [parse_order(rest)]
+    cache.on_user_event([event])
+    assert cache.orders("1_2") == []
+
+
+async def test_spot_reconcile_from_rest_reaches_target():
+    async with FakeExchange() as exchange:
+        api = AsyncAPI(exchange.url, signer=AlphasecSigner(CONFIG))
+        reconciler = Reconciler(SpotVenue(api))
+
+        def book():
+            return sorted((o.side, o.price, o.remaining) for o in exchange.spot.open_orders())
+
+        first = [Quote(BUY, 0.99, 10), Quote(BUY, 0.98, 10), Quote(BUY, 0.97, 10), Quote(SELL, 1.01, 10)]
+        result = await reconciler.reconcile("KAIA/USDT", first)
+        assert [a.kind for a in result.actions] == [PLACE] * 4 and not result.errors
+
+        second = [Quote(BUY, 0.99, 10), Quote(BUY, 0.98, 20), Quote(SELL, 1.02, 10)]
+        result = await reconciler.reconcile("KAIA/USDT", second)
+        assert len(result.kept) == 1 and sorted(a.kind for a in result.actions) == [CANCEL, MODIFY, MODIFY]
+        assert book() == [(BUY, Decimal("0.98"), Decimal("20")), (BUY, Decimal("0.99"), Decimal("10")),
+                          (SELL, Decimal("1.02"), Decimal("10"))]
+
+        result = await reconciler.reconcile("KAIA/USDT", second)
+        assert result.outcomes == [] and len(result.kept) == 3
+        await api.close()
+
+
+async def test_event_fed_cache_sees_own_actions_immediately():
+    async with FakeExchange() as exchange:
+        async with AsyncAgent(exchange.url, signer=AlphasecSigner(CONFIG)) as agent:
+            await agent.start()
+            reconciler = Reconciler(SpotVenue(agent.api), live=LiveOrders())
+            await agent.subscribe(f"userEvent@{CONFIG['l1_address']}", reconciler.live.on_user_event)
+
+            quotes = [Quote(BUY, 0.5, 10), Quote(SELL, 2.0, 10)]
+            assert len((await reconciler.reconcile("KAIA/USDT", quotes)).outcomes) == 2
+            assert (await reconciler.reconcile("KAIA/USDT", quotes)).outcomes == []   # before any event
+            await asyncio.sleep(0.1)   # events arrive; nothing changes
+            assert (await reconciler.reconcile("KAIA/USDT", quotes)).outcomes == []
+
+            result = await reconciler.reconcile("KAIA/USDT", [Quote(BUY, 0.6, 10)])
+            assert sorted(a.kind for a in result.actions) == [CANCEL, MODIFY]
+            await asyncio.sleep(0.1)
+            live = reconciler.live.orders("1_2")   # KAIA/USDT
+            assert [(o.price, o.order_id) for o in live] == [(Decimal("0.6"), result.outcomes[-1].order_id)]
+            assert len(exchange.spot.open_orders()) == 1
+
+
+async def test_perp_reconcile():
+    async with FakeExchange() as exchange:
+        async with AsyncAgent(exchange.url, signer=AlphasecSigner(CONFIG)) as agent:
+            reconciler = Reconciler(PerpVenue(agent.perp))
+            await reconciler.reconcile("BTCUSDT", [Quote(BUY, "100.0", "0.5"), Quote(SELL, "101.0", "0.5")])
+            result = await reconciler.reconcile("BTCUSDT", [Quote(BUY, "100.5", "0.5"), Quote(SELL, "101.0", "0.5")])
+            assert [a.kind for a in result.actions] == [MODIFY] and not result.errors
+            assert sorted(o.price for o in exchange.perp.open_orders()) == [Decimal("100.5"), Decimal("101.0")]
+
+
+async def test_perp_cache_tracks_order_ids_not_tx_hashes():
+    ids = iter(range(1, 1000))
+    async with FakeExchange(perp_order_ids=lambda tx_hash: f"perp-{next(ids)}") as exchange:
+        async with AsyncAgent(exchange.url, signer=AlphasecSigner(CONFIG)) as agent:
+            await agent.start()
+            reconciler = Reconciler(PerpVenue(agent.perp), live=LiveOrders())
+            await agent.subscribe(f"userEvent@{CONFIG['l1_address']}", reconciler.live.on_user_event)
+
+            def cached():
+                return sorted((o.order_id, o.price) for o in reconciler.live.orders("1"))
+
+            def book():
+                return sorted((o.order_id, o.price) for o in exchange.perp.open_orders())
+
+            quotes = [Quote(BUY, "100.0", "0.5"), Quote(SELL, "101.0", "0.5")]
+            result = await reconciler.reconcile("BTCUSDT", quotes)
+            assert all(o.pending and o.order_id.startswith("0x") for o in result.outcomes)
+            assert all(i.startswith("perp-") for i, _ in cached())   # only events add orders, with their ids
+            await asyncio.sleep(0.1)
+            assert cached() == book() and [i for i, _ in book()] == ["perp-1", "perp-2"]
+
+            result = await reconciler.reconcile("BTCUSDT", [Quote(BUY, "100.5", "0.5")])
+            assert sorted(a.kind for a in result.actions) == [CANCEL, MODIFY] and not result.errors
+            assert all(i == "perp-3" for i, _ in cached())   # both replaced orders dropped at once
+            await asyncio.sleep(0.1)
+            assert cached() == book() == [("perp-3", Decimal("100.5"))]
+            assert (await reconciler.reconcile("BTCUSDT", [Quote(BUY, "100.5", "0.5")])).outcomes == []
@@ -0,0 +1,155 @@
+"""Offline tests for the reference-data ResponseCache."""
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from alphasec.api.api import API
+from alphasec.api.async_api import AsyncAPI
+from alphasec.api.cache import ResponseCache
+
+TOKENS_RESULT = [
+    {"tokenId": "1", "l2Symbol": "KAIA", "l1Address": "0x" + "11" * 20, "l1Decimal": 18},
+    {"tokenId": "2", "l2Symbol": "USDT", "l1Address": "0x" + "22" * 20, "l1Decimal": 6},
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry_and_uncached_paths():
+    clock = FakeClock()
+    cache = ResponseCache(clock=clock)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"code": 200, "result": len(calls)}
+
+    assert cache.get_or_fetch("/api/v1/market", None, fetch)["result"] == 1
+    clock.now = 59.0
+    assert cache.get_or_fetch("/api/v1/market", None, fetch)["result"] == 1
+    clock.now = 60.0
+    assert cache.get_or_fetch("/api/v1/market", None, fetch)["result"] == 2
+
+    # Paths without a TTL always go to the server.
+    cache.get_or_fetch("/api/v1/order/open", None, fetch)
+    cache.get_or_fetch("/api/v1/order/open", None, fetch)
+    assert len(calls) == 4
+    assert cache.stats()["hits"] == 1
+
+
+def test_query_string_is_part_of_the_key_and_lru_evicts():
+    cache = ResponseCache(max_entries=2)
+    fetch = lambda: {"result": object()}
+    a = cache.get_or_fetch("/api/v1/market/ticker?marketId=1", None, fetch)
+    b = cache.get_or_fetch("/api/v1/market/ticker?marketId=2", None, fetch)
+    assert a is not b
+    assert cache.get_or_fetch("/api/v1/market/ticker?marketId=1", None, fetch) is a
+    cache.get_or_fetch("/api/v1/market/ticker?marketId=3", None, fetch)
+    # marketId=2 was least recently used.
+    assert cache.get_or_fetch("/api/v1/market/ticker?marketId=1", None, fetch) is a
+    assert cache.get_or_fetch("/api/v1/market/ticker?marketId=2", None, fetch) is not b
+
+
+def test_error_responses_are_not_cached():
+    cache = ResponseCache()
+    responses = iter([{"code": 500, "error": "busy"}, {"code": 200, "result": []}])
+    assert cache.get_or_fetch("/api/v1/market", None, lambda: next(responses))["code"] == 500
+    assert cache.get_or_fetch("/api/v1/market", None, lambda: next(responses))["result"] == []
+
+
+def test_sync_threads_share_one_request():
+    cache = ResponseCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"result": "x"}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch("/api/v1/market", None, fetch)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert [r["result"] for r in results] == ["x"] * 8
+
+
+def test_sync_api_serves_tokens_and_markets_from_cache(monkeypatch):
+    calls = []
+
+    class Response:
+        def __init__(self, payload):
+            self._payload = payload
+
+        def json(self):
+            return self._payload
+
+    class Session:
+        headers = {}
+
+        def get(self, url, params=None, timeout=None):
+            calls.append(url)
+            if url.endswith("/api/v1/market/tokens"):
+                return Response({"result": TOKENS_RESULT})
+            return Response({"code": 200, "result": [{"marketId": "1_2"}]})
+
+    monkeypatch.setattr("alphasec.api.api.requests.Session", Session)
+    api = API("http://offline.test", cache=ResponseCache())
+    for _ in range(3):
+        api.get_market_list()
+    api.get_tokens()
+    assert calls == ["http://offline.test/api/v1/market/tokens", "http://offline.test/api/v1/market"]
+
+
+async def test_async_concurrent_gets_coalesce():
+    counts = {}
+
+    async def handler(request):
+        counts[request.url.path] = counts.get(request.url.path, 0) + 1
+        if request.url.path == "/api/v1/market/tokens":
+            return httpx.Response(200, json={"result": TOKENS_RESULT})
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"code": 200, "result": [{"marketId": "1_2"}]})
+
+    api = AsyncAPI(url="http://offline.test", cache=ResponseCache())
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    results = await asyncio.gather(*(api.get_market_list() for _ in range(20)))
+    assert all(r == [{"marketId": "1_2"}] for r in results)
+    assert counts == {"/api/v1/market/tokens": 1, "/api/v1/market": 1}
+    assert api.cache.stats()["coalesced"] == 19
+    await api.close()
+
+
+async def test_async_waiter_takes_over_when_leader_is_cancelled():
+    cache = ResponseCache()
+    started = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        started.set()
+        await asyncio.sleep(0.05)
+        return {"result": len(calls)}
+
+    leader = asyncio.ensure_future(cache.aget_or_fetch("/api/v1/market", None, fetch))
+    await started.wait()
+    waiter = asyncio.ensure_future(cache.aget_or_fetch("/api/v1/market", None, fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert (await waiter)["result"] == 2
+    with pytest.raises(asyncio.CancelledError):
+        await leader
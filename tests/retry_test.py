@@ -0,0 +1,108 @@
+"""Offline tests for RetryPolicy: resend the same signed tx, never re-sign."""
+import os
+
+import httpx
+import pytest
+import requests
+
+from alphasec import AlphasecSigner, load_config
+from alphasec.api.api import API
+from alphasec.api.async_api import AsyncAPI
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT
+from alphasec.api.retry import RetryPolicy
+
+TOKENS_RESULT = [
+    {"tokenId": "1", "l2Symbol": "KAIA", "l1Address": "0x" + "11" * 20, "l1Decimal": 18},
+    {"tokenId": "2", "l2Symbol": "USDT", "l1Address": "0x" + "22" * 20, "l1Decimal": 6},
+]
+
+
+def no_jitter(**kwargs):
+    return RetryPolicy(base_delay=0.001, rng=lambda: 1.0, **kwargs)
+
+
+def test_applies_only_to_signed_submits_and_queries():
+    policy = RetryPolicy()
+    assert policy.applies("POST", {"tx": "0xabc"})
+    assert policy.applies("GET", None)
+    assert not policy.applies("POST", {"address": "0x1"})
+    assert not RetryPolicy(retry_queries=False).applies("GET", None)
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.3, rng=lambda: 0.5)
+    assert [policy.backoff(n) for n in range(4)] == [0.05, 0.1, 0.15, 0.15]
+
+
+def test_deadline_stops_retries():
+    now = [0.0]
+
+    def send():
+        now[0] += 1.0
+        raise httpx.ConnectTimeout("slow")
+
+    policy = RetryPolicy(max_attempts=10, deadline=2.5, rng=lambda: 0.0, clock=lambda: now[0])
+    with pytest.raises(httpx.ConnectTimeout):
+        policy.run(send)
+    assert policy.retries == 2
+
+
+async def test_async_order_resends_identical_tx_after_timeout():
+    config = load_config(os.path.dirname(__file__) + "/config")
+    bodies = []
+
+    def handler(request):
+        if request.url.path == "/api/v1/market/tokens":
+            return httpx.Response(200, json={"result": TOKENS_RESULT})
+        bodies.append(request.content)
+        if len(bodies) == 1:
+            raise httpx.ReadTimeout("reset", request=request)
+        if len(bodies) == 2:
+            return httpx.Response(503, text="upstream unavailable")
+        return httpx.Response(200, json={"code": 200, "errMsg": "", "result": "order-1"})
+
+    api = AsyncAPI("http://offline.test", signer=AlphasecSigner(config), retry_policy=no_jitter())
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    result = await api.order("KAIA/USDT", BUY, price=1.5, quantity=10, order_type=LIMIT, order_mode=BASE_MODE)
+    assert result["order_id"] == "order-1"
+    assert len(bodies) == 3 and len(set(bodies)) == 1
+    assert api.retry_policy.retries == 2
+    await api.close()
+
+
+async def test_async_unsigned_write_is_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError("down", request=request)
+
+    api = AsyncAPI("http://offline.test", retry_policy=no_jitter())
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api._initialized = True
+    with pytest.raises(httpx.ConnectError):
+        await api.post("/api/v1/wallet/session", {"address": "0x1"})
+    assert len(calls) == 1
+    await api.close()
+
+
+def test_sync_post_retries_connection_errors(monkeypatch):
+    attempts = []
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return {"code": 200, "result": "0xhash"}
+
+    def post(url, json=None, timeout=None):
+        attempts.append(json)
+        if len(attempts) < 3:
+            raise requests.ConnectionError("reset by peer")
+        return Response()
+
+    api = API("http://offline.test", retry_policy=no_jitter())
+    api._initialized = True
+    monkeypatch.setattr(api.session, "post", post)
+    assert api.post("/fapi/v1/order", {"tx": "0xsigned"}) == {"code": 200, "result": "0xhash"}
+    assert attempts == [{"tx": "0xsigned"}] * 3
@@ -0,0 +1,70 @@
+"""Session wallet rotation against the FakeExchange."""
+import asyncio
+import os
+import time
+
+from eth_account import Account
+
+from alphasec import API, AlphasecSigner, AsyncAPI, load_config
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT
+from alphasec.sessions import AsyncSessionManager, SessionManager
+from alphasec.testing import FakeExchange
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+
+
+def _keys(exchange):
+    return {s["publicKey"].lower() for s in exchange._sessions.get(CONFIG["l1_address"].lower(), [])}
+
+
+async def test_async_rotation_swaps_before_expiry_and_deletes_retired():
+    async with FakeExchange() as exchange:
+        api = AsyncAPI(exchange.url, signer=AlphasecSigner(dict(CONFIG, session_enabled=False)))
+        async with AsyncSessionManager(api, lifetime=0.6, renew_before=0.4, grace=0.05) as sessions:
+            first = sessions.wallet
+            assert api.signer.session_enabled and _keys(exchange) == {first.address.lower()}
+            assert sessions.expires_at > time.time()
+
+            await asyncio.sleep(0.35)   # rotated at ~0.2s, old one deleted after grace
+            second = sessions.wallet
+            assert second.address != first.address
+            assert _keys(exchange) == {second.address.lower()}
+            result = await api.order("KAIA/USDT", BUY, price=0.5, quantity=10, order_type=LIMIT, order_mode=BASE_MODE)
+            assert result["status"]
+        await api.close()
+
+
+async def test_async_adopts_registered_session():
+    async with FakeExchange() as exchange:
+        api = AsyncAPI(exchange.url, signer=AlphasecSigner(CONFIG))
+        wallet = Account.create()
+        expiry = int((time.time() + 3600) * 1000)
+        assert (await api.create_session("existing", wallet, expiry, int(time.time() * 1000)))["status"]
+        api.signer.set_session_wallet(wallet)
+
+        async with AsyncSessionManager(api, lifetime=7200, renew_before=60) as sessions:
+            assert sessions.wallet is wallet and sessions.expires_at == expiry / 1000   # nothing registered
+            assert _keys(exchange) == {wallet.address.lower()}
+        await api.close()
+
+
+async def test_async_failed_rotation_keeps_current_wallet_and_retries():
+    async with FakeExchange() as exchange:
+        api = AsyncAPI(exchange.url, signer=AlphasecSigner(CONFIG))
+        async with AsyncSessionManager(api, lifetime=0.6, renew_before=0.5, retry_interval=0.2) as sessions:
+            first = sessions.wallet
+            exchange.fail_next(1, 500)   # the rotation due at ~0.1s fails
+            await asyncio.sleep(0.2)
+            assert sessions.wallet is first
+            await asyncio.sleep(0.25)    # retried at ~0.3s
+            assert sessions.wallet is not first
+        await api.close()
+
+
+def test_sync_rotation_in_thread():
+    with FakeExchange() as exchange:
+        api = API(exchange.url, signer=AlphasecSigner(dict(CONFIG, session_enabled=False)))
+        with SessionManager(api, lifetime=0.6, renew_before=0.4, grace=0.05) as sessions:
+            first = sessions.wallet
+            time.sleep(0.35)
+            assert sessions.wallet is not first and _keys(exchange) == {sessions.wallet.address.lower()}
@@ -0,0 +1,66 @@
+"""Columnar ticker table: in-place updates, cross-market scans and staleness."""
+import asyncio
+import math
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from alphasec import AlphasecSigner, AsyncAgent, load_config  # noqa: E402
+from alphasec.marketdata import TickerTable  # noqa: E402
+from alphasec.perp.constants import BUY, GTC  # noqa: E402
+from alphasec.testing import FakeExchange  # noqa: E402
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+
+
+def test_rows_are_updated_in_place_and_scanned_as_columns():
+    now = [1000.0]
+    table = TickerTable(capacity=1, clock=lambda: now[0])
+    table.update([{"marketId": "1_2", "price": "1.10", "open24h": "1.00", "volume24h": "50"},
+                  {"marketId": "3_2", "price": "9", "open24h": "10"}])
+    on_btc = table.handler("perp_ticker@1")
+    now[0] = 1004.0
+    on_btc([{"market_id": "1", "price": "100", "open24h": "0", "mark_price": "99.5",
+             "quote_volume24h": "1234.5"}])
+
+    assert table.markets == ["1_2", "3_2", "1"] and "1" in table and len(table) == 3
+    assert list(table.perp) == [False, False, True]
+    assert table.get("1").mark_price == 99.5 and math.isnan(table.get("1_2").mark_price)
+    change = table.change_24h()
+    assert change[:2] == pytest.approx([0.10, -0.10]) and math.isnan(change[2])
+    assert table.where(np.abs(change) > 0.05) == ["1_2", "3_2"]
+
+    table.update({"marketId": "1_2", "price": "1.2"})            # partial row keeps other fields
+    assert (table.get("1_2").price, table.get("1_2").volume) == (1.2, 50.0)
+    assert list(table.staleness(now=1010.0)) == [6.0, 10.0, 6.0]
+    assert table.stale(max_age=8.0, now=1010.0) == ["3_2"]
+
+    with pytest.raises(ValueError):
+        table.column("price")[0] = 0.0
+    with pytest.raises(KeyError, match="unknown ticker column"):
+        table.column("bid")
+    with pytest.raises(ValueError, match="ticker@"):
+        table.handler("trade@1_2")
+
+
+async def test_ticker_streams_feed_the_table():
+    async with FakeExchange() as exchange:
+        exchange.seed_book("BTCUSDT", asks=[(100, "1")])
+        async with AsyncAgent(exchange.url, signer=AlphasecSigner(CONFIG)) as agent:
+            await agent.start()
+            table = TickerTable()
+            table.update(await agent.perp.get_tickers(), perp=True)
+            assert table.markets == ["1", "2"] and table.get("1").price == 0.0
+
+            await agent.perp.subscribe("perp_ticker@1", table.handler("perp_ticker@1"))
+            await asyncio.sleep(0.05)
+            await agent.perp.order("BTCUSDT", BUY, "100", "0.25", GTC)
+            for _ in range(100):
+                if table.get("1").price:
+                    break
+                await asyncio.sleep(0.01)
+            ticker = table.get("1")
+            assert (ticker.price, ticker.volume, ticker.quote_volume) == (100.0, 0.25, 25.0)
+            assert table.stale(max_age=60) == []
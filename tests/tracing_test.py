@@ -0,0 +1,129 @@
+"""Per-stage tracing of signed submits, against the offline FakeExchange."""
+import asyncio
+import os
+import sys
+import types
+
+import pytest
+
+from alphasec import API, AlphasecSigner, AsyncAgent, load_config
+from alphasec.agent import Agent
+from alphasec.api.constants import BASE_MODE, BUY, LIMIT, SELL
+from alphasec.api.tracing import HistogramSink, OpenTelemetrySink, Trace, Tracer
+from alphasec.perp.constants import GTC
+from alphasec.testing import FakeExchange
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+
+
+async def test_async_order_stages_and_ack():
+    traces = []
+    tracer = Tracer(traces.append, track_acks=True)
+    async with FakeExchange() as exchange:
+        async with AsyncAgent(exchange.url, signer=AlphasecSigner(CONFIG), tracer=tracer) as agent:
+            await agent.start()
+            await agent.subscribe(f"userEvent@{CONFIG['l1_address']}", tracer.on_user_event)
+            while not exchange.subscribers(f"userEvent@{CONFIG['l1_address']}"):
+                await asyncio.sleep(0.005)
+            order = await agent.order("KAIA/USDT", BUY, price=1.0, quantity=2, order_type=LIMIT, order_mode=BASE_MODE)
+            assert traces == []   # parked until the userEvent arrives
+            for _ in range(200):
+                if traces:
+                    break
+                await asyncio.sleep(0.005)
+            await agent.cancel(order["order_id"])
+
+    first = traces[0]
+    assert first.operation == "order" and first.attributes == {"market": "KAIA/USDT"}
+    assert first.tx_hash == order["order_id"] and first.error is None
+    stages = first.durations()
+    assert {"normalize", "build", "sign", "submit", "pool_wait", "http", "ack"} <= set(stages)
+    assert stages["http"] <= stages["submit"] <= first.duration
+    assert [t.operation for t in traces] == ["order", "cancel"]
+    assert "ack" not in traces[1].durations()   # cancels are not ack-tracked
+
+
+def test_sync_spot_and_perp_with_histogram_and_failures():
+    histogram = HistogramSink()
+    traces = []
+
+    def sink(trace: Trace) -> None:
+        traces.append(trace)
+        histogram(trace)
+
+    with FakeExchange() as exchange:
+        exchange.seed_book("BTCUSDT", asks=[(100, 1)])
+        agent = Agent(exchange.url, signer=AlphasecSigner(CONFIG), tracer=Tracer(sink))
+        try:
+            agent.api.order("KAIA/USDT", SELL, price=2.0, quantity=1, order_type=LIMIT, order_mode=BASE_MODE)
+            agent.perp.order("BTCUSDT", BUY, price="100", quantity="0.5", tif=GTC)
+            agent.perp.set_leverage("BTCUSDT", 5)
+            exchange.fail_next(1, status=400)
+            with pytest.raises(Exception):
+                agent.perp.order("BTCUSDT", BUY, price="100", quantity="0.1", tif=GTC)
+        finally:
+            agent.stop()
+
+    assert [t.operation for t in traces] == ["order", "perp.order", "perp.set_leverage", "perp.order"]
+    assert list(traces[1].durations()) == ["normalize", "build", "sign", "submit"]
+    assert list(traces[2].durations()) == ["sign", "submit"]
+    assert traces[3].error is not None and traces[3].tx_hash is None
+    summary = histogram.summary()
+    assert summary["perp.order"]["total"]["count"] == 2 and histogram.errors["perp.order"] == 1
+    assert histogram.percentile("order", "sign", 50) == summary["order"]["sign"]["p50"]
+
+
+def test_sink_errors_and_ack_timeout_do_not_leak():
+    def broken(trace):
+        raise RuntimeError("sink down")
+
+    tracer = Tracer(broken)
+    tracer.finish(tracer.start("order"), tx_hash="0x1")   # logged, not raised
+
+    emitted = []
+    tracer = Tracer(emitted.append, track_acks=True, ack_timeout=0.0)
+    tracer.finish(tracer.start("order"), tx_hash="0xAA")
+    tracer.finish(tracer.start("order"), tx_hash="0xbb")
+    assert [t.tx_hash for t in emitted] == ["0xAA"]   # expired on the next finish, no ack stage
+    assert "ack" not in emitted[0].durations()
+    tracer.flush()
+    assert len(emitted) == 2 and not tracer.ack("0xbb")
+
+
+def test_default_has_no_tracer():
+    assert API("http://127.0.0.1:1").tracer is None
+
+
+def test_opentelemetry_sink_uses_measured_timestamps(monkeypatch):
+    spans = []
+
+    class Span:
+        def __init__(self, name, start_time, parent=None):
+            self.name, self.start, self.parent, self.stop, self.status = name, start_time, parent, None, None
+            spans.append(self)
+
+        def end(self, end_time):
+            self.stop = end_time
+
+        def set_status(self, status):
+            self.status = status
+
+    class OtelTracer:
+        def start_span(self, name, context=None, start_time=None, attributes=None):
+            return Span(name, start_time, context)
+
+    otel = types.ModuleType("opentelemetry")
+    otel.trace = types.SimpleNamespace(
+        get_tracer=lambda name: OtelTracer(), set_span_in_context=lambda span: span,
+        Status=lambda code, description: (code, description), StatusCode=types.SimpleNamespace(ERROR="ERROR"))
+    monkeypatch.setitem(sys.modules, "opentelemetry", otel)
+
+    trace = Trace("order")
+    trace.mark("sign")
+    trace.end = trace.start + 0.5
+    trace.error = "rejected"
+    OpenTelemetrySink()(trace)
+    root, child = spans
+    assert root.name == "alphasec.order" and root.status == ("ERROR", "rejected")
+    assert child.parent is root and root.start <= child.start <= child.stop <= root.stop
+    assert root.stop - root.start == pytest.approx(5e8, rel=1e-3)
@@ -0,0 +1,63 @@
+"""Trade tape: batched ring ingest and rolling-window statistics."""
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from alphasec.marketdata import TradeTape  # noqa: E402
+
+T0 = 1_700_000_000_000
+
+
+def _brute(trades, window_s, now_ms):
+    inside = [t for t in trades if t[0] > now_ms - window_s * 1000]
+    volume = sum(t[2] for t in inside)
+    buy = sum(t[2] for t in inside if t[3] == "BUY")
+    sell = volume - buy
+    return len(inside), volume, sum(t[1] * t[2] for t in inside) / volume if volume else math.nan, buy, sell
+
+
+def test_windows_match_brute_force_across_ring_wraps():
+    rng = random.Random(7)
+    tape = TradeTape(windows=(5, 30), capacity=1024)
+    trades, now_ms, query = [], T0, T0
+    for _ in range(1500):
+        batch = []
+        for _ in range(rng.randint(0, 6)):
+            now_ms += rng.randint(0, 120)
+            batch.append((now_ms, rng.uniform(99, 101), rng.uniform(0.01, 2), rng.choice(["BUY", "SELL"])))
+        trades += batch
+        tape.add_trades([{"price": str(p), "quantity": str(q), "side": s, "time": t} for t, p, q, s in batch])
+        query = max(query, now_ms + rng.randint(0, 500))   # registered windows only move forward
+        for window in (5, 30, 12):   # 12 is not registered: summed on demand
+            count, volume, vwap, buy, sell = _brute(trades[-2048:], window, query)
+            stats = tape.stats(window, now=query / 1000)
+            assert stats.count == count
+            assert stats.volume == pytest.approx(volume, abs=1e-9)
+            assert (stats.buy_volume, stats.sell_volume) == pytest.approx((buy, sell), abs=1e-9)
+            if count:
+                assert stats.vwap == pytest.approx(vwap)
+                assert stats.imbalance == pytest.approx((buy - sell) / (buy + sell))
+            else:
+                assert math.isnan(stats.vwap) and math.isnan(stats.imbalance)
+    assert tape.total == len(trades) > tape.capacity == len(tape)
+    assert not tape.truncated(30)
+
+
+def test_short_fields_truncation_and_flat_memory():
+    tape = TradeTape(windows=(60,), capacity=4, clock=lambda: T0 / 1000)
+    tape.add_trades({"px": "10", "sz": "1", "side": "BUY"})                     # no time: stamped by the clock
+    tape.add_trades([{"px": "20", "sz": "3", "side": "SELL", "time": T0 - 5000}])   # clamped to arrival order
+    times, prices, sizes, sides = tape.to_arrays()
+    assert list(times) == [T0, T0] and list(sides) == [1, -1]
+    assert tape.vwap(60) == pytest.approx(17.5) and tape.imbalance(60) == pytest.approx(-0.5)
+
+    tape.add_trades([{"px": "1", "sz": "1", "side": "BUY", "time": T0 + i} for i in range(1, 6)])
+    assert tape.count(60) == 4 and tape.volume(60) == 4.0 and tape.truncated(60)
+    assert list(tape.to_arrays()[0]) == [T0 + 2, T0 + 3, T0 + 4, T0 + 5]
+    assert tape.rate(60, now=T0 / 1000 + 10) == pytest.approx(4 / 60)
+    assert tape.count(60, now=T0 / 1000 + 120) == 0 and tape.volume(60) == 0.0   # windows never move back
+    with pytest.raises(ValueError, match="price/size"):
+        tape.add_trades([{"side": "BUY"}])
@@ -0,0 +1,113 @@
+"""Batched withdrawal proof retrieval and L1 execution against FakeChain."""
+import os
+
+from eth_account import Account
+from web3 import AsyncWeb3
+
+from alphasec import AlphasecSigner, load_config
+from alphasec.bridge import NOT_SENT, WithdrawalProofs, group_by_destination
+from alphasec.testing.chain import FakeChain
+from alphasec.transaction.abi import L1_OUTBOX_ABI, L2_SYSTEM_ABI, ZK_INTERFACE_ABI
+from alphasec.transaction.constants import (
+    ALPHASEC_SYSTEM_CONTRACT_ADDR,
+    ALPHASEC_ZK_INTERFACE_CONTRACT_ADDR,
+    KAIROS_ERC20_GATEWAY_CONTRACT_ADDR,
+    KAIROS_OUTBOX_CONTRACT_ADDR,
+)
+
+CONFIG = load_config(os.path.dirname(__file__) + "/config")
+ME = CONFIG["l1_address"]
+STRANGER = Account.create().address
+
+
+def _root(size):
+    return size.to_bytes(32, "big")
+
+
+def _chains(registered_up_to):
+    l2, l1 = FakeChain(), FakeChain(chain_id=1001)
+    for position, (block, destination) in enumerate([(100, ME), (105, KAIROS_ERC20_GATEWAY_CONTRACT_ADDR),
+                                                     (105, ME), (106, STRANGER), (120, ME)]):
+        l2.add_log(ALPHASEC_SYSTEM_CONTRACT_ADDR, L2_SYSTEM_ABI, "L2ToL1Tx", block, caller=ME,
+                   destination=destination, hash=position, position=position, arbBlockNum=block, ethBlockNum=7,
+                   timestamp=1700000000 + block, callvalue=10**18, data=b"")
+    # The tree holds one leaf per withdrawal so far; its size at a block names its root.
+    l2.on_call(ALPHASEC_SYSTEM_CONTRACT_ADDR, L2_SYSTEM_ABI, "sendMerkleTreeState",
+               lambda block, sizes={100: 1, 105: 3}: (sizes[block], _root(sizes[block]), []))
+    l2.on_call(ALPHASEC_ZK_INTERFACE_CONTRACT_ADDR, ZK_INTERFACE_ABI, "constructOutboxProof",
+               lambda block, size, leaf: (leaf.to_bytes(32, "big"), _root(size), [bytes([leaf]) * 32]))
+    l1.on_call(KAIROS_OUTBOX_CONTRACT_ADDR, L1_OUTBOX_ABI, "roots",
+               lambda block, root: root if int.from_bytes(root, "big") <= registered_up_to else bytes(32))
+    l1.on_call(KAIROS_OUTBOX_CONTRACT_ADDR, L1_OUTBOX_ABI, "isSpent", lambda block, index: index == 0)
+    return l2, l1
+
+
+async def test_scan_batches_logs_proofs_and_outbox_status():
+    l2, l1 = _chains(registered_up_to=3)
+    proofs = WithdrawalProofs(AlphasecSigner(CONFIG), AsyncWeb3(l2), AsyncWeb3(l1))
+    found = await proofs.scan(100, 110)
+
+    assert [w.position for w in found] == [0, 1, 2]   # stranger and out-of-range events excluded
+    assert l2.requests == ["eth_getLogs"]
+    assert l2.batches == [["eth_call"] * 2, ["eth_call"] * 3]   # one tree state per block, one proof per event
+    assert l1.batches == [["eth_call"] * 5]                     # two distinct roots + three isSpent
+    assert [(w.root, w.proof) for w in found][1] == (_root(3), [bytes([1]) * 32])
+    assert [w.ready for w in found] == [False, True, True]      # position 0 is spent
+    assert set(group_by_destination(found)) == {ME, KAIROS_ERC20_GATEWAY_CONTRACT_ADDR}
+
+
+async def test_execute_ready_withdrawals_with_consecutive_nonces():
+    l2, l1 = _chains(registered_up_to=1)
+    proofs = WithdrawalProofs(AlphasecSigner(CONFIG), AsyncWeb3(l2), AsyncWeb3(l1))
+    found = await proofs.scan(100, 110)
+    assert [w.registered for w in found] == [True, False, False]
+
+    l1.nonces[ME.lower()] = 4
+    found = [w._replace(registered=True) if w.position > 0 else w for w in found]   # roots landed on L1
+    results = await proofs.execute(found)
+    assert [r["status"] for r in results] == [False, True, True]
+    assert "spent" in results[0]["error"]
+    assert [(tx.nonce, tx.to) for tx in l1.sent] == [(4, KAIROS_OUTBOX_CONTRACT_ADDR), (5, KAIROS_OUTBOX_CONTRACT_ADDR)]
+    assert [r["tx_hash"] for r in results[1:]] == [tx.hash for tx in l1.sent]
+    assert l1.requests.count("eth_sendRawTransaction") == 2
+
+    results = await proofs.execute([found[1]._replace(registered=False)])
+    assert not results[0]["status"] and "not registered" in results[0]["error"]
+
+
+async def test_execute_stops_at_a_rejected_nonce():
+    l2, l1 = _chains(registered_up_to=3)
+    proofs = WithdrawalProofs(AlphasecSigner(CONFIG), AsyncWeb3(l2), AsyncWeb3(l1))
+    found = [w._replace(spent=False) for w in await proofs.scan(100, 110)]
+    l1.nonces[ME.lower()] = 4
+    l1.reject_nonces.add(5)
+
+    results = await proofs.execute(found)
+    assert [r["status"] for r in results] == [True, False, False]
+    assert "underpriced" in results[1]["error"]
+    assert results[2] == {"status": False, "error": NOT_SENT, "tx_hash": None}
+    assert [tx.nonce for tx in l1.sent] == [4]
+    assert l1.requests.count("eth_sendRawTransaction") == 2
+    assert proofs.nonces._next is None
+
+
+async def test_execute_reports_sent_hashes_when_the_transport_fails():
+    l2, l1 = _chains(registered_up_to=3)
+    proofs = WithdrawalProofs(AlphasecSigner(CONFIG), AsyncWeb3(l2), AsyncWeb3(l1))
+    found = [w._replace(spent=False) for w in await proofs.scan(100, 110)]
+    make_request = l1.make_request
+    sends = []
+
+    async def flaky(method, params):
+        if method == "eth_sendRawTransaction":
+            sends.append(method)
+            if len(sends) == 2:
+                raise ConnectionError("connection reset")
+        return await make_request(method, params)
+
+    l1.make_request = flaky
+    results = await proofs.execute(found, wait=False)
+    assert results[0] == {"status": True, "error": None, "tx_hash": l1.sent[0].hash}
+    assert "connection reset" in results[1]["error"]
+    assert results[2] == {"status": False, "error": NOT_SENT, "tx_hash": None}
+    assert len(sends) == 2 and proofs.nonces._next is None
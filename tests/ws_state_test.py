@@ -0,0 +1,85 @@
+"""Connection state machine: waiters resume on the transition, not on a poll."""
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from alphasec.websocket.async_ws import AsyncWebsocketManager
+from alphasec.websocket.state import CONNECTING, READY, RECONNECTING, STOPPED, ConnectionState
+from alphasec.websocket.ws import WebsocketManager
+
+
+def test_threads_wake_on_transition():
+    state = ConnectionState()
+    woke = []
+    waiter = threading.Thread(target=lambda: woke.append((state.wait((READY,), timeout=2), time.perf_counter())))
+    waiter.start()
+    time.sleep(0.02)
+    state.set(READY)
+    set_at = time.perf_counter()
+    waiter.join()
+    assert woke[0][0] == READY and woke[0][1] - set_at < 0.08
+    assert state.wait((READY, STOPPED)) == READY   # already there: no wait
+    with pytest.raises(TimeoutError, match="still ready"):
+        state.wait((STOPPED,), timeout=0.01)
+    with pytest.raises(ValueError):
+        state.set("open")
+
+
+async def test_async_waiters_woken_from_loop_and_from_other_threads():
+    state = ConnectionState()
+    ready = asyncio.ensure_future(state.wait_async((READY,)))
+    stopped = asyncio.ensure_future(state.wait_async((STOPPED,)))
+    await asyncio.sleep(0)
+    state.set(RECONNECTING)
+    await asyncio.sleep(0)
+    assert not ready.done()
+    state.set(READY)
+    assert await asyncio.wait_for(ready, 0.05) == READY
+
+    threading.Thread(target=state.set, args=(STOPPED,)).start()
+    assert await asyncio.wait_for(stopped, 1) == STOPPED
+    with pytest.raises(TimeoutError):
+        await state.wait_async((CONNECTING,), timeout=0.01)
+    assert state._futures == []
+
+
+async def test_async_subscribe_resumes_when_ready_and_fails_when_stopped():
+    manager = AsyncWebsocketManager("http://localhost:8080")
+    manager._ws = AsyncMock()
+    assert manager.state == CONNECTING and not manager.ws_ready
+
+    pending = asyncio.ensure_future(manager.subscribe("trade@5_2", print))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    manager.ws_ready = True
+    assert await asyncio.wait_for(pending, 0.05) == 1
+    assert time.perf_counter() - start < 0.08 and manager.state == READY
+
+    manager.ws_ready = False
+    assert manager.state == RECONNECTING
+    pending = asyncio.ensure_future(manager.unsubscribe("trade@5_2", 1))
+    await asyncio.sleep(0.01)
+    await manager.stop()
+    with pytest.raises(RuntimeError, match="stopped"):
+        await pending
+    assert manager.state == STOPPED and not manager.ws_ready
+
+
+def test_sync_wait_ready_wakes_on_open_and_on_stop():
+    manager = WebsocketManager("http://example.invalid")
+    manager.ws = MagicMock()
+    threading.Timer(0.02, manager.on_open, args=(None,)).start()
+    manager.wait_ready(timeout=2)
+    assert manager.state == READY
+    assert manager.subscribe("trade@5_2", print) == 1
+
+    manager.on_close(None)
+    assert manager.state == RECONNECTING
+    threading.Timer(0.02, manager.stop).start()
+    with pytest.raises(RuntimeError, match="stopped"):
+        manager.unsubscribe("trade@5_2", 1, timeout=2)
+    with pytest.raises(RuntimeError):
+        manager.wait_ready()